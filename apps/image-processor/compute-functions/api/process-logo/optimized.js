@@ -4,6 +4,7 @@
  */
 
 const { spawn } = require('child_process');
+const readline = require('readline');
 const fs = require('fs').promises;
 const path = require('path');
 const https = require('https');
@@ -13,6 +14,80 @@ const { promisify } = require('util');
 const REMBG_MODEL_PATH = '/tmp/models/u2net.onnx';
 const OUTPUT_DIR = '/tmp/output';
 
+// Persistent Python worker (scripts/worker.py): rembg stays loaded across jobs and warm invocations
+// A job that takes longer than this (including time queued behind others) kills and respawns the worker
+const WORKER_JOB_TIMEOUT_MS = parseInt(process.env.WORKER_JOB_TIMEOUT_MS || '120000', 10);
+
+let worker = null;
+let nextJobId = 0;
+const pendingJobs = new Map();
+
+function failPendingJobs(error) {
+  for (const job of pendingJobs.values()) {
+    clearTimeout(job.timer);
+    job.reject(error);
+  }
+  pendingJobs.clear();
+}
+
+function resetWorker(child, error) {
+  // Late events from a worker that was already replaced are ignored
+  if (worker !== child) return;
+  worker = null;
+  failPendingJobs(error);
+  child.kill('SIGKILL');
+}
+
+function getWorker() {
+  if (worker) return worker;
+  const child = spawn('python3', ['/tmp/scripts/worker.py', '--preload', REMBG_MODEL_PATH], {
+    stdio: ['pipe', 'pipe', 'inherit']
+  });
+  worker = child;
+  // Failed spawn (e.g. ENOENT) and EPIPE on a dead worker's stdin would otherwise crash the instance
+  child.on('error', (error) => resetWorker(child, new Error(`Worker failed: ${error.message}`)));
+  child.stdin.on('error', (error) => resetWorker(child, new Error(`Worker input failed: ${error.message}`)));
+  readline.createInterface({ input: child.stdout }).on('line', (line) => {
+    let result;
+    try {
+      result = JSON.parse(line);
+    } catch (error) {
+      // Native libraries can write to fd 1 directly, past the worker's stdout redirect
+      console.warn(`Ignoring non-JSON worker output: ${line}`);
+      return;
+    }
+    const job = pendingJobs.get(result.id);
+    if (!job) return;
+    pendingJobs.delete(result.id);
+    clearTimeout(job.timer);
+    if (result.success) {
+      job.resolve(result);
+    } else {
+      job.reject(new Error(result.error));
+    }
+  });
+  child.on('exit', (code, signal) => {
+    resetWorker(child, new Error(`Worker exited with ${signal || `code ${code}`}`));
+  });
+  return child;
+}
+
+function runWorkerJob(job, timeoutMs = WORKER_JOB_TIMEOUT_MS) {
+  return new Promise((resolve, reject) => {
+    const id = ++nextJobId;
+    const child = getWorker();
+    const timer = setTimeout(() => {
+      pendingJobs.delete(id);
+      reject(new Error(`Worker job timed out after ${timeoutMs}ms`));
+      // Jobs run one at a time, so a hung job would stall every later request on this instance
+      resetWorker(child, new Error('Worker restarted after a job timed out'));
+      getWorker();
+    }, timeoutMs);
+    pendingJobs.set(id, { resolve, reject, timer });
+    child.stdin.write(JSON.stringify({ id, ...job }) + '\n');
+  });
+}
+
 export default async function handler(req, res) {
   // Set CORS headers
   res.setHeader('Access-Control-Allow-Origin', '*');
@@ -81,50 +156,25 @@ export default async function handler(req, res) {
 }
 
 async function aiBackgroundRemoval(imageUrl) {
-  return new Promise((resolve, reject) => {
-    const python = spawn('python3', [
-      '/tmp/scripts/background_removal.py',
-      imageUrl,
-      REMBG_MODEL_PATH
-    ]);
-
-    let output = '';
-    python.stdout.on('data', (data) => {
-      output += data.toString();
-    });
-
-    python.on('close', (code) => {
-      if (code === 0) {
-        const result = JSON.parse(output);
-        resolve(result.output_path);
-      } else {
-        reject(new Error(`Background removal failed: ${output}`));
-      }
+  try {
+    const result = await runWorkerJob({
+      op: 'background_removal',
+      image_url: imageUrl,
+      model_path: REMBG_MODEL_PATH
     });
-  });
+    return result.output_path;
+  } catch (error) {
+    throw new Error(`Background removal failed: ${error.message}`);
+  }
 }
 
 async function pythonEnhancement(imagePath) {
-  return new Promise((resolve, reject) => {
-    const python = spawn('python3', [
-      '/tmp/scripts/enhancement.py',
-      imagePath
-    ]);
-
-    let output = '';
-    python.stdout.on('data', (data) => {
-      output += data.toString();
-    });
-
-    python.on('close', (code) => {
-      if (code === 0) {
-        const result = JSON.parse(output);
-        resolve(result.output_path);
-      } else {
-        reject(new Error(`Enhancement failed: ${output}`));
-      }
-    });
-  });
+  try {
+    const result = await runWorkerJob({ op: 'enhancement', image_path: imagePath });
+    return result.output_path;
+  } catch (error) {
+    throw new Error(`Enhancement failed: ${error.message}`);
+  }
 }
 
 async function aiUpscaling(imagePath, scaleFactor) {
@@ -1,52 +1,80 @@
 #!/usr/bin/env python3
 """
 AI Background Removal Script for Compute Functions
+
+One-shot CLI; worker.py imports remove_background() to run it with a session kept loaded.
 """
 import sys
 import json
 import os
+import time
 import cv2
 import numpy as np
 import requests
 from io import BytesIO
 from PIL import Image
 
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", "/tmp/output")
+
+def output_path(prefix, extension="png"):
+    """Unique output file; a long-lived worker writes many results from one pid"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    return os.path.join(OUTPUT_DIR, f"{prefix}_{os.getpid()}_{time.time_ns()}.{extension}")
+
+def load_image(source):
+    """PIL image from an http(s) URL or a local path"""
+    if source.startswith(("http://", "https://")):
+        response = requests.get(source, timeout=30)
+        response.raise_for_status()
+        image = Image.open(BytesIO(response.content))
+    else:
+        image = Image.open(source)
+    image.load()
+    return image
+
+def new_rembg_session(model_path):
+    """rembg session for a model file such as /tmp/models/u2netp.onnx (None if rembg is missing)"""
+    try:
+        from rembg import new_session
+    except ImportError:
+        return None
+    # The model comes from the path; rembg loads it from that directory
+    model_name = os.path.splitext(os.path.basename(model_path))[0] or 'u2net'
+    os.environ.setdefault('U2NET_HOME', os.path.dirname(model_path))
+    return new_session(model_name)
+
+def remove_background(image, session):
+    """
+    RGBA result of removing the background from a PIL image
+
+    Uses rembg when a session is given, otherwise the traditional threshold method.
+    """
+    if session is not None:
+        from rembg import remove
+        return remove(image, session=session).convert("RGBA")
+    return traditional_background_removal(np.array(image.convert("RGB")))
+
 def main():
     if len(sys.argv) != 3:
         print(json.dumps({"error": "Usage: background_removal.py <image_url> <model_path>"}))
         sys.exit(1)
-    
+
     image_url = sys.argv[1]
     model_path = sys.argv[2]
-    
+
     try:
-        # Download image
-        response = requests.get(image_url, timeout=30)
-        image_data = BytesIO(response.content)
-        image = Image.open(image_data)
-        
-        # Convert to OpenCV
-        cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        # AI background removal using rembg
-        try:
-            from rembg import remove, new_session
-            session = new_session('u2net')
-            result = remove(image, session=session)
-            
-            # Save result
-            output_path = f"/tmp/output/bg_removed_{os.getpid()}.png"
-            result.save(output_path, 'PNG')
-            
-        except ImportError:
-            # Fallback to traditional method
-            output_path = traditional_background_removal(cv_image)
-        
+        image = load_image(image_url)
+        result = remove_background(image, new_rembg_session(model_path))
+
+        # Save result
+        path = output_path("bg_removed")
+        result.save(path, 'PNG')
+
         print(json.dumps({
             "success": True,
-            "output_path": output_path
+            "output_path": path
         }))
-        
+
     except Exception as e:
         print(json.dumps({
             "success": False,
@@ -54,27 +82,20 @@ def main():
         }))
         sys.exit(1)
 
-def traditional_background_removal(cv_image):
-    """Fallback traditional background removal"""
+def traditional_background_removal(rgb):
+    """Fallback traditional background removal; returns an RGBA PIL image"""
     # Convert to grayscale
-    gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
-    
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+
     # Apply Gaussian blur
     blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    
+
     # Create mask
     _, mask = cv2.threshold(blurred, 240, 255, cv2.THRESH_BINARY)
     mask_inv = cv2.bitwise_not(mask)
-    
+
     # Create RGBA image
-    result = cv2.cvtColor(cv_image, cv2.COLOR_BGR2BGRA)
-    result[:, :, 3] = mask_inv
-    
-    # Save
-    output_path = f"/tmp/output/traditional_bg_removed_{os.getpid()}.png"
-    cv2.imwrite(output_path, result)
-    
-    return output_path
+    return Image.fromarray(np.dstack([rgb, mask_inv]), "RGBA")
 
 if __name__ == "__main__":
     main()
@@ -1,60 +1,62 @@
 #!/usr/bin/env python3
 """
 Image Enhancement Script for Compute Functions
+
+One-shot CLI; worker.py imports enhance() to run it without a new interpreter per image.
 """
 import sys
 import json
 import os
-import cv2
-import numpy as np
+import time
 from PIL import Image, ImageEnhance, ImageFilter
 
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", "/tmp/output")
+
+def enhance(pil_image):
+    """Contrast, sharpness and colour boost plus an unsharp mask"""
+    if pil_image.mode not in ("RGB", "RGBA", "L"):
+        pil_image = pil_image.convert("RGBA" if "A" in pil_image.getbands() else "RGB")
+
+    # Enhance contrast
+    enhancer = ImageEnhance.Contrast(pil_image)
+    pil_image = enhancer.enhance(1.2)
+
+    # Enhance sharpness
+    enhancer = ImageEnhance.Sharpness(pil_image)
+    pil_image = enhancer.enhance(1.1)
+
+    # Enhance color
+    enhancer = ImageEnhance.Color(pil_image)
+    pil_image = enhancer.enhance(1.1)
+
+    # Apply unsharp mask
+    return pil_image.filter(ImageFilter.UnsharpMask(radius=1, percent=150, threshold=3))
+
 def main():
     if len(sys.argv) != 2:
         print(json.dumps({"error": "Usage: enhancement.py <image_path>"}))
         sys.exit(1)
-    
+
     image_path = sys.argv[1]
-    
+
     try:
         # Load image
-        image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
-        if image is None:
+        try:
+            image = Image.open(image_path)
+            image.load()
+        except OSError:
             raise ValueError("Could not load image")
-        
-        # Convert to PIL
-        if len(image.shape) == 3:
-            if image.shape[2] == 4:
-                pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA))
-            else:
-                pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-        else:
-            pil_image = Image.fromarray(image)
-        
-        # Enhance contrast
-        enhancer = ImageEnhance.Contrast(pil_image)
-        pil_image = enhancer.enhance(1.2)
-        
-        # Enhance sharpness
-        enhancer = ImageEnhance.Sharpness(pil_image)
-        pil_image = enhancer.enhance(1.1)
-        
-        # Enhance color
-        enhancer = ImageEnhance.Color(pil_image)
-        pil_image = enhancer.enhance(1.1)
-        
-        # Apply unsharp mask
-        pil_image = pil_image.filter(ImageFilter.UnsharpMask(radius=1, percent=150, threshold=3))
-        
+
         # Save enhanced image
-        output_path = f"/tmp/output/enhanced_{os.getpid()}.png"
-        pil_image.save(output_path, 'PNG', optimize=True)
-        
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        output_path = os.path.join(OUTPUT_DIR, f"enhanced_{os.getpid()}_{time.time_ns()}.png")
+        enhance(image).save(output_path, 'PNG', optimize=True)
+
         print(json.dumps({
             "success": True,
             "output_path": output_path
         }))
-        
+
     except Exception as e:
         print(json.dumps({
             "success": False,
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Persistent Worker for Compute Functions
+
+Keeps cv2, PIL and rembg imported and rembg sessions loaded, and runs newline-delimited JSON jobs:
+
+    {"id": 1, "op": "background_removal", "image_url": "https://...", "model_path": "/tmp/models/u2netp.onnx"}
+    {"id": 2, "op": "enhancement", "image_path": "/tmp/output/bg_removed_1_2.png", "output": "shm"}
+    {"id": 3, "op": "stats"}
+    {"op": "shutdown"}
+
+Every job gets one response line carrying its id. Results are written to a PNG ("output": "path",
+the default; the response has "output_path") or left in a shared memory block ("output": "shm";
+the response has "shm": {name, shape, dtype, mode}, and the caller unlinks it). Inputs can come
+from "image_url", "image_path" or an "image_shm" block in the same format.
+
+Usage:
+    worker.py [--preload MODEL_PATH]                  # jobs on stdin, responses on stdout
+    worker.py --socket /tmp/worker.sock [--preload]   # one NDJSON stream per socket connection
+
+The one-shot background_removal.py and enhancement.py CLIs still work on their own.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import socketserver
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from background_removal import load_image, new_rembg_session, remove_background, output_path
+from enhancement import enhance
+
+DEFAULT_MODEL_PATH = os.getenv("REMBG_MODEL_PATH", "/tmp/models/u2net.onnx")
+
+def _create_shm(size):
+    """Shared memory block that outlives this process until the caller unlinks it"""
+    try:
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    except TypeError:
+        # Before Python 3.13 the resource tracker would unlink the block when the worker exits
+        from multiprocessing import resource_tracker
+        block = shared_memory.SharedMemory(create=True, size=size)
+        resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+def read_shm_image(spec):
+    """PIL image copied out of a shared memory block described by {name, shape, mode}"""
+    block = shared_memory.SharedMemory(name=spec["name"], create=False)
+    try:
+        array = np.ndarray(tuple(spec["shape"]), dtype=np.uint8, buffer=block.buf)
+        return Image.fromarray(array.copy(), spec.get("mode"))
+    finally:
+        block.close()
+
+def write_shm_image(image):
+    """Put an image's pixels in a new shared memory block; returns its description"""
+    array = np.asarray(image)
+    block = _create_shm(max(1, array.nbytes))
+    try:
+        np.ndarray(array.shape, dtype=np.uint8, buffer=block.buf)[...] = array
+        return {"name": block.name, "shape": list(array.shape), "dtype": "uint8", "mode": image.mode}
+    finally:
+        block.close()
+
+class Worker:
+    """Runs jobs one at a time with rembg sessions cached per model file"""
+
+    def __init__(self):
+        self.sessions = {}
+        self.jobs = 0
+        self.failed = 0
+        self.started = time.time()
+        # Jobs are serialized so one worker's memory stays at one image plus its models
+        self.lock = threading.Lock()
+
+    def session(self, model_path):
+        if model_path not in self.sessions:
+            start = time.perf_counter()
+            self.sessions[model_path] = new_rembg_session(model_path)
+            print(f"Loaded {model_path} in {(time.perf_counter() - start) * 1000:.0f}ms", file=sys.stderr)
+        return self.sessions[model_path]
+
+    def stats(self):
+        return {
+            "pid": os.getpid(),
+            "jobs": self.jobs,
+            "failed": self.failed,
+            "uptime_s": round(time.time() - self.started, 1),
+            "models": sorted(self.sessions)
+        }
+
+    def _input(self, job):
+        if "image_shm" in job:
+            return read_shm_image(job["image_shm"])
+        source = job.get("image_path") or job.get("image_url")
+        if not source:
+            raise ValueError("Job needs image_url, image_path or image_shm")
+        return load_image(source)
+
+    def _output(self, image, mode, prefix):
+        if mode == "shm":
+            return {"shm": write_shm_image(image)}
+        if mode != "path":
+            raise ValueError(f"Unknown output mode: {mode}")
+        path = output_path(prefix)
+        image.save(path, "PNG")
+        return {"output_path": path}
+
+    def handle(self, job):
+        """Run one job; returns its response (errors are reported, never raised)"""
+        start = time.perf_counter()
+        op = job.get("op")
+        with self.lock:
+            try:
+                if op == "ping":
+                    result = {}
+                elif op == "stats":
+                    result = self.stats()
+                elif op == "background_removal":
+                    session = self.session(job.get("model_path", DEFAULT_MODEL_PATH))
+                    image = remove_background(self._input(job), session)
+                    result = self._output(image, job.get("output", "path"), "bg_removed")
+                elif op == "enhancement":
+                    result = self._output(enhance(self._input(job)), job.get("output", "path"), "enhanced")
+                else:
+                    raise ValueError(f"Unknown op: {op}")
+                self.jobs += 1
+                response = {"id": job.get("id"), "success": True, **result}
+            except Exception as e:
+                self.failed += 1
+                response = {"id": job.get("id"), "success": False, "error": str(e)}
+        response["processing_time_ms"] = int((time.perf_counter() - start) * 1000)
+        return response
+
+    def serve_stream(self, lines, write):
+        """Answer NDJSON jobs from an iterable of lines until it ends or a shutdown job arrives"""
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                write({"id": None, "success": False, "error": f"Invalid JSON: {e}"})
+                continue
+            if job.get("op") == "shutdown":
+                write({"id": job.get("id"), "success": True, "shutdown": True})
+                return False
+            write(self.handle(job))
+        return True
+
+def serve_stdio(worker):
+    # Anything a library prints must not end up in the response stream
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    def write(response):
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+    worker.serve_stream(sys.stdin, write)
+
+def serve_socket(worker, socket_path):
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def write(response):
+                self.wfile.write((json.dumps(response) + "\n").encode())
+                self.wfile.flush()
+
+            lines = (raw.decode() for raw in self.rfile)
+            if not worker.serve_stream(lines, write):
+                threading.Thread(target=self.server.shutdown).start()
+
+    with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as server:
+        print(f"Worker listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent NDJSON worker for background removal and enhancement")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--preload", action="append", default=[], help="rembg model file to load at start (repeatable)")
+    args = parser.parse_args()
+
+    worker = Worker()
+    for model_path in args.preload:
+        worker.session(model_path)
+
+    if args.socket:
+        serve_socket(worker, args.socket)
+    else:
+        serve_stdio(worker)
+
+if __name__ == "__main__":
+    main()
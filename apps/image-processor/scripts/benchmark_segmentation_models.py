@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark rembg segmentation models on the test inputs and write the numbers the service selects by
+
+For each model: session load time, median/p95 per-image inference, peak memory and edge quality.
+Edge quality is the boundary F-score against the input's own alpha when it has one (the image is
+composited onto white first), otherwise the share of the mask boundary lying on an image edge.
+Every model runs in its own process so peak memory isn't inherited from the previous one.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import subprocess
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.services.segmentation_models import (
+    SEGMENTATION_MODELS, boundary_f_score, edge_alignment, default_benchmarks_path
+)
+
+IMAGE_DIRS = ("test-input/logos", "test-input/masks")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def _load_inputs(paths):
+    """(name, model input, reference alpha or None, grayscale) per image"""
+    inputs = []
+    for path in paths:
+        image = Image.open(path)
+        rgba = image.convert("RGBA")
+        alpha = np.asarray(rgba.getchannel("A"))
+        reference = alpha if alpha.min() < 255 else None
+        if reference is not None:
+            # The model sees the logo on white, as an uploaded logo usually arrives
+            white = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+            model_input = Image.alpha_composite(white, rgba).convert("RGB")
+        else:
+            model_input = rgba.convert("RGB")
+        inputs.append((Path(path).name, model_input, reference, np.asarray(model_input.convert("L"))))
+    return inputs
+
+
+def benchmark_model(model: str, paths, runs: int) -> dict:
+    """Measure one model in this process"""
+    from rembg import new_session
+
+    inputs = _load_inputs(paths)
+    base_rss = _rss_mb()
+    start = time.perf_counter()
+    session = new_session(model)
+    load_time_ms = (time.perf_counter() - start) * 1000
+
+    latencies, per_image = [], {}
+    for name, image, reference, gray in inputs:
+        mask = np.asarray(session.predict(image)[0])  # warm-up, and the mask that gets scored
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            session.predict(image)
+            times.append((time.perf_counter() - start) * 1000)
+        latencies.extend(times)
+        if reference is not None:
+            score, metric = boundary_f_score(mask, reference), "boundary_f_score"
+        else:
+            score, metric = edge_alignment(mask, gray), "edge_alignment"
+        per_image[name] = {"latency_ms": round(float(np.median(times)), 1), metric: round(score, 4)}
+
+    scores = [next(v for k, v in numbers.items() if k != "latency_ms") for numbers in per_image.values()]
+    return {
+        "latency_ms": round(float(np.median(latencies)), 1),
+        "p95_latency_ms": round(float(np.percentile(latencies, 95)), 1),
+        "load_time_ms": round(load_time_ms, 1),
+        "peak_memory_mb": round(_peak_rss_mb() - base_rss, 1),
+        "edge_quality": round(float(np.mean(scores)), 4),
+        "images": per_image
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rembg segmentation models")
+    parser.add_argument("--models", default=",".join(SEGMENTATION_MODELS), help="Comma-separated model names")
+    parser.add_argument("--runs", type=int, default=5, help="Timed inferences per image after one warm-up")
+    parser.add_argument("--output", default=default_benchmarks_path(), help="Benchmark JSON the service reads")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for d in IMAGE_DIRS for p in Path(d).glob("*.png"))
+    if args.single:
+        print(json.dumps(benchmark_model(args.single, paths, args.runs)))
+        return
+
+    import onnxruntime
+    import rembg
+
+    results = {}
+    for model in args.models.split(","):
+        print(f"Benchmarking {model} on {len(paths)} images...")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--single", model, "--runs", str(args.runs)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"  failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        results[model] = json.loads(proc.stdout.strip().splitlines()[-1])
+        numbers = results[model]
+        print(f"  {numbers['latency_ms']}ms (p95 {numbers['p95_latency_ms']}ms), "
+              f"{numbers['peak_memory_mb']}MB, edge quality {numbers['edge_quality']}")
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "host": {"machine": platform.machine(), "cpus": os.cpu_count(), "python": platform.python_version()},
+        "onnxruntime": onnxruntime.__version__,
+        "rembg": getattr(rembg, "__version__", None),
+        "runs": args.runs,
+        "images": [Path(p).name for p in paths],
+        "models": results
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Export Real-ESRGAN x4plus/x2plus weights to ONNX for the realesrgan-onnx upscaling backend
+
+Needs torch and basicsr (only on the machine doing the export, not on the service host).
+"""
+
+import argparse
+from pathlib import Path
+
+def main():
+    parser = argparse.ArgumentParser(description="Export RealESRGAN_x{2,4}plus.pth to ONNX")
+    parser.add_argument("--scale", type=int, choices=(2, 4), default=4)
+    parser.add_argument("--weights", help="Defaults to models/RealESRGAN_x<scale>plus.pth")
+    parser.add_argument("--output", help="Defaults to models/RealESRGAN_x<scale>plus.onnx")
+    parser.add_argument("--int8", action="store_true", help="Also write a dynamically quantized .int8.onnx copy")
+    args = parser.parse_args()
+    args.weights = args.weights or f"models/RealESRGAN_x{args.scale}plus.pth"
+    args.output = args.output or f"models/RealESRGAN_x{args.scale}plus.onnx"
+    
+    import torch
+    from basicsr.archs.rrdbnet_arch import RRDBNet
+    
+    model = RRDBNet(num_in_ch=3, num_out_ch=3, num_feat=64, num_block=23, num_grow_ch=32, scale=args.scale)
+    state = torch.load(args.weights, map_location="cpu")
+    model.load_state_dict(state.get("params_ema", state.get("params", state)), strict=True)
+    model.eval()
+    
+    # Height and width are dynamic so the service can feed arbitrary tiles
+    print(f"Exporting {args.weights} -> {args.output}")
+    torch.onnx.export(
+        model,
+        torch.rand(1, 3, 64, 64),
+        args.output,
+        input_names=["input"],
+        output_names=["output"],
+        dynamic_axes={"input": {2: "height", 3: "width"}, "output": {2: "height", 3: "width"}},
+        opset_version=17
+    )
+    
+    if args.int8:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        int8_path = str(Path(args.output).with_suffix("")) + ".int8.onnx"
+        print(f"Quantizing -> {int8_path}")
+        quantize_dynamic(args.output, int8_path, weight_type=QuantType.QUInt8)
+    
+    print("Export complete!")
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ from src.services.supabase_service import supabase_service
 from src.validators import InputValidator, ValidationError, FileValidator
 from src.api.color_analysis import analyze_image_colors
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Initialize services
@@ -37,6 +38,7 @@ class AssetPackRequest(BaseModel):
     include_banner: bool = Field(True, description="Include banner generation")
     output_format: str = Field("png", description="Output format (png, jpg, webp)")
     quality: int = Field(95, ge=1, le=100, description="Output quality (1-100)")
+    preview: bool = Field(False, description="Return low-resolution inline previews instead of uploading full-resolution assets")
     
     class Config:
         # Allow extra fields and make all fields optional by default
@@ -59,6 +61,7 @@ class AssetPackResponse(BaseModel):
     banner_url: Optional[str] = None
     colors: Optional[ColorAnalysis] = None
     processing_time_ms: int
+    preview: bool = False
     error: Optional[str] = None
 
 @router.post("/asset-pack", response_model=AssetPackResponse)
@@ -167,56 +170,62 @@ async def create_asset_pack(request: AssetPackRequest):
             import traceback
             traceback.print_exc()
         
-        # Step 2: Create t-shirt front with logo
-        tshirt_front_result = await overlay_service.overlay_logo_on_tshirt(
-            logo_url=clean_logo_url,
-            tshirt_color=request.tshirt_color,
-            position="left_chest",
-            output_format=request.output_format,
-            quality=request.quality
-        )
+        # Steps 2-4: Render t-shirt front, back and optional banner, then upload them concurrently
+        players_data = [{"number": p.number, "name": p.name} for p in request.players]
         
-        if not tshirt_front_result["success"]:
+        # Preview mode: low-resolution renders returned inline, nothing uploaded or stored
+        if request.preview:
+            kinds = ["tshirt_front", "tshirt_back"] + (["banner"] if request.include_banner else [])
+            preview_result = await overlay_service.create_previews(
+                kinds,
+                logo_url=clean_logo_url,
+                players=players_data,
+                tshirt_color=request.tshirt_color,
+                optional=("banner",)
+            )
+            if not preview_result["success"]:
+                return AssetPackResponse(
+                    success=False,
+                    team_name=request.team_name,
+                    processing_time_ms=int((time.time() - start_time) * 1000),
+                    preview=True,
+                    error=preview_result["error"]
+                )
+            
+            previews = preview_result["previews"]
             return AssetPackResponse(
-                success=False,
+                success=True,
                 team_name=request.team_name,
+                clean_logo_url=clean_logo_url,
+                tshirt_front_url=previews["tshirt_front"]["data_url"],
+                tshirt_back_url=previews["tshirt_back"]["data_url"],
+                banner_url=previews["banner"]["data_url"] if "banner" in previews else None,
+                colors=color_analysis_result,
                 processing_time_ms=int((time.time() - start_time) * 1000),
-                error=f"T-shirt front creation failed: {tshirt_front_result['error']}"
+                preview=True
             )
-        
-        tshirt_front_url = tshirt_front_result["output_url"]
-        
-        # Step 3: Create t-shirt back with roster
-        players_data = [{"number": p.number, "name": p.name} for p in request.players]
-        tshirt_back_result = await overlay_service.overlay_roster_on_tshirt_back(
+        images_result = await overlay_service.create_asset_pack_images(
+            logo_url=clean_logo_url,
+            team_name=request.team_name,
             players=players_data,
             tshirt_color=request.tshirt_color,
+            include_banner=request.include_banner,
             output_format=request.output_format,
             quality=request.quality
         )
         
-        if not tshirt_back_result["success"]:
+        if not images_result["success"]:
             return AssetPackResponse(
                 success=False,
                 team_name=request.team_name,
                 processing_time_ms=int((time.time() - start_time) * 1000),
-                error=f"T-shirt back creation failed: {tshirt_back_result['error']}"
+                error=images_result["error"]
             )
         
-        tshirt_back_url = tshirt_back_result["output_url"]
-        
-        # Step 4: Create banner (optional)
-        banner_url = None
-        if request.include_banner:
-            roster_text = "\n".join([f"{p.number} {p.name}" for p in request.players])
-            banner_result = await overlay_service.create_banner(
-                logo_url=clean_logo_url,
-                team_name=request.team_name,
-                players=players_data
-            )
-            
-            if banner_result["success"]:
-                banner_url = banner_result["output_url"]
+        tshirt_front_url = images_result["tshirt_front_url"]
+        tshirt_back_url = images_result["tshirt_back_url"]
+        banner_url = images_result["banner_url"]
+        logger.info(f"Uploaded {images_result['total_bytes']} bytes in {images_result['upload_time_ms']}ms")
         
         processing_time_ms = int((time.time() - start_time) * 1000)
         
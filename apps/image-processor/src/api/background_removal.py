@@ -4,21 +4,28 @@ API endpoints for AI-powered background removal
 import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
-from src.services.ai_background_remover import AIBackgroundRemover
+from src.services.ai_background_remover import ai_remover
+from src.services.segmentation_models import segmentation_models
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize AI background remover
-ai_remover = AIBackgroundRemover()
+def _select_model(model: Optional[str], latency_budget_ms: Optional[float]) -> str:
+    """Model for a request, by name or latency budget; unknown names are a 400"""
+    try:
+        return segmentation_models.select(model, latency_budget_ms)["model"]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 class BackgroundRemovalRequest(BaseModel):
     """Request model for background removal"""
     image_url: HttpUrl = Field(..., description="URL of the image to process")
     method: str = Field(default="ai", description="Removal method: 'ai', 'hybrid', or 'traditional'")
+    model: Optional[str] = Field(default=None, description="Segmentation model, e.g. 'u2netp', 'u2net', 'silueta', 'isnet-general-use'")
+    latency_budget_ms: Optional[float] = Field(default=None, gt=0, description="Pick the best benchmarked model within this per-image inference time")
 
 class BackgroundRemovalResponse(BaseModel):
     """Response model for background removal"""
@@ -27,6 +34,9 @@ class BackgroundRemovalResponse(BaseModel):
     original_url: HttpUrl
     method_used: str
     file_size_bytes: Optional[int] = None
+    model_used: Optional[str] = None
+    bypassed: bool = False
+    alpha_analysis: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
 @router.post("/remove-background/ai")
@@ -40,16 +50,20 @@ async def remove_background_ai(request: BackgroundRemovalRequest):
     Returns:
         BackgroundRemovalResponse with transparent image
     """
+    model = _select_model(request.model, request.latency_budget_ms)
     try:
-        result = await ai_remover.remove_background_ai(str(request.image_url))
+        result = await ai_remover.remove_background_ai(str(request.image_url), model=model)
         
         if result["success"]:
             return BackgroundRemovalResponse(
                 success=True,
-                processed_url=result["processed_path"],
+                processed_url=result["output_url"],
                 original_url=request.image_url,
                 method_used=result["method"],
-                file_size_bytes=result["file_size_bytes"]
+                file_size_bytes=result["file_size_bytes"],
+                model_used=result.get("model"),
+                bypassed=result.get("bypassed", False),
+                alpha_analysis=result.get("alpha_analysis")
             )
         else:
             return BackgroundRemovalResponse(
@@ -74,16 +88,20 @@ async def remove_background_hybrid(request: BackgroundRemovalRequest):
     Returns:
         BackgroundRemovalResponse with transparent image
     """
+    model = _select_model(request.model, request.latency_budget_ms)
     try:
-        result = await ai_remover.remove_background_hybrid(str(request.image_url))
+        result = await ai_remover.remove_background_hybrid(str(request.image_url), model=model)
         
         if result["success"]:
             return BackgroundRemovalResponse(
                 success=True,
-                processed_url=result["processed_path"],
+                processed_url=result["output_url"],
                 original_url=request.image_url,
                 method_used=result["method"],
-                file_size_bytes=result["file_size_bytes"]
+                file_size_bytes=result["file_size_bytes"],
+                model_used=result.get("model"),
+                bypassed=result.get("bypassed", False),
+                alpha_analysis=result.get("alpha_analysis")
             )
         else:
             return BackgroundRemovalResponse(
@@ -108,21 +126,25 @@ async def remove_background_auto(request: BackgroundRemovalRequest):
     Returns:
         BackgroundRemovalResponse with transparent image
     """
+    model = _select_model(request.model, request.latency_budget_ms)
     try:
         # Try AI first, fallback to hybrid if needed
-        result = await ai_remover.remove_background_ai(str(request.image_url))
+        result = await ai_remover.remove_background_ai(str(request.image_url), model=model)
         
         if not result["success"]:
             logger.info("AI method failed, trying hybrid approach...")
-            result = await ai_remover.remove_background_hybrid(str(request.image_url))
+            result = await ai_remover.remove_background_hybrid(str(request.image_url), model=model)
         
         if result["success"]:
             return BackgroundRemovalResponse(
                 success=True,
-                processed_url=result["processed_path"],
+                processed_url=result["output_url"],
                 original_url=request.image_url,
                 method_used=result["method"],
-                file_size_bytes=result["file_size_bytes"]
+                file_size_bytes=result["file_size_bytes"],
+                model_used=result.get("model"),
+                bypassed=result.get("bypassed", False),
+                alpha_analysis=result.get("alpha_analysis")
             )
         else:
             return BackgroundRemovalResponse(
@@ -141,6 +163,8 @@ class SimpleBackgroundRemovalRequest(BaseModel):
     image_url: str = Field(..., description="URL or file path of the image to process")
     output_format: str = Field(default="png", description="Output format: 'png' or 'jpg'")
     quality: int = Field(default=95, ge=1, le=100, description="Output quality (1-100)")
+    model: Optional[str] = Field(default=None, description="Segmentation model (see /remove-background/models)")
+    latency_budget_ms: Optional[float] = Field(default=None, gt=0, description="Pick the best benchmarked model within this per-image inference time")
 
 @router.post("/remove-background")
 async def remove_background_simple(request: SimpleBackgroundRemovalRequest) -> dict:
@@ -153,11 +177,17 @@ async def remove_background_simple(request: SimpleBackgroundRemovalRequest) -> d
     Returns:
         Dictionary with processing results and Supabase URL
     """
+    model = _select_model(request.model, request.latency_budget_ms)
     try:
-        logger.info(f"Simple background removal request for: {request.image_url}")
+        logger.info(f"Simple background removal request for: {request.image_url} ({model})")
         
-        # Use hybrid method for best results
-        result = await ai_remover.remove_background_hybrid(request.image_url)
+        # Use hybrid method for best results; the result comes back encoded, ready to upload
+        result = await ai_remover.remove_background_hybrid_encoded(
+            request.image_url,
+            output_format=request.output_format,
+            quality=request.quality,
+            model=model
+        )
         
         if not result["success"]:
             return {
@@ -169,46 +199,31 @@ async def remove_background_simple(request: SimpleBackgroundRemovalRequest) -> d
         # Upload to storage
         from src.storage import storage
         
-        # Read the processed image
-        import os
-        if os.path.exists(result["output_url"]):
-            with open(result["output_url"], "rb") as f:
-                file_data = f.read()
-            
-            # Generate filename
-            import time
-            timestamp = int(time.time() * 1000)
-            filename = f"bg_removed_{timestamp}.{request.output_format}"
-            
-            # Upload to Supabase
-            storage_file = await storage.upload_file(
-                file_data=file_data,
-                file_name=filename,
-                bucket='team-logos',
-                content_type=f'image/{request.output_format}'
-            )
-            
-            # Clean up local file
-            try:
-                os.remove(result["output_url"])
-            except:
-                pass
-            
-            return {
-                "success": True,
-                "original_url": request.image_url,
-                "processed_url": storage_file.public_url,
-                "method_used": result["method"],
-                "file_size_bytes": storage_file.file_size,
-                "output_format": request.output_format,
-                "quality": request.quality
-            }
-        else:
-            return {
-                "success": False,
-                "error": "Processed image file not found",
-                "original_url": request.image_url
-            }
+        # Generate filename
+        import time
+        timestamp = int(time.time() * 1000)
+        filename = f"bg_removed_{timestamp}.{request.output_format}"
+        
+        # Upload to Supabase
+        storage_file = await storage.upload_file(
+            file_data=result["data"],
+            file_name=filename,
+            bucket='team-logos',
+            content_type=result["content_type"]
+        )
+        
+        return {
+            "success": True,
+            "original_url": request.image_url,
+            "processed_url": storage_file.public_url,
+            "method_used": result["method"],
+            "model_used": result.get("model"),
+            "bypassed": result.get("bypassed", False),
+            "file_size_bytes": storage_file.file_size,
+            "output_format": request.output_format,
+            "quality": request.quality,
+            "timings_ms": result["timings_ms"]
+        }
             
     except Exception as e:
         logger.error(f"Simple background removal failed: {e}")
@@ -217,3 +232,14 @@ async def remove_background_simple(request: SimpleBackgroundRemovalRequest) -> d
             "error": str(e),
             "original_url": request.image_url
         }
+
+@router.get("/remove-background/models")
+async def list_segmentation_models() -> dict:
+    """
+    Segmentation models available for background removal
+    
+    Returns:
+        Default model and, per model, input size, file size and the benchmarked
+        latency, peak memory and edge quality (None until a benchmark has been run)
+    """
+    return segmentation_models.profiles()
@@ -4,7 +4,7 @@ Banner Generator API - Create sports banners with team rosters
 import os
 import time
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from PIL import Image, ImageDraw, ImageFont
@@ -44,6 +44,7 @@ class BannerResponse(BaseModel):
     filename: str
     file_size_bytes: int
     processing_time_ms: int
+    logo_background_bypassed: bool = False
     error: Optional[str] = None
 
 class BannerGeneratorService:
@@ -101,8 +102,9 @@ class BannerGeneratorService:
             
             # Download and process logo (preprocess if requested)
             logo_image = await self._download_image(request.logo_url)
+            logo_background_bypassed = False
             if style.use_preprocessed_logo:
-                logo_image = await self._preprocess_logo(logo_image)
+                logo_image, logo_background_bypassed = await self._preprocess_logo(logo_image)
             logo_image = await self._resize_logo(logo_image, style)
             
             # Calculate layout
@@ -129,6 +131,7 @@ class BannerGeneratorService:
                 "filename": filename,
                 "file_size_bytes": file_size,
                 "processing_time_ms": processing_time,
+                "logo_background_bypassed": logo_background_bypassed,
                 "error": None
             }
             
@@ -273,23 +276,19 @@ class BannerGeneratorService:
             # Fallback to solid color with requested dimensions
             return Image.new('RGB', (style.banner_width, style.banner_height), style.background_color)
     
-    async def _preprocess_logo(self, logo_image: Image.Image) -> Image.Image:
-        """Preprocess logo to remove background"""
+    async def _preprocess_logo(self, logo_image: Image.Image) -> Tuple[Image.Image, bool]:
+        """Preprocess logo to remove background. Returns (logo, whether rembg was bypassed)."""
         try:
-            from services.ai_background_remover import AIBackgroundRemover
+            from src.services.ai_background_remover import ai_remover
             
-            # Use AI background remover
-            ai_remover = AIBackgroundRemover()
-            session, remove_func = ai_remover._get_rembg_session()
+            # Remove background using AI (shared, pooled rembg sessions) unless it is already transparent
+            result_image, analysis = ai_remover.remove_image_if_needed(logo_image)
             
-            # Remove background using AI
-            result_image = remove_func(logo_image, session=session)
-            
-            return result_image
+            return result_image, analysis["bypass"]
             
         except Exception as e:
             logger.warning(f"Logo preprocessing failed: {str(e)}")
-            return logo_image
+            return logo_image, False
 
 # Initialize service
 banner_service = BannerGeneratorService()
@@ -11,18 +11,28 @@ import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import os
 import time
+import uuid
 
-from services.ai_background_remover import AIBackgroundRemover
+from services.ai_background_remover import ai_remover
 from services.upscaler import ImageUpscaler
+from services.segmentation_models import segmentation_models
+from utils.filename_utils import generate_processing_filename
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # Initialize services
-ai_remover = AIBackgroundRemover()
 upscaler = ImageUpscaler()
 
+# Segmentation model per tier; requests can override it by name or latency budget.
+# The budget tier removes backgrounds with OpenCV and uses no model.
+TIER_SEGMENTATION_MODELS = {
+    "standard": "u2netp",
+    "premium": "u2net",
+    "enterprise": "isnet-general-use"
+}
+
 class CostOptimizedProcessor:
     """Cost-optimized processor with different quality tiers"""
     
@@ -32,7 +42,13 @@ class CostOptimizedProcessor:
         os.makedirs(self.temp_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
     
-    async def process_logo_tier(self, image_url: str, tier: str = "standard") -> dict:
+    async def process_logo_tier(
+        self,
+        image_url: str,
+        tier: str = "standard",
+        model: Optional[str] = None,
+        latency_budget_ms: Optional[float] = None
+    ) -> dict:
         """
         Process logo with different cost/quality tiers
         
@@ -41,21 +57,35 @@ class CostOptimizedProcessor:
         - standard: Balanced quality/speed (~30-40s) 
         - premium: Best quality (~50-60s)
         - enterprise: Maximum quality (~90-120s)
+        
+        Args:
+            image_url: URL of the logo to process
+            tier: Processing tier
+            model: Segmentation model overriding the tier's
+            latency_budget_ms: Pick the best benchmarked model within this inference time instead
         """
         start_time = time.time()
         processing_steps = []
         
         try:
+            if model or latency_budget_ms:
+                segmentation_model = segmentation_models.select(model, latency_budget_ms)["model"]
+            else:
+                segmentation_model = TIER_SEGMENTATION_MODELS.get(tier)
+            
             if tier == "budget":
                 return await self._process_budget_tier(image_url, start_time)
             elif tier == "standard":
-                return await self._process_standard_tier(image_url, start_time)
+                result = await self._process_standard_tier(image_url, start_time, segmentation_model)
             elif tier == "premium":
-                return await self._process_premium_tier(image_url, start_time)
+                result = await self._process_premium_tier(image_url, start_time, segmentation_model)
             elif tier == "enterprise":
-                return await self._process_enterprise_tier(image_url, start_time)
+                result = await self._process_enterprise_tier(image_url, start_time, segmentation_model)
             else:
                 raise ValueError(f"Invalid tier: {tier}")
+            
+            result["segmentation_model"] = segmentation_model
+            return result
                 
         except Exception as e:
             logger.error(f"Cost-optimized processing failed: {e}")
@@ -136,7 +166,7 @@ class CostOptimizedProcessor:
             "estimated_cost_usd": 0.01  # ~$0.01
         }
     
-    async def _process_standard_tier(self, image_url: str, start_time: float) -> dict:
+    async def _process_standard_tier(self, image_url: str, start_time: float, segmentation_model: str) -> dict:
         """Standard tier: Balanced quality/speed"""
         processing_steps = []
         
@@ -144,11 +174,11 @@ class CostOptimizedProcessor:
         logger.info("Standard tier: AI background removal...")
         processing_steps.append("ai_background_removal")
         
-        bg_result = await ai_remover.remove_background_ai(str(image_url))
+        bg_result = await ai_remover.remove_background_ai(str(image_url), model=segmentation_model)
         if not bg_result["success"]:
             return {"success": False, "error": f"Background removal failed: {bg_result['error']}"}
         
-        bg_removed_path = bg_result["processed_path"]
+        bg_removed_path = bg_result["output_url"]
         processing_steps.append("ai_background_removal_complete")
         
         # Step 2: Basic enhancement
@@ -162,17 +192,23 @@ class CostOptimizedProcessor:
         logger.info("Standard tier: 2x upscaling...")
         processing_steps.append("upscaling_2x")
         
-        file_url = f"file://{os.path.abspath(enhanced_path)}"
-        upscale_result = await upscaler.upscale_image(
-            image_url=file_url,
-            scale_factor=2,
-            output_format="png"
-        )
+        enhanced_image = cv2.imread(enhanced_path, cv2.IMREAD_UNCHANGED)
+        if enhanced_image is None:
+            return {"success": False, "error": f"Could not load enhanced image: {enhanced_path}"}
+        upscale_result = await upscaler.upscale_array(enhanced_image, scale_factor=2)
         
         if not upscale_result["success"]:
             return {"success": False, "error": f"Upscaling failed: {upscale_result['error']}"}
         
-        upscaled_path = upscale_result["upscaled_path"]
+        # Upscaling is the last step, so this is the only write of the result. The millisecond
+        # timestamp alone repeats across concurrent requests, so add a per-call id to the name
+        upscaled_path = os.path.join(self.output_dir, generate_processing_filename(
+            original_url=f"file://{os.path.abspath(enhanced_path)}",
+            processing_type=f"upscaled_{uuid.uuid4().hex[:8]}",
+            extension="png",
+            include_timestamp=True
+        ))
+        cv2.imwrite(upscaled_path, upscale_result["image"])
         processing_steps.append("upscaling_2x_complete")
         
         # Calculate metrics
@@ -191,7 +227,7 @@ class CostOptimizedProcessor:
             "estimated_cost_usd": 0.05  # ~$0.05
         }
     
-    async def _process_premium_tier(self, image_url: str, start_time: float) -> dict:
+    async def _process_premium_tier(self, image_url: str, start_time: float, segmentation_model: str) -> dict:
         """Premium tier: High quality (current optimized processor)"""
         processing_steps = []
         
@@ -199,7 +235,7 @@ class CostOptimizedProcessor:
         from api.logo_processor import OptimizedLogoProcessor
         processor = OptimizedLogoProcessor()
         
-        result = await processor.process_logo_optimized(str(image_url), scale_factor=4)
+        result = await processor.process_logo_optimized(str(image_url), scale_factor=4, segmentation_model=segmentation_model)
         
         if result["success"]:
             result["tier"] = "premium"
@@ -208,7 +244,7 @@ class CostOptimizedProcessor:
         else:
             return result
     
-    async def _process_enterprise_tier(self, image_url: str, start_time: float) -> dict:
+    async def _process_enterprise_tier(self, image_url: str, start_time: float, segmentation_model: str) -> dict:
         """Enterprise tier: Maximum quality with multiple passes"""
         processing_steps = []
         
@@ -216,11 +252,11 @@ class CostOptimizedProcessor:
         logger.info("Enterprise tier: Hybrid AI background removal...")
         processing_steps.append("hybrid_ai_background_removal")
         
-        bg_result = await ai_remover.remove_background_hybrid(str(image_url))
+        bg_result = await ai_remover.remove_background_hybrid(str(image_url), model=segmentation_model)
         if not bg_result["success"]:
             return {"success": False, "error": f"Background removal failed: {bg_result['error']}"}
         
-        bg_removed_path = bg_result["processed_path"]
+        bg_removed_path = bg_result["output_url"]
         processing_steps.append("hybrid_ai_background_removal_complete")
         
         # Step 2: Advanced enhancement (multiple passes)
@@ -234,24 +270,21 @@ class CostOptimizedProcessor:
         logger.info("Enterprise tier: 4x upscaling...")
         processing_steps.append("upscaling_4x")
         
-        file_url = f"file://{os.path.abspath(enhanced_path)}"
-        upscale_result = await upscaler.upscale_image(
-            image_url=file_url,
-            scale_factor=4,
-            output_format="png"
-        )
+        enhanced_image = cv2.imread(enhanced_path, cv2.IMREAD_UNCHANGED)
+        if enhanced_image is None:
+            return {"success": False, "error": f"Could not load enhanced image: {enhanced_path}"}
+        upscale_result = await upscaler.upscale_array(enhanced_image, scale_factor=4)
         
         if not upscale_result["success"]:
             return {"success": False, "error": f"Upscaling failed: {upscale_result['error']}"}
         
-        upscaled_path = upscale_result["upscaled_path"]
         processing_steps.append("upscaling_4x_complete")
         
-        # Step 4: Final optimization (multiple passes)
+        # Step 4: Final optimization (multiple passes) on the in-memory upscaled array
         logger.info("Enterprise tier: Final optimization...")
         processing_steps.append("final_optimization")
         
-        final_path = await self._enterprise_optimization(upscaled_path)
+        final_path = await self._enterprise_optimization(enhanced_path, upscale_result["image"])
         processing_steps.append("final_optimization_complete")
         
         # Calculate metrics
@@ -263,7 +296,7 @@ class CostOptimizedProcessor:
             "processed_path": final_path,
             "background_removed_path": bg_removed_path,
             "enhanced_path": enhanced_path,
-            "upscaled_path": upscaled_path,
+            "upscaled_path": None,  # upscaled intermediate stays in memory
             "processing_steps": processing_steps,
             "total_processing_time_ms": total_time_ms,
             "file_size_bytes": file_size,
@@ -340,10 +373,11 @@ class CostOptimizedProcessor:
             logger.warning(f"Advanced enhancement failed: {e}")
             return image_path
     
-    async def _enterprise_optimization(self, image_path: str) -> str:
-        """Enterprise optimization with multiple passes"""
+    async def _enterprise_optimization(self, image_path: str, image: Optional[np.ndarray] = None) -> str:
+        """Enterprise optimization with multiple passes (pass `image` to skip reading image_path)"""
         try:
-            image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+            if image is None:
+                image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
             if image is None:
                 return image_path
             
@@ -372,7 +406,11 @@ class CostOptimizedProcessor:
             image = (image * 255).astype(np.uint8)
             
             # Save
-            final_path = image_path.replace("_upscaled.png", "_enterprise_final.png")
+            base_name = os.path.splitext(image_path)[0]
+            for suffix in ("_upscaled", "_enhanced"):
+                if base_name.endswith(suffix):
+                    base_name = base_name[:-len(suffix)]
+            final_path = f"{base_name}_enterprise_final.png"
             cv2.imwrite(final_path, image)
             
             return final_path
@@ -388,6 +426,8 @@ class CostOptimizedRequest(BaseModel):
     """Request model for cost-optimized processing"""
     image_url: HttpUrl = Field(..., description="URL of the logo to process")
     tier: str = Field(default="standard", description="Processing tier: budget, standard, premium, enterprise")
+    model: Optional[str] = Field(default=None, description="Segmentation model overriding the tier's (e.g. 'u2net', 'isnet-general-use')")
+    latency_budget_ms: Optional[float] = Field(default=None, gt=0, description="Pick the best benchmarked segmentation model within this inference time")
 
 class CostOptimizedResponse(BaseModel):
     """Response model for cost-optimized processing"""
@@ -401,6 +441,7 @@ class CostOptimizedResponse(BaseModel):
     total_processing_time_ms: int
     file_size_bytes: Optional[int] = None
     tier: str
+    segmentation_model: Optional[str] = None
     estimated_cost_usd: float
     error: Optional[str] = None
 
@@ -424,7 +465,9 @@ async def process_logo_cost_optimized(request: CostOptimizedRequest):
     try:
         result = await cost_processor.process_logo_tier(
             image_url=str(request.image_url),
-            tier=request.tier
+            tier=request.tier,
+            model=request.model,
+            latency_budget_ms=request.latency_budget_ms
         )
         
         if result["success"]:
@@ -439,6 +482,7 @@ async def process_logo_cost_optimized(request: CostOptimizedRequest):
                 total_processing_time_ms=result["total_processing_time_ms"],
                 file_size_bytes=result["file_size_bytes"],
                 tier=result["tier"],
+                segmentation_model=result.get("segmentation_model"),
                 estimated_cost_usd=result["estimated_cost_usd"]
             )
         else:
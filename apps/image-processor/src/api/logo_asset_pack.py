@@ -10,7 +10,8 @@ from pydantic import BaseModel
 from PIL import Image
 import numpy as np
 
-from services.ai_background_remover import AIBackgroundRemover
+from services.ai_background_remover import ai_remover
+from services.alpha_analysis import analyze_alpha
 from utils.filename_utils import generate_processing_filename, slugify_filename
 import urllib.parse
 
@@ -45,7 +46,7 @@ class LogoAssetPackResponse(BaseModel):
 class LogoAssetPackService:
     def __init__(self):
         self.output_dir = "./output/asset-packs"
-        self.ai_remover = AIBackgroundRemover()
+        self.ai_remover = ai_remover
         os.makedirs(self.output_dir, exist_ok=True)
     
     async def generate_asset_pack(self, request: LogoAssetPackRequest) -> dict:
@@ -155,30 +156,12 @@ class LogoAssetPackService:
             return f"logo_{timestamp}"
     
     def _has_transparent_background(self, image: Image.Image) -> bool:
-        """Check if image already has transparent background"""
+        """Check if image already has a clean transparent background"""
         try:
-            # Check if image has alpha channel
-            if image.mode not in ('RGBA', 'LA'):
-                return False
-            
-            # Convert to RGBA if it's LA
-            if image.mode == 'LA':
-                image = image.convert('RGBA')
-            
-            # Get alpha channel
-            alpha = image.split()[-1]
-            
-            # Check if there are any fully transparent pixels (alpha = 0)
-            # This indicates the image has transparency
-            transparent_pixels = sum(1 for pixel in alpha.getdata() if pixel == 0)
-            total_pixels = alpha.size[0] * alpha.size[1]
-            
-            # If more than 5% of pixels are transparent, consider it to have transparent background
-            transparency_ratio = transparent_pixels / total_pixels
-            has_transparency = transparency_ratio > 0.05
-            
-            logger.info(f"Transparency check: {transparent_pixels}/{total_pixels} transparent pixels ({transparency_ratio:.2%})")
-            return has_transparency
+            analysis = analyze_alpha(image)
+            logger.info(f"Transparency check: {analysis['transparent_ratio']:.2%} transparent, "
+                        f"border {analysis['border_transparency']:.2%} ({analysis['reason']})")
+            return analysis["clean_background"]
             
         except Exception as e:
             logger.warning(f"Transparency check failed: {str(e)}")
@@ -187,8 +170,7 @@ class LogoAssetPackService:
     async def _remove_background(self, logo_image: Image.Image) -> Image.Image:
         """Remove background using AI"""
         try:
-            session, remove_func = self.ai_remover._get_rembg_session()
-            result_image = remove_func(logo_image, session=session)
+            result_image, _ = self.ai_remover.remove_image_if_needed(logo_image)
             return result_image
         except Exception as e:
             logger.warning(f"Background removal failed: {str(e)}")
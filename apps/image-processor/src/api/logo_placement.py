@@ -58,9 +58,10 @@ class LogoPlacementService:
         quality: int = 95,
         auto_remove_background: bool = True,
         include_roster: bool = False,
-        players: Optional[List[Player]] = None
+        players: Optional[List[Player]] = None,
+        logo_image: Optional[Image.Image] = None
     ) -> str:
-        """Place logo on t-shirt at specified position"""
+        """Place logo on t-shirt at specified position (logo_image: already downloaded and cleaned logo)"""
         try:
             start_time = time.time()
             
@@ -77,15 +78,16 @@ class LogoPlacementService:
                 result_image = await self._add_roster_text(tshirt_image, players)
             else:
                 # Normal logo placement mode - require logo_url
-                if not logo_url:
+                if not logo_url and logo_image is None:
                     raise ValueError("logo_url is required for logo placement mode")
                 
-                # Download logo image
-                logo_image = await self._download_image(logo_url)
-                
-                # Remove background from logo if requested
-                if auto_remove_background:
-                    logo_image = await self._remove_logo_background(logo_image)
+                if logo_image is None:
+                    # Download logo image
+                    logo_image = await self._download_image(logo_url)
+                    
+                    # Remove background from logo if requested
+                    if auto_remove_background:
+                        logo_image = await self._remove_logo_background(logo_image)
                 
                 if logo_image.mode != 'RGBA':
                     logo_image = logo_image.convert('RGBA')
@@ -185,16 +187,10 @@ class LogoPlacementService:
         """Remove background from logo using AI"""
         try:
             # Only import when needed to avoid startup delays
-            from services.ai_background_remover import AIBackgroundRemover
-            
-            # Use AI background remover
-            ai_remover = AIBackgroundRemover()
-            
-            # Get rembg session
-            session, remove_func = ai_remover._get_rembg_session()
+            from services.ai_background_remover import ai_remover
             
-            # Remove background using AI
-            result_image = remove_func(logo_image, session=session)
+            # Remove background using AI (shared, pooled rembg sessions) unless it is already transparent
+            result_image, _ = ai_remover.remove_image_if_needed(logo_image)
             
             return result_image
             
@@ -202,6 +198,17 @@ class LogoPlacementService:
             logger.warning(f"AI background removal failed, using original logo: {str(e)}")
             return logo_image
     
+    async def _remove_logo_backgrounds(self, logo_images: List[Image.Image], stats: dict) -> List[Image.Image]:
+        """Remove backgrounds from several logos in micro-batched rembg calls"""
+        try:
+            from services.ai_background_remover import ai_remover
+            
+            return [image for image, _ in ai_remover.remove_images_if_needed(logo_images, stats)]
+            
+        except Exception as e:
+            logger.warning(f"AI background removal failed, using original logos: {str(e)}")
+            return logo_images
+    
     async def _download_image(self, url: str) -> Image.Image:
         """Download image from URL or local file"""
         try:
@@ -359,6 +366,11 @@ async def batch_place_logos(request: BatchLogoPlacementRequest):
     try:
         results = []
         
+        # Download every logo first so their backgrounds go through rembg together
+        logo_images = [await logo_placement_service._download_image(logo_url) for logo_url in request.logo_urls]
+        batch_stats = {}
+        logo_images = await logo_placement_service._remove_logo_backgrounds(logo_images, batch_stats)
+        
         for i, logo_url in enumerate(request.logo_urls):
             position = request.positions[i % len(request.positions)]
             scale_factor = request.scale_factors[i % len(request.scale_factors)]
@@ -368,7 +380,8 @@ async def batch_place_logos(request: BatchLogoPlacementRequest):
                 logo_url=logo_url,
                 position=position,
                 scale_factor=scale_factor,
-                output_format=request.output_format
+                output_format=request.output_format,
+                logo_image=logo_images[i]
             )
             
             results.append({
@@ -383,6 +396,7 @@ async def batch_place_logos(request: BatchLogoPlacementRequest):
             "success": True,
             "tshirt_url": request.tshirt_url,
             "total_logos": len(request.logo_urls),
+            "rembg_batch": batch_stats or None,
             "results": results
         }
         
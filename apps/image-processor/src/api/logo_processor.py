@@ -11,7 +11,7 @@ import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import os
 
-from services.ai_background_remover import AIBackgroundRemover
+from services.ai_background_remover import ai_remover
 from services.upscaler import ImageUpscaler
 from services.preprocessor import ImagePreprocessor
 from utils.filename_utils import generate_pipeline_filename
@@ -21,7 +21,6 @@ from logging import logger
 router = APIRouter()
 
 # Initialize services
-ai_remover = AIBackgroundRemover()
 upscaler = ImageUpscaler()
 preprocessor = ImagePreprocessor()
 
@@ -34,7 +33,7 @@ class OptimizedLogoProcessor:
         os.makedirs(self.temp_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
     
-    async def process_logo_optimized(self, image_url: str, scale_factor: int = 4) -> dict:
+    async def process_logo_optimized(self, image_url: str, scale_factor: int = 4, segmentation_model: Optional[str] = None) -> dict:
         """
         Optimized logo processing pipeline:
         1. File validation (size, format, dimensions)
@@ -71,11 +70,11 @@ class OptimizedLogoProcessor:
             logger.info("Step 1: AI background removal...")
             processing_steps.append("ai_background_removal")
             
-            bg_result = await ai_remover.remove_background_hybrid(image_url)
+            bg_result = await ai_remover.remove_background_hybrid(image_url, model=segmentation_model)
             if not bg_result["success"]:
                 return {"success": False, "error": f"Background removal failed: {bg_result['error']}"}
             
-            bg_removed_path = bg_result["processed_path"]
+            bg_removed_path = bg_result["output_url"]
             processing_steps.append("ai_background_removal_complete")
             
             # Validate the processed file locally
@@ -105,25 +104,22 @@ class OptimizedLogoProcessor:
             logger.info("Step 3: AI upscaling...")
             processing_steps.append("ai_upscaling")
             
-            # Convert local path to file URL for upscaler
-            file_url = f"file://{os.path.abspath(enhanced_path)}"
-            upscale_result = await upscaler.upscale_image(
-                image_url=file_url,
-                scale_factor=scale_factor,
-                output_format="png"
-            )
+            # Upscale in memory and hand the array straight to the final step (no encode/upload in between)
+            enhanced_image = cv2.imread(enhanced_path, cv2.IMREAD_UNCHANGED)
+            if enhanced_image is None:
+                return {"success": False, "error": f"Could not load enhanced image: {enhanced_path}"}
+            upscale_result = await upscaler.upscale_array(enhanced_image, scale_factor=scale_factor)
             
             if not upscale_result["success"]:
                 return {"success": False, "error": f"Upscaling failed: {upscale_result['error']}"}
             
-            upscaled_path = upscale_result["upscaled_path"]
             processing_steps.append("ai_upscaling_complete")
             
             # Step 4: Final Python optimization
             logger.info("Step 4: Final Python optimization...")
             processing_steps.append("final_optimization")
             
-            final_path = await self._final_optimization(upscaled_path)
+            final_path = await self._final_optimization(enhanced_path, upscale_result["image"])
             processing_steps.append("final_optimization_complete")
             
             # Calculate metrics
@@ -135,7 +131,8 @@ class OptimizedLogoProcessor:
                 "processed_path": final_path,
                 "background_removed_path": bg_removed_path,
                 "enhanced_path": enhanced_path,
-                "upscaled_path": upscaled_path,
+                "upscaled_path": None,  # upscaled intermediate stays in memory
+                "upscale_model_used": upscale_result["model_used"],
                 "processing_steps": processing_steps,
                 "total_processing_time_ms": total_time_ms,
                 "file_size_bytes": file_size
@@ -192,11 +189,12 @@ class OptimizedLogoProcessor:
             logger.warning(f"Python enhancement failed: {e}")
             return image_path
     
-    async def _final_optimization(self, image_path: str) -> str:
-        """Final optimization using OpenCV for print quality"""
+    async def _final_optimization(self, image_path: str, image: Optional[np.ndarray] = None) -> str:
+        """Final optimization using OpenCV for print quality (pass `image` to skip reading image_path)"""
         try:
             # Load image
-            image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+            if image is None:
+                image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
             if image is None:
                 raise ValueError("Could not load image")
             
@@ -228,9 +226,10 @@ class OptimizedLogoProcessor:
             # For now, we'll generate a clean final filename
             timestamp = int(time.time() * 1000)
             base_name = os.path.splitext(os.path.basename(image_path))[0]
-            # Remove the "_upscaled" suffix if present
-            if base_name.endswith("_upscaled"):
-                base_name = base_name[:-9]  # Remove "_upscaled"
+            # Remove the "_upscaled" / "_enhanced" suffix if present
+            for suffix in ("_upscaled", "_enhanced"):
+                if base_name.endswith(suffix):
+                    base_name = base_name[:-len(suffix)]
             final_path = os.path.join(os.path.dirname(image_path), f"{base_name}_final_{timestamp}.png")
             cv2.imwrite(final_path, image)
             
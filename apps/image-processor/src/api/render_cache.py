@@ -0,0 +1,79 @@
+"""
+Render cache admin API endpoints
+"""
+
+import os
+import hmac
+from fastapi import APIRouter, HTTPException, Header
+from typing import Dict, Any, Optional
+from src.services.render_cache import render_cache
+
+router = APIRouter()
+
+
+def _check_admin_key(x_admin_key: Optional[str]):
+    """Require X-Admin-Key to match ADMIN_API_KEY; the admin endpoints are disabled without one"""
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key:
+        raise HTTPException(status_code=403, detail="Admin API disabled: ADMIN_API_KEY is not configured")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, admin_key):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+
+@router.get("/admin/render-cache")
+async def inspect_render_cache(
+    operation: Optional[str] = None,
+    limit: int = 100,
+    x_admin_key: Optional[str] = Header(None)
+) -> Dict[str, Any]:
+    """
+    Inspect render cache entries
+
+    Args:
+        operation: Only list entries for this operation (e.g. tshirt_front, banner, upscale, rembg)
+        limit: Maximum number of entries to return (most recently used first)
+
+    Returns:
+        Cache statistics and entries
+    """
+    _check_admin_key(x_admin_key)
+    entries = render_cache.entries(operation)
+    entries.reverse()
+
+    return {
+        "success": True,
+        "stats": render_cache.stats(),
+        "entries": entries[:limit]
+    }
+
+
+@router.delete("/admin/render-cache")
+async def purge_render_cache(
+    operation: Optional[str] = None,
+    x_admin_key: Optional[str] = Header(None)
+) -> Dict[str, Any]:
+    """
+    Purge render cache entries for one operation, or all entries when no operation is given
+    """
+    _check_admin_key(x_admin_key)
+    removed = render_cache.purge(operation=operation)
+
+    return {
+        "success": True,
+        "removed": removed
+    }
+
+
+@router.delete("/admin/render-cache/{key}")
+async def purge_render_cache_entry(key: str, x_admin_key: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """
+    Purge a single render cache entry
+    """
+    _check_admin_key(x_admin_key)
+    if not render_cache.purge(key=key):
+        raise HTTPException(status_code=404, detail=f"Cache entry not found: {key}")
+
+    return {
+        "success": True,
+        "removed": 1
+    }
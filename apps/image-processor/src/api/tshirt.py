@@ -30,6 +30,7 @@ class TShirtFrontRequest(BaseModel):
     position: str = Field(default="left_chest", description="Logo position: 'left_chest' or 'center_chest'")
     output_format: str = Field(default="png", description="Output format: 'png', 'jpg', or 'webp'")
     quality: int = Field(default=95, ge=1, le=100, description="Output quality (1-100)")
+    preview: bool = Field(default=False, description="Return a low-resolution inline preview instead of uploading full-resolution output")
 
 class TShirtBackRequest(BaseModel):
     """Request model for t-shirt back creation with roster"""
@@ -38,6 +39,7 @@ class TShirtBackRequest(BaseModel):
     output_format: str = Field(default="png", description="Output format: 'png', 'jpg', or 'webp'")
     quality: int = Field(default=95, ge=1, le=100, description="Output quality (1-100)")
     logo_url: Optional[str] = Field(default=None, description="Optional URL of logo to display above roster")
+    preview: bool = Field(default=False, description="Return a low-resolution inline preview instead of uploading full-resolution output")
 
 class TShirtResponse(BaseModel):
     """Response model for t-shirt creation"""
@@ -45,8 +47,29 @@ class TShirtResponse(BaseModel):
     tshirt_url: Optional[str] = None
     processing_time_ms: int
     file_size_bytes: Optional[int] = None
+    preview: bool = False
     error: Optional[str] = None
 
+async def _preview_response(kind: str, **kwargs) -> TShirtResponse:
+    """Render a single preview and return it inline as a data URL"""
+    result = await overlay_service.create_previews([kind], **kwargs)
+    if not result["success"]:
+        return TShirtResponse(
+            success=False,
+            processing_time_ms=result["processing_time_ms"],
+            preview=True,
+            error=result["error"]
+        )
+    
+    preview = result["previews"][kind]
+    return TShirtResponse(
+        success=True,
+        tshirt_url=preview["data_url"],
+        processing_time_ms=result["processing_time_ms"],
+        file_size_bytes=preview["file_size_bytes"],
+        preview=True
+    )
+
 @router.post("/tshirt/front", response_model=TShirtResponse)
 async def create_tshirt_front(request: TShirtFrontRequest) -> TShirtResponse:
     """
@@ -79,6 +102,14 @@ async def create_tshirt_front(request: TShirtFrontRequest) -> TShirtResponse:
         clean_logo_url = request.logo_url
         logger.info(f"Using logo URL: {clean_logo_url}")
         
+        if request.preview:
+            return await _preview_response(
+                "tshirt_front",
+                logo_url=clean_logo_url,
+                tshirt_color=request.tshirt_color,
+                position=request.position
+            )
+        
         # Step 2: Create t-shirt front with cleaned logo
         logger.info("Step 2: Creating t-shirt front with cleaned logo")
         result = await overlay_service.overlay_logo_on_tshirt(
@@ -141,6 +172,14 @@ async def create_tshirt_back(request: TShirtBackRequest) -> TShirtResponse:
         clean_logo_url = request.logo_url
         logger.info(f"Using logo URL: {clean_logo_url}")
         
+        if request.preview:
+            return await _preview_response(
+                "tshirt_back",
+                logo_url=clean_logo_url,
+                players=players_data,
+                tshirt_color=request.tshirt_color
+            )
+        
         # Create t-shirt back
         result = await overlay_service.overlay_roster_on_tshirt_back(
             players=players_data,
@@ -182,6 +221,7 @@ class TShirtBothRequest(BaseModel):
     logo_position: str = Field(default="left_chest", description="Logo position: 'left_chest' or 'center_chest'")
     output_format: str = Field(default="png", description="Output format: 'png', 'jpg', or 'webp'")
     quality: int = Field(default=95, ge=1, le=100, description="Output quality (1-100)")
+    preview: bool = Field(default=False, description="Return a low-resolution inline preview instead of uploading full-resolution output")
 
 @router.post("/tshirt/both", response_model=dict)
 async def create_tshirt_both(request: TShirtBothRequest) -> dict:
@@ -211,6 +251,32 @@ async def create_tshirt_both(request: TShirtBothRequest) -> dict:
                 detail="logo_position must be 'left_chest' or 'center_chest'"
             )
         
+        if request.preview:
+            result = await overlay_service.create_previews(
+                ["tshirt_front", "tshirt_back"],
+                logo_url=request.logo_url,
+                players=[{"number": p.number, "name": p.name} for p in request.players],
+                tshirt_color=request.tshirt_color,
+                position=request.logo_position
+            )
+            if not result["success"]:
+                return result
+            
+            previews = result["previews"]
+            return {
+                "success": True,
+                "preview": True,
+                "front": {
+                    "tshirt_url": previews["tshirt_front"]["data_url"],
+                    "file_size_bytes": previews["tshirt_front"]["file_size_bytes"]
+                },
+                "back": {
+                    "tshirt_url": previews["tshirt_back"]["data_url"],
+                    "file_size_bytes": previews["tshirt_back"]["file_size_bytes"]
+                },
+                "total_processing_time_ms": int((time.time() - start_time) * 1000)
+            }
+        
         # Create t-shirt front
         front_result = await overlay_service.overlay_logo_on_tshirt(
             logo_url=request.logo_url,
@@ -2,18 +2,20 @@
 API endpoints for image upscaling
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List
 import os
+import json
 import time
 
 from models.schemas import (
     UpscaleRequest,
     UpscaleResponse,
-    BatchUpscaleRequest,
-    BatchUpscaleResponse
+    BatchUpscaleRequest
 )
-from services.upscaler import upscaler
+from services.upscaler import upscaler, batch_throughput
+from services.job_queue import job_queue
 
 router = APIRouter()
 
@@ -49,7 +51,8 @@ async def upscale_image(request: UpscaleRequest):
                 scale_factor=result["scale_factor"],
                 model_used=result["model_used"],
                 processing_time_ms=result["processing_time_ms"],
-                file_size_bytes=result["file_size_bytes"]
+                file_size_bytes=result["file_size_bytes"],
+                chain=result.get("chain")
             )
         else:
             return UpscaleResponse(
@@ -64,69 +67,51 @@ async def upscale_image(request: UpscaleRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upscaling failed: {str(e)}")
 
-@router.post("/upscale/batch", response_model=BatchUpscaleResponse)
-async def upscale_batch(request: BatchUpscaleRequest, background_tasks: BackgroundTasks):
+@router.post("/upscale/batch")
+async def upscale_batch(request: BatchUpscaleRequest):
     """
     Upscale multiple images in batch
     
+    Images are processed concurrently on the upscaler's batch worker pool and each
+    UpscaleResponse is streamed back as an NDJSON line when it finishes, followed by a
+    summary line with counts and throughput.
+    
     Args:
         request: Batch upscaling request
-        background_tasks: FastAPI background tasks
         
     Returns:
-        BatchUpscaleResponse with results
+        NDJSON stream of results
     """
-    start_time = time.time()
-    results = []
+    image_urls = [str(url) for url in request.image_urls]
     
-    try:
-        # Process images concurrently
-        for image_url in request.image_urls:
-            result = await upscaler.upscale_image(
-                image_url=str(image_url),
-                scale_factor=request.scale_factor,
-                model=request.model.value,
-                output_format=request.output_format,
-                quality=request.quality
+    async def lines():
+        start_time = time.time()
+        results = []
+        async for index, result in upscaler.upscale_stream(
+            image_urls,
+            scale_factor=request.scale_factor,
+            model=request.model.value,
+            output_format=request.output_format,
+            quality=request.quality
+        ):
+            results.append(result)
+            response = UpscaleResponse(
+                success=result["success"],
+                upscaled_url=result.get("upscaled_path"),
+                original_url=image_urls[index],
+                scale_factor=result["scale_factor"],
+                model_used=result["model_used"],
+                processing_time_ms=result["processing_time_ms"],
+                file_size_bytes=result.get("file_size_bytes"),
+                chain=result.get("chain"),
+                error=result.get("error")
             )
-            
-            if result["success"]:
-                upscaled_url = f"file://{result['upscaled_path']}"
-                response = UpscaleResponse(
-                    success=True,
-                    upscaled_url=upscaled_url,
-                    original_url=image_url,
-                    scale_factor=result["scale_factor"],
-                    model_used=result["model_used"],
-                    processing_time_ms=result["processing_time_ms"],
-                    file_size_bytes=result["file_size_bytes"]
-                )
-            else:
-                response = UpscaleResponse(
-                    success=False,
-                    original_url=image_url,
-                    scale_factor=request.scale_factor,
-                    model_used=request.model.value,
-                    processing_time_ms=result["processing_time_ms"],
-                    error=result["error"]
-                )
-            
-            results.append(response)
-        
-        total_processing_time = int((time.time() - start_time) * 1000)
-        total_processed = sum(1 for r in results if r.success)
-        total_failed = len(results) - total_processed
+            yield json.dumps({"type": "result", "index": index, **response.model_dump(mode="json")}) + "\n"
         
-        return BatchUpscaleResponse(
-            success=total_failed == 0,
-            results=results,
-            total_processed=total_processed,
-            total_failed=total_failed,
-            processing_time_ms=total_processing_time
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Batch upscaling failed: {str(e)}")
+        summary = batch_throughput(results, time.time() - start_time)
+        yield json.dumps({"type": "summary", "success": summary["total_failed"] == 0, **summary}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @router.get("/upscale/models")
 async def get_available_models():
@@ -134,33 +119,9 @@ async def get_available_models():
     Get list of available upscaling models
     
     Returns:
-        List of available models with their capabilities
+        List of available models with their capabilities and measured speed
     """
-    return {
-        "models": [
-            {
-                "name": "realesrgan",
-                "display_name": "Real-ESRGAN",
-                "max_scale": 8,
-                "description": "State-of-the-art upscaling with excellent quality",
-                "available": True  # Would check if model is loaded
-            },
-            {
-                "name": "esrgan",
-                "display_name": "ESRGAN",
-                "max_scale": 4,
-                "description": "Enhanced Super-Resolution GAN",
-                "available": True
-            },
-            {
-                "name": "opencv",
-                "display_name": "OpenCV Bicubic",
-                "max_scale": 8,
-                "description": "Fast bicubic interpolation (fallback)",
-                "available": True
-            }
-        ]
-    }
+    return {"models": upscaler.available_models()}
 
 @router.get("/upscale/status/{job_id}")
 async def get_upscale_status(job_id: str):
@@ -173,10 +134,7 @@ async def get_upscale_status(job_id: str):
     Returns:
         Job status information
     """
-    # This would integrate with a job queue system like Redis
-    # For now, return a placeholder
-    return {
-        "job_id": job_id,
-        "status": "completed",
-        "message": "Job status tracking not implemented yet"
-    }
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
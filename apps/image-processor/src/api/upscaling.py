@@ -3,12 +3,16 @@ Upscaling API endpoints
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import asyncio
+import json
 import time
 
-from src.services.upscaler import ImageUpscaler
+from src.services.upscaler import ImageUpscaler, batch_throughput, SUPPORTED_MODELS
+from src.services.job_queue import job_queue
+from src.services.vectorizer import vectorizer
 from src.validators import InputValidator, ValidationError, FileValidator
 from src.storage import storage
 from src.custom_logging import logger
@@ -22,18 +26,33 @@ class UpscaleRequest(BaseModel):
     """Request model for image upscaling"""
     image_url: str = Field(..., description="URL of the image to upscale")
     scale_factor: int = Field(4, ge=2, le=8, description="Upscaling factor (2, 4, or 8)")
-    output_format: str = Field("png", description="Output format (png, jpg, webp)")
+    model: str = Field("realesrgan", description="Upscaling model (auto, realesrgan, realesrgan-onnx, esrgan, opencv-edge, opencv)")
+    output_format: str = Field("png", description="Output format (png, jpg, webp, tiff)")
     quality: int = Field(95, ge=1, le=100, description="Output quality (1-100)")
 
+def _validate_model(model: str) -> str:
+    """Reject unknown upscaling models"""
+    if model not in SUPPORTED_MODELS:
+        raise ValidationError(f"model must be one of: {', '.join(SUPPORTED_MODELS)}", "model")
+    return model
+
 class UpscaleResponse(BaseModel):
     """Response model for image upscaling"""
     success: bool
     original_url: str
     upscaled_url: Optional[str] = None
     scale_factor: int
+    model_used: Optional[str] = None
     processing_time_ms: int
     file_size_bytes: Optional[int] = None
+    peak_rss_mb: Optional[float] = None
+    tiling: Optional[Dict[str, Any]] = None
+    chain: Optional[Dict[str, Any]] = None
+    routing: Optional[Dict[str, Any]] = None
+    streamed_encode: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    
+    model_config = {"protected_namespaces": ()}
 
 @router.post("/upscale", response_model=UpscaleResponse)
 async def upscale_image(request: UpscaleRequest):
@@ -58,6 +77,7 @@ async def upscale_image(request: UpscaleRequest):
         InputValidator.validate_scale_factor(request.scale_factor, "scale_factor")
         InputValidator.validate_output_format(request.output_format, "output_format")
         InputValidator.validate_quality(request.quality, "quality")
+        _validate_model(request.model)
         
         # Validate file based on URL scheme
         image_url = str(request.image_url)
@@ -89,6 +109,7 @@ async def upscale_image(request: UpscaleRequest):
         result = await upscaler.upscale_image(
             image_url=str(request.image_url),
             scale_factor=request.scale_factor,
+            model=request.model,
             output_format=request.output_format,
             quality=request.quality
         )
@@ -109,8 +130,14 @@ async def upscale_image(request: UpscaleRequest):
                 original_url=str(request.image_url),
                 upscaled_url=result["upscaled_path"],
                 scale_factor=request.scale_factor,
+                model_used=result.get("model_used"),
                 processing_time_ms=processing_time_ms,
-                file_size_bytes=result.get("file_size_bytes")
+                file_size_bytes=result.get("file_size_bytes"),
+                peak_rss_mb=result.get("peak_rss_mb"),
+                tiling=result.get("tiling"),
+                chain=result.get("chain"),
+                routing=result.get("routing"),
+                streamed_encode=result.get("streamed_encode")
             )
         else:
             # Log failure (storage logging not available)
@@ -162,3 +189,236 @@ async def upscale_image(request: UpscaleRequest):
             processing_time_ms=processing_time_ms,
             error=str(e)
         )
+
+@router.get("/upscale/models")
+async def get_available_models():
+    """
+    Get list of available upscaling models
+    
+    Returns:
+        Models with availability and measured speed (output megapixels/sec, once used)
+    """
+    return {"models": upscaler.available_models()}
+
+class UpscaleJobResponse(BaseModel):
+    """Response model for a queued upscaling job"""
+    job_id: str
+    status: str
+    status_url: str
+
+class BatchUpscaleJobRequest(BaseModel):
+    """Request model for queueing several upscales"""
+    image_urls: List[str] = Field(..., min_length=1, max_length=50, description="URLs of the images to upscale")
+    scale_factor: int = Field(4, ge=2, le=8, description="Upscaling factor (2, 4, or 8)")
+    model: str = Field("realesrgan", description="Upscaling model (auto, realesrgan, realesrgan-onnx, esrgan, opencv-edge, opencv)")
+    output_format: str = Field("png", description="Output format (png, jpg, webp, tiff)")
+    quality: int = Field(95, ge=1, le=100, description="Output quality (1-100)")
+
+class BatchUpscaleJobResponse(BaseModel):
+    """Response model for a queued batch"""
+    jobs: List[UpscaleJobResponse]
+
+class UpscaleJobStatus(BaseModel):
+    """Status of a queued upscaling job"""
+    job_id: str
+    status: str  # pending, processing, completed, failed, cancelled
+    progress: int = 0
+    attempts: int = 0
+    created_at: str
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+def _queue_upscale(image_url: str, scale_factor: int, model: str, output_format: str, quality: int) -> UpscaleJobResponse:
+    """Validate parameters and queue one upscale job"""
+    InputValidator.validate_image_url(image_url, "image_url")
+    InputValidator.validate_scale_factor(scale_factor, "scale_factor")
+    InputValidator.validate_output_format(output_format, "output_format")
+    InputValidator.validate_quality(quality, "quality")
+    _validate_model(model)
+    
+    job_id = job_queue.submit("upscale", {
+        "image_url": image_url,
+        "scale_factor": scale_factor,
+        "model": model,
+        "output_format": output_format,
+        "quality": quality
+    })
+    return UpscaleJobResponse(job_id=job_id, status="pending", status_url=f"/api/v1/upscale/status/{job_id}")
+
+@router.post("/upscale/jobs", response_model=UpscaleJobResponse, status_code=202)
+async def submit_upscale_job(request: UpscaleRequest):
+    """
+    Queue an upscale and return immediately
+    
+    Args:
+        request: Upscaling request with image URL and parameters
+        
+    Returns:
+        Job id to poll at /upscale/status/{job_id}
+    """
+    try:
+        return _queue_upscale(str(request.image_url), request.scale_factor, request.model, request.output_format, request.quality)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Validation failed", "message": e.message, "field": e.field}
+        )
+
+@router.post("/upscale/batch", response_model=BatchUpscaleJobResponse, status_code=202)
+async def submit_upscale_batch(request: BatchUpscaleJobRequest):
+    """
+    Queue one upscale job per image and return their ids immediately
+    """
+    try:
+        return BatchUpscaleJobResponse(jobs=[
+            _queue_upscale(url, request.scale_factor, request.model, request.output_format, request.quality)
+            for url in request.image_urls
+        ])
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Validation failed", "message": e.message, "field": e.field}
+        )
+
+@router.get("/upscale/status/{job_id}", response_model=UpscaleJobStatus)
+async def get_upscale_status(job_id: str):
+    """
+    Get status of an upscaling job
+    
+    Args:
+        job_id: Job identifier returned on submit
+        
+    Returns:
+        Job status, with the upscale result once completed
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return UpscaleJobStatus(**job)
+
+@router.delete("/upscale/jobs/{job_id}")
+async def cancel_upscale_job(job_id: str):
+    """
+    Cancel a queued or running upscaling job
+    """
+    status = job_queue.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if status in ("completed", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job already {status}")
+    
+    return {
+        "success": True,
+        "job_id": job_id,
+        "status": status
+    }
+
+@router.post("/upscale/batch/stream")
+async def upscale_batch_stream(request: BatchUpscaleJobRequest):
+    """
+    Upscale several images concurrently and stream results as NDJSON
+    
+    Each line is {"type": "result", "index": ..., ...UpscaleResponse} as soon as that image
+    finishes (completion order), followed by a final {"type": "summary", ...} line with
+    counts and images/sec and megapixels/sec throughput.
+    """
+    try:
+        for url in request.image_urls:
+            InputValidator.validate_image_url(url, "image_urls")
+        InputValidator.validate_scale_factor(request.scale_factor, "scale_factor")
+        InputValidator.validate_output_format(request.output_format, "output_format")
+        InputValidator.validate_quality(request.quality, "quality")
+        _validate_model(request.model)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Validation failed", "message": e.message, "field": e.field}
+        )
+    
+    async def lines():
+        start_time = time.time()
+        results = []
+        async for index, result in upscaler.upscale_stream(
+            request.image_urls,
+            scale_factor=request.scale_factor,
+            model=request.model,
+            output_format=request.output_format,
+            quality=request.quality
+        ):
+            results.append(result)
+            item = UpscaleResponse(
+                success=result["success"],
+                original_url=request.image_urls[index],
+                upscaled_url=result.get("upscaled_path"),
+                scale_factor=request.scale_factor,
+                model_used=result.get("model_used"),
+                processing_time_ms=result.get("processing_time_ms", 0),
+                file_size_bytes=result.get("file_size_bytes"),
+                peak_rss_mb=result.get("peak_rss_mb"),
+                tiling=result.get("tiling"),
+                chain=result.get("chain"),
+                routing=result.get("routing"),
+                streamed_encode=result.get("streamed_encode"),
+                error=result.get("error")
+            )
+            yield json.dumps({"type": "result", "index": index, **item.model_dump()}) + "\n"
+        
+        summary = batch_throughput(results, time.time() - start_time)
+        logger.info("Batch upscale finished", **summary)
+        yield json.dumps({"type": "summary", "success": summary["total_failed"] == 0, **summary}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+class VectorizeRequest(BaseModel):
+    """Request model for tracing a flat-colour logo to SVG"""
+    image_url: str = Field(..., description="URL of the logo to trace")
+    corner_threshold: float = Field(60.0, ge=0, le=180, description="Vertices turning by at least this many degrees stay sharp")
+    smoothness: float = Field(1.0, ge=0, le=10, description="Path simplification tolerance in pixels (0 = follow every pixel)")
+    min_area: float = Field(4.0, ge=0, description="Regions and holes smaller than this many pixels are dropped")
+    remove_background: bool = Field(False, description="Leave out the detected background colour")
+
+class VectorizeResponse(BaseModel):
+    """Response model for logo vectorization"""
+    success: bool
+    original_url: str
+    svg_url: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    palette: Optional[List[str]] = None
+    layers: Optional[List[Dict[str, Any]]] = None
+    file_size_bytes: Optional[int] = None
+    processing_time_ms: int
+    error: Optional[str] = None
+
+@router.post("/upscale/vectorize", response_model=VectorizeResponse)
+async def vectorize_logo(request: VectorizeRequest):
+    """
+    Trace a flat-colour logo into SVG paths
+    
+    The fill palette comes from color analysis. The SVG can be rasterized at any print
+    size instead of upscaling the bitmap.
+    
+    Args:
+        request: Vectorize request with image URL and tracing thresholds
+        
+    Returns:
+        SVG URL, palette and per-layer path counts
+    """
+    try:
+        InputValidator.validate_image_url(request.image_url, "image_url")
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Validation failed", "message": e.message, "field": e.field}
+        )
+    
+    result = await vectorizer.vectorize_image(
+        request.image_url,
+        corner_threshold=request.corner_threshold,
+        smoothness=request.smoothness,
+        min_area=request.min_area,
+        remove_background=request.remove_background
+    )
+    return VectorizeResponse(**result)
@@ -4,13 +4,13 @@ Web Assets API - Prepare logos for web use
 import os
 import time
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from PIL import Image
 import numpy as np
 
-from services.ai_background_remover import AIBackgroundRemover
+from services.ai_background_remover import ai_remover
 from utils.filename_utils import generate_processing_filename
 
 logger = logging.getLogger(__name__)
@@ -33,7 +33,7 @@ class BatchLogoPreprocessRequest(BaseModel):
 class WebAssetsService:
     def __init__(self):
         self.output_dir = "./output/web-assets"
-        self.ai_remover = AIBackgroundRemover()
+        self.ai_remover = ai_remover
         os.makedirs(self.output_dir, exist_ok=True)
     
     async def preprocess_logo(self, request: LogoPreprocessRequest) -> dict:
@@ -44,50 +44,62 @@ class WebAssetsService:
             # Download logo
             logo_image = await self._download_image(request.logo_url)
             
-            # Remove background if requested
+            # Remove background if requested (skipped when it is already transparent)
+            background_bypassed = False
             if request.remove_background:
-                logo_image = await self._remove_background(logo_image)
+                logo_image, background_bypassed = await self._remove_background(logo_image)
             
-            # Optimize for web if requested
-            if request.optimize_for_web:
-                logo_image = await self._optimize_for_web(logo_image)
-            
-            # Generate filename
-            filename = generate_processing_filename(
-                original_url=request.logo_url,
-                processing_type="web_ready",
-                extension=request.output_format,
-                include_timestamp=True
-            )
-            
-            # Save processed logo
-            output_path = os.path.join(self.output_dir, filename)
-            await self._save_image(logo_image, output_path, request.output_format, request.quality)
-            
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            return {
-                "success": True,
-                "original_url": request.logo_url,
-                "processed_url": f"./output/web-assets/{filename}",
-                "filename": filename,
-                "file_size_bytes": os.path.getsize(output_path),
-                "processing_time_ms": processing_time,
-                "background_removed": request.remove_background,
-                "web_optimized": request.optimize_for_web,
-                "error": None
-            }
+            return await self._finish_logo(request, logo_image, background_bypassed, start_time)
             
         except Exception as e:
             logger.error(f"Logo preprocessing failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Logo preprocessing failed: {str(e)}")
     
+    async def _finish_logo(
+        self,
+        request: LogoPreprocessRequest,
+        logo_image: Image.Image,
+        background_bypassed: bool,
+        start_time: float
+    ) -> dict:
+        """Optimize and save a logo whose background step is done"""
+        # Optimize for web if requested
+        if request.optimize_for_web:
+            logo_image = await self._optimize_for_web(logo_image)
+        
+        # Generate filename
+        filename = generate_processing_filename(
+            original_url=request.logo_url,
+            processing_type="web_ready",
+            extension=request.output_format,
+            include_timestamp=True
+        )
+        
+        # Save processed logo
+        output_path = os.path.join(self.output_dir, filename)
+        await self._save_image(logo_image, output_path, request.output_format, request.quality)
+        
+        processing_time = int((time.time() - start_time) * 1000)
+        
+        return {
+            "success": True,
+            "original_url": request.logo_url,
+            "processed_url": f"./output/web-assets/{filename}",
+            "filename": filename,
+            "file_size_bytes": os.path.getsize(output_path),
+            "processing_time_ms": processing_time,
+            "background_removed": request.remove_background,
+            "background_bypassed": background_bypassed,
+            "web_optimized": request.optimize_for_web,
+            "error": None
+        }
+    
     async def batch_preprocess_logos(self, request: BatchLogoPreprocessRequest) -> dict:
-        """Preprocess multiple logos for web use"""
+        """Preprocess multiple logos for web use, removing their backgrounds in micro-batches"""
         try:
-            results = []
-            total_processing_time = 0
+            start_time = time.time()
             
+            requests_and_images = []
             for logo_url in request.logo_urls:
                 single_request = LogoPreprocessRequest(
                     logo_url=logo_url,
@@ -96,15 +108,24 @@ class WebAssetsService:
                     remove_background=request.remove_background,
                     optimize_for_web=request.optimize_for_web
                 )
-                
-                result = await self.preprocess_logo(single_request)
-                results.append(result)
-                total_processing_time += result["processing_time_ms"]
+                requests_and_images.append((single_request, await self._download_image(logo_url)))
+            
+            # One pass through rembg for every logo that still has a background
+            batch_stats = {}
+            if request.remove_background:
+                removed = await self._remove_backgrounds([image for _, image in requests_and_images], batch_stats)
+            else:
+                removed = [(image, False) for _, image in requests_and_images]
+            
+            results = []
+            for (single_request, _), (logo_image, background_bypassed) in zip(requests_and_images, removed):
+                results.append(await self._finish_logo(single_request, logo_image, background_bypassed, time.time()))
             
             return {
                 "success": True,
                 "total_logos": len(request.logo_urls),
-                "total_processing_time_ms": total_processing_time,
+                "total_processing_time_ms": int((time.time() - start_time) * 1000),
+                "rembg_batch": batch_stats or None,
                 "results": results,
                 "error": None
             }
@@ -113,23 +134,26 @@ class WebAssetsService:
             logger.error(f"Batch logo preprocessing failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Batch preprocessing failed: {str(e)}")
     
-    async def _remove_background(self, logo_image: Image.Image) -> Image.Image:
-        """Remove background using AI"""
+    async def _remove_backgrounds(self, logo_images: List[Image.Image], stats: dict) -> List[Tuple[Image.Image, bool]]:
+        """Batched _remove_background. Returns (image, whether rembg was bypassed) per logo."""
         try:
-            # Convert PIL to numpy array
-            logo_array = np.array(logo_image)
-            
-            # Get rembg session
-            session, remove_func = self.ai_remover._get_rembg_session()
-            
-            # Remove background using AI
-            result_image = remove_func(logo_image, session=session)
+            results = self.ai_remover.remove_images_if_needed(logo_images, stats)
+            return [(image, analysis["bypass"]) for image, analysis in results]
+        except Exception as e:
+            logger.warning(f"Batch background removal failed: {str(e)}")
+            return [(image, False) for image in logo_images]
+    
+    async def _remove_background(self, logo_image: Image.Image) -> Tuple[Image.Image, bool]:
+        """Remove background using AI. Returns (image, whether rembg was bypassed)."""
+        try:
+            # Remove background using AI unless the logo is already transparent
+            result_image, analysis = self.ai_remover.remove_image_if_needed(logo_image)
             
-            return result_image
+            return result_image, analysis["bypass"]
                 
         except Exception as e:
             logger.warning(f"Background removal failed: {str(e)}")
-            return logo_image
+            return logo_image, False
     
     async def _optimize_for_web(self, logo_image: Image.Image) -> Image.Image:
         """Optimize logo for web use"""
@@ -9,6 +9,10 @@ from dotenv import load_dotenv
 # Load environment variables FIRST before any other imports
 load_dotenv("local.env")
 
+# Thread-pool sizes for BLAS/OpenMP have to be in the environment before NumPy and cv2 load
+from src.services.resource_governor import resource_governor
+resource_governor.configure_environment()
+
 # Log startup immediately after environment is loaded
 print("🚀 Image Processor Service Starting...")
 print("📊 Service Configuration:")
@@ -25,19 +29,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 
-from src.api.upscaling import router as upscaling_router
+from src.api.upscaling import router as upscaling_router, upscaler
 from src.api.asset_pack_simple import router as asset_pack_router
 from src.api.stats import router as stats_router
 from src.api.storage import router as storage_router
-from src.api.background_removal import router as background_removal_router
+from src.api.background_removal import router as background_removal_router, ai_remover
 from src.api.tshirt import router as tshirt_router
 from src.api.banner_generator import router as banner_router
+from src.api.render_cache import router as render_cache_router
 from src.api.color_analysis import analyze_colors_endpoint
 from src.api.color_analysis_v2 import register_routes as register_color_analysis_v2
 from src.models.schemas import HealthResponse
 from src.middleware.request_id import RequestIDMiddleware
 from src.custom_logging import logger
 from src.services.logo_overlay import LogoOverlayService
+from src.services.model_warmup import model_warmup
+from src.services.job_queue import job_workers
+from src.services.rembg_sessions import rembg_sessions
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
@@ -135,6 +143,8 @@ app.include_router(tshirt_router, prefix="/api/v1", tags=["tshirt"])
 logger.info("   ✅ T-shirt router registered")
 app.include_router(banner_router, prefix="/api/v1", tags=["banner"])
 logger.info("   ✅ Banner router registered")
+app.include_router(render_cache_router, prefix="/api/v1", tags=["admin"])
+logger.info("   ✅ Render cache admin router registered")
 
 # Register color analysis v2 routes
 register_color_analysis_v2(app)
@@ -145,8 +155,30 @@ logger.info("   ✅ Color analysis v2 routes registered")
 async def startup_event():
     """Log when the FastAPI application starts"""
     logger.info("🎉 FastAPI application started successfully!")
+    
+    # OpenCV/torch/BLAS thread pools sized to this process's share of the CPU
+    resource_governor.apply()
+    
+    # Load models in the background; /ready reports 503 until they are hot
+    if os.getenv("WARMUP_ENABLED", "true").lower() == "true":
+        warmers = {
+            "realesrgan": upscaler.warm_up,
+            "realesrgan-onnx": upscaler.warm_up_onnx,
+            "rembg": ai_remover.warm_up
+        }
+        for name in os.getenv("WARMUP_MODELS", "realesrgan,rembg").split(","):
+            name = name.strip()
+            if name in warmers:
+                model_warmup.register(name, warmers[name])
+        model_warmup.start()
+        logger.info("🔥 Model warm-up started in background")
+    # Worker processes for queued jobs (/api/v1/upscale/jobs, /api/v1/upscale/batch)
+    if job_workers.num_workers > 0:
+        job_workers.start()
+        logger.info(f"🧵 Started {job_workers.num_workers} job worker process(es)")
     logger.info("🔗 Available endpoints:")
     logger.info("   - Health: /health")
+    logger.info("   - Readiness: /ready")
     logger.info("   - API Health: /api/v1/health")
     logger.info("   - Documentation: /docs")
     logger.info("   - ReDoc: /redoc")
@@ -158,6 +190,7 @@ async def startup_event():
 async def shutdown_event():
     """Log when the FastAPI application shuts down"""
     logger.info("🛑 Image Processor Service shutting down...")
+    job_workers.stop()
     logger.info("👋 Goodbye!")
 
 # Add health endpoint under /api/v1 for consistency with frontend
@@ -195,6 +228,7 @@ class TestBannerRequest(BaseModel):
     players: List[TestPlayer]
     output_format: str = "png"
     quality: int = 95
+    preview: bool = False
 
 # Initialize logo overlay service
 logger.info("🔧 Initializing services...")
@@ -209,6 +243,20 @@ async def test_banner_generation(request: TestBannerRequest):
         # Convert players to the format expected by the service
         players_data = [{"number": p.number, "name": p.name} for p in request.players]
         
+        # Low-resolution inline preview - nothing is uploaded
+        if request.preview:
+            result = await logo_overlay_service.create_previews(["banner"], logo_url=request.logo_url, players=players_data)
+            if not result["success"]:
+                return result
+            preview = result["previews"]["banner"]
+            return {
+                "success": True,
+                "preview": True,
+                "output_url": preview["data_url"],
+                "processing_time_ms": result["processing_time_ms"],
+                "file_size_bytes": preview["file_size_bytes"]
+            }
+        
         # Call the create_banner method directly
         result = await logo_overlay_service.create_banner(
             logo_url=request.logo_url,
@@ -243,6 +291,7 @@ async def root():
             "tshirt_both": "/api/v1/tshirt/both",
             "stats": "/api/v1/stats",
             "health": "/health",
+            "ready": "/ready",
             "docs": "/docs"
         }
     }
@@ -272,7 +321,10 @@ async def health_check():
             checks={
                 "temp_directory": temp_exists,
                 "output_directory": output_exists,
-                "model_available": model_exists
+                "model_available": model_exists,
+                "job_queue": job_workers.status(),
+                "rembg_sessions": rembg_sessions.stats(),
+                "resource_governor": resource_governor.status()
             }
         )
     except Exception as e:
@@ -283,6 +335,12 @@ async def health_check():
             checks={"error": str(e)}
         )
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint - 503 until model warm-up has finished"""
+    status = model_warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Custom HTTP exception handler"""
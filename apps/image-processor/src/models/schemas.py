@@ -9,6 +9,9 @@ from enum import Enum
 class UpscaleModel(str, Enum):
     """Available upscaling models"""
     REALESRGAN = "realesrgan"
+    REALESRGAN_ONNX = "realesrgan-onnx"
+    AUTO = "auto"
+    OPENCV_EDGE = "opencv-edge"
     ESRGAN = "esrgan"
     OPENCV = "opencv"
 
@@ -35,6 +38,7 @@ class UpscaleResponse(BaseModel):
     model_used: str = Field(alias="model_used")
     processing_time_ms: int
     file_size_bytes: Optional[int] = None
+    chain: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     
     model_config = {"protected_namespaces": ()}
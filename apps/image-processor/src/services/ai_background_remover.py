@@ -2,18 +2,36 @@
 AI-powered background removal service using rembg
 """
 import os
+import time
 import logging
 import asyncio
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 import cv2
 from PIL import Image
 import requests
 from io import BytesIO
 from src.utils.filename_utils import generate_processing_filename
+from src.services.render_cache import render_cache
+from src.services.rembg_sessions import rembg_sessions
+from src.services.segmentation_models import segmentation_models
+from src.services.alpha_analysis import analyze_alpha
+from src.services import rembg_batch
 
 logger = logging.getLogger(__name__)
 
+# Alpha cleanup runs on tiles of this size near the cutout boundary. The blur and the two
+# morphology passes move pixels at most CLEANUP_REACH from it, and each tile is padded by
+# CLEANUP_MARGIN pixels of context so its own border never reaches the pixels kept.
+CLEANUP_TILE = 64
+CLEANUP_REACH = 6
+CLEANUP_MARGIN = 8
+
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
 class AIBackgroundRemover:
     """AI-powered background removal using rembg library"""
     
@@ -25,30 +43,140 @@ class AIBackgroundRemover:
         os.makedirs(self.temp_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
         
-        # Initialize rembg models (lazy loading)
-        self._rembg_session = None
+        # rembg sessions come from the process-wide registry (lazy loading, bounded pool);
+        # requests can pick another model from the segmentation model registry
+        self.model = segmentation_models.default_model
+        # Skip rembg for inputs whose background is already transparent
+        self.bypass_transparent = os.getenv("REMBG_BYPASS_TRANSPARENT", "true").lower() == "true"
+        # Images per session call when several are removed together
+        self.batch_size = int(os.getenv("REMBG_BATCH_SIZE", "4"))
+    
+    def background_check(self, image: Any) -> Dict[str, Any]:
+        """Alpha analysis of an input image; "bypass" is True when rembg can be skipped"""
+        analysis = analyze_alpha(image)
+        analysis["bypass"] = self.bypass_transparent and analysis["clean_background"]
+        if analysis["bypass"]:
+            logger.info(f"Background already transparent ({analysis['transparent_ratio']:.1%}), skipping rembg")
+        return analysis
+    
+    def remove_image_if_needed(self, image: Image.Image) -> Tuple[Image.Image, Dict[str, Any]]:
+        """Run rembg on a PIL image unless its background is already clean. Returns (image, analysis)."""
+        analysis = self.background_check(image)
+        if analysis["bypass"]:
+            return image, analysis
+        return Image.fromarray(self.cut_out(image, {}), "RGBA"), analysis
+    
+    def remove_images_if_needed(
+        self,
+        images: List[Image.Image],
+        stats: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Image.Image, Dict[str, Any]]]:
+        """
+        remove_image_if_needed for a list: the images that need rembg share micro-batched session calls
+        
+        Args:
+            images: PIL images
+            stats: Receives the batch size, image count and inference throughput
+            
+        Returns:
+            (image, analysis) per input, in order
+        """
+        analyses = [self.background_check(image) for image in images]
+        pending = [index for index, analysis in enumerate(analyses) if not analysis["bypass"]]
+        results = list(images)
+        step = time.perf_counter()
+        if pending:
+            masks = self.predict_masks([images[index] for index in pending])
+            for index, mask in zip(pending, masks):
+                results[index] = Image.fromarray(self._apply_mask(images[index], mask), "RGBA")
+        if stats is not None:
+            elapsed = time.perf_counter() - step
+            stats.update({
+                "batch_size": self.batch_size,
+                "images": len(pending),
+                "bypassed": len(images) - len(pending),
+                "inference_ms": round(elapsed * 1000, 2),
+                "images_per_second": round(len(pending) / elapsed, 2) if pending and elapsed > 0 else 0.0
+            })
+        return list(zip(results, analyses))
+    
+    def _bypass_result(self, output_path: str, analysis: Dict[str, Any]) -> dict:
+        """Result for an input returned as-is because its background was already transparent"""
+        return {
+            "success": True,
+            "output_url": output_path,
+            "file_size_bytes": os.path.getsize(output_path),
+            "method": "bypass_transparent",
+            "bypassed": True,
+            "alpha_analysis": analysis
+        }
+    
+    def remove_image(self, image: Any) -> Any:
+        """Run rembg on a PIL image or encoded bytes with a pooled session; returns the same kind"""
+        with rembg_sessions.session(self.model) as (session, remove_func):
+            return remove_func(image, session=session)
+    
+    def predict_mask(self, image: Image.Image, model: Optional[str] = None) -> np.ndarray:
+        """Foreground mask (uint8, same size as the image) straight from a pooled session"""
+        with rembg_sessions.session(model or self.model) as (session, _):
+            return np.asarray(session.predict(image)[0])
+    
+    def predict_masks(self, images: List[Image.Image], model: Optional[str] = None) -> List[np.ndarray]:
+        """Foreground masks for several images from one pooled session, batch_size images per call"""
+        model = model or self.model
+        with rembg_sessions.session(model) as (session, _):
+            return rembg_batch.predict_masks(session, model, images, self.batch_size)
+    
+    def _apply_mask(self, image: Image.Image, mask: np.ndarray) -> np.ndarray:
+        """RGBA copy of the image whose alpha is the lower of its own alpha and the mask"""
+        rgba = np.array(image.convert("RGBA"))
+        np.minimum(rgba[:, :, 3], mask, out=rgba[:, :, 3])
+        return rgba
+    
+    def cut_out(self, image: Image.Image, timings: Dict[str, float], model: Optional[str] = None) -> np.ndarray:
+        """
+        RGBA array of the image with the rembg mask composited into its alpha channel
+        
+        Existing transparency is kept (the lower of the input alpha and the mask wins) and the
+        colour channels are left untouched, so edges aren't darkened by a cutout composite.
         
-    def _get_rembg_session(self):
-        """Lazy load rembg session"""
-        if self._rembg_session is None:
-            try:
-                from rembg import new_session, remove
-                # Use a model that's good for logos and preserves details
-                # u2netp is lighter and often better at preserving fine details like white elements
-                self._rembg_session = new_session('u2netp')  # Better for preserving details in logos
-                self._remove_func = remove
-                logger.info("AI background removal model loaded successfully")
-            except ImportError:
-                logger.error("rembg not installed. Install with: pip install rembg")
-                raise ImportError("rembg library not available")
-        return self._rembg_session, self._remove_func
+        Args:
+            image: Decoded PIL image
+            timings: Receives "inference" and "composite" times in ms
+            model: rembg model (defaults to self.model)
+        """
+        step = time.perf_counter()
+        mask = self.predict_mask(image, model)
+        timings["inference"] = _ms_since(step)
+        
+        step = time.perf_counter()
+        rgba = self._apply_mask(image, mask)
+        timings["composite"] = _ms_since(step)
+        return rgba
+    
+    def warm_up(self) -> Dict[str, Any]:
+        """Create the rembg session and run a tiny inference so the first request doesn't pay for it"""
+        load_start = time.time()
+        try:
+            with rembg_sessions.session(self.model) as (session, remove_func):
+                load_time_ms = int((time.time() - load_start) * 1000)
+                warm_start = time.time()
+                remove_func(Image.new("RGB", (32, 32), (255, 255, 255)), session=session)
+        except ImportError:
+            return {"state": "unavailable", "detail": "rembg not installed"}
+        return {
+            "state": "ready",
+            "load_time_ms": load_time_ms,
+            "warmup_time_ms": int((time.time() - warm_start) * 1000)
+        }
     
-    async def remove_background_from_image(self, image: Image.Image) -> dict:
+    async def remove_background_from_image(self, image: Image.Image, model: Optional[str] = None) -> dict:
         """
         Remove background from PIL Image using AI-powered rembg
         
         Args:
             image: PIL Image object
+            model: rembg model (defaults to self.model)
             
         Returns:
             dict: Result with success status and processed image path
@@ -56,35 +184,47 @@ class AIBackgroundRemover:
         try:
             print(f"DEBUG: Starting AI background removal from PIL Image")
             
-            # Get rembg session
-            session, remove_func = self._get_rembg_session()
-            
-            # Convert PIL Image to bytes
-            img_bytes = BytesIO()
-            image.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
+            analysis = self.background_check(image)
+            if analysis["bypass"]:
+                output_path = os.path.join(self.output_dir, generate_processing_filename("bg_removed", "png"))
+                image.save(output_path, "PNG")
+                return self._bypass_result(output_path, analysis)
+            
+            # The pixels are hashed directly; the image is never encoded on the way in
+            model = model or self.model
+            cache_key = render_cache.make_key(
+                "rembg_image",
+                render_cache.content_hash(image.tobytes()),
+                {"model": model, "mode": image.mode, "size": list(image.size)}
+            )
+            cached = self._cached_output(cache_key)
+            if cached:
+                return cached
             
-            # Process with rembg
             print(f"DEBUG: Processing image with rembg")
-            result_bytes = remove_func(img_bytes.getvalue(), session=session)
-            
-            # Convert result back to PIL Image
-            result_image = Image.open(BytesIO(result_bytes))
+            timings: Dict[str, float] = {}
+            rgba = self.cut_out(image, timings, model)
             
             # Generate output filename
             output_filename = generate_processing_filename("bg_removed", "png")
             output_path = os.path.join(self.output_dir, output_filename)
             
-            # Save processed image
-            result_image.save(output_path, "PNG")
+            # Encode once, at the output
+            step = time.perf_counter()
+            Image.fromarray(rgba, "RGBA").save(output_path, "PNG")
+            timings["encode"] = _ms_since(step)
             
             print(f"DEBUG: Background removed successfully, saved to: {output_path}")
             
-            return {
+            result = {
                 "success": True,
                 "output_url": output_path,
-                "file_size_bytes": os.path.getsize(output_path)
+                "file_size_bytes": os.path.getsize(output_path),
+                "model": model,
+                "timings_ms": timings
             }
+            render_cache.put(cache_key, "rembg_image", result)
+            return result
             
         except Exception as e:
             logger.error(f"AI background removal failed: {e}")
@@ -93,64 +233,101 @@ class AIBackgroundRemover:
                 "error": f"AI background removal failed: {str(e)}"
             }
 
-    async def remove_background_ai(self, image_url: str) -> dict:
+    async def remove_background_ai(self, image_url: str, model: Optional[str] = None) -> dict:
         """
         Remove background using AI-powered rembg
         
         Args:
             image_url: URL or data URL of the image to process
+            model: rembg model (defaults to self.model)
             
         Returns:
             dict: Result with success status and processed image path
         """
         try:
-            # Handle data URLs, file URLs, and HTTP URLs
-            if image_url.startswith('data:'):
-                # Handle data URLs (base64 encoded images)
-                import base64
-                header, data = image_url.split(',', 1)
-                image_data = base64.b64decode(data)
-                image = Image.open(BytesIO(image_data))
-            else:
-                from urllib.parse import urlparse
-                parsed_url = urlparse(image_url)
-                
-                if parsed_url.scheme == 'file':
-                    # For file URLs, open directly
-                    file_path = parsed_url.path
-                    image = Image.open(file_path)
-                else:
-                    # For HTTP URLs, download first
-                    response = requests.get(image_url, timeout=30)
-                    response.raise_for_status()
-                    
-                    # Load image
-                    image_data = BytesIO(response.content)
-                    image = Image.open(image_data)
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Get rembg session
-            session, remove_func = self._get_rembg_session()
-            
-            # Remove background using AI
-            logger.info("Starting AI background removal...")
-            result_image = remove_func(image, session=session)
-            
-            # Save result
-            output_path = await self._save_transparent_image(result_image, image_url)
+            image_data = await self._fetch_image_bytes(image_url)
+        except Exception as e:
+            logger.error(f"AI background removal failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "method": "ai_rembg"
+            }
+        return await self._remove_background_ai_data(image_data, image_url, model)
+    
+    async def _fetch_image_bytes(self, image_url: str) -> bytes:
+        """Fetch encoded image bytes from a data URL, file URL or HTTP URL"""
+        if image_url.startswith('data:'):
+            # Handle data URLs (base64 encoded images)
+            import base64
+            header, data = image_url.split(',', 1)
+            return base64.b64decode(data)
+        
+        from urllib.parse import urlparse
+        parsed_url = urlparse(image_url)
+        
+        if parsed_url.scheme == 'file':
+            # For file URLs, read directly
+            with open(parsed_url.path, 'rb') as f:
+                return f.read()
+        
+        # For HTTP URLs, download first
+        response = requests.get(image_url, timeout=30)
+        response.raise_for_status()
+        return response.content
+    
+    def _cached_output(self, cache_key: str) -> Optional[dict]:
+        """Cached result whose output file still exists on this host"""
+        cached = render_cache.get(cache_key)
+        if cached is None:
+            return None
+        if not os.path.exists(cached["output_url"]):
+            render_cache.purge(key=cache_key)
+            return None
+        cached["cached"] = True
+        return cached
+    
+    async def _remove_background_ai_data(self, image_data: bytes, image_url: str, model: Optional[str] = None) -> dict:
+        """Run rembg on already-fetched image bytes"""
+        try:
+            model = model or self.model
+            cache_key = render_cache.make_key("rembg", render_cache.content_hash(image_data), {"model": model})
+            cached = self._cached_output(cache_key)
+            if cached:
+                return cached
+            
+            step = time.perf_counter()
+            image = Image.open(BytesIO(image_data))
+            image.load()
+            timings: Dict[str, float] = {"decode": _ms_since(step)}
+            
+            analysis = self.background_check(image)
+            if analysis["bypass"]:
+                output_path = await self._save_transparent_image(image.convert("RGBA"), image_url)
+                return self._bypass_result(output_path, analysis)
+            
+            # Remove background using AI; any alpha the input already has is kept
+            logger.info(f"Starting AI background removal ({model})...")
+            rgba = self.cut_out(image, timings, model)
+            
+            # Save result (the only encode)
+            step = time.perf_counter()
+            output_path = await self._save_transparent_image(Image.fromarray(rgba, "RGBA"), image_url)
+            timings["encode"] = _ms_since(step)
             
             # Get file size
             file_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
             
-            return {
+            result = {
                 "success": True,
                 "output_url": output_path,
                 "file_size_bytes": file_size,
-                "method": "ai_rembg"
+                "method": "ai_rembg",
+                "model": model,
+                "timings_ms": timings
             }
+            render_cache.put(cache_key, "rembg", result)
+            return result
             
         except Exception as e:
             logger.error(f"AI background removal failed: {e}")
@@ -160,24 +337,25 @@ class AIBackgroundRemover:
                 "method": "ai_rembg"
             }
     
+    def _output_path(self, original_url: str, extension: str = "png") -> str:
+        """Output file path named after the original URL"""
+        if original_url:
+            # Generate filename with timestamp
+            filename = generate_processing_filename(
+                original_url=original_url,
+                processing_type="no_bg",
+                extension=extension,
+                include_timestamp=True
+            )
+        else:
+            timestamp = int(time.time() * 1000)
+            filename = f"no_bg_{timestamp}.{extension}"
+        return os.path.join(self.output_dir, filename)
+    
     async def _save_transparent_image(self, image: Image.Image, original_url: str) -> str:
         """Save transparent image with proper naming"""
         try:
-            # Generate filename based on original URL
-            if original_url:
-                # Generate filename with timestamp
-                filename = generate_processing_filename(
-                    original_url=original_url,
-                    processing_type="no_bg",
-                    extension="png",
-                    include_timestamp=True
-                )
-            else:
-                import time
-                timestamp = int(time.time() * 1000)
-                filename = f"no_bg_{timestamp}.png"
-            
-            output_path = os.path.join(self.output_dir, filename)
+            output_path = self._output_path(original_url)
             
             # Save as PNG with transparency
             image.save(output_path, 'PNG', optimize=True)
@@ -187,39 +365,139 @@ class AIBackgroundRemover:
         except Exception as e:
             raise ValueError(f"Failed to save transparent image: {str(e)}")
     
-    async def remove_background_hybrid(self, image_url: str) -> dict:
+    def _encode_output(self, rgba: np.ndarray, output_format: str = "png", quality: int = 95) -> Tuple[bytes, str]:
         """
-        Hybrid approach: AI removal + manual cleanup
+        Encode an RGBA result once, in the delivery format
+        
+        Returns:
+            (encoded bytes, content type); JPEG has no alpha, so it is flattened onto white
+        """
+        output_format = output_format.lower()
+        buffer = BytesIO()
+        if output_format in ("jpg", "jpeg"):
+            alpha = rgba[:, :, 3:].astype(np.uint16)
+            flat = (rgba[:, :, :3] * alpha + 255 * (255 - alpha) + 127) // 255
+            Image.fromarray(flat.astype(np.uint8), "RGB").save(buffer, "JPEG", quality=quality, optimize=True)
+            return buffer.getvalue(), "image/jpeg"
+        if output_format == "webp":
+            Image.fromarray(rgba, "RGBA").save(buffer, "WEBP", quality=quality)
+            return buffer.getvalue(), "image/webp"
+        if output_format == "png":
+            Image.fromarray(rgba, "RGBA").save(buffer, "PNG", optimize=True)
+            return buffer.getvalue(), "image/png"
+        raise ValueError(f"Unsupported output format: {output_format}")
+    
+    def _hybrid_pipeline(self, image_data: bytes, output_format: str = "png", quality: int = 95, model: Optional[str] = None) -> dict:
+        """
+        Decode -> transparency check -> rembg cutout -> alpha cleanup -> encode, all in memory
+        
+        Returns:
+            dict: Result with the single encoded artifact under "data"
+        """
+        step = time.perf_counter()
+        image = Image.open(BytesIO(image_data))
+        image.load()
+        timings: Dict[str, float] = {"decode": _ms_since(step)}
+        
+        analysis = self.background_check(image)
+        if analysis["bypass"]:
+            # A clean PNG is already the artifact; anything else is re-encoded as-is
+            if output_format.lower() == "png" and image.format == "PNG":
+                data, content_type = image_data, "image/png"
+            else:
+                step = time.perf_counter()
+                data, content_type = self._encode_output(np.array(image.convert("RGBA")), output_format, quality)
+                timings["encode"] = _ms_since(step)
+            return {
+                "success": True,
+                "data": data,
+                "content_type": content_type,
+                "method": "bypass_transparent",
+                "bypassed": True,
+                "alpha_analysis": analysis,
+                "timings_ms": timings
+            }
+        
+        model = model or self.model
+        rgba = self.cut_out(image, timings, model)
+        
+        step = time.perf_counter()
+        self._cleanup_ai_array(rgba)
+        timings["cleanup"] = _ms_since(step)
+        
+        step = time.perf_counter()
+        data, content_type = self._encode_output(rgba, output_format, quality)
+        timings["encode"] = _ms_since(step)
+        return {
+            "success": True,
+            "data": data,
+            "content_type": content_type,
+            "method": "hybrid_ai_manual",
+            "model": model,
+            "timings_ms": timings
+        }
+    
+    async def remove_background_hybrid_encoded(
+        self,
+        image_url: str,
+        output_format: str = "png",
+        quality: int = 95,
+        model: Optional[str] = None
+    ) -> dict:
+        """
+        Hybrid removal that returns the encoded result instead of writing a file
         
         Args:
             image_url: URL of the image to process
+            output_format: png, jpg or webp
+            quality: Encoder quality for jpg/webp (1-100)
+            model: rembg model (defaults to self.model)
             
         Returns:
-            dict: Result with success status and processed image path
+            dict: Result with success status, encoded bytes ("data") and content type
         """
         try:
-            # First, try AI removal
-            ai_result = await self.remove_background_ai(image_url)
-            
-            if not ai_result["success"]:
-                return ai_result
-            
-            # Load the AI result
-            ai_image = Image.open(ai_result["output_url"])
-            
-            # Apply additional cleanup
-            cleaned_image = self._cleanup_ai_result(ai_image)
-            
-            # Save cleaned result
-            output_path = await self._save_transparent_image(cleaned_image, image_url)
-            file_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
-            
+            image_data = await self._fetch_image_bytes(image_url)
+            return self._hybrid_pipeline(image_data, output_format, quality, model)
+        except Exception as e:
+            logger.error(f"Hybrid background removal failed: {e}")
             return {
-                "success": True,
-                "output_url": output_path,
-                "file_size_bytes": file_size,
+                "success": False,
+                "error": str(e),
                 "method": "hybrid_ai_manual"
             }
+    
+    async def remove_background_hybrid(self, image_url: str, model: Optional[str] = None) -> dict:
+        """
+        Hybrid approach: AI removal + manual cleanup
+        
+        Args:
+            image_url: URL of the image to process
+            model: rembg model (defaults to self.model)
+            
+        Returns:
+            dict: Result with success status and processed image path
+        """
+        try:
+            image_data = await self._fetch_image_bytes(image_url)
+            model = model or self.model
+            cache_key = render_cache.make_key("rembg_hybrid", render_cache.content_hash(image_data), {"model": model})
+            cached = self._cached_output(cache_key)
+            if cached:
+                return cached
+            
+            result = self._hybrid_pipeline(image_data, model=model)
+            
+            # The encoded artifact is written as-is; nothing is decoded or re-encoded on the way
+            output_path = self._output_path(image_url)
+            with open(output_path, "wb") as f:
+                f.write(result.pop("data"))
+            result.pop("content_type")
+            result["output_url"] = output_path
+            result["file_size_bytes"] = os.path.getsize(output_path)
+            
+            render_cache.put(cache_key, "rembg_hybrid", result)
+            return result
             
         except Exception as e:
             logger.error(f"Hybrid background removal failed: {e}")
@@ -229,50 +507,79 @@ class AIBackgroundRemover:
                 "method": "hybrid_ai_manual"
             }
     
-    def _cleanup_ai_result(self, image: Image.Image) -> Image.Image:
-        """Clean up AI result with additional processing, preserving white elements"""
-        try:
-            # Convert to numpy array
-            img_array = np.array(image)
-            
-            # If image has alpha channel, work with it
-            if img_array.shape[2] == 4:
-                alpha = img_array[:, :, 3]
-                rgb = img_array[:, :, :3]
-                
-                # Identify white/light elements that should be preserved
-                # White elements are those with high RGB values (close to 255)
-                white_threshold = 200  # Pixels with RGB values above this are considered white
-                is_white = np.all(rgb >= white_threshold, axis=2)
-                
-                # Only remove very transparent pixels that are NOT white elements
-                # This prevents removing white elements that might have some transparency
-                should_remove = (alpha < 30) & (~is_white)
-                alpha[should_remove] = 0
-                
-                # For white elements, ensure they have sufficient alpha
-                # This prevents white elements from being made transparent
-                white_alpha_min = 180  # Minimum alpha for white elements
-                white_needs_alpha = is_white & (alpha < white_alpha_min)
-                alpha[white_needs_alpha] = white_alpha_min
-                
-                # Smooth alpha channel only for non-white areas to avoid affecting white elements
-                non_white_mask = ~is_white
-                if np.any(non_white_mask):
-                    alpha_smooth = cv2.GaussianBlur(alpha, (3, 3), 0)
-                    alpha[non_white_mask] = alpha_smooth[non_white_mask]
-                
-                # Apply morphological operations only to non-white areas
-                if np.any(non_white_mask):
-                    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
-                    alpha_clean = cv2.morphologyEx(alpha, cv2.MORPH_CLOSE, kernel)
-                    alpha_clean = cv2.morphologyEx(alpha_clean, cv2.MORPH_OPEN, kernel)
-                    alpha[non_white_mask] = alpha_clean[non_white_mask]
-                
-                img_array[:, :, 3] = alpha
-            
-            return Image.fromarray(img_array)
-            
-        except Exception as e:
-            logger.warning(f"AI result cleanup failed: {e}")
-            return image
+    def _cleanup_ai_array(self, img_array: np.ndarray) -> np.ndarray:
+        """
+        Clean up the alpha of an RGBA cutout in place, preserving white elements
+        
+        Smoothing and morphology can only change pixels near the alpha boundary, so they run
+        on padded tiles that touch it; cost follows the contour length, not the image area.
+        """
+        rgb = img_array[:, :, :3]
+        
+        # Only remove very transparent pixels that are NOT white elements. White is judged on
+        # alpha-weighted colour (see _refine_alpha), which needs alpha >= 200, so no pixel under
+        # 30 is white, and white elements already clear the 180 alpha floor they used to get.
+        _, alpha = cv2.threshold(np.ascontiguousarray(img_array[:, :, 3]), 29, 255, cv2.THRESH_TOZERO)
+        img_array[:, :, 3] = alpha
+        
+        height, width = alpha.shape
+        for y0, y1, x0, x1 in _boundary_tiles(alpha, CLEANUP_TILE):
+            # Each tile is refined from the thresholded plane with enough context that the
+            # ROI border can't reach the pixels written back
+            top, bottom = max(0, y0 - CLEANUP_MARGIN), min(height, y1 + CLEANUP_MARGIN)
+            left, right = max(0, x0 - CLEANUP_MARGIN), min(width, x1 + CLEANUP_MARGIN)
+            roi = self._refine_alpha(alpha[top:bottom, left:right], rgb[top:bottom, left:right])
+            img_array[y0:y1, x0:x1, 3] = roi[y0 - top:y1 - top, x0 - left:x1 - left]
+        
+        return img_array
+    
+    def _refine_alpha(self, alpha: np.ndarray, rgb: np.ndarray) -> np.ndarray:
+        """Smooth and open/close the alpha of one region, leaving white elements untouched"""
+        # Identify white/light elements that should be preserved
+        # White elements are those with high RGB values (close to 255). The colour is weighted
+        # by alpha, because the cutout keeps the original colour of the background it dropped;
+        # the weighting rounds like the PIL composite rembg used to return, so the same pixels
+        # count as white.
+        white_threshold = 200  # Pixels with RGB values above this are considered white
+        # (every channel clears the threshold exactly when the darkest one does)
+        darkest = np.minimum(np.minimum(rgb[:, :, 0], rgb[:, :, 1]), rgb[:, :, 2])
+        non_white = _mul_div255(darkest, alpha) < white_threshold
+        
+        # Smooth alpha channel only for non-white areas to avoid affecting white elements
+        alpha = np.where(non_white, cv2.GaussianBlur(alpha, (3, 3), 0), alpha)
+        
+        # Apply morphological operations only to non-white areas
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
+        alpha_clean = cv2.morphologyEx(alpha, cv2.MORPH_CLOSE, kernel)
+        alpha_clean = cv2.morphologyEx(alpha_clean, cv2.MORPH_OPEN, kernel)
+        return np.where(non_white, alpha_clean, alpha)
+
+
+def _mul_div255(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a * b / 255 for uint8 planes, rounded the way PIL's composite and paste blend it"""
+    product = a.astype(np.uint32) * b + 128
+    return ((product >> 8) + product) >> 8
+
+
+def _boundary_tiles(alpha: np.ndarray, tile: int) -> List[Tuple[int, int, int, int]]:
+    """
+    (y0, y1, x0, x1) of every tile the alpha cleanup can change
+
+    A boundary pixel is one whose 3x3 neighbourhood isn't constant (dilate != erode).
+    More than CLEANUP_REACH pixels from any of them, the blur and morphology reproduce the input.
+    """
+    height, width = alpha.shape
+    edge = cv2.morphologyEx(alpha, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    band = cv2.dilate(edge, np.ones((2 * CLEANUP_REACH + 1, 2 * CLEANUP_REACH + 1), np.uint8))
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile), dtype=np.uint8)
+    padded[:height, :width] = band
+    touched = padded.reshape(rows, tile, cols, tile).max(axis=(1, 3))
+    return [
+        (row * tile, min(height, (row + 1) * tile), col * tile, min(width, (col + 1) * tile))
+        for row, col in zip(*np.nonzero(touched))
+    ]
+
+
+# Global background remover instance
+ai_remover = AIBackgroundRemover()
@@ -0,0 +1,131 @@
+"""
+Alpha channel analysis
+Vectorized checks that tell whether an image already has a clean transparent background
+"""
+
+import math
+import time
+import numpy as np
+from PIL import Image
+from typing import Any, Dict, Optional, Union
+
+# Alpha at or below this counts as transparent, at or above OPAQUE_ALPHA as opaque
+TRANSPARENT_ALPHA = 8
+OPAQUE_ALPHA = 247
+# Ratios are measured on a strided grid of about this many pixels; the border ring is always full resolution
+SAMPLE_PIXELS = 65536
+BORDER_WIDTH = 2
+
+# A clean background: transparent along the edges and over a real share of the canvas
+MIN_BORDER_TRANSPARENCY = 0.9
+MIN_TRANSPARENT_RATIO = 0.05
+# Matte fringe: low-alpha edge pixels this much lighter (or darker) than high-alpha ones
+MATTE_CONTRAST = 40
+MATTE_MIN_SAMPLES = 8
+
+
+def _rgba_image(image: Union[Image.Image, np.ndarray]) -> Optional[Image.Image]:
+    """RGBA view of the input, or None when it has no transparency"""
+    if isinstance(image, np.ndarray):
+        if image.ndim != 3 or image.shape[2] != 4:
+            return None
+        return Image.fromarray(np.ascontiguousarray(image, dtype=np.uint8), "RGBA")
+    if image.mode in ("LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        return image.convert("RGBA")
+    return image if image.mode == "RGBA" else None
+
+
+def _border_ring(image: Image.Image, width: int) -> np.ndarray:
+    """Alpha values of the outer ring of pixels, cropped so the rest of the image isn't touched"""
+    w, h = image.size
+    width = min(width, w, h)
+    boxes = [(0, 0, w, width), (0, h - width, w, h), (0, 0, width, h), (w - width, 0, w, h)]
+    return np.concatenate([np.asarray(image.crop(box).getchannel("A")).ravel() for box in boxes])
+
+
+def _detect_matte(rgba: np.ndarray, alpha: np.ndarray) -> Optional[str]:
+    """
+    "white" or "black" when the semi-transparent edge was blended onto a solid matte
+
+    A matted fringe gets closer to the matte colour as alpha drops, while clean
+    anti-aliasing keeps the edge colour independent of alpha.
+    """
+    alpha = alpha.ravel()
+    edge = np.flatnonzero((alpha > 16) & (alpha < 240))
+    edge_alpha = alpha[edge]
+    pixels = rgba.reshape(-1, 4)
+    faint = pixels[edge[edge_alpha < 96], :3]
+    solid = pixels[edge[edge_alpha >= 160], :3]
+    if len(faint) < MATTE_MIN_SAMPLES or len(solid) < MATTE_MIN_SAMPLES:
+        return None
+    faint_mean, solid_mean = float(faint.mean()), float(solid.mean())
+    if faint_mean >= 192 and faint_mean - solid_mean >= MATTE_CONTRAST:
+        return "white"
+    if faint_mean <= 64 and solid_mean - faint_mean >= MATTE_CONTRAST:
+        return "black"
+    return None
+
+
+def analyze_alpha(image: Union[Image.Image, np.ndarray]) -> Dict[str, Any]:
+    """
+    Measure how transparent an image's background already is
+
+    Args:
+        image: PIL image (any mode) or RGBA uint8 array
+
+    Returns:
+        Dictionary with transparent/opaque/partial ratios, border transparency,
+        detected matte colour, clean_background and the reason for the verdict
+    """
+    start = time.perf_counter()
+    rgba_image = _rgba_image(image)
+    if rgba_image is None:
+        return {
+            "has_alpha": False,
+            "transparent_ratio": 0.0,
+            "opaque_ratio": 1.0,
+            "partial_ratio": 0.0,
+            "border_transparency": 0.0,
+            "matte": None,
+            "clean_background": False,
+            "reason": "no_alpha",
+            "analysis_time_us": int((time.perf_counter() - start) * 1e6)
+        }
+
+    ring = _border_ring(rgba_image, BORDER_WIDTH)
+    border_transparency = float(np.count_nonzero(ring <= TRANSPARENT_ALPHA)) / ring.size
+
+    # Nearest-neighbour resize is a strided sample taken in C, without copying the full image
+    width, height = rgba_image.size
+    step = max(1, math.ceil(math.sqrt(width * height / SAMPLE_PIXELS)))
+    if step > 1:
+        rgba_image = rgba_image.resize((max(1, width // step), max(1, height // step)), Image.NEAREST)
+    alpha_channel = rgba_image.getchannel("A")
+    histogram = alpha_channel.histogram()
+    total = rgba_image.width * rgba_image.height
+    transparent_ratio = sum(histogram[:TRANSPARENT_ALPHA + 1]) / total
+    opaque_ratio = sum(histogram[OPAQUE_ALPHA:]) / total
+    matte = None
+    if sum(histogram[17:240]) >= 2 * MATTE_MIN_SAMPLES:
+        matte = _detect_matte(np.asarray(rgba_image), np.asarray(alpha_channel))
+
+    if border_transparency < MIN_BORDER_TRANSPARENCY:
+        reason = "opaque_border"
+    elif transparent_ratio < MIN_TRANSPARENT_RATIO:
+        reason = "mostly_opaque"
+    elif matte:
+        reason = f"{matte}_matte"
+    else:
+        reason = "clean"
+
+    return {
+        "has_alpha": True,
+        "transparent_ratio": round(transparent_ratio, 4),
+        "opaque_ratio": round(opaque_ratio, 4),
+        "partial_ratio": round(1.0 - transparent_ratio - opaque_ratio, 4),
+        "border_transparency": round(border_transparency, 4),
+        "matte": matte,
+        "clean_background": reason == "clean",
+        "reason": reason,
+        "analysis_time_us": int((time.perf_counter() - start) * 1e6)
+    }
@@ -12,7 +12,8 @@ import cv2
 import numpy as np
 from io import BytesIO
 
-from src.services.ai_background_remover import AIBackgroundRemover
+from src.services.ai_background_remover import ai_remover
+from src.services.alpha_analysis import analyze_alpha
 from src.services.preprocessor import ImagePreprocessor
 from src.utils.filename_utils import generate_pipeline_filename, generate_processing_filename
 from src.storage import storage
@@ -26,7 +27,7 @@ class AssetCleanupService:
     def __init__(self):
         self.temp_dir = os.getenv("TEMP_DIR", "./temp")
         self.output_dir = os.getenv("OUTPUT_DIR", "./output")
-        self.ai_remover = AIBackgroundRemover()
+        self.ai_remover = ai_remover
         self.preprocessor = ImagePreprocessor()
         self.storage = storage
         
@@ -94,7 +95,8 @@ class AssetCleanupService:
                 "success": True,
                 "output_url": storage_file.public_url,
                 "processing_time_ms": processing_time,
-                "file_size_bytes": storage_file.file_size
+                "file_size_bytes": storage_file.file_size,
+                "background_bypassed": bg_result.get("bypassed", False)
             }
             
         except Exception as e:
@@ -240,30 +242,12 @@ class AssetCleanupService:
             return image_path
 
     def _has_transparent_background(self, image: Image.Image) -> bool:
-        """Check if image already has transparent background"""
+        """Check if image already has a clean transparent background"""
         try:
-            # Check if image has alpha channel
-            if image.mode not in ('RGBA', 'LA'):
-                return False
-            
-            # Convert to RGBA if it's LA
-            if image.mode == 'LA':
-                image = image.convert('RGBA')
-            
-            # Get alpha channel
-            alpha = image.split()[-1]
-            
-            # Check if there are any fully transparent pixels (alpha = 0)
-            # This indicates the image has transparency
-            transparent_pixels = sum(1 for pixel in alpha.getdata() if pixel == 0)
-            total_pixels = alpha.size[0] * alpha.size[1]
-            
-            # If more than 5% of pixels are transparent, consider it to have transparent background
-            transparency_ratio = transparent_pixels / total_pixels
-            has_transparency = transparency_ratio > 0.05
-            
-            logger.info(f"Transparency check: {transparent_pixels}/{total_pixels} transparent pixels ({transparency_ratio:.2%})")
-            return has_transparency
+            analysis = analyze_alpha(image)
+            logger.info(f"Transparency check: {analysis['transparent_ratio']:.2%} transparent, "
+                        f"border {analysis['border_transparency']:.2%} ({analysis['reason']})")
+            return analysis["clean_background"]
             
         except Exception as e:
             logger.warning(f"Transparency check failed: {str(e)}")
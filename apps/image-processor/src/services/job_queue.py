@@ -0,0 +1,407 @@
+"""
+Job Queue
+SQLite-backed job state with a pool of worker processes; no external broker required
+"""
+
+import os
+import json
+import time
+import uuid
+import signal
+import sqlite3
+import asyncio
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from src.services.resource_governor import resource_governor
+
+logger = logging.getLogger(__name__)
+
+# Job states
+PENDING = "pending"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    lease_expires_at REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    completed_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat() if timestamp else None
+
+
+class JobQueue:
+    """
+    Durable FIFO of jobs stored in a SQLite file shared by the API and worker processes
+
+    A claim is a lease that the running worker renews; every app process (one per uvicorn
+    worker) supervises its own pool on the same file, so a job is only taken back once its
+    lease has expired or its owning pool has seen the worker die.
+    """
+
+    def __init__(self, db_path: str, retention_seconds: int = 86400, max_attempts: int = 3, lease_seconds: float = 60):
+        self.db_path = db_path
+        self.retention_seconds = retention_seconds
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            # Created on first use so importing the module never touches disk
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+                if "lease_expires_at" not in columns:
+                    # Job files created before leases existed
+                    conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL")
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Queue a job and return its id"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), PENDING, time.time())
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job state as a dict, or None if unknown or already purged"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": 100 if row["status"] in FINISHED_STATES else 0,
+            "attempts": row["attempts"],
+            "created_at": _iso(row["created_at"]),
+            "started_at": _iso(row["started_at"]),
+            "completed_at": _iso(row["completed_at"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"]
+        }
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job. Pending jobs are cancelled immediately; running jobs are flagged and
+        their worker is stopped by the pool. Returns the resulting status, or None if unknown.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            status = row["status"]
+            if status == PENDING:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, cancel_requested = 1, completed_at = ? WHERE id = ?",
+                    (CANCELLED, time.time(), job_id)
+                )
+                status = CANCELLED
+            elif status == PROCESSING:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+        return status
+
+    def claim(self, worker_pid: int) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest pending job to processing for this worker"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (PENDING,)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            now = time.time()
+            conn.execute(
+                """UPDATE jobs SET status = ?, worker_pid = ?, started_at = ?, lease_expires_at = ?,
+                   attempts = attempts + 1 WHERE id = ?""",
+                (PROCESSING, worker_pid, now, now + self.lease_seconds, row["id"])
+            )
+            conn.execute("COMMIT")
+        return {"job_id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"])}
+
+    def heartbeat(self, job_id: str, worker_pid: int) -> bool:
+        """Renew the lease of a running job; False if the worker no longer holds it"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND worker_pid = ?",
+                (time.time() + self.lease_seconds, job_id, PROCESSING, worker_pid)
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Record a job outcome; a job cancelled while running stays cancelled"""
+        with self._connect() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = CASE WHEN cancel_requested THEN ? ELSE ? END,
+                   result = ?, error = ?, completed_at = ?, worker_pid = NULL, lease_expires_at = NULL
+                   WHERE id = ? AND status = ?""",
+                (
+                    CANCELLED,
+                    FAILED if error else COMPLETED,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    PROCESSING
+                )
+            )
+
+    def running(self) -> List[Dict[str, Any]]:
+        """Jobs currently claimed by a worker"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, worker_pid, cancel_requested FROM jobs WHERE status = ?", (PROCESSING,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def recover(self, dead_pids: Optional[List[int]] = None) -> int:
+        """
+        Return abandoned jobs to the queue (or cancel/fail them). A job is abandoned when its
+        lease has expired, or when it is held by one of dead_pids - workers the calling pool
+        has seen exit. Jobs of live workers in other processes are never touched. Returns
+        jobs recovered.
+        """
+        dead = list(dead_pids or [])
+        now = time.time()
+        recovered = 0
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"""SELECT id, attempts, cancel_requested FROM jobs WHERE status = ?
+                    AND (lease_expires_at IS NULL OR lease_expires_at < ?
+                         OR worker_pid IN ({','.join('?' * len(dead))}))""",
+                (PROCESSING, now, *dead)
+            ).fetchall()
+            for row in rows:
+                if row["cancel_requested"]:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker_pid = NULL, lease_expires_at = NULL, completed_at = ? WHERE id = ?",
+                        (CANCELLED, now, row["id"])
+                    )
+                elif row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        """UPDATE jobs SET status = ?, worker_pid = NULL, lease_expires_at = NULL, completed_at = ?,
+                           error = ? WHERE id = ?""",
+                        (FAILED, now, f"Worker died {row['attempts']} times while processing", row["id"])
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker_pid = NULL, lease_expires_at = NULL, started_at = NULL WHERE id = ?",
+                        (PENDING, row["id"])
+                    )
+                recovered += 1
+            conn.execute("COMMIT")
+        if recovered:
+            logger.warning(f"Recovered {recovered} job(s) from dead workers")
+        return recovered
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATES))}) AND completed_at < ?",
+                (*FINISHED_STATES, cutoff)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Job counts by status"""
+        if not self._initialized and not os.path.exists(self.db_path):
+            return {}
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+async def _run_upscale_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Upscale job handler (runs inside a worker process)"""
+    from src.services.upscaler import upscaler
+    return await upscaler.upscale_image(**payload)
+
+
+# Job kind -> async handler(payload) returning a result dict with "success" and "error"
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "upscale": _run_upscale_job
+}
+
+
+def process_next_job(queue: JobQueue, worker_pid: Optional[int] = None) -> bool:
+    """Claim and run one job. Returns False when the queue is empty."""
+    worker_pid = worker_pid or os.getpid()
+    job = queue.claim(worker_pid)
+    if job is None:
+        return False
+
+    # Renew the lease while the handler runs so no other process takes the job back
+    done = threading.Event()
+
+    def renew():
+        while not done.wait(queue.lease_seconds / 3):
+            queue.heartbeat(job["job_id"], worker_pid)
+
+    heartbeat = threading.Thread(target=renew, daemon=True)
+    heartbeat.start()
+
+    handler = JOB_HANDLERS.get(job["kind"])
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job['kind']}")
+        result = asyncio.run(handler(job["payload"]))
+        error = None if result.get("success", True) else (result.get("error") or "Job failed")
+        queue.finish(job["job_id"], result=result, error=error)
+    except Exception as e:
+        logger.error(f"Job {job['job_id']} failed: {e}")
+        queue.finish(job["job_id"], error=str(e))
+    finally:
+        done.set()
+        heartbeat.join()
+    return True
+
+
+def _worker_main(db_path: str, retention_seconds: int, max_attempts: int, lease_seconds: float, poll_interval: float):
+    """Worker process loop: claim jobs until terminated"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    resource_governor.apply()
+    queue = JobQueue(db_path, retention_seconds, max_attempts, lease_seconds)
+    while True:
+        if not process_next_job(queue):
+            time.sleep(poll_interval)
+
+
+class JobWorkerPool:
+    """Supervises worker processes: restarts crashed workers, recovers their jobs and enforces cancellation"""
+
+    def __init__(self, queue: JobQueue, num_workers: int = 2, poll_interval: float = 0.5):
+        self.queue = queue
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[multiprocessing.process.BaseProcess] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def _spawn(self) -> multiprocessing.process.BaseProcess:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                self.queue.db_path,
+                self.queue.retention_seconds,
+                self.queue.max_attempts,
+                self.queue.lease_seconds,
+                self.poll_interval
+            ),
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def start(self) -> asyncio.Task:
+        """Recover jobs whose lease ran out (e.g. left by a previous run), start workers and the supervisor"""
+        self.queue.recover()
+        self._workers = [self._spawn() for _ in range(self.num_workers)]
+        self._task = asyncio.create_task(self._supervise())
+        logger.info(f"Started {self.num_workers} job worker(s) on {self.queue.db_path}")
+        return self._task
+
+    def supervise_once(self):
+        """One supervision pass (restart dead workers, stop cancelled jobs, recover, purge)"""
+        cancelled_pids = {job["worker_pid"] for job in self.queue.running() if job["cancel_requested"]}
+        for process in self._workers:
+            if process.pid in cancelled_pids and process.is_alive():
+                logger.info(f"Stopping worker {process.pid} for cancelled job")
+                process.terminate()
+                process.join(5)
+
+        dead_pids = []
+        for i, process in enumerate(self._workers):
+            if not process.is_alive():
+                if process.exitcode not in (0, -signal.SIGTERM):
+                    logger.warning(f"Job worker {process.pid} exited with {process.exitcode}, restarting")
+                dead_pids.append(process.pid)
+                self._workers[i] = self._spawn()
+
+        # Only this pool's dead workers, plus leases nobody renewed
+        self.queue.recover(dead_pids)
+        self.queue.purge_expired()
+
+    async def _supervise(self):
+        while True:
+            await asyncio.sleep(max(self.poll_interval, 1.0))
+            try:
+                await asyncio.to_thread(self.supervise_once)
+            except Exception as e:
+                logger.error(f"Job supervisor pass failed: {e}")
+
+    def stop(self):
+        """Stop the supervisor and workers; queued and running jobs resume on next start"""
+        if self._task:
+            self._task.cancel()
+        for process in self._workers:
+            process.terminate()
+        for process in self._workers:
+            process.join(5)
+        self._workers = []
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "alive": sum(1 for p in self._workers if p.is_alive()),
+            "jobs": self.queue.stats()
+        }
+
+
+# Global job queue and worker pool instances
+job_queue = JobQueue(
+    db_path=os.getenv("JOB_DB_PATH", os.path.join(os.getenv("TEMP_DIR", "./temp"), "jobs.sqlite3")),
+    retention_seconds=int(os.getenv("JOB_RETENTION_HOURS", "24")) * 3600,
+    max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+    lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60"))
+)
+job_workers = JobWorkerPool(
+    job_queue,
+    num_workers=int(os.getenv("JOB_WORKERS", "2")),
+    poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+)
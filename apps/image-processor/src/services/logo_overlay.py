@@ -3,17 +3,39 @@ Logo Overlay Service
 Handles logo placement on t-shirts and banner creation
 """
 
+import io
 import os
+import base64
 import time
 import logging
-import requests
+from collections import OrderedDict
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from src.utils.filename_utils import generate_pipeline_filename
 from src.storage import storage
+from src.services.render_cache import render_cache
+from src.utils.image_handler import image_handler
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=8)
+def _load_roster_font(size: int) -> ImageFont.ImageFont:
+    """Load the roster font, falling back from Impact to Arial Black, Arial, then the default font"""
+    # Try Impact first (blocky and thick), then Arial Black, then Arial, then default
+    for font_path in ("/System/Library/Fonts/Impact.ttf", "/System/Library/Fonts/Arial Black.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(font_path, size)
+        except (OSError, IOError):
+            continue
+    return ImageFont.load_default()
+
+def _scaled(value: int, scale: float) -> int:
+    """Scale a fixed pixel offset or font size for reduced-resolution (preview) renders"""
+    if scale == 1.0:
+        return value
+    return max(1, int(round(value * scale)))
+
 class LogoOverlayService:
     def __init__(self):
         self.temp_dir = os.getenv("TEMP_DIR", "./temp")
@@ -23,6 +45,18 @@ class LogoOverlayService:
         # Initialize storage service
         self.storage = storage
         
+        # Composited template + logo layers, reused when only the roster text changes
+        self._base_layers: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._max_base_layers = int(os.getenv("RENDER_BASE_LAYER_CACHE_SIZE", "8"))
+        
+        # Decoded templates, keyed by (path, scale, mtime) - previews use downscaled copies
+        self._templates: Dict[tuple, Image.Image] = {}
+        
+        # Preview tier: reduced resolution, fast lossy encode, returned inline instead of uploaded
+        self.preview_scale = float(os.getenv("PREVIEW_SCALE", "0.25"))
+        self.preview_format = os.getenv("PREVIEW_FORMAT", "webp").lower()
+        self.preview_quality = int(os.getenv("PREVIEW_QUALITY", "60"))
+        
         # Create directories if they don't exist (only if we have write permissions)
         try:
             os.makedirs(self.temp_dir, exist_ok=True)
@@ -32,7 +66,7 @@ class LogoOverlayService:
             # If we can't create directories, continue without them
             pass
 
-    async def _upload_to_storage(self, file_data: bytes, filename: str, content_type: str) -> str:
+    async def _upload_to_storage(self, file_data, filename: str, content_type: str) -> str:
         """Upload file to storage and return public URL"""
         storage_file = await self.storage.upload_file(
             file_data=file_data,
@@ -42,6 +76,68 @@ class LogoOverlayService:
         )
         return storage_file.public_url
 
+    async def _fetch_logo(self, logo_url: Optional[str], required: bool = True) -> Optional[bytes]:
+        """Fetch the encoded logo once per request; the bytes feed both cache keys and compositing"""
+        if not logo_url:
+            return None
+        try:
+            return await image_handler.load_bytes(logo_url)
+        except Exception as e:
+            if required:
+                raise Exception(f"Failed to load image: {str(e)}")
+            logger.warning(f"Failed to add logo above roster: {str(e)}")
+            return None
+
+    def _cache_key(self, operation: str, logo_bytes: Optional[bytes], **params) -> str:
+        """Render cache key from the logo's content hash and the normalized render parameters"""
+        return render_cache.make_key(operation, render_cache.content_hash(logo_bytes), params)
+
+    def _get_base_layer(self, key: tuple) -> Optional[Image.Image]:
+        base = self._base_layers.get(key)
+        if base is not None:
+            self._base_layers.move_to_end(key)
+        return base
+
+    def _load_template(self, template_path: str, scale: float = 1.0) -> Image.Image:
+        """Decoded RGBA template, downscaled once per scale; callers must copy before drawing on it"""
+        key = (template_path, scale, os.path.getmtime(template_path))
+        template = self._templates.get(key)
+        if template is None:
+            template = Image.open(template_path).convert("RGBA")
+            if scale != 1.0:
+                size = (max(1, int(template.width * scale)), max(1, int(template.height * scale)))
+                template = template.resize(size, Image.Resampling.LANCZOS)
+            self._templates[key] = template
+        return template
+
+    def _put_base_layer(self, key: tuple, base: Image.Image):
+        self._base_layers[key] = base
+        self._base_layers.move_to_end(key)
+        while len(self._base_layers) > self._max_base_layers:
+            self._base_layers.popitem(last=False)
+
+    def _cached_result(self, cache_key: str, start_time: float) -> Optional[Dict[str, Any]]:
+        """Previously stored result for this render, if any"""
+        cached = render_cache.get(cache_key)
+        if cached:
+            cached["cached"] = True
+            cached["processing_time_ms"] = int((time.time() - start_time) * 1000)
+        return cached
+
+    def _encode_image(self, result_img: Image.Image, output_format: str, quality: int) -> Tuple[io.BytesIO, str]:
+        """Encode a rendered image into an in-memory buffer and return it with its content type"""
+        img_bytes = io.BytesIO()
+        if output_format.lower() == "jpg" or output_format.lower() == "jpeg":
+            result_img = result_img.convert("RGB")
+            result_img.save(img_bytes, "JPEG", quality=quality, optimize=True)
+            content_type = "image/jpeg"
+        else:
+            result_img.save(img_bytes, output_format.upper(), quality=quality, optimize=True)
+            content_type = f"image/{output_format.lower()}"
+        
+        img_bytes.seek(0)
+        return img_bytes, content_type
+
     async def overlay_logo_on_tshirt(
         self,
         logo_url: str,
@@ -66,66 +162,35 @@ class LogoOverlayService:
         start_time = time.time()
         
         try:
-            # Load t-shirt template
-            tshirt_template_path = os.path.join(self.assets_dir, f"{tshirt_color}_tshirt_front.png")
-            if not os.path.exists(tshirt_template_path):
-                return {
-                    "success": False,
-                    "error": f"T-shirt template not found: {tshirt_template_path}"
-                }
-            
-            # Load images using unified handler
-            from src.utils.image_handler import image_handler
+            logo_bytes = await self._fetch_logo(logo_url)
+            cache_key = self._cache_key("tshirt_front", logo_bytes, tshirt_color=tshirt_color, position=position, output_format=output_format, quality=quality)
+            cached = self._cached_result(cache_key, start_time)
+            if cached:
+                return cached
             
-            tshirt_img = Image.open(tshirt_template_path).convert("RGBA")
-            logo_img = await image_handler.load_image(logo_url)
-            
-            # Calculate logo size and position
-            logo_width, logo_height = self._calculate_logo_size(tshirt_img, logo_img, position)
-            logo_x, logo_y = self._calculate_logo_position(tshirt_img, logo_width, logo_height, position)
-            
-            # Resize logo
-            logo_resized = logo_img.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
-            
-            # Remove white/light background from logo
-            logo_cleaned = self._remove_logo_background(logo_resized)
-            
-            # Create result image
-            result_img = tshirt_img.copy()
-            
-            # Paste logo onto t-shirt
-            result_img.paste(logo_cleaned, (logo_x, logo_y), logo_cleaned)
+            result_img = self._render_tshirt_front(logo_bytes, tshirt_color, position)
             
             # Upload to Supabase storage
             filename = generate_pipeline_filename("team", [f"tshirt-{tshirt_color}-front"], output_format)
-            
-            # Convert to bytes
-            import io
-            img_bytes = io.BytesIO()
-            if output_format.lower() == "jpg" or output_format.lower() == "jpeg":
-                result_img = result_img.convert("RGB")
-                result_img.save(img_bytes, "JPEG", quality=quality, optimize=True)
-                content_type = "image/jpeg"
-            else:
-                result_img.save(img_bytes, output_format.upper(), quality=quality, optimize=True)
-                content_type = f"image/{output_format.lower()}"
-            
-            img_bytes.seek(0)
+            img_bytes, content_type = self._encode_image(result_img, output_format, quality)
+            file_size = img_bytes.getbuffer().nbytes
             
             storage_file = await self._upload_to_storage(
-                file_data=img_bytes.getvalue(),
+                file_data=img_bytes.getbuffer(),
                 filename=filename,
                 content_type=content_type
             )
             
             processing_time_ms = int((time.time() - start_time) * 1000)
             
-            return {
+            result = {
                 "success": True,
                 "output_url": storage_file,
                 "processing_time_ms": processing_time_ms,
-                "file_size_bytes": len(img_bytes.getvalue())
+                "file_size_bytes": file_size
             }
+            render_cache.put(cache_key, "tshirt_front", result)
+            return result
             
         except Exception as e:
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -135,6 +200,35 @@ class LogoOverlayService:
                 "processing_time_ms": processing_time_ms
             }
 
+    def _render_tshirt_front(self, logo_bytes: bytes, tshirt_color: str, position: str, scale: float = 1.0) -> Image.Image:
+        """Compose the logo onto the t-shirt front template"""
+        # Load t-shirt template
+        tshirt_template_path = os.path.join(self.assets_dir, f"{tshirt_color}_tshirt_front.png")
+        if not os.path.exists(tshirt_template_path):
+            raise FileNotFoundError(f"T-shirt template not found: {tshirt_template_path}")
+        
+        # Load images
+        tshirt_img = self._load_template(tshirt_template_path, scale)
+        logo_img = Image.open(io.BytesIO(logo_bytes))
+        
+        # Calculate logo size and position
+        logo_width, logo_height = self._calculate_logo_size(tshirt_img, logo_img, position)
+        logo_x, logo_y = self._calculate_logo_position(tshirt_img, logo_width, logo_height, position)
+        
+        # Resize logo
+        logo_resized = logo_img.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
+        
+        # Remove white/light background from logo
+        logo_cleaned = self._remove_logo_background(logo_resized)
+        
+        # Create result image
+        result_img = tshirt_img.copy()
+        
+        # Paste logo onto t-shirt
+        result_img.paste(logo_cleaned, (logo_x, logo_y), logo_cleaned)
+        
+        return result_img
+
     async def overlay_roster_on_tshirt_back(
         self,
         players: List[Dict[str, Any]],
@@ -159,150 +253,36 @@ class LogoOverlayService:
         start_time = time.time()
         
         try:
-            # Load t-shirt template
-            tshirt_template_path = os.path.join(self.assets_dir, f"{tshirt_color}_tshirt_back.png")
-            if not os.path.exists(tshirt_template_path):
-                return {
-                    "success": False,
-                    "error": f"T-shirt back template not found: {tshirt_template_path}"
-                }
-            
-            # Load t-shirt image
-            tshirt_img = Image.open(tshirt_template_path).convert("RGBA")
-            
-            # Create result image
-            result_img = tshirt_img.copy()
-            draw = ImageDraw.Draw(result_img)
+            logo_bytes = await self._fetch_logo(logo_url, required=False)
+            cache_key = self._cache_key("tshirt_back", logo_bytes, players=players, tshirt_color=tshirt_color, output_format=output_format, quality=quality)
+            cached = self._cached_result(cache_key, start_time)
+            if cached:
+                return cached
             
-            # Try to load fonts, fallback to default if not available
-            try:
-                # Try Impact first (blocky and thick), then Arial Black, then Arial Bold, then default
-                try:
-                    number_font = ImageFont.truetype("/System/Library/Fonts/Impact.ttf", 36)  # 10% smaller (40 * 0.9)
-                    name_font = ImageFont.truetype("/System/Library/Fonts/Impact.ttf", 24)     # 10% smaller (27 * 0.9)
-                except (OSError, IOError):
-                    try:
-                        number_font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", 36)  # 10% smaller (40 * 0.9)
-                        name_font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", 24)    # 10% smaller (27 * 0.9)
-                    except (OSError, IOError):
-                        try:
-                            number_font = ImageFont.truetype("arial.ttf", 36)  # 10% smaller (40 * 0.9)
-                            name_font = ImageFont.truetype("arial.ttf", 24)    # 10% smaller (27 * 0.9)
-                        except (OSError, IOError):
-                            number_font = ImageFont.load_default()
-                            name_font = ImageFont.load_default()
-            except Exception:
-                number_font = ImageFont.load_default()
-                name_font = ImageFont.load_default()
-            
-            # Set text color based on t-shirt color
-            text_color = (255, 255, 255) if tshirt_color == "black" else (0, 0, 0)
-            
-            # Calculate roster position (center of t-shirt back, moved 20% left, then right 10% and up 30%)
-            tshirt_width, tshirt_height = tshirt_img.size
-            start_x = int(tshirt_width * 0.3) + int(tshirt_width * 0.1)  # Move 20% left from center, then right 10%
-            start_y = tshirt_height // 2 - 80 - int(tshirt_height * 0.3)  # Center vertically, then up 30% (20% + 10%)
-            line_height = 32  # Adjusted spacing for smaller text (36 * 0.9)
-            current_y = start_y
-            
-            # Add small logo above roster if provided
-            if logo_url:
-                try:
-                    # Download and process logo
-                    logo_path = await self._download_image(logo_url)
-                    if logo_path:
-                        logo_img = Image.open(logo_path)
-                        
-                        # Resize logo to small size (about 9% of t-shirt width - 10% smaller)
-                        logo_size = int(tshirt_width * 0.09)
-                        logo_img = logo_img.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-                        
-                        # Convert to RGBA to ensure transparency support
-                        if logo_img.mode != 'RGBA':
-                            logo_img = logo_img.convert('RGBA')
-                        
-                        # Simple background removal - make white/light backgrounds transparent
-                        data = logo_img.getdata()
-                        new_data = []
-                        for item in data:
-                            # If pixel is white or very light, make it transparent
-                            if item[0] > 240 and item[1] > 240 and item[2] > 240:
-                                new_data.append((255, 255, 255, 0))  # Transparent
-                            else:
-                                new_data.append(item)
-                        logo_img.putdata(new_data)
-                        
-                        # Position logo above roster (centered horizontally)
-                        logo_x = start_x + 30  # Align with roster text
-                        logo_y = start_y - logo_size - 20  # 20px gap above roster
-                        
-                        # Paste logo onto t-shirt with transparency
-                        result_img.paste(logo_img, (logo_x, logo_y), logo_img)
-                        
-                        # Adjust roster start position to account for logo
-                        current_y = start_y
-                except Exception as e:
-                    logger.warning(f"Failed to add logo above roster: {str(e)}")
-                    current_y = start_y
-            else:
-                current_y = start_y
-            
-            # Draw roster
-            for player in players:
-                number_text = str(player["number"])
-                # Extract first name or use nickname (single word names)
-                full_name = player["name"].strip()
-                if ' ' in full_name:
-                    name_text = full_name.split()[0].upper()  # Extract first name
-                else:
-                    name_text = full_name.upper()  # Use nickname/single name as-is
-                
-                # Get text dimensions for right alignment
-                number_bbox = draw.textbbox((0, 0), number_text, font=number_font)
-                number_width = number_bbox[2] - number_bbox[0]
-                
-                # Right-align numbers by calculating position
-                number_x = start_x + 60 - number_width  # 60px column width, right-aligned
-                
-                # Draw number (right-aligned)
-                draw.text((number_x, current_y), number_text, fill=text_color, font=number_font)
-                
-                # Draw name (offset to the right of the number column)
-                name_x = start_x + 80  # Start after the number column
-                draw.text((name_x, current_y + 8), name_text, fill=text_color, font=name_font)
-                
-                current_y += line_height
+            result_img = self._render_tshirt_back(players, tshirt_color, logo_bytes)
             
             # Save result to storage
             filename = generate_pipeline_filename("team", [f"tshirt-{tshirt_color}-back"], output_format)
+            img_bytes, content_type = self._encode_image(result_img, output_format, quality)
+            file_size = img_bytes.getbuffer().nbytes
             
-            # Convert to bytes
-            import io
-            img_bytes = io.BytesIO()
-            if output_format.lower() == "jpg" or output_format.lower() == "jpeg":
-                result_img = result_img.convert("RGB")
-                result_img.save(img_bytes, "JPEG", quality=quality, optimize=True)
-                content_type = "image/jpeg"
-            else:
-                result_img.save(img_bytes, output_format.upper(), quality=quality, optimize=True)
-                content_type = f"image/{output_format.lower()}"
-            
-            img_bytes.seek(0)
-            
+            # Upload to Supabase storage
             storage_file = await self._upload_to_storage(
-                file_data=img_bytes.getvalue(),
+                file_data=img_bytes.getbuffer(),
                 filename=filename,
                 content_type=content_type
             )
             
             processing_time_ms = int((time.time() - start_time) * 1000)
             
-            return {
+            result = {
                 "success": True,
                 "output_url": storage_file,
                 "processing_time_ms": processing_time_ms,
-                "file_size_bytes": len(img_bytes.getvalue())
+                "file_size_bytes": file_size
             }
+            render_cache.put(cache_key, "tshirt_back", result)
+            return result
             
         except Exception as e:
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -312,6 +292,99 @@ class LogoOverlayService:
                 "processing_time_ms": processing_time_ms
             }
 
+    def _render_tshirt_back(self, players: List[Dict[str, Any]], tshirt_color: str, logo_bytes: Optional[bytes] = None, scale: float = 1.0) -> Image.Image:
+        """Draw the roster over the cached t-shirt back base layer"""
+        base_key = ("tshirt_back", tshirt_color, render_cache.content_hash(logo_bytes), scale)
+        base = self._get_base_layer(base_key)
+        if base is None:
+            base = self._render_tshirt_back_base(tshirt_color, logo_bytes, scale)
+            self._put_base_layer(base_key, base)
+        
+        result_img = base.copy()
+        self._draw_tshirt_back_roster(result_img, players, tshirt_color, scale)
+        return result_img
+
+    def _roster_origin(self, tshirt_img: Image.Image, scale: float = 1.0) -> Tuple[int, int]:
+        """Top-left of the roster block on the t-shirt back"""
+        # Center of t-shirt back, moved 20% left, then right 10% and up 30%
+        tshirt_width, tshirt_height = tshirt_img.size
+        start_x = int(tshirt_width * 0.3) + int(tshirt_width * 0.1)  # Move 20% left from center, then right 10%
+        start_y = tshirt_height // 2 - _scaled(80, scale) - int(tshirt_height * 0.3)  # Center vertically, then up 30% (20% + 10%)
+        return start_x, start_y
+
+    def _render_tshirt_back_base(self, tshirt_color: str, logo_bytes: Optional[bytes], scale: float = 1.0) -> Image.Image:
+        """T-shirt back template with the small logo composited above the roster area"""
+        # Load t-shirt template
+        tshirt_template_path = os.path.join(self.assets_dir, f"{tshirt_color}_tshirt_back.png")
+        if not os.path.exists(tshirt_template_path):
+            raise FileNotFoundError(f"T-shirt back template not found: {tshirt_template_path}")
+        
+        base_img = self._load_template(tshirt_template_path, scale).copy()
+        
+        # Add small logo above roster if provided
+        if logo_bytes:
+            try:
+                logo_img = Image.open(io.BytesIO(logo_bytes))
+                tshirt_width = base_img.width
+                start_x, start_y = self._roster_origin(base_img, scale)
+                
+                # Resize logo to small size (about 9% of t-shirt width - 10% smaller)
+                logo_size = int(tshirt_width * 0.09)
+                logo_img = logo_img.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
+                
+                # Simple background removal - make white/light backgrounds transparent
+                logo_img = self._remove_logo_background(logo_img)
+                
+                # Position logo above roster (centered horizontally)
+                logo_x = start_x + _scaled(30, scale)  # Align with roster text
+                logo_y = start_y - logo_size - _scaled(20, scale)  # 20px gap above roster
+                
+                # Paste logo onto t-shirt with transparency
+                base_img.paste(logo_img, (logo_x, logo_y), logo_img)
+            except Exception as e:
+                logger.warning(f"Failed to add logo above roster: {str(e)}")
+        
+        return base_img
+
+    def _draw_tshirt_back_roster(self, result_img: Image.Image, players: List[Dict[str, Any]], tshirt_color: str, scale: float = 1.0):
+        """Text layer: player numbers and names on the t-shirt back"""
+        draw = ImageDraw.Draw(result_img)
+        number_font = _load_roster_font(_scaled(36, scale))  # 10% smaller (40 * 0.9)
+        name_font = _load_roster_font(_scaled(24, scale))    # 10% smaller (27 * 0.9)
+        
+        # Set text color based on t-shirt color
+        text_color = (255, 255, 255) if tshirt_color == "black" else (0, 0, 0)
+        
+        start_x, start_y = self._roster_origin(result_img, scale)
+        line_height = _scaled(32, scale)  # Adjusted spacing for smaller text (36 * 0.9)
+        current_y = start_y
+        
+        # Draw roster
+        for player in players:
+            number_text = str(player["number"])
+            # Extract first name or use nickname (single word names)
+            full_name = player["name"].strip()
+            if ' ' in full_name:
+                name_text = full_name.split()[0].upper()  # Extract first name
+            else:
+                name_text = full_name.upper()  # Use nickname/single name as-is
+            
+            # Get text dimensions for right alignment
+            number_bbox = draw.textbbox((0, 0), number_text, font=number_font)
+            number_width = number_bbox[2] - number_bbox[0]
+            
+            # Right-align numbers by calculating position
+            number_x = start_x + _scaled(60, scale) - number_width  # 60px column width, right-aligned
+            
+            # Draw number (right-aligned)
+            draw.text((number_x, current_y), number_text, fill=text_color, font=number_font)
+            
+            # Draw name (offset to the right of the number column)
+            name_x = start_x + _scaled(80, scale)  # Start after the number column
+            draw.text((name_x, current_y + _scaled(8, scale)), name_text, fill=text_color, font=name_font)
+            
+            current_y += line_height
+
     async def create_banner(
         self,
         logo_url: str,
@@ -336,124 +409,39 @@ class LogoOverlayService:
         start_time = time.time()
         
         try:
-            # Load banner template from test-input
-            banner_template_path = os.path.join(self.assets_dir, "..", "test-input", "banner", "banner-template.png")
-            if not os.path.exists(banner_template_path):
-                return {
-                    "success": False,
-                    "error": f"Banner template not found: {banner_template_path}"
-                }
-            
-            # Download logo
-            logo_path = await self._download_image(logo_url)
-            if not logo_path:
-                return {
-                    "success": False,
-                    "error": "Failed to download logo"
-                }
-            
-            # Load images
-            banner_img = Image.open(banner_template_path).convert("RGBA")
-            logo_img = Image.open(logo_path).convert("RGBA")
-            
-            # Calculate logo size and position
-            logo_width, logo_height = self._calculate_banner_logo_size(banner_img, logo_img)
-            logo_x, logo_y = self._calculate_banner_logo_position(banner_img, logo_width, logo_height)
-            
-            # Resize logo
-            logo_resized = logo_img.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
-            
-            # Remove white/light background from logo
-            logo_cleaned = self._remove_logo_background(logo_resized)
-            
-            # Create result image
-            result_img = banner_img.copy()
-            
-            # Paste logo onto banner
-            result_img.paste(logo_cleaned, (logo_x, logo_y), logo_cleaned)
-            
-            # Add roster text in single column format
-            draw = ImageDraw.Draw(result_img)
-            
-            # Try to load fonts, fallback to default if not available
             try:
-                # Try Impact first (blocky and thick), then Arial Black, then Arial, then default
-                try:
-                    roster_font = ImageFont.truetype("/System/Library/Fonts/Impact.ttf", 36)
-                except (OSError, IOError):
-                    try:
-                        roster_font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", 36)
-                    except (OSError, IOError):
-                        try:
-                            roster_font = ImageFont.truetype("arial.ttf", 36)
-                        except (OSError, IOError):
-                            roster_font = ImageFont.load_default()
+                logo_bytes = await self._fetch_logo(logo_url)
             except Exception:
-                roster_font = ImageFont.load_default()
-            
-            # Add roster in single column format with right-aligned numbers
-            roster_x = int(banner_img.width * 0.6)  # Position on right side
-            roster_y = int(banner_img.height * 0.34)  # Move up another 3% (0.37 - 0.03 = 0.34)
-            line_height = 40  # Spacing between lines
-            number_column_width = 60  # Fixed width for number column
-            name_spacing = 20  # Space between number and name
-            
-            # Extract first names or use nicknames (single word names) and draw in column
-            for i, p in enumerate(players):
-                full_name = p['name'].strip()
-                if ' ' in full_name:
-                    first_name = full_name.split()[0]  # Extract first name
-                else:
-                    first_name = full_name  # Use nickname/single name as-is
-                
-                # Get text dimensions for right alignment
-                number_text = str(p['number'])
-                name_text = first_name.upper()
-                
-                # Calculate number position (right-aligned in column)
-                number_bbox = draw.textbbox((0, 0), number_text, font=roster_font)
-                number_width = number_bbox[2] - number_bbox[0]
-                number_x = roster_x + number_column_width - number_width  # Right-aligned
-                
-                # Calculate name position (fixed spacing after number column)
-                name_x = roster_x + number_column_width + name_spacing
-                
-                current_y = roster_y + (i * line_height)
-                
-                # Draw number (right-aligned)
-                draw.text((number_x, current_y), number_text, fill=(0, 0, 0), font=roster_font)
-                # Draw name (fixed position)
-                draw.text((name_x, current_y), name_text, fill=(0, 0, 0), font=roster_font)
+                raise ValueError("Failed to download logo")
+            cache_key = self._cache_key("banner", logo_bytes, players=players, output_format=output_format, quality=quality)
+            cached = self._cached_result(cache_key, start_time)
+            if cached:
+                return cached
+            
+            result_img = self._render_banner(logo_bytes, players)
             
             # Save result to storage
             filename = generate_pipeline_filename(team_name, ["banner"], output_format)
-            
-            # Convert to bytes
-            import io
-            img_bytes = io.BytesIO()
-            if output_format.lower() == "jpg" or output_format.lower() == "jpeg":
-                result_img = result_img.convert("RGB")
-                result_img.save(img_bytes, "JPEG", quality=quality, optimize=True)
-                content_type = "image/jpeg"
-            else:
-                result_img.save(img_bytes, output_format.upper(), quality=quality, optimize=True)
-                content_type = f"image/{output_format.lower()}"
+            img_bytes, content_type = self._encode_image(result_img, output_format, quality)
+            file_size = img_bytes.getbuffer().nbytes
             
             # Upload to Supabase storage
             storage_file = await self._upload_to_storage(
-                file_data=img_bytes.getvalue(),
+                file_data=img_bytes.getbuffer(),
                 filename=filename,
                 content_type=content_type
             )
             
             processing_time_ms = int((time.time() - start_time) * 1000)
             
-            return {
+            result = {
                 "success": True,
                 "output_url": storage_file,
                 "processing_time_ms": processing_time_ms,
-                "file_size_bytes": len(img_bytes.getvalue())
+                "file_size_bytes": file_size
             }
+            render_cache.put(cache_key, "banner", result)
+            return result
             
         except Exception as e:
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -463,6 +451,290 @@ class LogoOverlayService:
                 "processing_time_ms": processing_time_ms
             }
 
+    def _render_banner(self, logo_bytes: bytes, players: List[Dict[str, Any]], scale: float = 1.0) -> Image.Image:
+        """Draw the roster over the cached banner base layer"""
+        base_key = ("banner", render_cache.content_hash(logo_bytes), scale)
+        base = self._get_base_layer(base_key)
+        if base is None:
+            base = self._render_banner_base(logo_bytes, scale)
+            self._put_base_layer(base_key, base)
+        
+        result_img = base.copy()
+        self._draw_banner_roster(result_img, players, scale)
+        return result_img
+
+    def _render_banner_base(self, logo_bytes: bytes, scale: float = 1.0) -> Image.Image:
+        """Banner template with the logo composited on it"""
+        # Load banner template from test-input
+        banner_template_path = os.path.join(self.assets_dir, "..", "test-input", "banner", "banner-template.png")
+        if not os.path.exists(banner_template_path):
+            raise FileNotFoundError(f"Banner template not found: {banner_template_path}")
+        
+        # Load images
+        banner_img = self._load_template(banner_template_path, scale).copy()
+        logo_img = Image.open(io.BytesIO(logo_bytes)).convert("RGBA")
+        
+        # Calculate logo size and position
+        logo_width, logo_height = self._calculate_banner_logo_size(banner_img, logo_img)
+        logo_x, logo_y = self._calculate_banner_logo_position(banner_img, logo_width, logo_height)
+        
+        # Resize logo
+        logo_resized = logo_img.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
+        
+        # Remove white/light background from logo
+        logo_cleaned = self._remove_logo_background(logo_resized)
+        
+        # Paste logo onto banner
+        banner_img.paste(logo_cleaned, (logo_x, logo_y), logo_cleaned)
+        
+        return banner_img
+
+    def _draw_banner_roster(self, result_img: Image.Image, players: List[Dict[str, Any]], scale: float = 1.0):
+        """Text layer: roster in a single column on the banner"""
+        draw = ImageDraw.Draw(result_img)
+        roster_font = _load_roster_font(_scaled(36, scale))
+        
+        # Add roster in single column format with right-aligned numbers
+        roster_x = int(result_img.width * 0.6)  # Position on right side
+        roster_y = int(result_img.height * 0.34)  # Move up another 3% (0.37 - 0.03 = 0.34)
+        line_height = _scaled(40, scale)  # Spacing between lines
+        number_column_width = _scaled(60, scale)  # Fixed width for number column
+        name_spacing = _scaled(20, scale)  # Space between number and name
+        
+        # Extract first names or use nicknames (single word names) and draw in column
+        for i, p in enumerate(players):
+            full_name = p['name'].strip()
+            if ' ' in full_name:
+                first_name = full_name.split()[0]  # Extract first name
+            else:
+                first_name = full_name  # Use nickname/single name as-is
+            
+            # Get text dimensions for right alignment
+            number_text = str(p['number'])
+            name_text = first_name.upper()
+            
+            # Calculate number position (right-aligned in column)
+            number_bbox = draw.textbbox((0, 0), number_text, font=roster_font)
+            number_width = number_bbox[2] - number_bbox[0]
+            number_x = roster_x + number_column_width - number_width  # Right-aligned
+            
+            # Calculate name position (fixed spacing after number column)
+            name_x = roster_x + number_column_width + name_spacing
+            
+            current_y = roster_y + (i * line_height)
+            
+            # Draw number (right-aligned)
+            draw.text((number_x, current_y), number_text, fill=(0, 0, 0), font=roster_font)
+            # Draw name (fixed position)
+            draw.text((name_x, current_y), name_text, fill=(0, 0, 0), font=roster_font)
+
+    async def create_asset_pack_images(
+        self,
+        logo_url: str,
+        team_name: str,
+        players: List[Dict[str, Any]],
+        tshirt_color: str = "black",
+        include_banner: bool = True,
+        output_format: str = "png",
+        quality: int = 95
+    ) -> Dict[str, Any]:
+        """
+        Render t-shirt front, t-shirt back and banner, then upload them in one concurrent batch
+        
+        Args:
+            logo_url: URL of the logo image
+            team_name: Team name used for the banner filename
+            players: List of player dictionaries with 'number' and 'name'
+            tshirt_color: Color of t-shirt (black, white)
+            include_banner: Whether to render the banner
+            output_format: Output image format for the t-shirts
+            quality: Output quality (1-100) for the t-shirts
+            
+        Returns:
+            Dictionary with output URLs and upload timing
+        """
+        start_time = time.time()
+        
+        try:
+            logo_bytes = await self._fetch_logo(logo_url)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"T-shirt front creation failed: {str(e)}",
+                "processing_time_ms": int((time.time() - start_time) * 1000)
+            }
+        logo_hash = render_cache.content_hash(logo_bytes)
+        
+        # (operation, cache key, render, filename, format, quality, error prefix); keys match the single-image methods
+        jobs = [
+            (
+                "tshirt_front",
+                render_cache.make_key("tshirt_front", logo_hash, {"tshirt_color": tshirt_color, "position": "left_chest", "output_format": output_format, "quality": quality}),
+                lambda: self._render_tshirt_front(logo_bytes, tshirt_color, "left_chest"),
+                generate_pipeline_filename("team", [f"tshirt-{tshirt_color}-front"], output_format),
+                output_format, quality, "T-shirt front creation failed"
+            ),
+            (
+                "tshirt_back",
+                render_cache.make_key("tshirt_back", render_cache.content_hash(None), {"players": players, "tshirt_color": tshirt_color, "output_format": output_format, "quality": quality}),
+                lambda: self._render_tshirt_back(players, tshirt_color),
+                generate_pipeline_filename("team", [f"tshirt-{tshirt_color}-back"], output_format),
+                output_format, quality, "T-shirt back creation failed"
+            ),
+        ]
+        if include_banner:
+            jobs.append((
+                "banner",
+                render_cache.make_key("banner", logo_hash, {"players": players, "output_format": "png", "quality": 95}),
+                lambda: self._render_banner(logo_bytes, players),
+                generate_pipeline_filename(team_name, ["banner"], "png"),
+                "png", 95, "Banner creation failed"
+            ))
+        
+        urls: Dict[str, Optional[str]] = {"tshirt_front": None, "tshirt_back": None, "banner": None}
+        items = []
+        pending = []
+        cached_count = 0
+        for operation, cache_key, render, filename, fmt, fmt_quality, error_prefix in jobs:
+            cached = render_cache.get(cache_key)
+            if cached:
+                urls[operation] = cached["output_url"]
+                cached_count += 1
+                continue
+            
+            try:
+                result_img = render()
+            except Exception as e:
+                # Banner is optional - a failed render just leaves banner_url empty
+                if operation == "banner":
+                    logger.warning(f"{error_prefix}: {str(e)}")
+                    continue
+                return {
+                    "success": False,
+                    "error": f"{error_prefix}: {str(e)}",
+                    "processing_time_ms": int((time.time() - start_time) * 1000)
+                }
+            
+            img_bytes, content_type = self._encode_image(result_img, fmt, fmt_quality)
+            items.append((img_bytes.getbuffer(), filename, content_type))
+            pending.append((operation, cache_key))
+        
+        # Upload everything that was rendered as one concurrent batch
+        total_bytes = 0
+        upload_time_ms = 0
+        if items:
+            try:
+                batch = await self.storage.upload_many(items, bucket="team-assets")
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"Asset upload failed: {str(e)}",
+                    "processing_time_ms": int((time.time() - start_time) * 1000)
+                }
+            
+            for (operation, cache_key), storage_file in zip(pending, batch.files):
+                urls[operation] = storage_file.public_url
+                render_cache.put(cache_key, operation, {
+                    "success": True,
+                    "output_url": storage_file.public_url,
+                    "file_size_bytes": storage_file.file_size
+                })
+            total_bytes = batch.total_bytes
+            upload_time_ms = batch.wall_time_ms
+        
+        return {
+            "success": True,
+            "tshirt_front_url": urls["tshirt_front"],
+            "tshirt_back_url": urls["tshirt_back"],
+            "banner_url": urls["banner"],
+            "cached_count": cached_count,
+            "total_bytes": total_bytes,
+            "upload_time_ms": upload_time_ms,
+            "processing_time_ms": int((time.time() - start_time) * 1000)
+        }
+
+    async def create_previews(
+        self,
+        kinds: List[str],
+        logo_url: Optional[str] = None,
+        players: Optional[List[Dict[str, Any]]] = None,
+        tshirt_color: str = "black",
+        position: str = "left_chest",
+        optional: Tuple[str, ...] = ()
+    ) -> Dict[str, Any]:
+        """
+        Render low-resolution previews and return them inline - nothing is uploaded
+        
+        Args:
+            kinds: Any of "tshirt_front", "tshirt_back", "banner"
+            logo_url: URL of the logo image
+            players: List of player dictionaries with 'number' and 'name'
+            tshirt_color: Color of t-shirt (black, white)
+            position: Logo position on the t-shirt front
+            optional: Kinds whose failure is logged and skipped instead of failing the request
+            
+        Returns:
+            Dictionary with a data URL, size and dimensions per preview
+        """
+        start_time = time.time()
+        players = players or []
+        
+        try:
+            # Only the shirt back can do without a logo
+            logo_bytes = await self._fetch_logo(logo_url, required=any(k != "tshirt_back" for k in kinds))
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "processing_time_ms": int((time.time() - start_time) * 1000)
+            }
+        
+        scale = self.preview_scale
+        previews = {}
+        for kind in kinds:
+            try:
+                if kind == "tshirt_front":
+                    result_img = self._render_tshirt_front(logo_bytes, tshirt_color, position, scale)
+                elif kind == "tshirt_back":
+                    result_img = self._render_tshirt_back(players, tshirt_color, logo_bytes, scale)
+                elif kind == "banner":
+                    result_img = self._render_banner(logo_bytes, players, scale)
+                else:
+                    raise ValueError(f"Unknown preview type: {kind}")
+            except Exception as e:
+                if kind in optional:
+                    logger.warning(f"{kind} preview failed: {str(e)}")
+                    continue
+                return {
+                    "success": False,
+                    "error": f"{kind} preview failed: {str(e)}",
+                    "processing_time_ms": int((time.time() - start_time) * 1000)
+                }
+            
+            data, content_type = self._encode_preview(result_img)
+            previews[kind] = {
+                "data_url": f"data:{content_type};base64,{base64.b64encode(data).decode('ascii')}",
+                "file_size_bytes": len(data),
+                "width": result_img.width,
+                "height": result_img.height
+            }
+        
+        return {
+            "success": True,
+            "preview": True,
+            "previews": previews,
+            "processing_time_ms": int((time.time() - start_time) * 1000)
+        }
+
+    def _encode_preview(self, result_img: Image.Image) -> Tuple[bytes, str]:
+        """Fast lossy encode for previews (WebP at the fastest method, or JPEG)"""
+        buffer = io.BytesIO()
+        if self.preview_format in ("jpg", "jpeg"):
+            result_img.convert("RGB").save(buffer, "JPEG", quality=self.preview_quality)
+            return buffer.getvalue(), "image/jpeg"
+        result_img.save(buffer, "WEBP", quality=self.preview_quality, method=0)
+        return buffer.getvalue(), "image/webp"
+
     def _calculate_logo_size(self, tshirt_img: Image.Image, logo_img: Image.Image, position: str) -> tuple:
         """Calculate appropriate logo size for t-shirt"""
         tshirt_width, tshirt_height = tshirt_img.size
@@ -539,31 +811,3 @@ class LogoOverlayService:
         except Exception as e:
             print(f"DEBUG: Background removal failed: {e}")
             return logo_img  # Return original if removal fails
-
-    async def _download_image(self, url: str) -> Optional[str]:
-        """Download image from URL and return local path"""
-        try:
-            # Handle file:// URLs
-            if url.startswith("file://"):
-                return url.replace("file://", "")
-            
-            # Handle direct file paths
-            if os.path.exists(url):
-                return url
-            
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # Generate filename
-            filename = f"temp_logo_{int(time.time())}.png"
-            temp_path = os.path.join(self.temp_dir, filename)
-            
-            # Save to temp directory
-            with open(temp_path, "wb") as f:
-                f.write(response.content)
-            
-            return temp_path
-            
-        except Exception as e:
-            print(f"DEBUG: Failed to download image {url}: {e}")
-            return None
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Model Warm-up
+Loads models in the background at startup and tracks per-model readiness
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Model states; "pending" and "loading" keep the service out of rotation
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+UNAVAILABLE = "unavailable"
+
+
+class ModelWarmup:
+    """Runs registered warm-up callables in a background task and reports their state"""
+
+    def __init__(self):
+        self._warmers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, warm_up: Callable[[], Dict[str, Any]]):
+        """Register a blocking warm-up callable returning {"state", "load_time_ms", ...}"""
+        self._warmers[name] = warm_up
+        self._models[name] = {"state": PENDING}
+
+    def start(self) -> asyncio.Task:
+        """Start warming all registered models without blocking startup"""
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def run(self):
+        """Warm each model in a worker thread, one at a time to avoid competing for CPU"""
+        for name, warm_up in self._warmers.items():
+            self._models[name] = {"state": LOADING}
+            start_time = time.time()
+            try:
+                result = await asyncio.to_thread(warm_up)
+            except Exception as e:
+                logger.error(f"Warm-up failed for {name}: {e}")
+                result = {"state": FAILED, "detail": str(e)}
+            result["total_time_ms"] = int((time.time() - start_time) * 1000)
+            self._models[name] = result
+            logger.info(f"Model {name} warm-up finished: {result['state']} in {result['total_time_ms']}ms")
+
+    def is_ready(self) -> bool:
+        """True once no model is still pending or loading"""
+        return all(m["state"] not in (PENDING, LOADING) for m in self._models.values())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "degraded": any(m["state"] == FAILED for m in self._models.values()),
+            "models": {name: dict(state) for name, state in self._models.items()}
+        }
+
+
+# Global warm-up coordinator
+model_warmup = ModelWarmup()
@@ -15,6 +15,38 @@ from src.utils.filename_utils import generate_processing_filename
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Gamma of the print color correction (slightly brightens)
+PRINT_GAMMA = 1.2
+
+# Per-pixel filter steps in the order they run; none of them commutes with resizing
+FILTER_STEPS = ("denoise", "sharpen", "enhance_contrast", "color_correct")
+
+def gamma_lut(gamma: float = PRINT_GAMMA) -> np.ndarray:
+    """
+    256-entry table for gamma correction
+    
+    Computed with the same float32 arithmetic and truncation as a whole-image
+    np.power pass, so cv2.LUT gives identical pixels without the float copies.
+    """
+    levels = np.arange(256, dtype=np.float32) / 255.0
+    return (np.power(levels, 1.0 / gamma) * 255).astype(np.uint8)
+
+def blended_sharpen_kernel(strength: float = 0.3) -> np.ndarray:
+    """
+    3x3 sharpening kernel already blended with the original image
+    
+    (1 - strength) * image + strength * (kernel * image) is one convolution with
+    (1 - strength) * identity + strength * kernel.
+    """
+    kernel = np.full((3, 3), -1.0, dtype=np.float32)
+    kernel[1, 1] = 9.0
+    identity = np.zeros((3, 3), dtype=np.float32)
+    identity[1, 1] = 1.0
+    return (1.0 - strength) * identity + strength * kernel
+
+GAMMA_LUT = gamma_lut()
+SHARPEN_KERNEL = blended_sharpen_kernel()
+
 class ImagePreprocessor:
     """Image preprocessing service for print preparation"""
     
@@ -46,39 +78,9 @@ class ImagePreprocessor:
             image_data = await self._download_image(image_url)
             original_image = self._load_image(image_data)
             
-            # Apply preprocessing steps
-            processed_image = original_image.copy()
-            
-            # 1. Noise reduction
-            if preprocessing_options.get('denoise', True):
-                processed_image = self._denoise_image(processed_image)
-            
-            # 2. Sharpening
-            if preprocessing_options.get('sharpen', True):
-                processed_image = self._sharpen_image(processed_image)
-            
-            # 3. Contrast enhancement
-            if preprocessing_options.get('enhance_contrast', True):
-                processed_image = self._enhance_contrast(processed_image)
-            
-            # 4. Color correction
-            if preprocessing_options.get('color_correct', True):
-                processed_image = self._color_correct(processed_image)
-            
-            # 5. Background removal (if requested)
-            if preprocessing_options.get('remove_background', False):
-                processed_image = self._remove_background(processed_image)
-            
-            # 6. Resize for print resolution
-            if preprocessing_options.get('print_resolution', 300):
-                processed_image = self._resize_for_print(
-                    processed_image, 
-                    preprocessing_options.get('print_resolution', 300)
-                )
-            
-            # 7. Convert to print-safe color space
-            if preprocessing_options.get('convert_to_cmyk', False):
-                processed_image = self._convert_to_cmyk(processed_image)
+            # Apply the planned steps over reused buffers
+            plan = self._plan_pipeline(preprocessing_options, original_image.shape)
+            processed_image = self._run_pipeline(original_image, plan)
             
             # Save processed image
             output_path = await self._save_processed_image(processed_image, image_url)
@@ -88,6 +90,7 @@ class ImagePreprocessor:
                 "output_url": output_path,
                 "original_url": image_url,
                 "preprocessing_applied": list(preprocessing_options.keys()),
+                "pipeline": plan["order"],
                 "file_size_bytes": os.path.getsize(output_path),
                 "error": None
             }
@@ -103,6 +106,100 @@ class ImagePreprocessor:
                 "error": str(e)
             }
     
+    def _plan_pipeline(self, options: Dict[str, Any], shape: Tuple[int, ...]) -> Dict[str, Any]:
+        """
+        Decide which steps run, and whether resizing goes before or after the filters
+        
+        The filters don't commute with resizing, so they run at whichever resolution is
+        smaller: before an upscale (the usual 300 DPI case), after a downscale.
+        
+        Args:
+            options: Preprocessing options of the request
+            shape: Shape of the loaded image
+            
+        Returns:
+            Plan with the enabled filters, resize target and the overall step order
+        """
+        filters = [step for step in FILTER_STEPS if options.get(step, True)]
+        
+        size = None
+        dpi = options.get('print_resolution', 300)
+        if dpi:
+            scale_factor = dpi / 72.0
+            height, width = shape[:2]
+            size = (int(width * scale_factor), int(height * scale_factor))
+        resize_first = size is not None and size[0] * size[1] < shape[0] * shape[1]
+        
+        remove_background = bool(options.get('remove_background', False))
+        convert_to_cmyk = bool(options.get('convert_to_cmyk', False))
+        
+        order = (["resize"] if resize_first else []) + filters
+        order += ["remove_background"] if remove_background else []
+        order += ["resize"] if size is not None and not resize_first else []
+        order += ["convert_to_cmyk"] if convert_to_cmyk else []
+        
+        return {
+            "filters": filters,
+            "size": size,
+            "resize_first": resize_first,
+            "remove_background": remove_background,
+            "convert_to_cmyk": convert_to_cmyk,
+            "order": order
+        }
+    
+    def _run_pipeline(self, image: np.ndarray, plan: Dict[str, Any]) -> np.ndarray:
+        """Run a plan from _plan_pipeline; the filters share two buffers of the working size"""
+        if plan["resize_first"]:
+            image = self._resize_to(image, plan["size"])
+        
+        if plan["filters"]:
+            image = self._apply_filters(image, plan["filters"])
+        
+        if plan["remove_background"]:
+            image = self._remove_background(image)
+        
+        if plan["size"] is not None and not plan["resize_first"]:
+            image = self._resize_to(image, plan["size"])
+        
+        if plan["convert_to_cmyk"]:
+            image = self._convert_to_cmyk(image)
+        
+        return image
+    
+    def _apply_filters(self, image: np.ndarray, steps: list) -> np.ndarray:
+        """
+        Apply filter steps in order over preallocated buffers
+        
+        Each step writes into the spare buffer (or in place) and the two are swapped, so
+        no step allocates a full image. A failing step is skipped like in the single-step
+        methods. The input buffer is reused, so callers pass an image they own.
+        """
+        current = image
+        spare = np.empty_like(image)
+        
+        for step in steps:
+            try:
+                if step == "denoise":
+                    cv2.bilateralFilter(current, 9, 75, 75, dst=spare)
+                    current, spare = spare, current
+                elif step == "sharpen":
+                    cv2.filter2D(current, -1, SHARPEN_KERNEL, dst=spare)
+                    current, spare = spare, current
+                elif step == "enhance_contrast":
+                    # CLAHE on the lightness plane only; the chroma planes stay in the LAB buffer
+                    lab = cv2.cvtColor(current, cv2.COLOR_BGR2LAB, dst=spare)
+                    lightness = cv2.extractChannel(lab, 0)
+                    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+                    clahe.apply(lightness, dst=lightness)
+                    cv2.insertChannel(lightness, lab, 0)
+                    cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=current)
+                elif step == "color_correct":
+                    cv2.LUT(current, GAMMA_LUT, dst=current)
+            except cv2.error as e:
+                logger.warning(f"Preprocessing step {step} failed: {e}")
+        
+        return current
+    
     async def _download_image(self, url: str) -> bytes:
         """Download image from URL"""
         import requests
@@ -144,17 +241,8 @@ class ImagePreprocessor:
     def _sharpen_image(self, image: np.ndarray) -> np.ndarray:
         """Sharpen image for better print quality"""
         try:
-            # Create sharpening kernel
-            kernel = np.array([[-1,-1,-1],
-                             [-1, 9,-1],
-                             [-1,-1,-1]])
-            
-            # Apply sharpening
-            sharpened = cv2.filter2D(image, -1, kernel)
-            
-            # Blend with original to avoid over-sharpening
-            result = cv2.addWeighted(image, 0.7, sharpened, 0.3, 0)
-            return result
+            # One convolution with the kernel blended 0.3 into the original to avoid over-sharpening
+            return cv2.filter2D(image, -1, SHARPEN_KERNEL)
         except Exception as e:
             logger.warning(f"Sharpening failed: {e}")
             return image
@@ -182,17 +270,8 @@ class ImagePreprocessor:
     def _color_correct(self, image: np.ndarray) -> np.ndarray:
         """Apply color correction for print accuracy"""
         try:
-            # Convert to float for better color manipulation
-            img_float = image.astype(np.float32) / 255.0
-            
-            # Apply gamma correction for better print appearance
-            gamma = 1.2  # Slightly brighten for print
-            corrected = np.power(img_float, 1.0/gamma)
-            
-            # Convert back to uint8
-            result = (corrected * 255).astype(np.uint8)
-            
-            return result
+            # Gamma correction for better print appearance, as a lookup table
+            return cv2.LUT(image, GAMMA_LUT)
         except Exception as e:
             logger.warning(f"Color correction failed: {e}")
             return image
@@ -247,13 +326,16 @@ class ImagePreprocessor:
             # Calculate new dimensions based on DPI
             # Assuming original image is at 72 DPI
             scale_factor = dpi / 72.0
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            
+            return self._resize_to(image, (int(width * scale_factor), int(height * scale_factor)))
+        except Exception as e:
+            logger.warning(f"Print resize failed: {e}")
+            return image
+    
+    def _resize_to(self, image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+        """Resize to (width, height) with Lanczos; returns the image unchanged on failure"""
+        try:
             # Resize using Lanczos interpolation for best quality
-            resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
-            
-            return resized
+            return cv2.resize(image, size, interpolation=cv2.INTER_LANCZOS4)
         except Exception as e:
             logger.warning(f"Print resize failed: {e}")
             return image
@@ -0,0 +1,96 @@
+"""
+Batched rembg inference
+Runs lists of images through one rembg session in micro-batches, with NumPy pre/postprocessing
+"""
+
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Any, Dict, List, Sequence, Tuple
+import logging
+
+from src.services.segmentation_models import SEGMENTATION_MODELS
+
+logger = logging.getLogger(__name__)
+
+# Input size, mean and std of the rembg models whose ONNX graph we can feed directly.
+# They match what each rembg session passes to BaseSession.normalize.
+BATCH_MODELS: Dict[str, Tuple[int, Tuple[float, float, float], Tuple[float, float, float]]] = {
+    name: (spec["input_size"], spec["mean"], spec["std"]) for name, spec in SEGMENTATION_MODELS.items()
+}
+
+
+def preprocess_batch(
+    images: Sequence[Image.Image],
+    size: int,
+    mean: Tuple[float, float, float],
+    std: Tuple[float, float, float]
+) -> np.ndarray:
+    """
+    Model input for a list of images: (N, 3, size, size) float32
+
+    Each image is resized to size x size and, as in rembg, scaled by its own maximum before
+    the mean/std normalisation.
+    """
+    batch = np.empty((len(images), size, size, 3), dtype=np.float32)
+    for index, image in enumerate(images):
+        rgb = np.asarray(image.convert("RGB"))
+        interpolation = cv2.INTER_AREA if min(rgb.shape[:2]) > size else cv2.INTER_CUBIC
+        batch[index] = cv2.resize(rgb, (size, size), interpolation=interpolation)
+    batch /= np.maximum(batch.max(axis=(1, 2, 3), keepdims=True), 1e-6)
+    batch -= np.array(mean, dtype=np.float32)
+    batch /= np.array(std, dtype=np.float32)
+    return np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+
+
+def postprocess_masks(predictions: np.ndarray, sizes: Sequence[Tuple[int, int]]) -> List[np.ndarray]:
+    """
+    Per-image uint8 masks from a (N, 1, H, W) prediction, each at its image's (width, height)
+
+    Every prediction is min-max normalised on its own, as rembg does for a single image.
+    """
+    masks = []
+    for prediction, size in zip(predictions[:, 0], sizes):
+        low, high = float(prediction.min()), float(prediction.max())
+        scaled = (prediction - low) / max(high - low, 1e-6)
+        mask = (scaled * 255).astype(np.uint8)
+        masks.append(cv2.resize(mask, size, interpolation=cv2.INTER_LANCZOS4))
+    return masks
+
+
+def session_batch_limit(session: Any) -> int:
+    """Largest batch the session's graph accepts (0 = any size)"""
+    batch_dim = session.inner_session.get_inputs()[0].shape[0]
+    return batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else 0
+
+
+def predict_masks(session: Any, model: str, images: Sequence[Image.Image], batch_size: int) -> List[np.ndarray]:
+    """
+    Foreground masks (uint8, one per image at its own size) from a rembg session
+
+    Models in BATCH_MODELS are run straight through the ONNX session in micro-batches of
+    batch_size; anything else falls back to the session's own per-image predict.
+
+    Args:
+        session: rembg session, as handed out by the session registry
+        model: rembg model name the session was created for
+        images: PIL images
+        batch_size: Images per session call
+
+    Returns:
+        List of masks in input order
+    """
+    if model not in BATCH_MODELS or not hasattr(session, "inner_session"):
+        return [np.asarray(session.predict(image)[0]) for image in images]
+
+    size, mean, std = BATCH_MODELS[model]
+    limit = session_batch_limit(session)
+    step = max(1, min(batch_size, limit) if limit else batch_size)
+    input_name = session.inner_session.get_inputs()[0].name
+
+    masks: List[np.ndarray] = []
+    for start in range(0, len(images), step):
+        chunk = images[start:start + step]
+        predictions = session.inner_session.run(None, {input_name: preprocess_batch(chunk, size, mean, std)})[0]
+        masks.extend(postprocess_masks(predictions, [image.size for image in chunk]))
+    return masks
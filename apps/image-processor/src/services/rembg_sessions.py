@@ -0,0 +1,167 @@
+"""
+Shared rembg session registry
+One bounded pool of rembg sessions per model, shared by every caller in the process
+"""
+
+import os
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.services.resource_governor import resource_governor
+
+logger = logging.getLogger(__name__)
+
+# u2netp is lighter and often better at preserving fine details like white elements in logos
+DEFAULT_MODEL = "u2netp"
+
+
+class _ModelPool:
+    """Sessions and counters for one model"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.idle: List[Any] = []
+        self.sessions = 0
+        self.in_use = 0
+        self.loads = 0
+        self.load_time_ms = 0
+        self.acquired = 0
+        self.waits = 0
+        self.wait_time_ms = 0.0
+        self.max_wait_ms = 0.0
+
+
+def _governed(new_session: Callable[[str], Any]) -> Callable[[str], Any]:
+    """
+    rembg's new_session, but with the governor's ONNX Runtime thread counts
+
+    rembg builds default SessionOptions itself (every core per session), so known models are
+    constructed from their session class the same way new_session does, with our options.
+    """
+    def create(model: str) -> Any:
+        try:
+            from rembg.sessions import sessions_class
+        except ImportError:
+            return new_session(model)
+        for session_class in sessions_class:
+            if session_class.name() == model:
+                return session_class(model, resource_governor.onnx_session_options(), None)
+        return new_session(model)
+    return create
+
+
+class RembgSessionRegistry:
+    """Hands out rembg sessions by model name, loading each model at most pool_size times"""
+
+    def __init__(self, pool_size: Optional[int] = None):
+        # 0 = one session per request the resource governor lets run side by side
+        self.pool_size = pool_size or int(os.getenv("REMBG_POOL_SIZE", "0")) or resource_governor.concurrent_requests
+        self._pools: Dict[str, _ModelPool] = {}
+        self._condition = threading.Condition()
+        self._new_session: Optional[Callable[[str], Any]] = None
+        self._remove: Optional[Callable[..., Any]] = None
+
+    def _load_rembg(self) -> Tuple[Callable[[str], Any], Callable[..., Any]]:
+        """Import rembg on first use. Returns (new_session, remove)."""
+        if self._remove is None:
+            try:
+                from rembg import new_session, remove
+            except ImportError:
+                logger.error("rembg not installed. Install with: pip install rembg")
+                raise ImportError("rembg library not available")
+            self._new_session, self._remove = _governed(new_session), remove
+        return self._new_session, self._remove
+
+    @contextmanager
+    def session(self, model: str = DEFAULT_MODEL) -> Iterator[Tuple[Any, Callable[..., Any]]]:
+        """
+        Borrow a session for one inference
+
+        Usage:
+            with rembg_sessions.session() as (session, remove):
+                output = remove(image, session=session)
+
+        Don't await inside the block: the session stays checked out until it exits.
+        """
+        _, remove = self._load_rembg()
+        session = self.acquire(model)
+        try:
+            yield session, remove
+        finally:
+            self.release(model, session)
+
+    def acquire(self, model: str = DEFAULT_MODEL) -> Any:
+        """Take an idle session, load a new one if the pool has room, otherwise wait for one"""
+        new_session, _ = self._load_rembg()
+        wait_start = time.time()
+        with self._condition:
+            pool = self._pools.setdefault(model, _ModelPool(self.pool_size))
+            waited = False
+            while not pool.idle and pool.sessions >= pool.size:
+                waited = True
+                self._condition.wait()
+            self._record_wait(pool, waited, (time.time() - wait_start) * 1000)
+            pool.in_use += 1
+            if pool.idle:
+                return pool.idle.pop()
+            # Reserve the slot and load outside the lock so other models aren't blocked
+            pool.sessions += 1
+
+        load_start = time.time()
+        try:
+            session = new_session(model)
+        except Exception:
+            with self._condition:
+                pool.sessions -= 1
+                pool.in_use -= 1
+                self._condition.notify()
+            raise
+        load_time_ms = int((time.time() - load_start) * 1000)
+        with self._condition:
+            pool.loads += 1
+            pool.load_time_ms += load_time_ms
+        logger.info(f"Loaded rembg session {model} ({pool.loads}/{pool.size}) in {load_time_ms}ms")
+        return session
+
+    def release(self, model: str, session: Any):
+        """Return a session to its pool"""
+        with self._condition:
+            pool = self._pools[model]
+            pool.in_use -= 1
+            pool.idle.append(session)
+            self._condition.notify()
+
+    def _record_wait(self, pool: _ModelPool, waited: bool, wait_ms: float):
+        pool.acquired += 1
+        if waited:
+            pool.waits += 1
+            pool.wait_time_ms += wait_ms
+            pool.max_wait_ms = max(pool.max_wait_ms, wait_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-model load count, sessions in use and time spent waiting for a free session"""
+        with self._condition:
+            return {
+                "pool_size": self.pool_size,
+                "models": {
+                    model: {
+                        "loads": pool.loads,
+                        "load_time_ms": pool.load_time_ms,
+                        "sessions": pool.sessions,
+                        "in_use": pool.in_use,
+                        "acquired": pool.acquired,
+                        "waits": pool.waits,
+                        "wait_time_ms": round(pool.wait_time_ms, 1),
+                        "avg_wait_ms": round(pool.wait_time_ms / pool.acquired, 2) if pool.acquired else 0.0,
+                        "max_wait_ms": round(pool.max_wait_ms, 1)
+                    }
+                    for model, pool in self._pools.items()
+                }
+            }
+
+
+# Global session registry
+rembg_sessions = RembgSessionRegistry()
@@ -0,0 +1,154 @@
+"""
+Render Result Cache
+Maps (input content hash, operation, normalized parameters, code version) to previously stored outputs
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump when a render, upscale or background-removal change alters output for the same inputs
+RENDER_CACHE_VERSION = "1"
+
+# Result fields that describe one particular run rather than the stored artifact
+_VOLATILE_FIELDS = ("processing_time_ms", "cached", "peak_rss_mb", "tiling")
+
+
+class RenderCache:
+    """LRU cache of derived-artifact results, optionally persisted to a JSON file"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1000, enabled: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def content_hash(data: Union[bytes, memoryview, None]) -> str:
+        """SHA-256 of input bytes (empty string when there is no input)"""
+        if data is None:
+            return ""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def make_key(operation: str, input_hash: str, params: Dict[str, Any]) -> str:
+        """Build a deterministic cache key from the operation, input hash and parameters"""
+        payload = json.dumps(
+            {"op": operation, "input": input_hash, "params": params, "version": RENDER_CACHE_VERSION},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result, or None on a miss"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry["hits"] += 1
+            self.hits += 1
+            return dict(entry["result"])
+
+    def put(self, key: str, operation: str, result: Dict[str, Any]):
+        """Store a successful result"""
+        if not self.enabled:
+            return
+        stored = {k: v for k, v in result.items() if k not in _VOLATILE_FIELDS}
+        with self._lock:
+            self._entries[key] = {
+                "operation": operation,
+                "created_at": time.time(),
+                "hits": 0,
+                "result": stored
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def entries(self, operation: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List cache entries, most recently used last"""
+        with self._lock:
+            return [
+                {"key": key, **entry}
+                for key, entry in self._entries.items()
+                if operation is None or entry["operation"] == operation
+            ]
+
+    def purge(self, operation: Optional[str] = None, key: Optional[str] = None) -> int:
+        """Remove one entry, all entries for an operation, or everything. Returns the number removed."""
+        with self._lock:
+            if key is not None:
+                removed = 1 if self._entries.pop(key, None) is not None else 0
+            else:
+                doomed = [k for k, e in self._entries.items() if operation is None or e["operation"] == operation]
+                for k in doomed:
+                    del self._entries[k]
+                removed = len(doomed)
+            if removed:
+                self._save()
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary counters for the cache"""
+        with self._lock:
+            by_operation: Dict[str, int] = {}
+            for entry in self._entries.values():
+                by_operation[entry["operation"]] = by_operation.get(entry["operation"], 0) + 1
+            return {
+                "enabled": self.enabled,
+                "version": RENDER_CACHE_VERSION,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "by_operation": by_operation
+            }
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == RENDER_CACHE_VERSION:
+                self._entries.update(data.get("entries", {}))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable render cache {self.path}: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": RENDER_CACHE_VERSION, "entries": self._entries}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Failed to persist render cache: {e}")
+
+
+# Global render cache instance
+render_cache = RenderCache(
+    path=os.getenv("RENDER_CACHE_PATH"),
+    max_entries=int(os.getenv("RENDER_CACHE_MAX_ENTRIES", "1000")),
+    enabled=os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+)
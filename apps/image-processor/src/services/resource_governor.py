@@ -0,0 +1,148 @@
+"""
+Resource Governor
+Divides the CPU between service processes and concurrent requests, and sizes the thread pools of
+ONNX Runtime, OpenCV, torch and the BLAS behind NumPy to that share instead of to every core
+"""
+
+import os
+import sys
+import math
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Thread-count variables read by OpenMP, OpenBLAS, MKL and numexpr when they first load
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of the container (cgroup v2 or v1), or None when unlimited"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def detect_cpus() -> Tuple[int, str]:
+    """Cores this process may use, and where the number came from"""
+    configured = int(os.getenv("CPU_CORES", "0"))
+    if configured > 0:
+        return configured, "CPU_CORES"
+    try:
+        cores, source = len(os.sched_getaffinity(0)), "affinity"
+    except AttributeError:
+        cores, source = os.cpu_count() or 1, "cpu_count"
+    quota = _cgroup_cpu_limit()
+    if quota is not None and math.ceil(quota) < cores:
+        return max(1, math.ceil(quota)), "cgroup"
+    return cores, source
+
+
+class ResourceGovernor:
+    """Thread budget per library, derived from cores, process count and the per-request core budget"""
+
+    def __init__(self):
+        self.cpus, self.cpu_source = detect_cpus()
+        # uvicorn --workers reads WEB_CONCURRENCY; every web worker starts its own pool of
+        # JOB_WORKERS queued-job processes at startup
+        self.web_workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        self.job_workers = max(0, int(os.getenv("JOB_WORKERS", "2")))
+        self.processes = self.web_workers * (1 + self.job_workers)
+        self.cores_per_process = max(1, self.cpus // self.processes)
+        # 0 = a single request may use every core of its process
+        budget = int(os.getenv("CPU_CORES_PER_REQUEST", "0"))
+        self.threads_per_request = max(1, min(budget or self.cores_per_process, self.cores_per_process))
+        # Heavy (model) calls a process can run side by side without oversubscribing its cores
+        self.concurrent_requests = max(1, self.cores_per_process // self.threads_per_request)
+        # ONNX_INTRA_OP_THREADS still pins ONNX Runtime explicitly
+        self.onnx_intra_op_threads = int(os.getenv("ONNX_INTRA_OP_THREADS", "0")) or self.threads_per_request
+        self._applied: Dict[str, Any] = {}
+
+    def configure_environment(self):
+        """
+        Export BLAS/OpenMP thread counts; only effective before NumPy, cv2 or torch are imported,
+        so main calls it first. Values already set in the environment are left alone.
+        """
+        for name in BLAS_ENV_VARS:
+            os.environ.setdefault(name, str(self.threads_per_request))
+        self._applied["environment"] = {name: os.environ[name] for name in BLAS_ENV_VARS}
+
+    def onnx_session_options(self) -> Any:
+        """ort.SessionOptions for a new ONNX Runtime session: intra-op per request, no inter-op pool"""
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.onnx_intra_op_threads
+        options.inter_op_num_threads = 1
+        self._applied["onnxruntime"] = {"intra_op": self.onnx_intra_op_threads, "inter_op": 1}
+        return options
+
+    def apply_opencv(self):
+        """Size OpenCV's parallel_for pool (process-wide)"""
+        try:
+            import cv2
+        except ImportError:
+            return
+        cv2.setNumThreads(self.threads_per_request)
+        self._applied["opencv"] = cv2.getNumThreads()
+
+    def apply_torch(self):
+        """Size torch's intra- and inter-op pools; call before building a model"""
+        torch = sys.modules.get("torch")
+        if torch is None:
+            # Not installed, or not imported yet; the upscaler applies this again when it loads torch
+            return
+        torch.set_num_threads(self.threads_per_request)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only settable before torch has run parallel work; keep whatever it has
+            pass
+        self._applied["torch"] = {"intra_op": torch.get_num_threads(), "inter_op": torch.get_num_interop_threads()}
+
+    def apply_blas(self):
+        """Cap an already-loaded BLAS at runtime (needs the optional threadpoolctl)"""
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            return
+        threadpool_limits(limits=self.threads_per_request, user_api="blas")
+        self._applied["blas"] = self.threads_per_request
+
+    def apply(self):
+        """Apply the process-wide settings (OpenCV, torch if installed, BLAS)"""
+        self.apply_opencv()
+        self.apply_torch()
+        self.apply_blas()
+        logger.info(
+            f"Resource governor: {self.cpus} cores ({self.cpu_source}) over {self.processes} processes, "
+            f"{self.threads_per_request} threads per request, {self.concurrent_requests} concurrent"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Configured budget and the thread counts actually applied per library"""
+        return {
+            "cpus": self.cpus,
+            "cpu_source": self.cpu_source,
+            "web_workers": self.web_workers,
+            "job_workers": self.job_workers,
+            "processes": self.processes,
+            "cores_per_process": self.cores_per_process,
+            "threads_per_request": self.threads_per_request,
+            "concurrent_requests": self.concurrent_requests,
+            "applied": dict(self._applied)
+        }
+
+
+# Global resource governor
+resource_governor = ResourceGovernor()
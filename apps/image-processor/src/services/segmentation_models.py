@@ -0,0 +1,176 @@
+"""
+Segmentation Models
+rembg model registry with benchmarked latency, memory and edge quality, and the per-request model choice
+"""
+
+import os
+import json
+import logging
+import cv2
+import numpy as np
+from typing import Any, Dict, Optional
+
+from src.services.rembg_sessions import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+# Static facts about each rembg model: network input size, normalisation and ONNX file size
+SEGMENTATION_MODELS: Dict[str, Dict[str, Any]] = {
+    "u2netp": {
+        "input_size": 320, "mean": IMAGENET_MEAN, "std": IMAGENET_STD, "file_size_mb": 4.7,
+        "description": "Lightweight U2-Net; fastest, often best at fine white details in logos"
+    },
+    "silueta": {
+        "input_size": 320, "mean": IMAGENET_MEAN, "std": IMAGENET_STD, "file_size_mb": 43,
+        "description": "Pruned U2-Net with close to u2net quality at a quarter of the size"
+    },
+    "u2net": {
+        "input_size": 320, "mean": IMAGENET_MEAN, "std": IMAGENET_STD, "file_size_mb": 176,
+        "description": "Full U2-Net for general objects"
+    },
+    "u2net_human_seg": {
+        "input_size": 320, "mean": IMAGENET_MEAN, "std": IMAGENET_STD, "file_size_mb": 176,
+        "description": "U2-Net trained for people; poor fit for logos"
+    },
+    "isnet-general-use": {
+        "input_size": 1024, "mean": IMAGENET_MEAN, "std": (1.0, 1.0, 1.0), "file_size_mb": 179,
+        "description": "IS-Net at 1024px; sharpest edges, slowest"
+    }
+}
+
+# Fields a benchmark run measures per model (see scripts/benchmark_segmentation_models.py)
+MEASURED_FIELDS = ("latency_ms", "p95_latency_ms", "load_time_ms", "peak_memory_mb", "edge_quality")
+
+# Distance in pixels within which a predicted boundary pixel counts as matching the reference
+EDGE_TOLERANCE = 2
+
+
+def _boundary(mask: np.ndarray) -> np.ndarray:
+    """Boolean map of the 1px boundary of a mask thresholded at 50%"""
+    binary = (mask >= 128).astype(np.uint8)
+    kernel = np.ones((3, 3), dtype=np.uint8)
+    return cv2.morphologyEx(binary, cv2.MORPH_GRADIENT, kernel) > 0
+
+
+def _match_ratio(edges: np.ndarray, target: np.ndarray, tolerance: int) -> float:
+    """Share of edge pixels within `tolerance` pixels of a target edge pixel"""
+    count = int(np.count_nonzero(edges))
+    if count == 0:
+        return 0.0
+    reach = cv2.dilate(target.astype(np.uint8), np.ones((2 * tolerance + 1,) * 2, dtype=np.uint8)) > 0
+    return float(np.count_nonzero(edges & reach)) / count
+
+
+def boundary_f_score(mask: np.ndarray, reference: np.ndarray, tolerance: int = EDGE_TOLERANCE) -> float:
+    """
+    Boundary F-measure of a predicted mask against a reference alpha (both uint8, same size)
+
+    Precision is the share of predicted boundary pixels within `tolerance` of the reference
+    boundary, recall the share of reference boundary pixels within `tolerance` of the prediction.
+    """
+    predicted, expected = _boundary(mask), _boundary(reference)
+    if not expected.any():
+        return 1.0 if not predicted.any() else 0.0
+    precision = _match_ratio(predicted, expected, tolerance)
+    recall = _match_ratio(expected, predicted, tolerance)
+    return 0.0 if precision + recall == 0 else 2 * precision * recall / (precision + recall)
+
+
+def edge_alignment(mask: np.ndarray, gray: np.ndarray, tolerance: int = EDGE_TOLERANCE) -> float:
+    """
+    Edge quality without a reference alpha: share of the mask boundary lying on an image edge
+
+    Used for opaque inputs (no alpha to compare with); a cut that runs through flat colour
+    instead of along the logo outline scores low.
+    """
+    return _match_ratio(_boundary(mask), cv2.Canny(gray, 50, 150) > 0, tolerance)
+
+
+def default_benchmarks_path() -> str:
+    return os.getenv(
+        "SEGMENTATION_BENCHMARKS_PATH",
+        os.path.join(os.getenv("MODELS_DIR", "./models"), "segmentation_benchmarks.json")
+    )
+
+
+class SegmentationModelRegistry:
+    """Known rembg models, their benchmark numbers, and model selection by name or latency budget"""
+
+    def __init__(self, benchmarks_path: Optional[str] = None):
+        self.benchmarks_path = benchmarks_path or default_benchmarks_path()
+        self.default_model = os.getenv("REMBG_MODEL", DEFAULT_MODEL)
+        self.benchmark_info: Dict[str, Any] = {}
+        self._measured: Dict[str, Dict[str, Any]] = {}
+        self.load_benchmarks()
+
+    def load_benchmarks(self) -> int:
+        """(Re)read the benchmark file. Returns the number of models with measurements."""
+        self._measured = {}
+        self.benchmark_info = {}
+        if not os.path.exists(self.benchmarks_path):
+            return 0
+        try:
+            with open(self.benchmarks_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read segmentation benchmarks {self.benchmarks_path}: {e}")
+            return 0
+        self.benchmark_info = {key: value for key, value in data.items() if key != "models"}
+        for model, numbers in data.get("models", {}).items():
+            if model in SEGMENTATION_MODELS:
+                self._measured[model] = {field: numbers[field] for field in MEASURED_FIELDS if field in numbers}
+        return len(self._measured)
+
+    def profile(self, model: str) -> Dict[str, Any]:
+        """Static facts plus benchmark numbers (None until measured) for one model"""
+        measured = self._measured.get(model, {})
+        profile = {"model": model, **SEGMENTATION_MODELS[model]}
+        profile.update({field: measured.get(field) for field in MEASURED_FIELDS})
+        profile["measured"] = bool(measured)
+        return profile
+
+    def profiles(self) -> Dict[str, Any]:
+        """Every model's profile, with the benchmark run they came from"""
+        return {
+            "default_model": self.default_model,
+            "benchmark": self.benchmark_info or None,
+            "models": {model: self.profile(model) for model in SEGMENTATION_MODELS}
+        }
+
+    def select(self, model: Optional[str] = None, latency_budget_ms: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Resolve the model for a request
+
+        Args:
+            model: Explicit model name; wins over the budget
+            latency_budget_ms: Per-image inference budget; picks the best measured edge
+                quality that fits, or the fastest measured model when none does
+
+        Returns:
+            Profile of the chosen model plus the reason it was chosen
+
+        Raises:
+            ValueError: Unknown model name
+        """
+        if model:
+            if model not in SEGMENTATION_MODELS:
+                raise ValueError(f"Unknown segmentation model: {model}. Available: {', '.join(SEGMENTATION_MODELS)}")
+            return {**self.profile(model), "reason": "requested"}
+        if latency_budget_ms is None:
+            return {**self.profile(self.default_model), "reason": "default"}
+
+        measured = [self.profile(name) for name in self._measured if self._measured[name].get("latency_ms") is not None]
+        if not measured:
+            return {**self.profile(self.default_model), "reason": "unmeasured_default"}
+        fitting = [p for p in measured if p["latency_ms"] <= latency_budget_ms]
+        if not fitting:
+            return {**min(measured, key=lambda p: p["latency_ms"]), "reason": "fastest_over_budget"}
+        best = max(fitting, key=lambda p: (p["edge_quality"] or 0.0, -p["latency_ms"]))
+        return {**best, "reason": "within_budget"}
+
+
+# Global model registry
+segmentation_models = SegmentationModelRegistry()
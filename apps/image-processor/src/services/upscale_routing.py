@@ -0,0 +1,99 @@
+"""
+Upscale Routing
+Cheap image features and the model="auto" decision: the cheapest upscaling method that meets a quality target
+"""
+
+import cv2
+import numpy as np
+from typing import Any, Dict
+
+# Features are computed on a thumbnail so routing costs the same for any input size
+FEATURE_THUMBNAIL_SIZE = 256
+
+# Estimated cost per output megapixel relative to a GAN pass
+METHOD_COST = {"opencv": 0.01, "opencv-edge": 0.03, "gan": 1.0}
+
+# Expected quality (1 = soft, 3 = best) of each method per content category
+METHOD_QUALITY = {
+    "flat": {"opencv": 1, "opencv-edge": 3, "gan": 3},
+    "illustration": {"opencv": 1, "opencv-edge": 2, "gan": 3},
+    "photo": {"opencv": 1, "opencv-edge": 1, "gan": 3}
+}
+
+QUALITY_TARGETS = {"draft": 1, "standard": 2, "high": 3}
+
+
+def extract_features(image: np.ndarray) -> Dict[str, float]:
+    """
+    Content features of a BGR/BGRA/grayscale image, measured on a nearest-neighbour thumbnail
+
+    Returns:
+        edge_density, flat_fraction (share of pixels with near-zero Laplacian), colors_95 (5-bit
+        colours needed to cover 95% of visible pixels) and complexity (AICapabilities-style score)
+    """
+    if image.ndim == 2:
+        bgr, alpha = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), None
+    else:
+        bgr, alpha = image[:, :, :3], image[:, :, 3] if image.shape[2] == 4 else None
+
+    height, width = bgr.shape[:2]
+    ratio = min(1.0, FEATURE_THUMBNAIL_SIZE / max(height, width))
+    size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+    # Nearest keeps flat colours flat; area averaging would invent blend colours at every edge
+    thumb = cv2.resize(bgr, size, interpolation=cv2.INTER_NEAREST)
+    gray = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+    visible = cv2.resize(alpha, size, interpolation=cv2.INTER_NEAREST) > 0 if alpha is not None else np.ones(gray.shape, bool)
+    if not visible.any():
+        visible[:] = True
+
+    edges = cv2.Canny(gray, 50, 150)
+    laplacian = np.abs(cv2.Laplacian(gray, cv2.CV_16S))
+
+    quantized = (thumb[visible] >> 3).astype(np.int32)
+    packed = (quantized[:, 0] << 10) | (quantized[:, 1] << 5) | quantized[:, 2]
+    counts = np.sort(np.bincount(packed, minlength=1 << 15))[::-1]
+    colors_95 = int(np.searchsorted(np.cumsum(counts), 0.95 * packed.size) + 1)
+
+    edge_density = float(np.mean(edges[visible] > 0))
+    return {
+        "edge_density": round(edge_density, 4),
+        "flat_fraction": round(float(np.mean(laplacian[visible] < 8)), 4),
+        "colors_95": colors_95,
+        "complexity": round(min(1.0, (edge_density * 10 + float(gray[visible].var()) / 1000) / 2), 2)
+    }
+
+
+def classify(features: Dict[str, float]) -> str:
+    """flat (logos, icons), photo, or illustration (everything in between)"""
+    if features["colors_95"] <= 32 and features["flat_fraction"] >= 0.8:
+        return "flat"
+    if features["colors_95"] > 256 and features["flat_fraction"] < 0.5:
+        return "photo"
+    return "illustration"
+
+
+def route(features: Dict[str, float], quality_target: str = "standard", gan_model: str = "realesrgan") -> Dict[str, Any]:
+    """
+    Pick the cheapest method whose expected quality meets the target
+
+    Args:
+        features: Output of extract_features
+        quality_target: draft, standard or high
+        gan_model: Concrete model to use when the GAN tier is chosen
+
+    Returns:
+        Decision with category, method, concrete model, estimated cost and saving versus the GAN
+    """
+    category = classify(features)
+    target = QUALITY_TARGETS.get(quality_target, QUALITY_TARGETS["standard"])
+    qualities = METHOD_QUALITY[category]
+    method = min((m for m in METHOD_COST if qualities[m] >= target), key=METHOD_COST.get)
+    return {
+        "category": category,
+        "quality_target": quality_target,
+        "method": method,
+        "model": gan_model if method == "gan" else method,
+        "estimated_cost": METHOD_COST[method],
+        "estimated_saving": round(1.0 - METHOD_COST[method] / METHOD_COST["gan"], 2),
+        "features": features
+    }
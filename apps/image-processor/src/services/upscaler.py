@@ -5,13 +5,24 @@ Image upscaling service using Real-ESRGAN, ESRGAN, and OpenCV
 import os
 import time
 import io
+import math
+import itertools
+from fractions import Fraction
 import cv2
 import numpy as np
 from PIL import Image
 import requests
-from typing import Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import logging
+import resource
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from src.utils.filename_utils import generate_processing_filename
+from src.services.render_cache import render_cache
+from src.services.upscale_routing import extract_features, route
+from src.services.resource_governor import resource_governor
+from src.utils.striped_encoder import STREAMABLE_FORMATS, open_stripe_writer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +37,203 @@ except ImportError:
     REALESRGAN_AVAILABLE = False
     logger.warning("Real-ESRGAN not available, will use OpenCV fallback")
 
+# Import ONNX Runtime (CPU backend for an exported Real-ESRGAN graph)
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+    logger.warning("ONNX Runtime not available, realesrgan-onnx will use OpenCV fallback")
+
+# Models accepted by upscale_image; "auto" routes each image by content
+SUPPORTED_MODELS = ("auto", "realesrgan", "realesrgan-onnx", "esrgan", "opencv-edge", "opencv")
+
+# Rough CPU working set of RRDBNet x4 per input pixel (float32 activations across the
+# dense blocks plus the 2x/4x upsampling stages); used to size tiles to the memory budget
+REALESRGAN_BYTES_PER_PIXEL = 8 * 1024
+
+# Target size of one output stripe when resampling or encoding row by row
+STREAM_STRIPE_BYTES = 8 * 1024 * 1024
+
+def _current_rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # No /proc (e.g. macOS) - fall back to the process high-water mark (bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+def _tile_starts(length: int, tile: int, overlap: int) -> List[int]:
+    """Start offsets of overlapping tiles covering [0, length)"""
+    if length <= tile:
+        return [0]
+    step = tile - overlap
+    return list(range(0, length - tile, step)) + [length - tile]
+
+def _blend_ramp(length: int, ramp: int, fade_in: bool) -> np.ndarray:
+    """1D weights for a new tile: 0->1 over `ramp` pixels where it overlaps already-written output"""
+    weights = np.ones(length, dtype=np.float32)
+    if fade_in and ramp > 0:
+        ramp = min(ramp, length)
+        weights[:ramp] = (np.arange(ramp, dtype=np.float32) + 0.5) / ramp
+    return weights
+
+def _resample_rows(
+    bands: Iterable[np.ndarray],
+    src_height: int,
+    dst_width: int,
+    dst_height: int,
+    interpolation: int = cv2.INTER_CUBIC
+) -> Iterator[np.ndarray]:
+    """
+    Resize an image that arrives as row bands, yielding output row bands
+    
+    Each stripe is resized from a window of source rows aligned to the resize ratio (so output
+    rows land on the same coordinates as a full-image resize) with a margin for the kernel.
+    Downsampling always uses INTER_AREA, as _upscale_chain did for overshooting chains.
+    """
+    bands = iter(bands)
+    ratio = Fraction(dst_height, src_height)
+    p, q = ratio.numerator, ratio.denominator
+    margin = 0 if ratio < 1 else 8
+    interpolation = cv2.INTER_AREA if ratio < 1 else interpolation
+    buffer, buffer_top, received, done = None, 0, 0, 0
+    stripe_rows = None
+    
+    for band in itertools.chain(bands, [None]):
+        if band is not None:
+            if stripe_rows is None:
+                if ratio == 1 and band.shape[1] == dst_width:
+                    # Nothing to resample
+                    yield band
+                    yield from bands
+                    return
+                channels = band.shape[2] if band.ndim == 3 else 1
+                stripe_rows = max(p, STREAM_STRIPE_BYTES // max(1, dst_width * channels) // p * p)
+            buffer = band if buffer is None else np.concatenate([buffer, band])
+            received += band.shape[0]
+        
+        while done < dst_height:
+            end = min(dst_height, done + stripe_rows)
+            s0 = max(0, (done * q // p - margin) // q * q)
+            s1 = min(src_height, -(-(-(-end * q // p) + margin) // q) * q)
+            if s1 > received and band is not None:
+                break
+            offset = s0 * p // q
+            window = buffer[s0 - buffer_top:s1 - buffer_top]
+            resized = cv2.resize(window, (dst_width, (s1 - s0) * p // q), interpolation=interpolation)
+            yield resized[done - offset:end - offset]
+            done = end
+            
+            # Drop source rows no later stripe can reach
+            keep = max(0, (done * q // p - margin) // q * q)
+            buffer, buffer_top = buffer[keep - buffer_top:], keep
+
+def _filter_rows(bands: Iterable[np.ndarray], radius: int, apply: Callable[[np.ndarray], np.ndarray]) -> Iterator[np.ndarray]:
+    """Apply a filter reaching `radius` rows up and down to row bands, carrying that much context between bands"""
+    pending, context = None, 0
+    for band in itertools.chain(bands, [None]):
+        if band is not None:
+            pending = band if pending is None else np.concatenate([pending, band])
+        if pending is None:
+            return
+        ready = pending.shape[0] if band is None else pending.shape[0] - radius
+        if ready <= context:
+            continue
+        yield apply(pending)[context:ready]
+        start = max(0, ready - radius)
+        pending, context = pending[start:], ready - start
+
+def _assemble_rows(bands: Iterable[np.ndarray], height: int) -> np.ndarray:
+    """Copy row bands into one array of the given height"""
+    output, top = None, 0
+    for band in bands:
+        if output is None and band.shape[0] == height:
+            # Produced in one piece (untiled); keep draining so the producer records its stats
+            output, top = band, height
+            continue
+        if output is None:
+            output = np.empty((height,) + band.shape[1:], dtype=band.dtype)
+        output[top:top + band.shape[0]] = band
+        top += band.shape[0]
+    return output
+
+def _unsharp_mask(image: np.ndarray, sigma: float) -> np.ndarray:
+    """Sharpen the colour channels of a BGR/BGRA/grayscale image, leaving alpha untouched"""
+    color = image[:, :, :3] if image.ndim == 3 else image
+    blurred = cv2.GaussianBlur(color, (0, 0), sigmaX=sigma)
+    sharpened = cv2.addWeighted(color, 1.6, blurred, -0.6, 0)
+    if image.ndim == 3 and image.shape[2] == 4:
+        image[:, :, :3] = sharpened
+        return image
+    return sharpened
+
+# Relative cost of one pass of each native model per input pixel (x4 = 1.0). RealESRGAN_x2plus
+# pixel-unshuffles its input, so its RRDB trunk runs on a quarter of the pixels.
+NATIVE_SCALE_COST = {2: 0.3, 4: 1.0}
+
+def plan_scale_chain(
+    scale: int,
+    native_scales: Sequence[int],
+    max_residual: float = 1.25,
+    max_cost: float = 8.0,
+    max_steps: int = 3
+) -> Dict[str, Any]:
+    """
+    Choose the cheapest sequence of native-scale passes for an upscale factor
+    
+    A chain may overshoot (the result is area-downsampled) but may only fall short by up to
+    max_residual (the result is cubic-upsampled), and may cost at most max_cost. Chains
+    overshooting by more than 2x are not considered. If nothing qualifies, the affordable
+    chain closest to the target factor is used.
+    
+    Returns:
+        {"steps": [...], "native_scale": product, "resample": target/product, "estimated_cost": ...}
+        where estimated_cost is in units of one x4 pass over the input image.
+    """
+    candidates: List[Tuple[List[int], int, float]] = []
+    
+    def extend(steps: List[int], product: int, cost: float):
+        if steps and product <= 2 * scale:
+            candidates.append((steps, product, cost))
+        if len(steps) == max_steps or product >= scale:
+            return
+        for native in sorted(native_scales):
+            # A pass costs its per-pixel weight times the (already upscaled) input area
+            extend(steps + [native], product * native, cost + NATIVE_SCALE_COST.get(native, 1.0) * product ** 2)
+    
+    extend([], 1, 0.0)
+    affordable = [c for c in candidates if c[2] <= max_cost] or candidates
+    valid = [c for c in affordable if scale / c[1] <= max_residual]
+    if valid:
+        steps, product, cost = min(valid, key=lambda c: (round(c[2], 6), abs(math.log(scale / c[1])), len(c[0])))
+    elif affordable:
+        steps, product, cost = min(affordable, key=lambda c: (abs(math.log(scale / c[1])), c[2]))
+    else:
+        steps, product, cost = [], 1, 0.0
+    
+    return {
+        "steps": steps,
+        "native_scale": product,
+        "resample": round(scale / product, 4),
+        "estimated_cost": round(cost, 3)
+    }
+
+def batch_throughput(results: Sequence[dict], elapsed_seconds: float) -> Dict[str, Any]:
+    """Aggregate counts and throughput (images/sec, output megapixels/sec) for a batch"""
+    succeeded = [r for r in results if r.get("success")]
+    megapixels = sum((r.get("width") or 0) * (r.get("height") or 0) for r in succeeded) / 1_000_000
+    elapsed_seconds = max(elapsed_seconds, 1e-6)
+    return {
+        "total_processed": len(succeeded),
+        "total_failed": len(results) - len(succeeded),
+        "processing_time_ms": int(elapsed_seconds * 1000),
+        "images_per_second": round(len(succeeded) / elapsed_seconds, 3),
+        "megapixels_per_second": round(megapixels / elapsed_seconds, 3)
+    }
+
 class ImageUpscaler:
     """Main upscaling service class"""
     
@@ -37,46 +245,317 @@ class ImageUpscaler:
         # Model paths
         self.models_dir = os.getenv("MODELS_DIR", "./models")
         self.realesrgan_model_path = os.getenv("REALESRGAN_MODEL_PATH", os.path.join(self.models_dir, "RealESRGAN_x4plus.pth"))
+        self.realesrgan_x2_model_path = os.getenv("REALESRGAN_X2_MODEL_PATH", os.path.join(self.models_dir, "RealESRGAN_x2plus.pth"))
         self.esrgan_model_path = os.getenv("ESRGAN_MODEL_PATH", os.path.join(self.models_dir, "RRDB_ESRGAN_x4.pth"))
+        self.onnx_model_path = os.getenv("REALESRGAN_ONNX_MODEL_PATH", os.path.join(self.models_dir, "RealESRGAN_x4plus.onnx"))
+        self.onnx_x2_model_path = os.getenv("REALESRGAN_ONNX_X2_MODEL_PATH", os.path.join(self.models_dir, "RealESRGAN_x2plus.onnx"))
+        
+        # ONNX Runtime settings: int8 uses a dynamically quantized copy of the graph; 0 threads = ORT default
+        self.onnx_int8 = os.getenv("REALESRGAN_ONNX_INT8", "false").lower() == "true"
+        self.onnx_threads = resource_governor.onnx_intra_op_threads
         
         # Ensure directories exist
         os.makedirs(self.temp_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(self.models_dir, exist_ok=True)
         
-        # Initialize models (lazy loading)
-        self._realesrgan_model = None
+        # Tiled inference: tile size is derived from the memory budget and image size
+        self.memory_budget_mb = int(os.getenv("UPSCALE_MEMORY_BUDGET_MB", "1024"))
+        self.tile_overlap = int(os.getenv("UPSCALE_TILE_OVERLAP", "16"))
+        
+        # Requests whose output exceeds this are rejected before any work; large PNG/TIFF
+        # outputs are encoded stripe by stripe instead of materializing the full image
+        self.max_output_megapixels = float(os.getenv("UPSCALE_MAX_OUTPUT_MEGAPIXELS", "256"))
+        self.stream_encode_megapixels = float(os.getenv("UPSCALE_STREAM_ENCODE_MEGAPIXELS", "16"))
+        
+        # Native-scale chaining: largest factor a final cubic resample may still add
+        self.max_residual = float(os.getenv("UPSCALE_MAX_RESIDUAL", "1.25"))
+        self.max_chain_cost = float(os.getenv("UPSCALE_MAX_CHAIN_COST", "8.0"))
+        
+        # model="auto": cheapest method meeting this quality target (draft, standard, high)
+        self.auto_quality_target = os.getenv("UPSCALE_AUTO_QUALITY", "standard")
+        self._routing_counts: Dict[str, int] = {}
+        
+        # Batch upscales run on a dedicated pool so one batch can't starve the event loop
+        self.batch_workers = int(os.getenv("UPSCALE_BATCH_WORKERS", str(resource_governor.concurrent_requests)))
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Initialize models (lazy loading), keyed by native scale
+        self._realesrgan_models: Dict[int, Any] = {}
         self._esrgan_model = None
+        self._onnx_sessions: Dict[int, Any] = {}
+        self._model_lock = threading.Lock()
+        # RealESRGANer.enhance keeps per-call state on the instance (img, mod_scale, output),
+        # so calls into one model are serialized; ONNX sessions run concurrently
+        self._enhance_locks: Dict[int, threading.Lock] = {2: threading.Lock(), 4: threading.Lock()}
+        
+        # Measured output megapixels/sec per model (exponential moving average)
+        self._model_speed: Dict[str, Dict[str, float]] = {}
+        # Routing counts and speeds are updated from the batch worker threads
+        self._stats_lock = threading.Lock()
+    
+    @property
+    def _realesrgan_model(self):
+        """The x4 RealESRGANer, if loaded"""
+        return self._realesrgan_models.get(4)
     
-    def _init_realesrgan_model(self):
+    @_realesrgan_model.setter
+    def _realesrgan_model(self, model):
+        self._realesrgan_models[4] = model
+    
+    @property
+    def _onnx_session(self):
+        """The x4 ONNX Runtime session, if loaded"""
+        return self._onnx_sessions.get(4)
+    
+    @_onnx_session.setter
+    def _onnx_session(self, session):
+        self._onnx_sessions[4] = session
+    
+    def _realesrgan_path(self, native_scale: int) -> str:
+        return self.realesrgan_x2_model_path if native_scale == 2 else self.realesrgan_model_path
+    
+    def _onnx_path(self, native_scale: int) -> str:
+        return self.onnx_x2_model_path if native_scale == 2 else self.onnx_model_path
+    
+    def _init_realesrgan_model(self, native_scale: int = 4):
         """Initialize Real-ESRGAN model if available"""
         if not REALESRGAN_AVAILABLE:
             return False
             
-        if self._realesrgan_model is not None:
+        if self._realesrgan_models.get(native_scale) is not None:
             return True
-            
+        
+        with self._model_lock:
+            # Another thread (e.g. startup warm-up) may have finished loading while we waited
+            if self._realesrgan_models.get(native_scale) is not None:
+                return True
+            return self._load_realesrgan_model(native_scale)
+    
+    def _load_realesrgan_model(self, native_scale: int = 4) -> bool:
+        """Build the RealESRGANer for a native scale (caller holds the model lock)"""
+        model_path = self._realesrgan_path(native_scale)
         try:
-            if not os.path.exists(self.realesrgan_model_path):
-                logger.warning(f"Real-ESRGAN model not found at {self.realesrgan_model_path}")
+            if not os.path.exists(model_path):
+                logger.warning(f"Real-ESRGAN x{native_scale} model not found at {model_path}")
                 return False
             
-            # Initialize Real-ESRGAN model
-            model = RRDBNet(num_in_ch=3, num_out_ch=3, num_feat=64, num_block=23, num_grow_ch=32, scale=4)
-            self._realesrgan_model = RealESRGANer(
-                scale=4,
-                model_path=self.realesrgan_model_path,
+            # Initialize Real-ESRGAN model with torch's pools sized by the governor
+            resource_governor.apply_torch()
+            model = RRDBNet(num_in_ch=3, num_out_ch=3, num_feat=64, num_block=23, num_grow_ch=32, scale=native_scale)
+            self._realesrgan_models[native_scale] = RealESRGANer(
+                scale=native_scale,
+                model_path=model_path,
                 model=model,
                 tile=0,
                 tile_pad=10,
                 pre_pad=0,
                 half=False
             )
-            logger.info("Real-ESRGAN model initialized successfully")
+            logger.info(f"Real-ESRGAN x{native_scale} model initialized successfully")
             return True
         except Exception as e:
-            logger.error(f"Failed to initialize Real-ESRGAN model: {str(e)}")
+            logger.error(f"Failed to initialize Real-ESRGAN x{native_scale} model: {str(e)}")
+            return False
+    
+    def _realesrgan_enhance(self, patch: np.ndarray, native_scale: int = 4) -> np.ndarray:
+        """One RealESRGANer.enhance call at the model's native scale, holding that model's lock"""
+        with self._enhance_locks[native_scale]:
+            return self._realesrgan_models[native_scale].enhance(patch, outscale=native_scale)[0]
+    
+    def _realesrgan_enhancers(self) -> Dict[int, Callable[[np.ndarray], np.ndarray]]:
+        """Loaded Real-ESRGAN models as {native scale: enhance(patch)}; x2 is optional"""
+        enhancers = {}
+        for native_scale in (2, 4):
+            if native_scale != 4 and not os.path.exists(self._realesrgan_path(native_scale)):
+                continue
+            if self._init_realesrgan_model(native_scale):
+                enhancers[native_scale] = lambda patch, k=native_scale: self._realesrgan_enhance(patch, k)
+        return enhancers
+    
+    def _onnx_enhancers(self) -> Dict[int, Callable[[np.ndarray], np.ndarray]]:
+        """Loaded ONNX sessions as {native scale: enhance(patch)}; x2 is optional"""
+        enhancers = {}
+        for native_scale in (2, 4):
+            if native_scale != 4 and self._onnx_sessions.get(native_scale) is None \
+                    and not os.path.exists(self._onnx_path(native_scale)):
+                continue
+            if self._init_onnx_session(native_scale):
+                session = self._onnx_sessions[native_scale]
+                enhancers[native_scale] = lambda patch, session=session, k=native_scale: self._onnx_enhance(patch, session, k)
+        return enhancers
+    
+    def warm_up(self) -> Dict[str, Any]:
+        """Load Real-ESRGAN weights and run a tiny inference so the first request doesn't pay for it"""
+        if not REALESRGAN_AVAILABLE:
+            return {"state": "unavailable", "detail": "Real-ESRGAN not installed, OpenCV fallback in use"}
+        
+        load_start = time.time()
+        if not self._init_realesrgan_model():
+            return {"state": "failed", "detail": f"Could not load {self.realesrgan_model_path}"}
+        load_time_ms = int((time.time() - load_start) * 1000)
+        
+        warm_start = time.time()
+        self._realesrgan_enhance(np.zeros((16, 16, 3), dtype=np.uint8))
+        return {
+            "state": "ready",
+            "load_time_ms": load_time_ms,
+            "warmup_time_ms": int((time.time() - warm_start) * 1000)
+        }
+    
+    def _onnx_model_file(self, native_scale: int = 4) -> str:
+        """Path of the ONNX graph to load, quantizing the fp32 graph to int8 on first use if requested"""
+        model_path = self._onnx_path(native_scale)
+        if not self.onnx_int8:
+            return model_path
+        
+        int8_path = os.path.splitext(model_path)[0] + ".int8.onnx"
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            logger.info(f"Quantizing {model_path} to int8")
+            quantize_dynamic(model_path, int8_path, weight_type=QuantType.QUInt8)
+        return int8_path
+    
+    def _init_onnx_session(self, native_scale: int = 4) -> bool:
+        """Create the ONNX Runtime CPU session for a native scale if available"""
+        if not ONNXRUNTIME_AVAILABLE:
             return False
+        
+        if self._onnx_sessions.get(native_scale) is not None:
+            return True
+        
+        with self._model_lock:
+            if self._onnx_sessions.get(native_scale) is not None:
+                return True
+            model_path = self._onnx_path(native_scale)
+            try:
+                if not os.path.exists(model_path):
+                    logger.warning(f"Real-ESRGAN x{native_scale} ONNX model not found at {model_path}")
+                    return False
+                
+                options = resource_governor.onnx_session_options()
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                self._onnx_sessions[native_scale] = ort.InferenceSession(
+                    self._onnx_model_file(native_scale),
+                    sess_options=options,
+                    providers=["CPUExecutionProvider"]
+                )
+                logger.info(f"Real-ESRGAN x{native_scale} ONNX session initialized ({'int8' if self.onnx_int8 else 'fp32'})")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to initialize Real-ESRGAN ONNX session: {str(e)}")
+                return False
+    
+    def warm_up_onnx(self) -> Dict[str, Any]:
+        """Create the ONNX Runtime session and run a tiny inference"""
+        if not ONNXRUNTIME_AVAILABLE:
+            return {"state": "unavailable", "detail": "ONNX Runtime not installed"}
+        
+        load_start = time.time()
+        if not self._init_onnx_session():
+            return {"state": "failed", "detail": f"Could not load {self.onnx_model_path}"}
+        load_time_ms = int((time.time() - load_start) * 1000)
+        
+        warm_start = time.time()
+        self._onnx_enhance(np.zeros((16, 16, 3), dtype=np.uint8))
+        return {
+            "state": "ready",
+            "load_time_ms": load_time_ms,
+            "warmup_time_ms": int((time.time() - warm_start) * 1000)
+        }
+    
+    def available_models(self) -> List[Dict[str, Any]]:
+        """Upscaling models with availability and measured speed (output megapixels/sec)"""
+        models = [
+            {
+                "name": "realesrgan",
+                "display_name": "Real-ESRGAN",
+                "max_scale": 8,
+                "description": "State-of-the-art upscaling with excellent quality (PyTorch)",
+                "available": REALESRGAN_AVAILABLE and os.path.exists(self.realesrgan_model_path),
+                "native_scales": [k for k in (2, 4) if os.path.exists(self._realesrgan_path(k))]
+            },
+            {
+                "name": "realesrgan-onnx",
+                "display_name": "Real-ESRGAN (ONNX Runtime CPU)",
+                "max_scale": 8,
+                "description": "Real-ESRGAN exported to ONNX, run on ONNX Runtime CPU without torch",
+                "available": ONNXRUNTIME_AVAILABLE and os.path.exists(self.onnx_model_path),
+                "native_scales": [k for k in (2, 4) if os.path.exists(self._onnx_path(k))],
+                "precision": "int8" if self.onnx_int8 else "fp32",
+                "intra_op_threads": self.onnx_threads
+            },
+            {
+                "name": "opencv-edge",
+                "display_name": "OpenCV Edge-Preserving",
+                "max_scale": 8,
+                "description": "Lanczos interpolation with edge sharpening; for flat-colour logos",
+                "available": True
+            },
+            {
+                "name": "auto",
+                "display_name": "Automatic",
+                "max_scale": 8,
+                "description": "Routes each image to the cheapest method meeting the quality target",
+                "available": True,
+                "quality_target": self.auto_quality_target,
+                "decisions": self._routing_decisions()
+            },
+            {
+                "name": "esrgan",
+                "display_name": "ESRGAN",
+                "max_scale": 4,
+                "description": "Enhanced Super-Resolution GAN",
+                "available": False
+            },
+            {
+                "name": "opencv",
+                "display_name": "OpenCV Bicubic",
+                "max_scale": 8,
+                "description": "Fast bicubic interpolation (fallback)",
+                "available": True
+            }
+        ]
+        with self._stats_lock:
+            for model in models:
+                speed = self._model_speed.get(model["name"])
+                model["measured"] = dict(speed) if speed else None
+        return models
+    
+    def _routing_decisions(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._routing_counts)
+    
+    def _gan_model_for_auto(self) -> str:
+        """Best GAN backend that can actually run here (edge-preserving interpolation if none can)"""
+        if ONNXRUNTIME_AVAILABLE and (self._onnx_session is not None or os.path.exists(self.onnx_model_path)):
+            return "realesrgan-onnx"
+        if REALESRGAN_AVAILABLE and (self._realesrgan_model is not None or os.path.exists(self.realesrgan_model_path)):
+            return "realesrgan"
+        return "opencv-edge"
+    
+    def _route(self, image: np.ndarray) -> Dict[str, Any]:
+        """Decide the model for model="auto" and log the decision for auditing"""
+        decision = route(extract_features(image), self.auto_quality_target, self._gan_model_for_auto())
+        with self._stats_lock:
+            self._routing_counts[decision["method"]] = self._routing_counts.get(decision["method"], 0) + 1
+        logger.info(
+            f"Upscale routing: {decision['category']} -> {decision['model']} "
+            f"(target {decision['quality_target']}, est. saving {decision['estimated_saving']:.0%} vs GAN, "
+            f"features {decision['features']})"
+        )
+        return decision
+    
+    def _record_speed(self, model: str, output_pixels: int, elapsed_seconds: float):
+        """Fold one run into the model's moving-average throughput"""
+        megapixels_per_second = output_pixels / 1_000_000 / max(elapsed_seconds, 1e-6)
+        with self._stats_lock:
+            speed = self._model_speed.get(model)
+            if speed is None:
+                self._model_speed[model] = {"runs": 1, "megapixels_per_second": round(megapixels_per_second, 3)}
+            else:
+                speed["runs"] += 1
+                speed["megapixels_per_second"] = round(0.8 * speed["megapixels_per_second"] + 0.2 * megapixels_per_second, 3)
     
     async def upscale_image(
         self,
@@ -92,8 +571,8 @@ class ImageUpscaler:
         Args:
             image_url: URL of the image to upscale
             scale_factor: Upscaling factor (1-8)
-            model: Model to use (realesrgan, esrgan, opencv)
-            output_format: Output format (png, jpg, webp)
+            model: Model to use (auto, realesrgan, realesrgan-onnx, esrgan, opencv-edge, opencv)
+            output_format: Output format (png, jpg, webp, tiff); large png/tiff outputs are encoded in stripes
             quality: Output quality (1-100)
             
         Returns:
@@ -104,56 +583,55 @@ class ImageUpscaler:
         try:
             # Download and validate image
             image_data = await self._download_image(image_url)
-            original_image = self._load_image(image_data)
             
-            # Upscale based on model with fallback
-            try:
-                if model == "realesrgan":
-                    upscaled_image = await self._upscale_realesrgan(original_image, scale_factor)
-                elif model == "esrgan":
-                    upscaled_image = await self._upscale_esrgan(original_image, scale_factor)
-                elif model == "opencv":
-                    upscaled_image = self._upscale_opencv(original_image, scale_factor)
-                else:
-                    raise ValueError(f"Unknown model: {model}")
-            except Exception as e:
-                logger.warning(f"Primary upscaling method {model} failed: {str(e)}, falling back to OpenCV")
-                upscaled_image = self._upscale_opencv(original_image, scale_factor)
-                model = "opencv"  # Update model used for reporting
+            # Identical input bytes and settings map to the previously uploaded result
+            requested_model = model
+            cache_key = render_cache.make_key(
+                "upscale",
+                render_cache.content_hash(image_data),
+                {"scale_factor": scale_factor, "model": model, "output_format": output_format, "quality": quality}
+            )
+            cached = render_cache.get(cache_key)
+            if cached:
+                cached["original_url"] = image_url
+                cached["cached"] = True
+                cached["processing_time_ms"] = int((time.time() - start_time) * 1000)
+                return cached
             
-            # Save upscaled image locally first
-            output_path = await self._save_image(upscaled_image, output_format, quality, image_url)
+            # Reject oversized outputs from the header alone, before decoding
+            width, height = Image.open(io.BytesIO(image_data)).size
+            self._check_output_budget(width, height, scale_factor)
             
-            # Upload to Supabase storage
-            from src.storage import storage
-            with open(output_path, "rb") as f:
-                file_data = f.read()
+            original_image = self._load_image(image_data)
+            output_height, output_width = height * scale_factor, width * scale_factor
+            upscale_stats: Dict[str, Any] = {}
+            if output_format.lower() in STREAMABLE_FORMATS and \
+                    output_width * output_height >= self.stream_encode_megapixels * 1_000_000:
+                buffer, content_type, model = self._encode_streamed(original_image, scale_factor, model, output_format, upscale_stats)
+            else:
+                upscaled_image, model = await self._run_model(original_image, scale_factor, model, upscale_stats)
+                
+                # Encode straight into memory and hand the buffer to storage - no local file round trip
+                buffer, content_type = self._encode_image(upscaled_image, output_format, quality)
+                del upscaled_image
             
-            # Generate filename for storage
+            from src.storage import storage
             timestamp = int(time.time() * 1000)
             filename = f"upscaled_{timestamp}.{output_format}"
             
-            # Log file size before upload
-            file_size_mb = len(file_data) / (1024 * 1024)
+            file_size_mb = buffer.getbuffer().nbytes / (1024 * 1024)
             logger.info(f"Uploading upscaled file: {filename}, size: {file_size_mb:.2f}MB")
             
-            # Upload to Supabase
             storage_file = await storage.upload_file(
-                file_data=file_data,
+                file_data=buffer.getbuffer(),
                 file_name=filename,
                 bucket='team-logos',
-                content_type=f'image/{output_format}'
+                content_type=content_type
             )
             
-            # Clean up local file
-            try:
-                os.remove(output_path)
-            except:
-                pass
-            
             processing_time = int((time.time() - start_time) * 1000)
             
-            return {
+            result = {
                 "success": True,
                 "upscaled_path": storage_file.public_url,
                 "original_url": image_url,
@@ -161,8 +639,19 @@ class ImageUpscaler:
                 "model_used": model,
                 "processing_time_ms": processing_time,
                 "file_size_bytes": storage_file.file_size,
+                "width": output_width,
+                "height": output_height,
+                "peak_rss_mb": round(max(upscale_stats.get("peak_rss_mb", 0.0), _current_rss_mb()), 1),
+                "tiling": upscale_stats.get("tiling"),
+                "chain": upscale_stats.get("chain"),
+                "routing": upscale_stats.get("routing"),
+                "streamed_encode": upscale_stats.get("streamed_encode"),
                 "error": None
             }
+            # Don't pin a fallback result under the requested model's key
+            if model == upscale_stats.get("routing", {}).get("model", requested_model):
+                render_cache.put(cache_key, "upscale", result)
+            return result
             
         except Exception as e:
             logger.error(f"Upscaling failed: {str(e)}")
@@ -177,6 +666,216 @@ class ImageUpscaler:
                 "error": str(e)
             }
     
+    async def upscale_stream(
+        self,
+        image_urls: Sequence[str],
+        scale_factor: int,
+        model: str = "realesrgan",
+        output_format: str = "png",
+        quality: int = 95
+    ) -> AsyncIterator[Tuple[int, dict]]:
+        """
+        Upscale several images on the batch worker pool, yielding each result as it finishes
+        
+        Args:
+            image_urls: URLs of the images to upscale
+            scale_factor, model, output_format, quality: As for upscale_image
+            
+        Yields:
+            (index into image_urls, upscale_image result) in completion order
+        """
+        if self._batch_executor is None:
+            self._batch_executor = ThreadPoolExecutor(max_workers=self.batch_workers, thread_name_prefix="upscale-batch")
+        loop = asyncio.get_running_loop()
+        
+        def run_one(index: int, image_url: str) -> Tuple[int, dict]:
+            # Each worker thread drives its own event loop so the CPU-bound steps run off the main loop
+            return index, asyncio.run(self.upscale_image(image_url, scale_factor, model, output_format, quality))
+        
+        futures = [
+            loop.run_in_executor(self._batch_executor, run_one, index, image_url)
+            for index, image_url in enumerate(image_urls)
+        ]
+        try:
+            for future in asyncio.as_completed(futures):
+                yield await future
+        finally:
+            # Client went away mid-stream: drop items that haven't started
+            for future in futures:
+                future.cancel()
+    
+    async def upscale_array(
+        self,
+        image: np.ndarray,
+        scale_factor: int,
+        model: str = "realesrgan"
+    ) -> dict:
+        """
+        Upscale an in-memory image and return the array, skipping encode and upload
+        
+        For callers that chain further processing on the result.
+        
+        Args:
+            image: BGR or BGRA uint8 array (as returned by cv2.imread)
+            scale_factor: Upscaling factor (1-8)
+            model: Model to use (auto, realesrgan, realesrgan-onnx, esrgan, opencv-edge, opencv)
+            
+        Returns:
+            Dictionary with the upscaled array under "image"
+        """
+        start_time = time.time()
+        
+        try:
+            self._check_output_budget(image.shape[1], image.shape[0], scale_factor)
+            upscale_stats: Dict[str, Any] = {}
+            upscaled_image, model_used = await self._run_model(image, scale_factor, model, upscale_stats)
+            
+            return {
+                "success": True,
+                "image": upscaled_image,
+                "scale_factor": scale_factor,
+                "model_used": model_used,
+                "processing_time_ms": int((time.time() - start_time) * 1000),
+                "peak_rss_mb": round(max(upscale_stats.get("peak_rss_mb", 0.0), _current_rss_mb()), 1),
+                "tiling": upscale_stats.get("tiling"),
+                "chain": upscale_stats.get("chain"),
+                "routing": upscale_stats.get("routing"),
+                "error": None
+            }
+        except Exception as e:
+            logger.error(f"Upscaling failed: {str(e)}")
+            return {
+                "success": False,
+                "image": None,
+                "scale_factor": scale_factor,
+                "model_used": model,
+                "processing_time_ms": int((time.time() - start_time) * 1000),
+                "error": str(e)
+            }
+    
+    def _check_output_budget(self, width: int, height: int, scale_factor: int):
+        """Raise ValueError if the upscaled output would exceed the configured megapixel budget"""
+        megapixels = width * scale_factor * height * scale_factor / 1_000_000
+        if megapixels > self.max_output_megapixels:
+            raise ValueError(
+                f"Output too large: {width * scale_factor}x{height * scale_factor} ({megapixels:.0f}MP) "
+                f"exceeds the {self.max_output_megapixels:.0f}MP limit"
+            )
+    
+    def _encode_streamed(
+        self,
+        image: np.ndarray,
+        scale_factor: int,
+        model: str,
+        output_format: str,
+        stats: Dict[str, Any]
+    ) -> Tuple[io.BytesIO, str, str]:
+        """
+        Upscale and encode stripe by stripe, so peak memory follows the tile/stripe size, not the output size
+        
+        Returns:
+            (buffer, content type, model used)
+        """
+        start_time = time.time()
+        if model == "auto":
+            stats["routing"] = self._route(image)
+            model = stats["routing"]["model"]
+        
+        try:
+            buffer = self._write_stripes(self._iter_model_rows(image, scale_factor, model, stats), image, scale_factor, output_format, stats)
+        except Exception as e:
+            # Nothing has been uploaded yet, so start the encode over
+            logger.warning(f"Primary upscaling method {model} failed: {str(e)}, falling back to OpenCV")
+            model = "opencv"
+            buffer = self._write_stripes(self._iter_model_rows(image, scale_factor, model, stats), image, scale_factor, output_format, stats)
+        
+        height, width = image.shape[:2]
+        self._record_speed(model, width * height * scale_factor ** 2, time.time() - start_time)
+        content_type = "image/png" if output_format.lower() == "png" else "image/tiff"
+        return buffer, content_type, model
+    
+    def _write_stripes(
+        self,
+        bands: Iterable[np.ndarray],
+        image: np.ndarray,
+        scale_factor: int,
+        output_format: str,
+        stats: Dict[str, Any]
+    ) -> io.BytesIO:
+        """Feed upscaled row bands into an incremental PNG/TIFF writer"""
+        height, width = image.shape[:2]
+        channels = image.shape[2] if image.ndim == 3 else 1
+        buffer = io.BytesIO()
+        writer = open_stripe_writer(output_format, buffer, width * scale_factor, height * scale_factor, channels)
+        
+        peak_rss = _current_rss_mb()
+        stripes = 0
+        for rows in bands:
+            writer.write_rows(rows)
+            stripes += 1
+            peak_rss = max(peak_rss, _current_rss_mb())
+        writer.close()
+        
+        stats["peak_rss_mb"] = max(stats.get("peak_rss_mb", 0.0), peak_rss)
+        stats["streamed_encode"] = {"format": output_format.lower(), "stripes": stripes}
+        logger.info(f"Streamed {width * scale_factor}x{height * scale_factor} {output_format} in {stripes} stripes, peak RSS {peak_rss:.0f}MB")
+        return buffer
+    
+    def _iter_model_rows(self, image: np.ndarray, scale_factor: int, model: str, stats: Dict[str, Any]) -> Iterator[np.ndarray]:
+        """Upscaled output of a concrete model as row bands (the streaming counterpart of _run_model)"""
+        height, width = image.shape[:2]
+        out_width, out_height = width * scale_factor, height * scale_factor
+        
+        if model in ("realesrgan", "realesrgan-onnx"):
+            enhancers = self._realesrgan_enhancers() if model == "realesrgan" else self._onnx_enhancers()
+            if enhancers:
+                return self._iter_chain_rows(image, scale_factor, enhancers, stats)
+            if model == "realesrgan-onnx":
+                raise RuntimeError("Real-ESRGAN ONNX session unavailable")
+            logger.warning("Real-ESRGAN not available, using OpenCV fallback")
+        elif model == "opencv-edge":
+            sigma = scale_factor * 0.5
+            lanczos = _resample_rows(iter([image]), height, out_width, out_height, cv2.INTER_LANCZOS4)
+            return _filter_rows(lanczos, int(math.ceil(3 * sigma)) + 1, lambda rows: _unsharp_mask(rows.copy(), sigma))
+        elif model == "esrgan":
+            logger.warning("ESRGAN not available, using OpenCV fallback")
+        elif model != "opencv":
+            raise ValueError(f"Unknown model: {model}")
+        
+        return _resample_rows(iter([image]), height, out_width, out_height, cv2.INTER_CUBIC)
+    
+    async def _run_model(
+        self,
+        image: np.ndarray,
+        scale_factor: int,
+        model: str,
+        stats: Dict[str, Any]
+    ) -> Tuple[np.ndarray, str]:
+        """Upscale with the requested model, falling back to OpenCV. Returns (image, model used)."""
+        start_time = time.time()
+        if model == "auto":
+            stats["routing"] = self._route(image)
+            model = stats["routing"]["model"]
+        try:
+            if model == "realesrgan":
+                upscaled = await self._upscale_realesrgan(image, scale_factor, stats)
+            elif model == "realesrgan-onnx":
+                upscaled = await self._upscale_onnx(image, scale_factor, stats)
+            elif model == "esrgan":
+                upscaled = await self._upscale_esrgan(image, scale_factor)
+            elif model == "opencv-edge":
+                upscaled = self._upscale_edge_preserving(image, scale_factor)
+            elif model == "opencv":
+                upscaled = self._upscale_opencv(image, scale_factor)
+            else:
+                raise ValueError(f"Unknown model: {model}")
+        except Exception as e:
+            logger.warning(f"Primary upscaling method {model} failed: {str(e)}, falling back to OpenCV")
+            upscaled, model = self._upscale_opencv(image, scale_factor), "opencv"
+        
+        self._record_speed(model, upscaled.shape[0] * upscaled.shape[1], time.time() - start_time)
+        return upscaled, model
+    
     async def _download_image(self, url: str) -> bytes:
         """Download image from URL or load from local file"""
         try:
@@ -254,36 +953,226 @@ class ImageUpscaler:
         except Exception as e:
             raise ValueError(f"Failed to load image: {str(e)}")
     
-    async def _upscale_realesrgan(self, image: np.ndarray, scale: int) -> np.ndarray:
+    async def _upscale_realesrgan(self, image: np.ndarray, scale: int, stats: Optional[Dict[str, Any]] = None) -> np.ndarray:
         """Upscale using Real-ESRGAN"""
         try:
-            # Initialize model if not already done
-            if not self._init_realesrgan_model():
+            # Initialize models if not already done
+            enhancers = self._realesrgan_enhancers()
+            if not enhancers:
                 logger.warning("Real-ESRGAN not available, using OpenCV fallback")
                 return self._upscale_opencv(image, scale)
             
-            # Real-ESRGAN works best with 4x scale, so we'll use it for 4x and above
-            if scale >= 4:
-                # Use Real-ESRGAN for 4x upscaling
-                output, _ = self._realesrgan_model.enhance(image, outscale=4)
-                
-                # If we need a different scale, resize accordingly
-                if scale != 4:
-                    height, width = output.shape[:2]
-                    new_width = int(width * scale / 4)
-                    new_height = int(height * scale / 4)
-                    output = cv2.resize(output, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-                
-                return output
-            else:
-                # For scales less than 4x, use OpenCV
-                logger.info(f"Using OpenCV for {scale}x upscaling (Real-ESRGAN optimized for 4x+)")
-                return self._upscale_opencv(image, scale)
+            return self._upscale_chain(image, scale, enhancers, stats if stats is not None else {})
                 
         except Exception as e:
             logger.error(f"Real-ESRGAN upscaling failed: {str(e)}")
             return self._upscale_opencv(image, scale)
     
+    async def _upscale_onnx(self, image: np.ndarray, scale: int, stats: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Upscale using the Real-ESRGAN ONNX graphs on ONNX Runtime CPU"""
+        enhancers = self._onnx_enhancers()
+        if not enhancers:
+            # Let _run_model fall back so the response reports the model actually used
+            raise RuntimeError("Real-ESRGAN ONNX session unavailable")
+        
+        return self._upscale_chain(image, scale, enhancers, stats if stats is not None else {})
+    
+    def _upscale_chain(
+        self,
+        image: np.ndarray,
+        scale: int,
+        enhancers: Dict[int, Callable[[np.ndarray], np.ndarray]],
+        stats: Dict[str, Any]
+    ) -> np.ndarray:
+        """Run the cheapest chain of native-scale passes into one output array"""
+        return _assemble_rows(self._iter_chain_rows(image, scale, enhancers, stats), image.shape[0] * scale)
+    
+    def _iter_chain_rows(
+        self,
+        image: np.ndarray,
+        scale: int,
+        enhancers: Dict[int, Callable[[np.ndarray], np.ndarray]],
+        stats: Dict[str, Any]
+    ) -> Iterator[np.ndarray]:
+        """
+        Run the cheapest chain of native-scale passes, then a final resample only if the chain misses the target
+        
+        Earlier passes are materialized (they are smaller than the output); the last pass and the
+        resample stream output rows.
+        """
+        chain = plan_scale_chain(scale, list(enhancers), self.max_residual, self.max_chain_cost)
+        chain_start = time.time()
+        step_times_ms = []
+        
+        def record(step_stats: Dict[str, Any], step_start: float):
+            stats["peak_rss_mb"] = max(stats.get("peak_rss_mb", 0.0), step_stats["peak_rss_mb"])
+            # Report tiling of the last (largest) pass
+            stats["tiling"] = step_stats["tiling"]
+            step_times_ms.append(int((time.time() - step_start) * 1000))
+        
+        source = image
+        for native_scale in chain["steps"][:-1]:
+            step_start, step_stats = time.time(), {}
+            source = self._enhance_tiled(source, step_stats, enhance=enhancers[native_scale], out_scale=native_scale)
+            record(step_stats, step_start)
+        
+        height, width = image.shape[:2]
+        if chain["steps"]:
+            last = chain["steps"][-1]
+            step_start, step_stats = time.time(), {}
+            bands = self._iter_enhanced_rows(source, step_stats, enhance=enhancers[last], out_scale=last)
+            chain_height = source.shape[0] * last
+        else:
+            bands, chain_height = iter([source]), height
+        
+        # Area resampling when the chain overshoots, cubic when it falls short
+        yield from _resample_rows(bands, chain_height, width * scale, height * scale, cv2.INTER_CUBIC)
+        if chain["steps"]:
+            record(step_stats, step_start)
+        
+        chain["step_times_ms"] = step_times_ms
+        chain["time_ms"] = int((time.time() - chain_start) * 1000)
+        stats["chain"] = chain
+        logger.info(f"Upscale x{scale} via chain {chain['steps']} (resample {chain['resample']}, cost {chain['estimated_cost']})")
+    
+    def _onnx_enhance(self, image: np.ndarray, session: Any = None, native_scale: int = 4) -> np.ndarray:
+        """Run one native-scale inference on a BGR/BGRA/grayscale uint8 image; alpha is resized separately"""
+        session = session or self._onnx_session
+        alpha = None
+        if image.ndim == 2:
+            bgr = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        elif image.shape[2] == 4:
+            bgr, alpha = image[:, :, :3], image[:, :, 3]
+        else:
+            bgr = image
+        
+        # x2plus pixel-unshuffles its input, so height and width must be even
+        height, width = bgr.shape[:2]
+        pad_h, pad_w = (-height) % 2 if native_scale == 2 else 0, (-width) % 2 if native_scale == 2 else 0
+        if pad_h or pad_w:
+            bgr = cv2.copyMakeBorder(bgr, 0, pad_h, 0, pad_w, cv2.BORDER_REFLECT_101)
+        
+        # HWC BGR uint8 -> NCHW RGB float32 in [0, 1]
+        tensor = np.ascontiguousarray(bgr[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+        input_name = session.get_inputs()[0].name
+        result = session.run(None, {input_name: tensor})[0][0]
+        output = (np.clip(result, 0.0, 1.0).transpose(1, 2, 0)[:, :, ::-1] * 255.0 + 0.5).astype(np.uint8)
+        output = output[:height * native_scale, :width * native_scale]
+        
+        if alpha is not None:
+            height, width = output.shape[:2]
+            output = np.dstack([output, cv2.resize(alpha, (width, height), interpolation=cv2.INTER_LINEAR)])
+        elif image.ndim == 2:
+            output = cv2.cvtColor(output, cv2.COLOR_BGR2GRAY)
+        return output
+    
+    def _choose_tile_size(self, height: int, width: int) -> int:
+        """Largest tile (multiple of 32) whose activations fit the memory budget; 0 if the whole image fits"""
+        budget_pixels = self.memory_budget_mb * 1024 * 1024 // REALESRGAN_BYTES_PER_PIXEL
+        if height * width <= budget_pixels:
+            return 0
+        side = int(budget_pixels ** 0.5) - 2 * self.tile_overlap
+        return max(64, min(1024, side // 32 * 32))
+    
+    def _enhance_tiled(
+        self,
+        image: np.ndarray,
+        stats: Dict[str, Any],
+        enhance: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        out_scale: int = 4
+    ) -> np.ndarray:
+        """Run a native-scale model over overlapping tiles into one output array"""
+        return _assemble_rows(self._iter_enhanced_rows(image, stats, enhance, out_scale), image.shape[0] * out_scale)
+    
+    def _iter_enhanced_rows(
+        self,
+        image: np.ndarray,
+        stats: Dict[str, Any],
+        enhance: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        out_scale: int = 4
+    ) -> Iterator[np.ndarray]:
+        """
+        Run a native-scale model over overlapping tiles, feathering each tile into the output across the overlap
+        
+        Yields finished output rows one tile row at a time; only the rows the next tile row
+        still overlaps are carried over. stats is filled in once the last band is yielded.
+        """
+        if enhance is None:
+            enhance = self._realesrgan_enhance
+        height, width = image.shape[:2]
+        tile = self._choose_tile_size(height, width)
+        peak_rss = _current_rss_mb()
+        
+        if tile == 0:
+            tile_start = time.time()
+            output = enhance(image)
+            stats["peak_rss_mb"] = max(peak_rss, _current_rss_mb())
+            stats["tiling"] = {
+                "tile_size": 0,
+                "tile_overlap": 0,
+                "tiles": 1,
+                "tile_times_ms": [int((time.time() - tile_start) * 1000)]
+            }
+            yield output
+            return
+        
+        overlap = min(self.tile_overlap, tile // 4)
+        carry = None
+        tile_times_ms = []
+        
+        ys = _tile_starts(height, tile, overlap)
+        xs = _tile_starts(width, tile, overlap)
+        for row, y in enumerate(ys):
+            band = None
+            for col, x in enumerate(xs):
+                tile_start = time.time()
+                patch = image[y:y + tile, x:x + tile]
+                tile_out = enhance(patch)
+                
+                if band is None:
+                    band = np.empty((tile_out.shape[0], width * out_scale) + tile_out.shape[2:], dtype=tile_out.dtype)
+                    if carry is not None:
+                        band[:carry.shape[0]] = carry
+                
+                ox = x * out_scale
+                th, tw = tile_out.shape[:2]
+                target = band[:th, ox:ox + tw]
+                
+                # Tiles are written in raster order, so only the top and left edges overlap earlier output.
+                # Feather across the actual overlap with the previous tile (the last tile can overlap more).
+                top_overlap = (ys[row - 1] + tile - y) * out_scale if row > 0 else 0
+                left_overlap = (xs[col - 1] + tile - x) * out_scale if col > 0 else 0
+                if top_overlap or left_overlap:
+                    wy = _blend_ramp(th, top_overlap, row > 0)
+                    wx = _blend_ramp(tw, left_overlap, col > 0)
+                    weight = np.outer(wy, wx)
+                    if tile_out.ndim == 3:
+                        weight = weight[:, :, None]
+                    blended = target.astype(np.float32) * (1.0 - weight) + tile_out.astype(np.float32) * weight
+                    target[...] = np.clip(blended + 0.5, 0, np.iinfo(band.dtype).max).astype(band.dtype)
+                else:
+                    target[...] = tile_out
+                
+                tile_times_ms.append(int((time.time() - tile_start) * 1000))
+                peak_rss = max(peak_rss, _current_rss_mb())
+            
+            if row + 1 < len(ys):
+                # Rows above the next tile row are final; the rest is blended again
+                finished = (ys[row + 1] - y) * out_scale
+                carry = band[finished:].copy()
+                yield band[:finished]
+            else:
+                yield band
+        
+        stats["peak_rss_mb"] = peak_rss
+        stats["tiling"] = {
+            "tile_size": tile,
+            "tile_overlap": overlap,
+            "tiles": len(tile_times_ms),
+            "tile_times_ms": tile_times_ms
+        }
+        logger.info(f"Tiled {width}x{height} as {len(ys)}x{len(xs)} tiles of {tile}px, peak RSS {peak_rss:.0f}MB")
+    
     async def _upscale_esrgan(self, image: np.ndarray, scale: int) -> np.ndarray:
         """Upscale using ESRGAN"""
         try:
@@ -295,6 +1184,12 @@ class ImageUpscaler:
             logger.error(f"ESRGAN upscaling failed: {str(e)}")
             return self._upscale_opencv(image, scale)
     
+    def _upscale_edge_preserving(self, image: np.ndarray, scale: int) -> np.ndarray:
+        """Lanczos upscale plus an unsharp mask on the colour channels: crisp flat-colour edges at interpolation cost"""
+        height, width = image.shape[:2]
+        upscaled = cv2.resize(image, (width * scale, height * scale), interpolation=cv2.INTER_LANCZOS4)
+        return _unsharp_mask(upscaled, scale * 0.5)
+    
     def _upscale_opencv(self, image: np.ndarray, scale: int) -> np.ndarray:
         """Upscale using OpenCV bicubic interpolation"""
         try:
@@ -312,6 +1207,46 @@ class ImageUpscaler:
         except Exception as e:
             raise ValueError(f"OpenCV upscaling failed: {str(e)}")
     
+    def _encode_image(self, image: np.ndarray, output_format: str, quality: int) -> Tuple[io.BytesIO, str]:
+        """Encode an upscaled BGR/BGRA array into an in-memory buffer. Returns (buffer, content type)."""
+        try:
+            # Convert BGR to RGB for PIL, preserving alpha channel if present
+            if len(image.shape) == 3 and image.shape[2] == 4:
+                # Image has alpha channel (BGRA)
+                pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA), 'RGBA')
+            elif len(image.shape) == 3 and image.shape[2] == 3:
+                # Image has no alpha channel (BGR)
+                pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), 'RGB')
+            else:
+                # Grayscale or other format
+                pil_image = Image.fromarray(image)
+            
+            buffer = io.BytesIO()
+            
+            # Save with appropriate format and quality
+            if output_format.lower() in ['jpg', 'jpeg']:
+                # Convert to RGB if saving as JPEG (no alpha support)
+                if pil_image.mode == 'RGBA':
+                    # Create white background for transparency
+                    background = Image.new('RGB', pil_image.size, (255, 255, 255))
+                    background.paste(pil_image, mask=pil_image.split()[-1])  # Use alpha channel as mask
+                    pil_image = background
+                pil_image.save(buffer, 'JPEG', quality=quality, optimize=True)
+                content_type = 'image/jpeg'
+            elif output_format.lower() == 'webp':
+                pil_image.save(buffer, 'WEBP', quality=quality, optimize=True)
+                content_type = 'image/webp'
+            elif output_format.lower() in ['tif', 'tiff']:
+                pil_image.save(buffer, 'TIFF', compression='tiff_adobe_deflate')
+                content_type = 'image/tiff'
+            else:  # PNG
+                pil_image.save(buffer, 'PNG', optimize=True, compress_level=9)
+                content_type = 'image/png'
+            
+            return buffer, content_type
+        except Exception as e:
+            raise ValueError(f"Failed to encode image: {str(e)}")
+    
     async def _save_image(
         self,
         image: np.ndarray,
@@ -336,33 +1271,9 @@ class ImageUpscaler:
                 filename = f"upscaled_{timestamp}.{output_format}"
             
             output_path = os.path.join(self.output_dir, filename)
-            
-            # Convert BGR to RGB for PIL, preserving alpha channel if present
-            if len(image.shape) == 3 and image.shape[2] == 4:
-                # Image has alpha channel (BGRA)
-                bgra_image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
-                pil_image = Image.fromarray(bgra_image, 'RGBA')
-            elif len(image.shape) == 3 and image.shape[2] == 3:
-                # Image has no alpha channel (BGR)
-                rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(rgb_image, 'RGB')
-            else:
-                # Grayscale or other format
-                pil_image = Image.fromarray(image)
-            
-            # Save with appropriate format and quality
-            if output_format.lower() in ['jpg', 'jpeg']:
-                # Convert to RGB if saving as JPEG (no alpha support)
-                if pil_image.mode == 'RGBA':
-                    # Create white background for transparency
-                    background = Image.new('RGB', pil_image.size, (255, 255, 255))
-                    background.paste(pil_image, mask=pil_image.split()[-1])  # Use alpha channel as mask
-                    pil_image = background
-                pil_image.save(output_path, 'JPEG', quality=quality, optimize=True)
-            elif output_format.lower() == 'webp':
-                pil_image.save(output_path, 'WEBP', quality=quality, optimize=True)
-            else:  # PNG
-                pil_image.save(output_path, 'PNG', optimize=True, compress_level=9)
+            buffer, _ = self._encode_image(image, output_format, quality)
+            with open(output_path, 'wb') as f:
+                f.write(buffer.getbuffer())
             
             return output_path
         except Exception as e:
@@ -0,0 +1,256 @@
+"""
+Logo vectorization service
+Traces palette-reduced flat-colour logos into SVG paths for resolution-independent print assets
+"""
+
+import io
+import os
+import time
+import math
+import asyncio
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Any, Dict, List, Sequence, Tuple
+import logging
+
+from src.services.color_analysis import analyze_image
+
+logger = logging.getLogger(__name__)
+
+# Pixels with lower alpha are left out of every layer
+ALPHA_THRESHOLD = 128
+
+
+def quantize_to_palette(rgb: np.ndarray, palette: Sequence[Tuple[int, int, int]]) -> np.ndarray:
+    """Index of the nearest palette colour (CIELAB distance) for every pixel of an RGB uint8 image"""
+    lab = cv2.cvtColor(rgb, cv2.COLOR_RGB2LAB).astype(np.float32)
+    palette_lab = cv2.cvtColor(np.array([palette], dtype=np.uint8), cv2.COLOR_RGB2LAB)[0].astype(np.float32)
+
+    labels = np.zeros(rgb.shape[:2], dtype=np.int16)
+    best = np.full(rgb.shape[:2], np.inf, dtype=np.float32)
+    # One pass per colour keeps memory at a few image-sized planes
+    for index, color in enumerate(palette_lab):
+        distance = np.sum((lab - color) ** 2, axis=2)
+        closer = distance < best
+        labels[closer] = index
+        best[closer] = distance[closer]
+    return labels
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def contour_to_path(contour: np.ndarray, corner_threshold: float = 60.0, smoothness: float = 1.0) -> str:
+    """
+    SVG path data for one closed contour
+
+    Args:
+        contour: OpenCV contour (N x 1 x 2)
+        corner_threshold: Vertices turning by at least this many degrees stay sharp corners
+        smoothness: Simplification tolerance in pixels; the remaining vertices are joined by
+            Catmull-Rom curves (0 keeps every contour pixel, as straight segments)
+
+    Returns:
+        Path data ("M ... Z"), or "" if the contour collapses to fewer than 3 vertices
+    """
+    points = cv2.approxPolyDP(contour, smoothness, True)[:, 0, :].astype(np.float64) if smoothness > 0 \
+        else contour[:, 0, :].astype(np.float64)
+    count = len(points)
+    if count < 3:
+        return ""
+    # Contours run through pixel centres
+    points += 0.5
+
+    incoming = points - np.roll(points, 1, axis=0)
+    outgoing = np.roll(points, -1, axis=0) - points
+    cosine = np.sum(incoming * outgoing, axis=1) / np.maximum(
+        np.linalg.norm(incoming, axis=1) * np.linalg.norm(outgoing, axis=1), 1e-9)
+    corner = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0))) >= corner_threshold
+
+    parts = [f"M{_fmt(points[0][0])} {_fmt(points[0][1])}"]
+    for i in range(count):
+        start, end = points[i], points[(i + 1) % count]
+        if corner[i] and corner[(i + 1) % count]:
+            parts.append(f"L{_fmt(end[0])} {_fmt(end[1])}")
+            continue
+        # Catmull-Rom tangents at smooth vertices; corners keep their control point on the vertex
+        c1 = start if corner[i] else start + (end - points[i - 1]) / 6.0
+        c2 = end if corner[(i + 1) % count] else end - (points[(i + 2) % count] - start) / 6.0
+        parts.append(f"C{_fmt(c1[0])} {_fmt(c1[1])} {_fmt(c2[0])} {_fmt(c2[1])} {_fmt(end[0])} {_fmt(end[1])}")
+    parts.append("Z")
+    return "".join(parts)
+
+
+def trace_layers(
+    labels: np.ndarray,
+    opaque: np.ndarray,
+    palette: Sequence[Tuple[int, int, int]],
+    corner_threshold: float = 60.0,
+    smoothness: float = 1.0,
+    min_area: float = 4.0
+) -> List[Dict[str, Any]]:
+    """
+    Trace a palette-label image into stacked colour layers
+
+    Layers are ordered by pixel count, largest first, and each layer covers its own pixels plus
+    those of every layer drawn above it. Later layers paint over it, so neighbouring regions
+    never leave hairline gaps between them.
+
+    Returns:
+        [{"color": "#RRGGBB", "pixels": n, "d": path data, "paths": subpath count}, ...] bottom to top
+    """
+    counts = np.bincount(labels[opaque], minlength=len(palette))
+    order = [int(i) for i in np.argsort(-counts, kind="stable") if counts[i] > 0]
+
+    layers = []
+    covered = opaque.copy()
+    for index in order:
+        mask = covered.astype(np.uint8)
+        # RETR_CCOMP gives outer boundaries and their holes; evenodd filling cuts the holes out
+        contours, _ = cv2.findContours(mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE)
+        subpaths = [
+            path for path in (
+                contour_to_path(contour, corner_threshold, smoothness)
+                for contour in contours if cv2.contourArea(contour) >= min_area
+            ) if path
+        ]
+        if subpaths:
+            layers.append({
+                "color": "#{:02X}{:02X}{:02X}".format(*palette[index]),
+                "pixels": int(counts[index]),
+                "d": "".join(subpaths),
+                "paths": len(subpaths)
+            })
+        covered &= labels != index
+    return layers
+
+
+def build_svg(layers: List[Dict[str, Any]], view_width: int, view_height: int, width: int, height: int) -> str:
+    """SVG document with one evenodd-filled path per layer"""
+    paths = "".join(f'<path fill="{layer["color"]}" fill-rule="evenodd" d="{layer["d"]}"/>' for layer in layers)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {view_width} {view_height}" '
+        f'width="{width}" height="{height}">{paths}</svg>'
+    )
+
+
+class LogoVectorizer:
+    """Traces flat-colour logos into SVG using the color analysis palette"""
+
+    def __init__(self):
+        # Tracing runs on at most this many pixels per edge; the SVG keeps the original size
+        self.max_edge = int(os.getenv("VECTORIZE_MAX_EDGE", "2048"))
+
+    def trace(
+        self,
+        image_data: bytes,
+        corner_threshold: float = 60.0,
+        smoothness: float = 1.0,
+        min_area: float = 4.0,
+        remove_background: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Trace an encoded image into an SVG document
+
+        Args:
+            image_data: Encoded image bytes
+            corner_threshold: Vertices turning by at least this many degrees stay sharp
+            smoothness: Path simplification tolerance in (traced) pixels
+            min_area: Regions and holes smaller than this many pixels are dropped
+            remove_background: Leave out the colour color analysis detects as the background
+
+        Returns:
+            Dictionary with the SVG document, palette and layer details
+        """
+        analysis = analyze_image(io.BytesIO(image_data), mode="logo")
+        palette = [swatch.rgb for swatch in analysis.swatches]
+
+        image = Image.open(io.BytesIO(image_data)).convert("RGBA")
+        width, height = image.size
+        ratio = min(1.0, self.max_edge / max(width, height))
+        if ratio < 1.0:
+            image = image.resize((max(1, round(width * ratio)), max(1, round(height * ratio))), Image.LANCZOS)
+        rgba = np.asarray(image)
+
+        labels = quantize_to_palette(np.ascontiguousarray(rgba[:, :, :3]), palette)
+        opaque = rgba[:, :, 3] >= ALPHA_THRESHOLD
+        if remove_background and analysis.background_candidate is not None:
+            background = int(quantize_to_palette(np.array([[analysis.background_candidate]], dtype=np.uint8), palette)[0, 0])
+            opaque &= labels != background
+
+        layers = trace_layers(labels, opaque, palette, corner_threshold, smoothness, min_area)
+        svg = build_svg(layers, rgba.shape[1], rgba.shape[0], width, height)
+        return {
+            "svg": svg,
+            "width": width,
+            "height": height,
+            "palette": [layer["color"] for layer in layers],
+            "layers": [{k: v for k, v in layer.items() if k != "d"} for layer in layers]
+        }
+
+    async def vectorize_image(
+        self,
+        image_url: str,
+        corner_threshold: float = 60.0,
+        smoothness: float = 1.0,
+        min_area: float = 4.0,
+        remove_background: bool = False
+    ) -> dict:
+        """
+        Download an image, trace it and upload the SVG
+
+        Args:
+            image_url: URL of the logo to trace
+            corner_threshold, smoothness, min_area, remove_background: As for trace
+
+        Returns:
+            Dictionary with the SVG URL and tracing details
+        """
+        start_time = time.time()
+
+        try:
+            from src.services.upscaler import upscaler
+            image_data = await upscaler._download_image(image_url)
+            # Palette analysis and per-layer contour tracing are CPU-bound; keep them off the event loop
+            traced = await asyncio.to_thread(
+                self.trace, image_data, corner_threshold, smoothness, min_area, remove_background
+            )
+
+            from src.storage import storage
+            svg_bytes = traced["svg"].encode("utf-8")
+            storage_file = await storage.upload_file(
+                file_data=svg_bytes,
+                file_name=f"vector_{int(time.time() * 1000)}.svg",
+                bucket='team-logos',
+                content_type='image/svg+xml'
+            )
+
+            processing_time = int((time.time() - start_time) * 1000)
+            logger.info(f"Vectorized {image_url}: {len(traced['layers'])} layers, {len(svg_bytes)} bytes in {processing_time}ms")
+            return {
+                "success": True,
+                "svg_url": storage_file.public_url,
+                "original_url": image_url,
+                "width": traced["width"],
+                "height": traced["height"],
+                "palette": traced["palette"],
+                "layers": traced["layers"],
+                "file_size_bytes": len(svg_bytes),
+                "processing_time_ms": processing_time,
+                "error": None
+            }
+        except Exception as e:
+            logger.error(f"Vectorization failed: {str(e)}")
+            return {
+                "success": False,
+                "svg_url": None,
+                "original_url": image_url,
+                "processing_time_ms": int((time.time() - start_time) * 1000),
+                "error": str(e)
+            }
+
+
+# Global vectorizer instance
+vectorizer = LogoVectorizer()
@@ -2,11 +2,16 @@
 Simplified Storage Service - Supabase Only
 """
 
+import io
 import os
+import time
 import uuid
+import asyncio
+import hashlib
+import threading
 from datetime import datetime
-from typing import List, Optional
-from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set, Tuple, Union
+from dataclasses import dataclass, field
 
 try:
     from supabase import create_client, Client
@@ -22,12 +27,132 @@ class StorageFile:
     file_size: int
     mime_type: str
     bucket: Optional[str] = None
+    deduplicated: bool = False
+
+# Content-addressed objects never change, so they can be cached for a year
+# (Supabase turns this into "Cache-Control: max-age=31536000")
+IMMUTABLE_CACHE_CONTROL = '31536000'
+
+# (data, file name, content type) - data may be a memoryview over an encode buffer
+UploadItem = Tuple[Union[bytes, memoryview], str, str]
+
+@dataclass
+class UploadBatchResult:
+    """Result of a concurrent multi-object upload"""
+    files: List[StorageFile] = field(default_factory=list)
+    total_bytes: int = 0
+    wall_time_ms: int = 0
+    max_concurrency: int = 1
+
+class _MemoryviewReader(io.RawIOBase):
+    """Read-only file object over a memoryview so uploads stream the buffer without copying it"""
+    
+    def __init__(self, view: memoryview):
+        self._view = view.cast('B')
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), len(self._view) - self._pos)
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        return self._pos
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+def _upload_body(file_data: Union[bytes, memoryview]):
+    """Adapt upload data to what the Supabase client accepts without an extra copy"""
+    if isinstance(file_data, memoryview):
+        return io.BufferedReader(_MemoryviewReader(file_data))
+    return file_data
+
+def _byte_length(file_data: Union[bytes, memoryview]) -> int:
+    return file_data.nbytes if isinstance(file_data, memoryview) else len(file_data)
+
+def _content_key(file_data: Union[bytes, memoryview], file_name: str) -> str:
+    """Object key derived from the SHA-256 of the bytes, keeping the original extension"""
+    digest = hashlib.sha256(file_data).hexdigest()
+    ext = os.path.splitext(file_name)[1].lower()
+    return f"sha256/{digest[:2]}/{digest}{ext}"
+
+def _is_duplicate_error(error: Exception) -> bool:
+    """
+    Whether an upload failed because the object already exists
+    
+    Reads the structured fields of the Supabase StorageException (status/code attributes,
+    or the response dict it wraps in older storage3 releases), never the message text,
+    which can echo the hex key.
+    """
+    details = error.args[0] if error.args and isinstance(error.args[0], dict) else {}
+    status = details.get('statusCode', getattr(error, 'status', None))
+    code = details.get('error', getattr(error, 'code', None))
+    return str(status) == '409' or code == 'Duplicate'
+
+class ContentIndex:
+    """Local record of content-addressed keys already uploaded, so existence checks need no network call"""
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._keys: Set[str] = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                self._keys.update(line.strip() for line in f if line.strip())
+    
+    def contains(self, bucket: str, key: str) -> bool:
+        return f"{bucket}/{key}" in self._keys
+    
+    def add(self, bucket: str, key: str):
+        entry = f"{bucket}/{key}"
+        with self._lock:
+            if entry in self._keys:
+                return
+            self._keys.add(entry)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(entry + '\n')
+    
+    def discard(self, bucket: str, key: str):
+        entry = f"{bucket}/{key}"
+        with self._lock:
+            if entry not in self._keys:
+                return
+            self._keys.discard(entry)
+            if self.path:
+                with open(self.path, 'w') as f:
+                    f.writelines(k + '\n' for k in sorted(self._keys))
+    
+    def __len__(self) -> int:
+        return len(self._keys)
 
 class StorageService:
     """Simplified storage service that only uses Supabase"""
     
     def __init__(self):
         self.supabase_client: Optional[Client] = None
+        self.content_addressed = os.getenv('STORAGE_CONTENT_ADDRESSED', 'false').lower() == 'true'
+        self.content_index = ContentIndex(os.getenv('STORAGE_CONTENT_INDEX_PATH'))
         self._init_supabase()
     
     def _init_supabase(self):
@@ -45,13 +170,80 @@ class StorageService:
     
     async def upload_file(
         self,
-        file_data: bytes,
+        file_data: Union[bytes, memoryview],
         file_name: str,
         bucket: str = 'team-logos',
         content_type: str = 'application/octet-stream',
-        cache_control: str = '3600'
+        cache_control: str = '3600',
+        content_addressed: Optional[bool] = None
+    ) -> StorageFile:
+        """
+        Upload a file to Supabase storage
+        
+        With content_addressed (default: STORAGE_CONTENT_ADDRESSED) the object is stored under
+        the hash of its bytes with immutable cache headers, and is skipped if already uploaded.
+        """
+        return self._upload_sync(file_data, file_name, bucket, content_type, cache_control, content_addressed)
+    
+    async def upload_many(
+        self,
+        items: Sequence[UploadItem],
+        bucket: str = 'team-logos',
+        cache_control: str = '3600',
+        max_concurrency: Optional[int] = None,
+        content_addressed: Optional[bool] = None
+    ) -> UploadBatchResult:
+        """
+        Upload several files concurrently with bounded parallelism
+        
+        Args:
+            items: (data, file name, content type) tuples; data may be bytes or a memoryview
+            bucket: Target bucket for every item
+            cache_control: Cache-Control value applied to every item
+            max_concurrency: Maximum uploads in flight (defaults to STORAGE_UPLOAD_CONCURRENCY)
+            content_addressed: Store items under their content hash (see upload_file)
+            
+        Returns:
+            UploadBatchResult with StorageFiles in input order, aggregate bytes and wall time
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('STORAGE_UPLOAD_CONCURRENCY', '4'))
+        max_concurrency = max(1, min(max_concurrency, len(items) or 1))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        start_time = time.time()
+        
+        async def upload_one(item: UploadItem) -> StorageFile:
+            file_data, file_name, content_type = item
+            async with semaphore:
+                # The Supabase client is synchronous, so run each upload in a worker thread
+                return await asyncio.to_thread(
+                    self._upload_sync, file_data, file_name, bucket, content_type, cache_control, content_addressed
+                )
+        
+        files = await asyncio.gather(*(upload_one(item) for item in items))
+        
+        return UploadBatchResult(
+            files=list(files),
+            total_bytes=sum(f.file_size for f in files),
+            wall_time_ms=int((time.time() - start_time) * 1000),
+            max_concurrency=max_concurrency
+        )
+    
+    def _upload_sync(
+        self,
+        file_data: Union[bytes, memoryview],
+        file_name: str,
+        bucket: str,
+        content_type: str,
+        cache_control: str,
+        content_addressed: Optional[bool] = None
     ) -> StorageFile:
-        """Upload a file to Supabase storage"""
+        """Upload a single file (blocking)"""
+        if content_addressed is None:
+            content_addressed = self.content_addressed
+        if content_addressed:
+            return self._upload_content_addressed(file_data, file_name, bucket, content_type)
+        
         try:
             # Generate unique filename
             file_id = str(uuid.uuid4())
@@ -62,7 +254,7 @@ class StorageService:
             # Upload to Supabase
             response = self.supabase_client.storage.from_(bucket).upload(
                 unique_name,
-                file_data,
+                _upload_body(file_data),
                 file_options={
                     'content-type': content_type,
                     'cache-control': cache_control
@@ -75,7 +267,7 @@ class StorageService:
             return StorageFile(
                 file_name=unique_name,
                 public_url=public_url,
-                file_size=len(file_data),
+                file_size=_byte_length(file_data),
                 mime_type=content_type,
                 bucket=bucket
             )
@@ -83,6 +275,46 @@ class StorageService:
         except Exception as e:
             raise Exception(f"Failed to upload file: {str(e)}")
     
+    def _upload_content_addressed(
+        self,
+        file_data: Union[bytes, memoryview],
+        file_name: str,
+        bucket: str,
+        content_type: str
+    ) -> StorageFile:
+        """Upload under a content hash key, skipping objects that already exist (blocking)"""
+        key = _content_key(file_data, file_name)
+        deduplicated = self.content_index.contains(bucket, key)
+        
+        if not deduplicated:
+            try:
+                self.supabase_client.storage.from_(bucket).upload(
+                    key,
+                    _upload_body(file_data),
+                    file_options={
+                        'content-type': content_type,
+                        'cache-control': IMMUTABLE_CACHE_CONTROL,
+                        'upsert': 'false'
+                    }
+                )
+            except Exception as e:
+                # Uploaded earlier by another process - same key means same bytes
+                if not _is_duplicate_error(e):
+                    raise Exception(f"Failed to upload file: {str(e)}")
+                deduplicated = True
+            self.content_index.add(bucket, key)
+        
+        public_url = self.supabase_client.storage.from_(bucket).get_public_url(key)
+        
+        return StorageFile(
+            file_name=key,
+            public_url=public_url,
+            file_size=_byte_length(file_data),
+            mime_type=content_type,
+            bucket=bucket,
+            deduplicated=deduplicated
+        )
+    
     async def get_public_url(self, file_path: str, bucket: str = 'team-logos') -> str:
         """Get public URL for a file"""
         try:
@@ -94,6 +326,7 @@ class StorageService:
         """Delete a file from storage"""
         try:
             self.supabase_client.storage.from_(bucket).remove([file_path])
+            self.content_index.discard(bucket, file_path)
             return True
         except Exception:
             return False
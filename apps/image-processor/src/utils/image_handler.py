@@ -38,29 +38,36 @@ class ImageHandler:
             PIL Image object
         """
         try:
-            if image_url.startswith("file://"):
-                # File URL
-                file_path = image_url.replace("file://", "")
-                if not os.path.exists(file_path):
-                    raise FileNotFoundError(f"File not found: {file_path}")
-                return Image.open(file_path)
-            
-            elif image_url.startswith(("http://", "https://")):
-                # HTTP URL
-                response = requests.get(image_url, timeout=30)
-                response.raise_for_status()
-                return Image.open(BytesIO(response.content))
-            
-            else:
-                # Local file path
-                if not os.path.exists(image_url):
-                    raise FileNotFoundError(f"File not found: {image_url}")
-                return Image.open(image_url)
-                
+            return Image.open(BytesIO(await self.load_bytes(image_url)))
         except Exception as e:
             logger.error(f"Failed to load image {image_url}: {e}")
             raise Exception(f"Failed to load image: {str(e)}")
     
+    async def load_bytes(self, image_url: str) -> bytes:
+        """
+        Fetch the raw (still encoded) bytes of an image from any URL type
+        
+        Args:
+            image_url: URL or path to image (data:, file://, http(s)://, local path)
+            
+        Returns:
+            Encoded image bytes
+        """
+        if image_url.startswith("data:"):
+            import base64
+            return base64.b64decode(image_url.split(",", 1)[1])
+        
+        if image_url.startswith(("http://", "https://")):
+            response = requests.get(image_url, timeout=30)
+            response.raise_for_status()
+            return response.content
+        
+        file_path = image_url.replace("file://", "", 1) if image_url.startswith("file://") else image_url
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        with open(file_path, "rb") as f:
+            return f.read()
+    
     def remove_background_simple(self, image: Image.Image) -> Image.Image:
         """
         Simple background removal for white/light backgrounds
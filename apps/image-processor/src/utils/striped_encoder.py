@@ -0,0 +1,189 @@
+"""
+Striped Image Encoders
+Write PNG and TIFF files a band of rows at a time, so large outputs never exist as one array
+"""
+
+import struct
+import zlib
+import numpy as np
+from typing import BinaryIO, List
+
+# Formats open_stripe_writer can encode incrementally
+STREAMABLE_FORMATS = ("png", "tiff")
+
+
+def _to_rgb(rows: np.ndarray) -> np.ndarray:
+    """BGR/BGRA/grayscale uint8 rows -> RGB/RGBA/grayscale as (rows, width, channels)"""
+    if rows.ndim == 2:
+        return rows[:, :, None]
+    if rows.shape[2] == 4:
+        return rows[:, :, [2, 1, 0, 3]]
+    return rows[:, :, ::-1]
+
+
+class _StripeWriter:
+    """Shared bookkeeping: every row of the declared size must be written exactly once"""
+
+    def __init__(self, fileobj: BinaryIO, width: int, height: int, channels: int):
+        if channels not in (1, 3, 4):
+            raise ValueError(f"Unsupported channel count: {channels}")
+        self.fileobj = fileobj
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.rows_written = 0
+
+    def _check_rows(self, rows: np.ndarray) -> np.ndarray:
+        if rows.dtype != np.uint8:
+            raise ValueError(f"Expected uint8 rows, got {rows.dtype}")
+        rgb = _to_rgb(rows)
+        if rgb.shape[1:] != (self.width, self.channels):
+            raise ValueError(f"Row shape {rows.shape[1:]} does not match {self.width}x{self.channels}")
+        if self.rows_written + rgb.shape[0] > self.height:
+            raise ValueError(f"Too many rows: {self.rows_written + rgb.shape[0]} > {self.height}")
+        self.rows_written += rgb.shape[0]
+        return rgb
+
+    def _check_complete(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Image incomplete: {self.rows_written} of {self.height} rows written")
+
+
+class PNGStripeWriter(_StripeWriter):
+    """8-bit PNG: rows are Up-filtered and fed through one zlib stream split across IDAT chunks"""
+
+    def __init__(self, fileobj: BinaryIO, width: int, height: int, channels: int, compress_level: int = 6):
+        super().__init__(fileobj, width, height, channels)
+        color_type = {1: 0, 3: 2, 4: 6}[channels]
+        fileobj.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        self._compressor = zlib.compressobj(compress_level)
+        self._previous = np.zeros(width * channels, dtype=np.uint8)
+
+    def _chunk(self, kind: bytes, data: bytes):
+        self.fileobj.write(struct.pack(">I", len(data)) + kind + data)
+        self.fileobj.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write_rows(self, rows: np.ndarray):
+        """Append a band of BGR/BGRA/grayscale uint8 rows"""
+        flat = self._check_rows(rows).reshape(-1, self.width * self.channels)
+        if flat.shape[0] == 0:
+            return
+        filtered = np.empty((flat.shape[0], flat.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2  # Up filter: each byte minus the byte above (wrapping)
+        filtered[0, 1:] = flat[0] - self._previous
+        filtered[1:, 1:] = flat[1:] - flat[:-1]
+        self._previous = flat[-1].copy()
+
+        data = self._compressor.compress(filtered.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self):
+        self._check_complete()
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+
+
+class TIFFStripeWriter(_StripeWriter):
+    """Baseline little-endian TIFF with deflate-compressed strips; the IFD goes at the end"""
+
+    SHORT, LONG = 3, 4
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        width: int,
+        height: int,
+        channels: int,
+        rows_per_strip: int = 64,
+        compress_level: int = 6
+    ):
+        super().__init__(fileobj, width, height, channels)
+        self.rows_per_strip = rows_per_strip
+        self.compress_level = compress_level
+        self._start = fileobj.tell()
+        fileobj.write(b"II" + struct.pack("<HI", 42, 0))  # IFD offset is patched in close()
+        self._pending: List[np.ndarray] = []
+        self._pending_rows = 0
+        self._strip_offsets: List[int] = []
+        self._strip_byte_counts: List[int] = []
+
+    def write_rows(self, rows: np.ndarray):
+        """Append a band of BGR/BGRA/grayscale uint8 rows"""
+        rgb = self._check_rows(rows)
+        self._pending.append(rgb)
+        self._pending_rows += rgb.shape[0]
+        while self._pending_rows >= self.rows_per_strip:
+            pending = np.concatenate(self._pending)
+            self._write_strip(pending[:self.rows_per_strip])
+            rest = pending[self.rows_per_strip:]
+            self._pending, self._pending_rows = [rest], rest.shape[0]
+
+    def _write_strip(self, strip: np.ndarray):
+        # Horizontal differencing (Predictor 2) per sample, then deflate
+        predicted = strip.copy()
+        predicted[:, 1:] = strip[:, 1:] - strip[:, :-1]
+        data = zlib.compress(predicted.tobytes(), self.compress_level)
+        self._strip_offsets.append(self.fileobj.tell() - self._start)
+        self._strip_byte_counts.append(len(data))
+        self.fileobj.write(data)
+
+    def close(self):
+        self._check_complete()
+        if self._pending_rows:
+            self._write_strip(np.concatenate(self._pending))
+
+        entries = [
+            (256, self.LONG, [self.width]),
+            (257, self.LONG, [self.height]),
+            (258, self.SHORT, [8] * self.channels),
+            (259, self.SHORT, [8]),  # Adobe deflate
+            (262, self.SHORT, [1 if self.channels == 1 else 2]),
+            (273, self.LONG, self._strip_offsets),
+            (277, self.SHORT, [self.channels]),
+            (278, self.LONG, [self.rows_per_strip]),
+            (279, self.LONG, self._strip_byte_counts),
+            (284, self.SHORT, [1]),
+            (317, self.SHORT, [2]),
+        ]
+        if self.channels == 4:
+            entries.append((338, self.SHORT, [2]))  # Unassociated alpha
+
+        if (self.fileobj.tell() - self._start) % 2:
+            self.fileobj.write(b"\0")
+        ifd_offset = self.fileobj.tell() - self._start
+        data_offset = ifd_offset + 2 + 12 * len(entries) + 4
+        ifd, extra = struct.pack("<H", len(entries)), b""
+        for tag, kind, values in entries:
+            packed = struct.pack(f"<{len(values)}{'H' if kind == self.SHORT else 'I'}", *values)
+            if len(packed) <= 4:
+                ifd += struct.pack("<HHI", tag, kind, len(values)) + packed.ljust(4, b"\0")
+            else:
+                ifd += struct.pack("<HHII", tag, kind, len(values), data_offset + len(extra))
+                extra += packed
+        self.fileobj.write(ifd + struct.pack("<I", 0) + extra)
+
+        end = self.fileobj.tell()
+        self.fileobj.seek(self._start + 4)
+        self.fileobj.write(struct.pack("<I", ifd_offset))
+        self.fileobj.seek(end)
+
+
+def open_stripe_writer(output_format: str, fileobj: BinaryIO, width: int, height: int, channels: int) -> _StripeWriter:
+    """
+    Create an incremental writer for png or tiff
+
+    Args:
+        output_format: png or tiff
+        fileobj: Seekable binary file-like object
+        width, height, channels: Size of the image that will be written
+
+    Returns:
+        Writer with write_rows(rows) and close()
+    """
+    if output_format.lower() == "png":
+        return PNGStripeWriter(fileobj, width, height, channels)
+    if output_format.lower() in ("tif", "tiff"):
+        return TIFFStripeWriter(fileobj, width, height, channels)
+    raise ValueError(f"Striped encoding not supported for {output_format}")
@@ -149,7 +149,7 @@ class InputValidator:
         if not isinstance(format_str, str):
             raise ValidationError(f"{field_name} must be a string", field_name)
         
-        valid_formats = {'png', 'jpg', 'jpeg', 'webp'}
+        valid_formats = {'png', 'jpg', 'jpeg', 'webp', 'tiff'}
         format_lower = format_str.lower()
         
         if format_lower not in valid_formats:
@@ -0,0 +1,83 @@
+"""
+Shared fixtures for the unit tests: services built against per-test directories
+
+Test modules add their own stubs by overriding a fixture and requesting it by the same name,
+e.g. ``def upscaler(upscaler): upscaler._onnx_session = _FakeSession(); return upscaler``.
+"""
+
+import pytest
+from contextlib import ExitStack
+from unittest.mock import patch
+from PIL import Image
+
+
+@pytest.fixture
+def service_dirs(tmp_path, monkeypatch):
+    """Point TEMP_DIR, OUTPUT_DIR and MODELS_DIR at directories under tmp_path"""
+    monkeypatch.setenv("TEMP_DIR", str(tmp_path / "temp"))
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("MODELS_DIR", str(tmp_path / "models"))
+    return tmp_path
+
+
+@pytest.fixture
+def upscaler_env():
+    """Extra environment for the upscaler fixture; override to configure it"""
+    return {}
+
+
+@pytest.fixture
+def upscaler(service_dirs, monkeypatch, upscaler_env):
+    """ImageUpscaler with per-test directories and no model loaded"""
+    from src.services.upscaler import ImageUpscaler
+    for name, value in upscaler_env.items():
+        monkeypatch.setenv(name, value)
+    return ImageUpscaler()
+
+
+@pytest.fixture
+def remover(service_dirs):
+    """AIBackgroundRemover with per-test directories"""
+    from src.services.ai_background_remover import AIBackgroundRemover
+    return AIBackgroundRemover()
+
+
+@pytest.fixture
+def fake_rembg_sessions():
+    """
+    Install a fresh single-session registry for the remover; call it with new_session(model)
+    returning the stand-in session. Returns the registry.
+    """
+    from src.services import ai_background_remover
+    from src.services.rembg_sessions import RembgSessionRegistry
+
+    with ExitStack() as stack:
+        def install(new_session):
+            registry = RembgSessionRegistry(pool_size=1)
+            stack.enter_context(patch.object(ai_background_remover, "rembg_sessions", registry))
+            stack.enter_context(patch.object(registry, "_load_rembg", return_value=(new_session, None)))
+            return registry
+        yield install
+
+
+@pytest.fixture
+def overlay_templates():
+    """Template sizes for the overlay_service fixture; override for other sizes"""
+    return {"tshirt": (400, 400), "banner": (600, 300)}
+
+
+@pytest.fixture
+def overlay_service(tmp_path, overlay_templates):
+    """LogoOverlayService pointed at small generated templates"""
+    from src.services.logo_overlay import LogoOverlayService
+    assets_dir = tmp_path / "assets"
+    banner_dir = tmp_path / "test-input" / "banner"
+    assets_dir.mkdir()
+    banner_dir.mkdir(parents=True)
+    for side in ("front", "back"):
+        Image.new("RGBA", overlay_templates["tshirt"], (20, 20, 20, 255)).save(assets_dir / f"black_tshirt_{side}.png")
+    Image.new("RGBA", overlay_templates["banner"], (240, 240, 240, 255)).save(banner_dir / "banner-template.png")
+
+    service = LogoOverlayService()
+    service.assets_dir = str(assets_dir)
+    return service
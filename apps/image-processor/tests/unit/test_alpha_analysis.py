@@ -0,0 +1,147 @@
+"""
+Unit tests for the alpha analysis and the rembg transparency bypass
+"""
+
+import io
+import base64
+import numpy as np
+import pytest
+from unittest.mock import patch
+from PIL import Image, ImageDraw
+from src.services.alpha_analysis import analyze_alpha
+
+
+def _coverage(size=200, supersample=4):
+    """Anti-aliased disc coverage (0-1) on a size x size canvas"""
+    mask = Image.new("L", (size * supersample, size * supersample), 0)
+    ImageDraw.Draw(mask).ellipse([s * supersample for s in (40, 40, 160, 160)], fill=255)
+    return np.asarray(mask.resize((size, size), Image.BOX)).astype(np.float32) / 255
+
+
+def _logo(color=(200, 30, 30), matte=None):
+    """RGBA disc on a transparent canvas; with a matte its edge is blended onto that colour"""
+    coverage = _coverage()
+    rgb = np.empty(coverage.shape + (3,), dtype=np.float32)
+    rgb[:] = color
+    if matte is not None:
+        rgb = rgb * coverage[..., None] + np.array(matte, dtype=np.float32) * (1 - coverage[..., None])
+    alpha = coverage * 255
+    return Image.fromarray(np.dstack([rgb, alpha]).round().astype(np.uint8), "RGBA")
+
+
+def _png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class TestAnalyzeAlpha:
+    """Test cases for analyze_alpha"""
+
+    def test_transparent_logo_is_clean(self):
+        analysis = analyze_alpha(_logo())
+
+        assert analysis["clean_background"] is True
+        assert analysis["border_transparency"] == 1.0
+        assert 0.6 < analysis["transparent_ratio"] < 0.8
+        assert analysis["partial_ratio"] > 0
+
+    def test_image_without_alpha(self):
+        analysis = analyze_alpha(Image.new("RGB", (50, 50), "white"))
+
+        assert analysis["clean_background"] is False
+        assert analysis["reason"] == "no_alpha"
+
+    def test_opaque_background_with_alpha_channel(self):
+        analysis = analyze_alpha(Image.new("RGBA", (50, 50), (255, 255, 255, 255)))
+
+        assert analysis["reason"] == "opaque_border"
+        assert analysis["opaque_ratio"] == 1.0
+
+    def test_transparent_border_around_opaque_canvas(self):
+        """A thin transparent frame alone isn't a removed background"""
+        image = Image.new("RGBA", (200, 200), (0, 0, 0, 0))
+        image.paste((255, 255, 255, 255), (2, 2, 198, 198))
+
+        assert analyze_alpha(image)["reason"] == "mostly_opaque"
+
+    @pytest.mark.parametrize("matte", ["white", "black"])
+    def test_matte_fringe_is_detected(self, matte):
+        analysis = analyze_alpha(_logo(color=(120, 60, 140), matte=(255, 255, 255) if matte == "white" else (0, 0, 0)))
+
+        assert analysis["matte"] == matte
+        assert analysis["clean_background"] is False
+
+    def test_dark_logo_edge_is_not_a_matte(self):
+        """Clean anti-aliasing of a black logo keeps its edge colour at every alpha"""
+        assert analyze_alpha(_logo(color=(10, 10, 10)))["matte"] is None
+
+    def test_accepts_rgba_arrays_and_la_images(self):
+        logo = _logo()
+
+        assert analyze_alpha(np.asarray(logo))["clean_background"] is True
+        assert analyze_alpha(logo.convert("LA"))["clean_background"] is True
+
+
+class TestTransparencyBypass:
+    """Test cases for skipping rembg on already-transparent inputs"""
+
+    @pytest.mark.asyncio
+    async def test_transparent_input_skips_rembg(self, remover):
+        with patch.object(remover, "remove_image") as remove_image:
+            result = await remover._remove_background_ai_data(_png_bytes(_logo()), "https://example.com/logo.png")
+
+        remove_image.assert_not_called()
+        assert result["method"] == "bypass_transparent"
+        assert result["bypassed"] is True
+        assert result["alpha_analysis"]["reason"] == "clean"
+        assert np.array_equal(np.asarray(Image.open(result["output_url"])), np.asarray(_logo()))
+
+    @pytest.mark.asyncio
+    async def test_hybrid_returns_bypass_without_cleanup(self, remover):
+        data_url = "data:image/png;base64," + base64.b64encode(_png_bytes(_logo())).decode()
+        with patch.object(remover, "remove_image") as remove_image, \
+             patch.object(remover, "_cleanup_ai_array") as cleanup:
+            result = await remover.remove_background_hybrid(data_url)
+
+        remove_image.assert_not_called()
+        cleanup.assert_not_called()
+        assert result["bypassed"] is True
+
+    def test_opaque_input_still_runs_rembg(self, remover):
+        image = Image.new("RGB", (40, 40), "white")
+        mask = np.zeros((40, 40), dtype=np.uint8)
+        with patch.object(remover, "predict_mask", return_value=mask) as predict_mask:
+            result, analysis = remover.remove_image_if_needed(image)
+
+        predict_mask.assert_called_once_with(image, None)
+        assert result.mode == "RGBA"
+        assert analysis["bypass"] is False
+
+    def test_bypass_can_be_disabled(self, remover):
+        remover.bypass_transparent = False
+        with patch.object(remover, "predict_mask", return_value=np.zeros((200, 200), dtype=np.uint8)) as predict_mask:
+            result, analysis = remover.remove_image_if_needed(_logo())
+
+        predict_mask.assert_called_once()
+        assert analysis["clean_background"] is True
+
+    def test_endpoint_reports_bypass(self, client, remover):
+        from src.api import background_removal
+
+        result = {
+            "success": True,
+            "output_url": "./output/no_bg_logo.png",
+            "file_size_bytes": 1234,
+            "method": "bypass_transparent",
+            "bypassed": True,
+            "alpha_analysis": analyze_alpha(_logo())
+        }
+        with patch.object(background_removal.ai_remover, "remove_background_hybrid", return_value=result):
+            response = client.post("/api/v1/remove-background/hybrid", json={"image_url": "https://example.com/logo.png"})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["bypassed"] is True
+        assert body["processed_url"] == "./output/no_bg_logo.png"
+        assert body["alpha_analysis"]["reason"] == "clean"
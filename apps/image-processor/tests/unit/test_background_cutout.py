@@ -0,0 +1,242 @@
+"""
+Unit tests for the encode-free rembg cutout and the in-memory hybrid pipeline
+"""
+
+import io
+import os
+import base64
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from PIL import Image
+from src.services import ai_background_remover as module
+
+
+class _FakeSession:
+    """Session stand-in: the foreground is the left half of the image"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def predict(self, image):
+        self.inputs.append(image)
+        mask = np.zeros((image.height, image.width), dtype=np.uint8)
+        mask[:, :image.width // 2] = 255
+        mask[:, image.width // 2] = 128
+        return [Image.fromarray(mask, "L")]
+
+
+@pytest.fixture
+def session():
+    return _FakeSession()
+
+
+@pytest.fixture
+def remover(remover, session, fake_rembg_sessions):
+    fake_rembg_sessions(lambda model: session)
+    return remover
+
+
+def _photo(alpha=None):
+    """Opaque-background test image; an alpha plane makes it RGBA"""
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, (40, 60, 3), dtype=np.uint8)
+    if alpha is None:
+        return Image.fromarray(rgb, "RGB")
+    return Image.fromarray(np.dstack([rgb, alpha]), "RGBA")
+
+
+class TestCutOut:
+    """Test cases for AIBackgroundRemover.cut_out"""
+
+    def test_mask_becomes_alpha_and_colours_are_untouched(self, remover, session):
+        image = _photo()
+        timings = {}
+
+        rgba = remover.cut_out(image, timings)
+
+        assert session.inputs == [image]
+        assert np.array_equal(rgba[:, :, :3], np.asarray(image))
+        assert (rgba[:, :30, 3] == 255).all()
+        assert (rgba[:, 30, 3] == 128).all()
+        assert (rgba[:, 31:, 3] == 0).all()
+        assert set(timings) == {"inference", "composite"}
+
+    def test_existing_alpha_is_kept(self, remover):
+        alpha = np.full((40, 60), 255, dtype=np.uint8)
+        alpha[:10] = 60
+
+        rgba = remover.cut_out(_photo(alpha), {})
+
+        assert (rgba[:10, :30, 3] == 60).all()
+        assert (rgba[10:, :30, 3] == 255).all()
+
+
+class TestEncodeFreeRemoval:
+    """Test cases for the remover paths that decode and encode only at the boundaries"""
+
+    @pytest.mark.asyncio
+    async def test_from_image_encodes_once(self, remover, session):
+        image = _photo()
+        with patch.object(Image.Image, "save", autospec=True, side_effect=Image.Image.save) as save:
+            result = await remover.remove_background_from_image(image)
+
+        assert result["success"] is True
+        assert save.call_count == 1
+        assert set(result["timings_ms"]) == {"inference", "composite", "encode"}
+        assert isinstance(session.inputs[0], Image.Image)
+        output = np.asarray(Image.open(result["output_url"]))
+        assert np.array_equal(output[:, :, :3], np.asarray(image))
+
+    @pytest.mark.asyncio
+    async def test_url_path_keeps_input_alpha(self, remover):
+        alpha = np.full((40, 60), 255, dtype=np.uint8)
+        alpha[:, :5] = 100
+        buffer = io.BytesIO()
+        _photo(alpha).save(buffer, "PNG")
+
+        result = await remover._remove_background_ai_data(buffer.getvalue(), "https://example.com/team.png")
+
+        assert result["method"] == "ai_rembg"
+        assert set(result["timings_ms"]) == {"decode", "inference", "composite", "encode"}
+        output = np.asarray(Image.open(result["output_url"]))
+        assert (output[:, :5, 3] == 100).all()
+        assert (output[:, 5:30, 3] == 255).all()
+        assert (output[:, 31:, 3] == 0).all()
+
+
+def _white_background_logo():
+    """Dark block on white; the fake session keeps the left half"""
+    rgb = np.full((40, 60, 3), 255, dtype=np.uint8)
+    rgb[10:30, 10:25] = (20, 40, 160)
+    return Image.fromarray(rgb, "RGB")
+
+
+def _data_url(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+class TestInMemoryHybrid:
+    """Test cases for the in-memory hybrid pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_hybrid_writes_a_single_artifact(self, remover, tmp_path):
+        data_url = _data_url(_white_background_logo())
+        with patch.object(Image.Image, "save", autospec=True, side_effect=Image.Image.save) as save:
+            result = await remover.remove_background_hybrid(data_url)
+
+        assert result["method"] == "hybrid_ai_manual"
+        assert save.call_count == 1
+        assert set(result["timings_ms"]) == {"decode", "inference", "composite", "cleanup", "encode"}
+        assert os.listdir(tmp_path / "output") == [os.path.basename(result["output_url"])]
+        output = np.asarray(Image.open(result["output_url"]))
+        # White background the mask dropped stays transparent after the white-element cleanup
+        assert (output[:, 35:, 3] == 0).all()
+        assert (output[12:28, 12:23, 3] == 255).all()
+
+    @pytest.mark.asyncio
+    async def test_encoded_jpeg_is_flattened_onto_white(self, remover):
+        result = await remover.remove_background_hybrid_encoded(_data_url(_photo()), output_format="jpg", quality=90)
+
+        assert result["content_type"] == "image/jpeg"
+        decoded = np.asarray(Image.open(io.BytesIO(result["data"])))
+        assert decoded.shape == (40, 60, 3)
+        assert (decoded[:, 40:] > 240).all()
+
+    @pytest.mark.asyncio
+    async def test_clean_png_passes_through_unchanged(self, remover, session):
+        logo = np.zeros((40, 60, 4), dtype=np.uint8)
+        logo[10:30, 10:50] = (200, 30, 30, 255)
+        buffer = io.BytesIO()
+        Image.fromarray(logo, "RGBA").save(buffer, "PNG")
+
+        result = await remover.remove_background_hybrid_encoded("data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode())
+
+        assert result["bypassed"] is True
+        assert result["data"] == buffer.getvalue()
+        assert session.inputs == []
+
+    def test_endpoint_uploads_the_encoded_result(self, client, remover, tmp_path):
+        from src.storage import storage
+
+        upload = AsyncMock(return_value=MagicMock(public_url="https://cdn/bg.png", file_size=10))
+        with patch.object(storage, "upload_file", upload):
+            response = client.post("/api/v1/remove-background", json={"image_url": _data_url(_white_background_logo())})
+
+        body = response.json()
+        assert body["success"] is True
+        assert body["processed_url"] == "https://cdn/bg.png"
+        assert upload.call_args.kwargs["content_type"] == "image/png"
+        uploaded = np.asarray(Image.open(io.BytesIO(upload.call_args.kwargs["file_data"])))
+        assert (uploaded[:, 35:, 3] == 0).all()
+
+
+def _reference_cleanup(img_array):
+    """
+    Alpha the original cleanup gave: rembg's PIL composite of the cutout, then the whole-plane
+    white-element thresholds, smoothing and morphology
+    """
+    mask = Image.fromarray(np.ascontiguousarray(img_array[:, :, 3]), "L")
+    cutout = np.array(Image.composite(Image.fromarray(np.ascontiguousarray(img_array[:, :, :3]), "RGB"),
+                                      Image.new("RGBA", mask.size, (0, 0, 0, 0)), mask))
+    alpha = cutout[:, :, 3]
+    is_white = np.all(cutout[:, :, :3] >= 200, axis=2)
+    alpha[(alpha < 30) & ~is_white] = 0
+    alpha[is_white & (alpha < 180)] = 180
+    non_white = ~is_white
+    alpha[non_white] = cv2.GaussianBlur(alpha, (3, 3), 0)[non_white]
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
+    clean = cv2.morphologyEx(cv2.morphologyEx(alpha, cv2.MORPH_CLOSE, kernel), cv2.MORPH_OPEN, kernel)
+    alpha[non_white] = clean[non_white]
+    return alpha
+
+
+def _soft_cutout(height, width, seed):
+    """Noisy colours, a white band and an anti-aliased mask that runs off the image edges"""
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    rgb[height // 3:height // 2] = 255
+    mask = np.zeros((height * 4, width * 4), dtype=np.uint8)
+    cv2.circle(mask, (width * 3, height * 2), min(height, width) * 2, 255, -1)
+    cv2.rectangle(mask, (0, 0), (width, height // 2), 255, -1)
+    mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_AREA)
+    mask[: height // 8] = rng.integers(0, 256, (height // 8, width), dtype=np.uint8)
+    return np.dstack([rgb, mask])
+
+
+class TestBoundaryBandCleanup:
+    """Test cases for the boundary-tile alpha cleanup"""
+
+    @pytest.mark.parametrize("height,width,seed", [(40, 60, 0), (97, 131, 1), (200, 333, 2), (256, 256, 3)])
+    def test_matches_whole_plane_cleanup(self, remover, height, width, seed):
+        image = _soft_cutout(height, width, seed)
+
+        banded = remover._cleanup_ai_array(image.copy())
+
+        assert np.array_equal(banded[:, :, :3], image[:, :, :3])
+        assert np.array_equal(banded[:, :, 3], _reference_cleanup(image))
+
+    def test_white_edges_round_like_the_composite(self, remover):
+        for seed in range(30):
+            image = _soft_cutout(48, 64, seed)
+            image[:, :, :3] = np.random.default_rng(seed).integers(190, 256, (48, 64, 3), dtype=np.uint8)
+
+            banded = remover._cleanup_ai_array(image.copy())
+
+            assert np.array_equal(banded[:, :, 3], _reference_cleanup(image)), seed
+
+    def test_only_tiles_near_the_boundary_are_refined(self):
+        alpha = np.zeros((1024, 1024), dtype=np.uint8)
+        cv2.circle(alpha, (512, 512), 100, 255, -1)
+
+        tiles = module._boundary_tiles(alpha, 64)
+
+        assert 0 < len(tiles) <= 16
+        for y0, y1, x0, x1 in tiles:
+            assert 300 < y1 and y0 < 724 and 300 < x1 and x0 < 724
+
+    def test_flat_alpha_needs_no_tiles(self):
+        assert module._boundary_tiles(np.full((300, 200), 255, dtype=np.uint8), 64) == []
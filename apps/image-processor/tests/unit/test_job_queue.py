@@ -0,0 +1,182 @@
+"""
+Unit tests for the SQLite job queue and the upscale job endpoints
+"""
+
+import time
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.services import job_queue as job_queue_module
+from src.services.job_queue import JobQueue, JobWorkerPool, process_next_job
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), retention_seconds=60, max_attempts=2)
+
+
+class TestJobQueue:
+    """Test cases for JobQueue"""
+
+    def test_submit_claim_complete(self, queue):
+        """Jobs are claimed oldest first and keep their result"""
+        first = queue.submit("upscale", {"image_url": "a"})
+        second = queue.submit("upscale", {"image_url": "b"})
+
+        job = queue.claim(worker_pid=111)
+        assert job == {"job_id": first, "kind": "upscale", "payload": {"image_url": "a"}}
+        assert queue.get(first)["status"] == "processing"
+        assert queue.get(second)["status"] == "pending"
+
+        queue.finish(first, result={"success": True, "upscaled_path": "https://cdn/a.png"})
+        done = queue.get(first)
+        assert done["status"] == "completed"
+        assert done["progress"] == 100
+        assert done["result"]["upscaled_path"] == "https://cdn/a.png"
+
+    def test_cancel_pending_and_running(self, queue):
+        """Pending jobs cancel at once; running jobs end cancelled instead of completed"""
+        pending = queue.submit("upscale", {})
+        running = queue.submit("upscale", {})
+        queue.claim(worker_pid=1)  # claims `pending`, the oldest
+        queue.claim(worker_pid=2)
+
+        assert queue.cancel(running) == "processing"
+        queue.finish(running, result={"success": True})
+
+        assert queue.get(running)["status"] == "cancelled"
+        assert queue.cancel("missing") is None
+        assert queue.get(pending)["status"] == "processing"
+
+    def test_dead_worker_jobs_are_requeued(self, queue):
+        """A crash returns the job to the queue until max_attempts is reached"""
+        job_id = queue.submit("upscale", {})
+        queue.claim(worker_pid=999999)
+
+        assert queue.recover(dead_pids=[999999]) == 1
+        assert queue.get(job_id)["status"] == "pending"
+
+        queue.claim(worker_pid=999999)
+        queue.recover(dead_pids=[999999])
+        failed = queue.get(job_id)
+        assert failed["status"] == "failed"
+        assert "died" in failed["error"]
+
+    def test_live_worker_jobs_are_left_alone(self, queue):
+        job_id = queue.submit("upscale", {})
+        queue.claim(worker_pid=42)
+
+        assert queue.recover() == 0
+        assert queue.recover(dead_pids=[43]) == 0
+        assert queue.get(job_id)["status"] == "processing"
+
+    def test_expired_lease_is_recovered_and_heartbeat_renews(self, queue):
+        """A job whose worker stops renewing its lease is requeued by anyone"""
+        queue.lease_seconds = 0.05
+        renewed = queue.submit("upscale", {})
+        abandoned = queue.submit("upscale", {})
+        queue.claim(worker_pid=1)
+        queue.claim(worker_pid=2)
+
+        time.sleep(0.03)
+        assert queue.heartbeat(renewed, worker_pid=1) is True
+        assert queue.heartbeat(renewed, worker_pid=2) is False
+        time.sleep(0.03)
+
+        assert queue.recover() == 1
+        assert queue.get(renewed)["status"] == "processing"
+        assert queue.get(abandoned)["status"] == "pending"
+
+    def test_retention(self, queue):
+        """Finished jobs are purged after the retention period"""
+        job_id = queue.submit("upscale", {})
+        queue.claim(worker_pid=1)
+        queue.finish(job_id, error="boom")
+
+        assert queue.purge_expired() == 0
+        queue.retention_seconds = 0
+        time.sleep(0.01)
+        assert queue.purge_expired() == 1
+        assert queue.get(job_id) is None
+
+    def test_process_next_job_runs_handler(self, queue):
+        """process_next_job runs the handler for the job kind and records failures"""
+        ok = queue.submit("upscale", {"image_url": "a"})
+        bad = queue.submit("unknown", {})
+        handler = AsyncMock(return_value={"success": True, "upscaled_path": "x"})
+
+        with patch.dict(job_queue_module.JOB_HANDLERS, {"upscale": handler}):
+            assert process_next_job(queue) is True
+            assert process_next_job(queue) is True
+            assert process_next_job(queue) is False
+
+        handler.assert_awaited_once_with({"image_url": "a"})
+        assert queue.get(ok)["status"] == "completed"
+        assert queue.get(bad)["status"] == "failed"
+
+
+class TestJobWorkerPool:
+    """Test cases for worker supervision"""
+
+    def test_crashed_worker_is_replaced_and_job_recovered(self, queue):
+        """A dead worker is respawned and its job goes back to pending"""
+        pool = JobWorkerPool(queue, num_workers=1)
+        dead = type("Proc", (), {"pid": 999999, "exitcode": -9, "is_alive": lambda self: False})()
+        alive = type("Proc", (), {"pid": 4242, "exitcode": None, "is_alive": lambda self: True})()
+        pool._workers = [dead]
+        job_id = queue.submit("upscale", {})
+        queue.claim(worker_pid=dead.pid)
+
+        with patch.object(pool, "_spawn", return_value=alive) as spawn:
+            pool.supervise_once()
+
+        assert spawn.call_count == 1
+        assert pool._workers == [alive]
+        assert queue.get(job_id)["status"] == "pending"
+
+    def test_pools_sharing_a_database_leave_each_others_jobs_alone(self, queue):
+        """Each app process supervises its own pool; running jobs of another process survive"""
+        ours = JobWorkerPool(JobQueue(queue.db_path, max_attempts=1), num_workers=1)
+        theirs = JobWorkerPool(JobQueue(queue.db_path, max_attempts=1), num_workers=1)
+        ours._workers = [type("Proc", (), {"pid": 4242, "exitcode": None, "is_alive": lambda self: True})()]
+        theirs._workers = [type("Proc", (), {"pid": 5151, "exitcode": None, "is_alive": lambda self: True})()]
+        running = queue.submit("upscale", {})
+        cancelling = queue.submit("upscale", {})
+        theirs.queue.claim(worker_pid=5151)
+        theirs.queue.claim(worker_pid=5151)
+        queue.cancel(cancelling)
+
+        ours.queue.recover()  # what start() does
+        ours.supervise_once()
+
+        assert queue.get(running)["status"] == "processing"
+        assert queue.get(running)["attempts"] == 1
+        assert queue.get(cancelling)["status"] == "processing"
+
+
+class TestUpscaleJobEndpoints:
+    """Test cases for the job-based upscale API"""
+
+    def test_submit_poll_cancel(self, client, queue):
+        """Submitting returns a job id at once; status and cancel use it"""
+        with patch("src.api.upscaling.job_queue", queue):
+            response = client.post("/api/v1/upscale/jobs", json={"image_url": "https://example.com/a.png"})
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            status = client.get(f"/api/v1/upscale/status/{job_id}")
+            assert status.status_code == 200
+            assert status.json()["status"] == "pending"
+
+            cancel = client.delete(f"/api/v1/upscale/jobs/{job_id}")
+            assert cancel.json()["status"] == "cancelled"
+            assert client.get("/api/v1/upscale/status/nope").status_code == 404
+
+    def test_batch_queues_one_job_per_image(self, client, queue):
+        with patch("src.api.upscaling.job_queue", queue):
+            response = client.post("/api/v1/upscale/batch", json={
+                "image_urls": ["https://example.com/a.png", "https://example.com/b.png"]
+            })
+
+        assert response.status_code == 202
+        assert len(response.json()["jobs"]) == 2
+        assert queue.stats() == {"pending": 2}
@@ -0,0 +1,65 @@
+"""
+Unit tests for layered (base + text) rendering in LogoOverlayService
+"""
+
+import io
+import pytest
+from unittest.mock import patch
+from PIL import Image
+from src.services.logo_overlay import LogoOverlayService
+
+
+@pytest.fixture
+def logo_bytes():
+    logo = Image.new("RGB", (64, 64), (255, 255, 255))
+    logo.paste((200, 0, 0), (16, 16, 48, 48))
+    buffer = io.BytesIO()
+    logo.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+ROSTER_A = [{"number": 7, "name": "Alex Smith"}, {"number": 12, "name": "Sam"}]
+ROSTER_B = [{"number": 3, "name": "Jordan Lee"}]
+
+
+class TestLayeredRender:
+    """Roster-only edits reuse the cached base layer"""
+
+    def test_tshirt_back_base_built_once(self, overlay_service, logo_bytes):
+        """A second roster over the same template and logo does not rebuild the base"""
+        with patch.object(overlay_service, "_render_tshirt_back_base", wraps=overlay_service._render_tshirt_back_base) as base:
+            first = overlay_service._render_tshirt_back(ROSTER_A, "black", logo_bytes)
+            second = overlay_service._render_tshirt_back(ROSTER_B, "black", logo_bytes)
+
+        assert base.call_count == 1
+        assert first.tobytes() != second.tobytes()
+
+    def test_layered_output_matches_fresh_render(self, overlay_service, logo_bytes):
+        """Drawing over a cached base gives the same pixels as a full render"""
+        overlay_service._render_tshirt_back(ROSTER_B, "black", logo_bytes)
+        layered = overlay_service._render_tshirt_back(ROSTER_A, "black", logo_bytes)
+
+        fresh_service = LogoOverlayService()
+        fresh_service.assets_dir = overlay_service.assets_dir
+        fresh = fresh_service._render_tshirt_back(ROSTER_A, "black", logo_bytes)
+
+        assert layered.tobytes() == fresh.tobytes()
+
+    def test_cached_base_is_not_mutated(self, overlay_service, logo_bytes):
+        """Text is drawn on a copy, never on the cached base"""
+        overlay_service._render_banner(logo_bytes, ROSTER_A)
+        base = next(iter(overlay_service._base_layers.values())).tobytes()
+        overlay_service._render_banner(logo_bytes, ROSTER_B)
+
+        assert next(iter(overlay_service._base_layers.values())).tobytes() == base
+
+    def test_new_logo_builds_new_base(self, overlay_service, logo_bytes):
+        """Changing the logo invalidates the base layer"""
+        other_logo = io.BytesIO()
+        Image.new("RGB", (64, 64), (0, 0, 200)).save(other_logo, "PNG")
+
+        with patch.object(overlay_service, "_render_banner_base", wraps=overlay_service._render_banner_base) as base:
+            overlay_service._render_banner(logo_bytes, ROSTER_A)
+            overlay_service._render_banner(other_logo.getvalue(), ROSTER_A)
+
+        assert base.call_count == 2
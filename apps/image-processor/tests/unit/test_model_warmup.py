@@ -0,0 +1,83 @@
+"""
+Unit tests for background model warm-up and the /ready endpoint
+"""
+
+import threading
+import pytest
+from unittest.mock import patch
+from src.services.model_warmup import ModelWarmup, model_warmup
+
+
+class TestModelWarmup:
+    """Test cases for ModelWarmup"""
+
+    @pytest.mark.asyncio
+    async def test_states_progress_to_ready(self):
+        """Models move from pending through loading to their warm-up result"""
+        warmup = ModelWarmup()
+        release = threading.Event()
+
+        def slow_model():
+            release.wait(timeout=5)
+            return {"state": "ready", "load_time_ms": 12}
+
+        warmup.register("slow", slow_model)
+        assert warmup.status()["models"]["slow"]["state"] == "pending"
+        assert warmup.is_ready() is False
+
+        task = warmup.start()
+        release.set()
+        await task
+
+        status = warmup.status()
+        assert status["ready"] is True
+        assert status["models"]["slow"]["load_time_ms"] == 12
+        assert "total_time_ms" in status["models"]["slow"]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_reported_as_degraded(self):
+        """A crashing warm-up marks the model failed without blocking readiness"""
+        warmup = ModelWarmup()
+        warmup.register("broken", lambda: 1 / 0)
+        warmup.register("missing", lambda: {"state": "unavailable"})
+
+        await warmup.run()
+
+        status = warmup.status()
+        assert status["ready"] is True
+        assert status["degraded"] is True
+        assert status["models"]["broken"]["state"] == "failed"
+        assert status["models"]["missing"]["state"] == "unavailable"
+
+    def test_upscaler_warm_up_without_realesrgan(self):
+        """Without Real-ESRGAN installed the upscaler reports the OpenCV fallback"""
+        from src.services.upscaler import ImageUpscaler
+
+        with patch("src.services.upscaler.REALESRGAN_AVAILABLE", False):
+            assert ImageUpscaler().warm_up()["state"] == "unavailable"
+
+
+class TestReadyEndpoint:
+    """Test cases for /ready"""
+
+    def test_not_ready_while_loading(self, client):
+        """The endpoint returns 503 while a model is still loading"""
+        warmup = ModelWarmup()
+        warmup.register("realesrgan", lambda: {"state": "ready"})
+        with patch("main.model_warmup", warmup):
+            response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["models"]["realesrgan"]["state"] == "pending"
+
+    def test_ready_after_warm_up(self, client):
+        """The endpoint returns 200 with per-model details once warm-up is done"""
+        warmup = ModelWarmup()
+        warmup.register("rembg", lambda: {"state": "ready", "load_time_ms": 5})
+        with patch("main.model_warmup", warmup):
+            import asyncio
+            asyncio.run(warmup.run())
+            response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["models"]["rembg"]["load_time_ms"] == 5
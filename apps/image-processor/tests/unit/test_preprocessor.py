@@ -0,0 +1,126 @@
+"""
+Unit tests for the fused print preprocessing pipeline
+"""
+
+import io
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock
+from PIL import Image
+from src.services.preprocessor import ImagePreprocessor, GAMMA_LUT, SHARPEN_KERNEL
+
+
+def _photo(height=96, width=128, seed=7):
+    """Smooth colour gradients with mild noise, like a photographed logo"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    image = np.dstack([40 + 150 * x / width, 60 + 120 * y / height, 200 - 120 * x / width])
+    image += rng.normal(0, 6, image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def _reference_steps(image, dpi=300):
+    """The original separate passes: bilateral, filter2D + addWeighted, CLAHE, float gamma, resize"""
+    image = cv2.bilateralFilter(image, 9, 75, 75)
+    kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+    image = cv2.addWeighted(image, 0.7, cv2.filter2D(image, -1, kernel), 0.3, 0)
+    l, a, b = cv2.split(cv2.cvtColor(image, cv2.COLOR_BGR2LAB))
+    l = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(l)
+    image = cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR)
+    image = (np.power(image.astype(np.float32) / 255.0, 1.0 / 1.2) * 255).astype(np.uint8)
+    height, width = image.shape[:2]
+    return cv2.resize(image, (int(width * dpi / 72.0), int(height * dpi / 72.0)), interpolation=cv2.INTER_LANCZOS4)
+
+
+@pytest.fixture
+def preprocessor(service_dirs):
+    return ImagePreprocessor()
+
+
+class TestFusedPrimitives:
+    """Test cases for the gamma table and the blended sharpening kernel"""
+
+    def test_gamma_lut_matches_float_pass_exactly(self):
+        image = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+        expected = (np.power(image.astype(np.float32) / 255.0, 1.0 / 1.2) * 255).astype(np.uint8)
+
+        np.testing.assert_array_equal(cv2.LUT(image, GAMMA_LUT), expected)
+
+    def test_blended_kernel_matches_filter_and_blend(self):
+        image = _photo()
+        kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+        expected = cv2.addWeighted(image, 0.7, cv2.filter2D(image, -1, kernel), 0.3, 0)
+
+        unclipped = cv2.filter2D(image.astype(np.float32), -1, kernel.astype(np.float32))
+        in_range = (unclipped >= 0) & (unclipped <= 255)
+
+        fused = cv2.filter2D(image, -1, SHARPEN_KERNEL)
+
+        # The separate pass saturated the sharpened image before blending; elsewhere only rounding differs
+        assert in_range.mean() > 0.5
+        assert np.abs(fused.astype(int) - expected.astype(int))[in_range].max() <= 1
+        assert SHARPEN_KERNEL.sum() == pytest.approx(1.0)
+
+
+class TestPipeline:
+    """Test cases for planning and running the preprocessing steps"""
+
+    def test_plan_filters_before_an_upscale(self, preprocessor):
+        plan = preprocessor._plan_pipeline({"remove_background": True}, (100, 200, 3))
+
+        assert plan["order"] == ["denoise", "sharpen", "enhance_contrast", "color_correct", "remove_background", "resize"]
+        assert plan["size"] == (833, 416)
+
+    def test_plan_filters_after_a_downscale(self, preprocessor):
+        plan = preprocessor._plan_pipeline({"print_resolution": 36, "sharpen": False}, (100, 200, 3))
+
+        assert plan["order"] == ["resize", "denoise", "enhance_contrast", "color_correct"]
+        assert plan["size"] == (100, 50)
+
+    def test_plan_without_resize(self, preprocessor):
+        plan = preprocessor._plan_pipeline({"print_resolution": 0, "convert_to_cmyk": True}, (100, 200, 3))
+
+        assert plan["size"] is None
+        assert plan["order"][-1] == "convert_to_cmyk"
+        assert "resize" not in plan["order"]
+
+    def test_fused_filters_equal_the_single_step_methods(self, preprocessor):
+        image = _photo()
+        expected = preprocessor._color_correct(preprocessor._enhance_contrast(
+            preprocessor._sharpen_image(preprocessor._denoise_image(image))))
+
+        fused = preprocessor._apply_filters(image.copy(), ["denoise", "sharpen", "enhance_contrast", "color_correct"])
+
+        np.testing.assert_array_equal(fused, expected)
+
+    def test_pipeline_stays_close_to_the_separate_passes(self, preprocessor):
+        image = _photo()
+        plan = preprocessor._plan_pipeline({}, image.shape)
+
+        fused = preprocessor._run_pipeline(image.copy(), plan)
+        expected = _reference_steps(image)
+
+        assert fused.shape == expected.shape
+        assert np.abs(fused.astype(int) - expected.astype(int)).mean() < 0.5
+
+    def test_failing_step_is_skipped(self, preprocessor):
+        image = _photo()
+        expected = preprocessor._color_correct(image)
+
+        with patch("src.services.preprocessor.cv2.bilateralFilter", side_effect=cv2.error("boom")):
+            result = preprocessor._apply_filters(image.copy(), ["denoise", "color_correct"])
+
+        np.testing.assert_array_equal(result, expected)
+
+    @pytest.mark.asyncio
+    async def test_preprocess_for_print_reports_the_pipeline(self, preprocessor):
+        buffer = io.BytesIO()
+        Image.fromarray(_photo(48, 64)).save(buffer, "PNG")
+
+        with patch.object(preprocessor, "_download_image", AsyncMock(return_value=buffer.getvalue())):
+            result = await preprocessor.preprocess_for_print("https://example.com/logo.png", {"print_resolution": 144})
+
+        assert result["success"] is True
+        assert result["pipeline"][-1] == "resize"
+        assert Image.open(result["output_url"]).size == (128, 96)
@@ -0,0 +1,109 @@
+"""
+Unit tests for the low-resolution preview tier
+"""
+
+import io
+import base64
+import pytest
+from unittest.mock import patch, AsyncMock
+from PIL import Image
+from src.services.logo_overlay import image_handler
+
+
+@pytest.fixture
+def overlay_templates():
+    return {"tshirt": (800, 800), "banner": (1200, 400)}
+
+
+@pytest.fixture
+def overlay_service(overlay_service):
+    overlay_service.preview_scale = 0.25
+    return overlay_service
+
+
+@pytest.fixture
+def logo_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 0, 0)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+PLAYERS = [{"number": 7, "name": "Alex Smith"}, {"number": 12, "name": "Sam"}]
+
+
+class TestPreviews:
+    """Test cases for LogoOverlayService.create_previews"""
+
+    @pytest.mark.asyncio
+    async def test_previews_are_inline_and_downscaled(self, overlay_service, logo_bytes):
+        """Previews come back as WebP data URLs at the preview scale, without uploading"""
+        with patch.object(image_handler, "load_bytes", AsyncMock(return_value=logo_bytes)), \
+             patch.object(overlay_service, "_upload_to_storage", AsyncMock()) as upload:
+            result = await overlay_service.create_previews(
+                ["tshirt_front", "tshirt_back", "banner"], logo_url="https://logo", players=PLAYERS
+            )
+
+        assert result["success"] is True
+        assert upload.call_count == 0
+        assert (result["previews"]["tshirt_front"]["width"], result["previews"]["tshirt_front"]["height"]) == (200, 200)
+        assert result["previews"]["banner"]["width"] == 300
+
+        data_url = result["previews"]["tshirt_back"]["data_url"]
+        assert data_url.startswith("data:image/webp;base64,")
+        decoded = Image.open(io.BytesIO(base64.b64decode(data_url.split(",", 1)[1])))
+        assert decoded.format == "WEBP"
+        assert decoded.size == (200, 200)
+
+    @pytest.mark.asyncio
+    async def test_jpeg_profile(self, overlay_service, logo_bytes):
+        """PREVIEW_FORMAT=jpeg switches the encoder"""
+        overlay_service.preview_format = "jpeg"
+        with patch.object(image_handler, "load_bytes", AsyncMock(return_value=logo_bytes)):
+            result = await overlay_service.create_previews(["tshirt_front"], logo_url="https://logo")
+
+        assert result["previews"]["tshirt_front"]["data_url"].startswith("data:image/jpeg;base64,")
+
+    @pytest.mark.asyncio
+    async def test_optional_kind_failure_is_skipped(self, overlay_service, logo_bytes):
+        """A failing optional preview is left out instead of failing the request"""
+        with patch.object(image_handler, "load_bytes", AsyncMock(return_value=logo_bytes)), \
+             patch.object(overlay_service, "_render_banner", side_effect=FileNotFoundError("no template")):
+            result = await overlay_service.create_previews(
+                ["tshirt_front", "banner"], logo_url="https://logo", players=PLAYERS, optional=("banner",)
+            )
+            failed = await overlay_service.create_previews(["banner"], logo_url="https://logo", players=PLAYERS)
+
+        assert result["success"] is True
+        assert list(result["previews"]) == ["tshirt_front"]
+        assert failed["success"] is False
+        assert "no template" in failed["error"]
+
+    def test_preview_templates_are_cached(self, overlay_service):
+        """Each template is downscaled once per scale"""
+        path = f"{overlay_service.assets_dir}/black_tshirt_front.png"
+
+        first = overlay_service._load_template(path, 0.25)
+        second = overlay_service._load_template(path, 0.25)
+
+        assert first is second
+        assert first.size == (200, 200)
+        assert overlay_service._load_template(path).size == (800, 800)
+
+
+class TestPreviewEndpoints:
+    """Test cases for preview=true on the API"""
+
+    def test_tshirt_front_preview(self, client):
+        """The t-shirt endpoint returns the inline preview in tshirt_url"""
+        preview = {"data_url": "data:image/webp;base64,AAAA", "file_size_bytes": 3, "width": 1, "height": 1}
+        with patch("src.api.tshirt.overlay_service.create_previews", AsyncMock(return_value={
+            "success": True, "preview": True, "previews": {"tshirt_front": preview}, "processing_time_ms": 5
+        })) as create_previews, patch("src.api.tshirt.overlay_service.overlay_logo_on_tshirt", AsyncMock()) as full:
+            response = client.post("/api/v1/tshirt/front", json={"logo_url": "https://logo", "preview": True})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["preview"] is True
+        assert body["tshirt_url"] == preview["data_url"]
+        assert create_previews.call_args.args[0] == ["tshirt_front"]
+        assert full.call_count == 0
@@ -0,0 +1,121 @@
+"""
+Unit tests for batched rembg inference
+"""
+
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from PIL import Image
+from src.services.rembg_batch import preprocess_batch, postprocess_masks, predict_masks, BATCH_MODELS
+
+
+class _FakeOnnxSession:
+    """inner_session stand-in: predicts each image's red channel, records batch sizes"""
+
+    def __init__(self, batch_dim="batch"):
+        self.batch_dim = batch_dim
+        self.batches = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input.1", shape=[self.batch_dim, 3, 320, 320])]
+
+    def run(self, outputs, feed):
+        batch = feed["input.1"]
+        self.batches.append(batch.shape[0])
+        return [batch[:, :1] * 10.0]
+
+
+class _FakeRembgSession:
+    def __init__(self, batch_dim="batch"):
+        self.inner_session = _FakeOnnxSession(batch_dim)
+        self.single = []
+
+    def predict(self, image):
+        self.single.append(image)
+        return [Image.new("L", image.size, 255)]
+
+
+def _images(count):
+    rng = np.random.default_rng(0)
+    return [
+        Image.fromarray(rng.integers(0, 256, (30 + 7 * i, 50 + 3 * i, 3), dtype=np.uint8), "RGB")
+        for i in range(count)
+    ]
+
+
+class TestBatchProcessing:
+    """Test cases for the NumPy pre/postprocessing"""
+
+    def test_preprocess_matches_rembg_normalisation(self):
+        size, mean, std = BATCH_MODELS["u2netp"]
+        images = [Image.new("RGB", (40, 20), (255, 128, 0)), Image.new("RGB", (500, 700), (100, 100, 100))]
+
+        batch = preprocess_batch(images, size, mean, std)
+
+        assert batch.shape == (2, 3, 320, 320)
+        assert batch.dtype == np.float32
+        # Each image is scaled by its own maximum, then normalised per channel
+        assert np.allclose(batch[0, :, 0, 0], [(1.0 - mean[0]) / std[0], (128 / 255 - mean[1]) / std[1], (0 - mean[2]) / std[2]], atol=1e-5)
+        assert np.allclose(batch[1, :, 5, 5], [(1.0 - m) / s for m, s in zip(mean, std)], atol=1e-5)
+
+    def test_postprocess_normalises_and_resizes_each_image(self):
+        predictions = np.zeros((2, 1, 320, 320), dtype=np.float32)
+        predictions[0, 0, :, 160:] = 0.2
+        predictions[1, 0, :, :160] = 5.0
+
+        masks = postprocess_masks(predictions, [(64, 48), (100, 30)])
+
+        assert [mask.shape for mask in masks] == [(48, 64), (30, 100)]
+        assert masks[0][:, -5:].min() == 255 and masks[0][:, :5].max() == 0
+        assert masks[1][:, :5].min() == 255 and masks[1][:, -5:].max() == 0
+
+
+class TestPredictMasks:
+    """Test cases for micro-batched session calls"""
+
+    def test_images_are_split_into_micro_batches(self):
+        session = _FakeRembgSession()
+
+        masks = predict_masks(session, "u2netp", _images(10), batch_size=4)
+
+        assert session.inner_session.batches == [4, 4, 2]
+        assert [mask.shape for mask in masks] == [(30 + 7 * i, 50 + 3 * i) for i in range(10)]
+        assert session.single == []
+
+    def test_fixed_batch_graph_is_respected(self):
+        session = _FakeRembgSession(batch_dim=1)
+
+        predict_masks(session, "u2netp", _images(3), batch_size=8)
+
+        assert session.inner_session.batches == [1, 1, 1]
+
+    def test_unknown_model_falls_back_to_session_predict(self):
+        session = _FakeRembgSession()
+
+        masks = predict_masks(session, "birefnet-general", _images(2), batch_size=4)
+
+        assert len(session.single) == 2
+        assert session.inner_session.batches == []
+        assert masks[0].shape == (30, 50)
+
+
+class TestBatchedRemover:
+    """Test cases for AIBackgroundRemover.remove_images_if_needed"""
+
+    def test_only_images_with_a_background_are_batched(self, remover, fake_rembg_sessions):
+        session = _FakeRembgSession()
+        fake_rembg_sessions(lambda model: session)
+        clean = Image.new("RGBA", (60, 60), (0, 0, 0, 0))
+        clean.paste((255, 0, 0, 255), (20, 20, 40, 40))
+        images = _images(3)
+        images.insert(1, clean)
+        stats = {}
+
+        results = remover.remove_images_if_needed(images, stats)
+
+        assert session.inner_session.batches == [3]
+        assert results[1][0] is clean
+        assert results[1][1]["bypass"] is True
+        assert all(image.mode == "RGBA" and image.size == source.size for (image, _), source in zip(results, images))
+        assert stats["images"] == 3 and stats["bypassed"] == 1
+        assert stats["images_per_second"] > 0
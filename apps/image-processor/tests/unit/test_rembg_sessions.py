@@ -0,0 +1,119 @@
+"""
+Unit tests for the shared rembg session registry
+"""
+
+import time
+import threading
+import pytest
+from unittest.mock import patch
+from PIL import Image
+from src.services.rembg_sessions import RembgSessionRegistry
+
+
+def _fake_rembg(load_delay=0.0, run_delay=0.0):
+    """(new_session, remove) stand-ins that count loads"""
+    loads = []
+
+    def new_session(model):
+        time.sleep(load_delay)
+        loads.append(model)
+        return object()
+
+    def remove(image, session=None):
+        time.sleep(run_delay)
+        return image
+
+    return new_session, remove, loads
+
+
+@pytest.fixture
+def registry():
+    return RembgSessionRegistry(pool_size=2)
+
+
+class TestRembgSessionRegistry:
+    """Test cases for RembgSessionRegistry"""
+
+    def test_sessions_are_reused(self, registry):
+        """Sequential requests load the model once"""
+        new_session, remove, loads = _fake_rembg()
+        with patch.object(registry, "_load_rembg", return_value=(new_session, remove)):
+            for _ in range(5):
+                with registry.session("u2netp") as (session, remove_func):
+                    remove_func(None, session=session)
+
+        assert loads == ["u2netp"]
+        stats = registry.stats()["models"]["u2netp"]
+        assert stats["loads"] == 1
+        assert stats["acquired"] == 5
+        assert stats["in_use"] == 0
+        assert stats["waits"] == 0
+
+    def test_pool_is_bounded_and_waits_are_reported(self, registry):
+        """Concurrent callers beyond the pool size wait instead of loading more sessions"""
+        new_session, remove, loads = _fake_rembg(run_delay=0.1)
+        peak = [0]
+
+        def worker():
+            with registry.session() as (session, remove_func):
+                peak[0] = max(peak[0], registry.stats()["models"]["u2netp"]["in_use"])
+                remove_func(None, session=session)
+
+        with patch.object(registry, "_load_rembg", return_value=(new_session, remove)):
+            threads = [threading.Thread(target=worker) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        stats = registry.stats()["models"]["u2netp"]
+        assert len(loads) == 2
+        assert peak[0] == 2
+        assert stats["waits"] >= 3
+        assert stats["max_wait_ms"] > 50
+        assert stats["in_use"] == 0
+
+    def test_models_have_separate_pools(self, registry):
+        new_session, remove, loads = _fake_rembg()
+        with patch.object(registry, "_load_rembg", return_value=(new_session, remove)):
+            with registry.session("u2netp"), registry.session("isnet-general-use"):
+                pass
+
+        assert sorted(loads) == ["isnet-general-use", "u2netp"]
+
+    def test_failed_load_frees_the_slot(self, registry):
+        def broken(model):
+            raise RuntimeError("corrupt model")
+
+        with patch.object(registry, "_load_rembg", return_value=(broken, None)):
+            for _ in range(3):
+                with pytest.raises(RuntimeError):
+                    with registry.session():
+                        pass
+
+        stats = registry.stats()["models"]["u2netp"]
+        assert stats["sessions"] == 0
+        assert stats["in_use"] == 0
+
+
+class TestSharedBackgroundRemover:
+    """Test cases for AIBackgroundRemover on the shared registry"""
+
+    def test_instances_share_sessions(self):
+        from src.services import ai_background_remover as module
+
+        registry = RembgSessionRegistry(pool_size=1)
+        new_session, remove, loads = _fake_rembg()
+        image = Image.new("RGB", (8, 8))
+        with patch.object(module, "rembg_sessions", registry), \
+             patch.object(registry, "_load_rembg", return_value=(new_session, remove)):
+            assert module.AIBackgroundRemover().remove_image(image) is image
+            assert module.AIBackgroundRemover().remove_image(image) is image
+            assert module.ai_remover.warm_up()["state"] == "ready"
+
+        assert loads == ["u2netp"]
+
+    def test_health_reports_sessions(self, client):
+        response = client.get("/health")
+
+        assert "rembg_sessions" in response.json()["checks"]
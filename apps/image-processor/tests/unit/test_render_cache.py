@@ -0,0 +1,126 @@
+"""
+Unit tests for the render result cache and its admin endpoints
+"""
+
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from src.services.render_cache import RenderCache, render_cache
+
+
+class TestRenderCache:
+    """Test cases for RenderCache"""
+
+    def test_key_ignores_param_order(self):
+        """Normalized parameters give the same key regardless of order"""
+        a = RenderCache.make_key("banner", "abc", {"quality": 95, "output_format": "png"})
+        b = RenderCache.make_key("banner", "abc", {"output_format": "png", "quality": 95})
+
+        assert a == b
+        assert a != RenderCache.make_key("banner", "abd", {"quality": 95, "output_format": "png"})
+        assert a != RenderCache.make_key("tshirt_front", "abc", {"quality": 95, "output_format": "png"})
+
+    def test_hit_returns_copy_without_volatile_fields(self):
+        """Stored results drop per-run timing and come back as copies"""
+        cache = RenderCache()
+        cache.put("k", "banner", {"success": True, "output_url": "https://cdn/x.png", "processing_time_ms": 900})
+
+        hit = cache.get("k")
+        hit["output_url"] = "changed"
+
+        assert "processing_time_ms" not in hit
+        assert cache.get("k")["output_url"] == "https://cdn/x.png"
+        assert cache.stats()["hits"] == 2
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted first"""
+        cache = RenderCache(max_entries=2)
+        cache.put("a", "op", {"output_url": "a"})
+        cache.put("b", "op", {"output_url": "b"})
+        cache.get("a")
+        cache.put("c", "op", {"output_url": "c"})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_purge_by_operation(self):
+        """Purging an operation leaves other operations alone"""
+        cache = RenderCache()
+        cache.put("a", "upscale", {"output_url": "a"})
+        cache.put("b", "banner", {"output_url": "b"})
+
+        assert cache.purge(operation="upscale") == 1
+        assert [e["key"] for e in cache.entries()] == ["b"]
+
+    def test_persists_to_disk(self, tmp_path):
+        """Entries survive a restart when a path is configured"""
+        path = str(tmp_path / "cache.json")
+        RenderCache(path=path).put("k", "rembg", {"output_url": "/tmp/out.png"})
+
+        assert RenderCache(path=path).get("k") == {"output_url": "/tmp/out.png"}
+
+    def test_disabled_cache_never_hits(self):
+        """A disabled cache stores nothing"""
+        cache = RenderCache(enabled=False)
+        cache.put("k", "op", {"output_url": "x"})
+
+        assert cache.get("k") is None
+
+
+class TestLogoOverlayCache:
+    """Test cases for render caching in LogoOverlayService"""
+
+    @pytest.mark.asyncio
+    async def test_second_render_is_served_from_cache(self):
+        """The same logo and parameters skip rendering and upload"""
+        from src.services.logo_overlay import LogoOverlayService, image_handler
+        from PIL import Image
+
+        service = LogoOverlayService()
+        render_cache.purge()
+        with patch.object(image_handler, "load_bytes", AsyncMock(return_value=b"logo-bytes")), \
+             patch.object(service, "_render_banner", MagicMock(return_value=Image.new("RGBA", (8, 8)))) as render, \
+             patch.object(service, "_upload_to_storage", AsyncMock(return_value="https://cdn/banner.png")) as upload:
+            first = await service.create_banner("https://logo", "Team", [{"number": 1, "name": "A"}])
+            second = await service.create_banner("https://logo", "Other Team", [{"number": 1, "name": "A"}])
+
+        render_cache.purge()
+        assert first["success"] and second["success"]
+        assert second["output_url"] == "https://cdn/banner.png"
+        assert second["cached"] is True
+        assert render.call_count == 1
+        assert upload.call_count == 1
+
+
+class TestRenderCacheAPI:
+    """Test cases for the render cache admin endpoints"""
+
+    def test_inspect_and_purge(self, client, monkeypatch):
+        """Entries can be listed and purged through the API"""
+        monkeypatch.setenv("ADMIN_API_KEY", "secret")
+        headers = {"X-Admin-Key": "secret"}
+        render_cache.purge()
+        render_cache.put("key-1", "upscale", {"output_url": "https://cdn/u.png"})
+
+        response = client.get("/api/v1/admin/render-cache", params={"operation": "upscale"}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["entries"][0]["key"] == "key-1"
+
+        response = client.delete("/api/v1/admin/render-cache/key-1", headers=headers)
+        assert response.status_code == 200
+        assert client.delete("/api/v1/admin/render-cache/key-1", headers=headers).status_code == 404
+
+    def test_admin_key_required_when_configured(self, client, monkeypatch):
+        """A configured ADMIN_API_KEY must be supplied"""
+        monkeypatch.setenv("ADMIN_API_KEY", "secret")
+
+        assert client.get("/api/v1/admin/render-cache").status_code == 403
+        assert client.get("/api/v1/admin/render-cache", headers={"X-Admin-Key": "wrong"}).status_code == 403
+        assert client.get("/api/v1/admin/render-cache", headers={"X-Admin-Key": "secret"}).status_code == 200
+
+    def test_admin_endpoints_disabled_without_key(self, client, monkeypatch):
+        """Without ADMIN_API_KEY nobody can inspect or purge the cache"""
+        monkeypatch.delenv("ADMIN_API_KEY", raising=False)
+
+        assert client.get("/api/v1/admin/render-cache").status_code == 403
+        assert client.delete("/api/v1/admin/render-cache").status_code == 403
+        assert client.delete("/api/v1/admin/render-cache/key-1", headers={"X-Admin-Key": ""}).status_code == 403
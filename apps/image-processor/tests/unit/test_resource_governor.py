@@ -0,0 +1,135 @@
+"""
+Unit tests for the CPU resource governor
+"""
+
+import sys
+import types
+import cv2
+import pytest
+from unittest.mock import patch
+from src.services import resource_governor as module
+from src.services.resource_governor import ResourceGovernor, BLAS_ENV_VARS
+from src.services.rembg_sessions import _governed
+
+
+@pytest.fixture
+def cpu_env(monkeypatch):
+    """Set the governor's inputs; anything not given is unset"""
+    def configure(**values):
+        for name in ("CPU_CORES", "WEB_CONCURRENCY", "JOB_WORKERS", "CPU_CORES_PER_REQUEST", "ONNX_INTRA_OP_THREADS"):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in values.items():
+            monkeypatch.setenv(name, str(value))
+        return ResourceGovernor()
+    return configure
+
+
+class TestBudget:
+    """Test cases for the thread budget"""
+
+    def test_cores_are_split_over_processes_and_requests(self, cpu_env):
+        governor = cpu_env(CPU_CORES=16, WEB_CONCURRENCY=1, JOB_WORKERS=3, CPU_CORES_PER_REQUEST=2)
+
+        assert governor.processes == 4
+        assert governor.cores_per_process == 4
+        assert governor.threads_per_request == 2
+        assert governor.concurrent_requests == 2
+        assert governor.onnx_intra_op_threads == 2
+
+    def test_each_web_worker_counts_its_own_job_pool(self, cpu_env):
+        governor = cpu_env(CPU_CORES=16, WEB_CONCURRENCY=4, JOB_WORKERS=2)
+
+        assert governor.processes == 12
+        assert governor.cores_per_process == 1
+        assert governor.threads_per_request == 1
+
+    def test_request_budget_is_capped_at_the_process_share(self, cpu_env):
+        governor = cpu_env(CPU_CORES=4, WEB_CONCURRENCY=1, JOB_WORKERS=1, CPU_CORES_PER_REQUEST=8)
+
+        assert governor.threads_per_request == 2
+        assert governor.concurrent_requests == 1
+
+    def test_more_processes_than_cores_still_get_one_thread(self, cpu_env):
+        governor = cpu_env(CPU_CORES=2, WEB_CONCURRENCY=4, JOB_WORKERS=2)
+
+        assert governor.cores_per_process == 1
+        assert governor.threads_per_request == 1
+
+    def test_explicit_onnx_threads_win(self, cpu_env):
+        assert cpu_env(CPU_CORES=8, JOB_WORKERS=0, ONNX_INTRA_OP_THREADS=3).onnx_intra_op_threads == 3
+
+    def test_container_quota_limits_detected_cores(self, cpu_env):
+        with patch.object(module, "_cgroup_cpu_limit", return_value=2.5), \
+             patch.object(module.os, "sched_getaffinity", return_value=set(range(32)), create=True):
+            governor = cpu_env(JOB_WORKERS=0)
+
+        assert (governor.cpus, governor.cpu_source) == (3, "cgroup")
+
+
+class TestApply:
+    """Test cases for applying the budget to each library"""
+
+    def test_environment_keeps_explicit_values(self, cpu_env, monkeypatch):
+        governor = cpu_env(CPU_CORES=8, JOB_WORKERS=0, CPU_CORES_PER_REQUEST=2)
+        for name in BLAS_ENV_VARS:
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("OMP_NUM_THREADS", "5")
+
+        governor.configure_environment()
+
+        assert module.os.environ["OMP_NUM_THREADS"] == "5"
+        assert module.os.environ["OPENBLAS_NUM_THREADS"] == "2"
+        assert governor.status()["applied"]["environment"]["MKL_NUM_THREADS"] == "2"
+
+    def test_opencv_and_torch_pools_are_sized(self, cpu_env, monkeypatch):
+        calls = {}
+        torch = types.SimpleNamespace(
+            set_num_threads=lambda n: calls.update(intra=n),
+            set_num_interop_threads=lambda n: calls.update(inter=n),
+            get_num_threads=lambda: calls["intra"],
+            get_num_interop_threads=lambda: calls["inter"]
+        )
+        monkeypatch.setitem(sys.modules, "torch", torch)
+        governor = cpu_env(CPU_CORES=2, JOB_WORKERS=0)
+        previous = cv2.getNumThreads()
+        try:
+            governor.apply()
+            applied = governor.status()["applied"]
+        finally:
+            cv2.setNumThreads(previous)
+
+        assert calls == {"intra": 2, "inter": 1}
+        assert applied["torch"] == {"intra_op": 2, "inter_op": 1}
+        assert "opencv" in applied
+
+    def test_rembg_sessions_get_governed_options(self, monkeypatch):
+        created = []
+
+        class FakeSession:
+            @classmethod
+            def name(cls):
+                return "u2netp"
+
+            def __init__(self, model, options, providers):
+                created.append((model, options, providers))
+
+        rembg = types.ModuleType("rembg")
+        sessions = types.ModuleType("rembg.sessions")
+        sessions.sessions_class = [FakeSession]
+        monkeypatch.setitem(sys.modules, "rembg", rembg)
+        monkeypatch.setitem(sys.modules, "rembg.sessions", sessions)
+        fallback = []
+
+        with patch.object(module.resource_governor, "onnx_session_options", return_value="options"):
+            create = _governed(lambda model: fallback.append(model))
+            create("u2netp")
+            create("birefnet-general")
+
+        assert created == [("u2netp", "options", None)]
+        assert fallback == ["birefnet-general"]
+
+    def test_health_reports_the_governor(self, client):
+        checks = client.get("/health").json()["checks"]
+
+        assert checks["resource_governor"]["threads_per_request"] >= 1
+        assert "applied" in checks["resource_governor"]
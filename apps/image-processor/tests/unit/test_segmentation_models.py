@@ -0,0 +1,151 @@
+"""
+Unit tests for the segmentation model registry and per-request model selection
+"""
+
+import json
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock
+from PIL import Image
+from src.services.segmentation_models import (
+    SegmentationModelRegistry, boundary_f_score, edge_alignment, SEGMENTATION_MODELS
+)
+
+
+def _disc(size=128, center=64, radius=40):
+    mask = np.zeros((size, size), dtype=np.uint8)
+    cv2.circle(mask, (center, center), radius, 255, -1)
+    return mask
+
+
+@pytest.fixture
+def benchmarks(tmp_path):
+    path = tmp_path / "segmentation_benchmarks.json"
+    path.write_text(json.dumps({
+        "created_at": "2026-10-19T00:00:00Z",
+        "models": {
+            "u2netp": {"latency_ms": 60, "peak_memory_mb": 90, "edge_quality": 0.81},
+            "silueta": {"latency_ms": 180, "peak_memory_mb": 260, "edge_quality": 0.86},
+            "u2net": {"latency_ms": 420, "peak_memory_mb": 700, "edge_quality": 0.85},
+            "isnet-general-use": {"latency_ms": 1900, "peak_memory_mb": 1400, "edge_quality": 0.93},
+            "not-a-model": {"latency_ms": 1, "edge_quality": 1.0}
+        }
+    }))
+    return str(path)
+
+
+class TestEdgeMetrics:
+    """Test cases for the benchmark edge quality metrics"""
+
+    def test_identical_masks_score_one(self):
+        assert boundary_f_score(_disc(), _disc()) == 1.0
+
+    def test_small_shift_stays_within_tolerance(self):
+        assert boundary_f_score(_disc(center=65), _disc()) == 1.0
+        assert boundary_f_score(_disc(center=72), _disc()) < 0.5
+
+    def test_edge_alignment_follows_image_edges(self):
+        gray = _disc()
+
+        assert edge_alignment(_disc(), gray) > 0.9
+        assert edge_alignment(_disc(radius=20), gray) == 0.0
+
+
+class TestModelSelection:
+    """Test cases for SegmentationModelRegistry.select"""
+
+    def test_without_benchmarks_the_default_is_used(self, tmp_path):
+        registry = SegmentationModelRegistry(str(tmp_path / "missing.json"))
+
+        assert registry.select()["model"] == registry.default_model
+        choice = registry.select(latency_budget_ms=100)
+        assert choice["reason"] == "unmeasured_default"
+        assert choice["measured"] is False
+        assert choice["latency_ms"] is None
+
+    def test_budget_picks_best_edge_quality_that_fits(self, benchmarks):
+        registry = SegmentationModelRegistry(benchmarks)
+
+        assert registry.select(latency_budget_ms=100)["model"] == "u2netp"
+        assert registry.select(latency_budget_ms=500)["model"] == "silueta"
+        choice = registry.select(latency_budget_ms=5000)
+        assert choice["model"] == "isnet-general-use"
+        assert choice["reason"] == "within_budget"
+        assert choice["edge_quality"] == 0.93
+
+    def test_budget_below_every_model_gets_the_fastest(self, benchmarks):
+        choice = SegmentationModelRegistry(benchmarks).select(latency_budget_ms=10)
+
+        assert choice["model"] == "u2netp"
+        assert choice["reason"] == "fastest_over_budget"
+
+    def test_name_wins_over_budget(self, benchmarks):
+        choice = SegmentationModelRegistry(benchmarks).select("u2net", latency_budget_ms=100)
+
+        assert choice["model"] == "u2net"
+        assert choice["reason"] == "requested"
+        assert choice["input_size"] == 320
+
+    def test_unknown_model_is_rejected(self, benchmarks):
+        with pytest.raises(ValueError, match="Unknown segmentation model"):
+            SegmentationModelRegistry(benchmarks).select("u3net")
+
+    def test_profiles_ignore_unknown_benchmark_entries(self, benchmarks):
+        profiles = SegmentationModelRegistry(benchmarks).profiles()
+
+        assert set(profiles["models"]) == set(SEGMENTATION_MODELS)
+        assert profiles["benchmark"]["created_at"] == "2026-10-19T00:00:00Z"
+        assert profiles["models"]["u2net_human_seg"]["measured"] is False
+        assert profiles["models"]["silueta"]["peak_memory_mb"] == 260
+
+
+class _MaskSession:
+    def predict(self, image):
+        return [Image.new("L", image.size, 255)]
+
+
+class TestPerRequestModel:
+    """Test cases for running background removal with a chosen model"""
+
+    @pytest.mark.asyncio
+    async def test_requested_model_gets_its_own_session(self, remover, fake_rembg_sessions):
+        loaded = []
+
+        def new_session(model):
+            loaded.append(model)
+            return _MaskSession()
+
+        fake_rembg_sessions(new_session)
+        image = Image.new("RGB", (32, 24), (10, 120, 200))
+        default = await remover.remove_background_from_image(image)
+        chosen = await remover.remove_background_from_image(image, model="silueta")
+
+        assert loaded == [remover.model, "silueta"]
+        assert default["model"] == remover.model
+        assert chosen["model"] == "silueta"
+
+    def test_endpoint_resolves_the_budget(self, client, benchmarks):
+        from src.api import background_removal
+
+        result = {"success": True, "output_url": "./output/a.png", "file_size_bytes": 1, "method": "ai_rembg", "model": "silueta"}
+        remove = AsyncMock(return_value=result)
+        with patch.object(background_removal, "segmentation_models", SegmentationModelRegistry(benchmarks)), \
+             patch.object(background_removal.ai_remover, "remove_background_ai", remove):
+            response = client.post("/api/v1/remove-background/ai", json={"image_url": "https://example.com/logo.png", "latency_budget_ms": 500})
+
+        assert response.status_code == 200
+        assert remove.call_args.kwargs["model"] == "silueta"
+        assert response.json()["model_used"] == "silueta"
+
+    def test_endpoint_rejects_unknown_model(self, client):
+        response = client.post("/api/v1/remove-background/ai", json={"image_url": "https://example.com/logo.png", "model": "u3net"})
+
+        assert response.status_code == 400
+        assert "u3net" in response.json()["error"]
+
+    def test_models_endpoint_lists_the_registry(self, client):
+        response = client.get("/api/v1/remove-background/models")
+
+        assert response.status_code == 200
+        assert set(response.json()["models"]) == set(SEGMENTATION_MODELS)
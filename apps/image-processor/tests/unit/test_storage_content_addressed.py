@@ -0,0 +1,133 @@
+"""
+Unit tests for content-addressed (deduplicated) uploads in the storage service
+"""
+
+import hashlib
+import pytest
+from unittest.mock import patch, MagicMock
+from src.storage.storage_service_simple import StorageService, ContentIndex, IMMUTABLE_CACHE_CONTROL
+
+
+class _StorageException(Exception):
+    """Shape of storage3's StorageException: the response dict is the only argument"""
+
+
+class _StorageApiError(Exception):
+    """Shape of newer storage3 StorageApiError: status and code as attributes"""
+
+    def __init__(self, message, code, status):
+        super().__init__(f"{{'statusCode': {status}, 'error': {code}, 'message': {message}}}")
+        self.code = code
+        self.status = status
+
+
+@pytest.fixture
+def storage_service(monkeypatch, tmp_path):
+    """StorageService in content-addressed mode backed by a mock Supabase client"""
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost:54321")
+    monkeypatch.setenv("SUPABASE_SERVICE_KEY", "test-key")
+    monkeypatch.setenv("STORAGE_CONTENT_ADDRESSED", "true")
+    monkeypatch.setenv("STORAGE_CONTENT_INDEX_PATH", str(tmp_path / "index.txt"))
+    with patch("src.storage.storage_service_simple.create_client") as mock_create:
+        client = MagicMock()
+        mock_create.return_value = client
+        service = StorageService()
+    bucket = client.storage.from_.return_value
+    bucket.get_public_url.side_effect = lambda name: f"https://cdn.test/{name}"
+    return service, bucket
+
+
+class TestContentAddressedUpload:
+    """Test cases for content-addressed uploads"""
+
+    @pytest.mark.asyncio
+    async def test_key_is_content_hash_with_immutable_cache(self, storage_service):
+        """Objects are named by their SHA-256 and cached for a year"""
+        service, bucket = storage_service
+        data = b"rendered-png"
+        digest = hashlib.sha256(data).hexdigest()
+
+        result = await service.upload_file(data, "team_tshirt.PNG", bucket="team-assets", content_type="image/png")
+
+        assert result.file_name == f"sha256/{digest[:2]}/{digest}.png"
+        assert result.public_url == f"https://cdn.test/{result.file_name}"
+        assert result.deduplicated is False
+        file_options = bucket.upload.call_args.kwargs["file_options"]
+        assert file_options["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    @pytest.mark.asyncio
+    async def test_identical_bytes_uploaded_once(self, storage_service):
+        """A second upload of the same bytes is answered from the local index"""
+        service, bucket = storage_service
+
+        first = await service.upload_file(b"same", "a.png", bucket="team-assets")
+        second = await service.upload_file(b"same", "b.png", bucket="team-assets")
+
+        assert bucket.upload.call_count == 1
+        assert second.file_name == first.file_name
+        assert second.deduplicated is True
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error", [
+        _StorageException({"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"}),
+        _StorageException({"statusCode": 400, "error": "Duplicate", "message": "The resource already exists"}),
+        _StorageApiError("The resource already exists", code="Duplicate", status=409)
+    ])
+    async def test_remote_duplicate_is_treated_as_existing(self, storage_service, error):
+        """An object uploaded by another process is not an error"""
+        service, bucket = storage_service
+        bucket.upload.side_effect = error
+
+        result = await service.upload_file(b"elsewhere", "a.png", bucket="team-assets")
+
+        assert result.deduplicated is True
+        assert service.content_index.contains("team-assets", result.file_name)
+
+    @pytest.mark.asyncio
+    async def test_error_echoing_409_in_the_key_is_not_a_duplicate(self, storage_service):
+        """Only the status fields count; the message can contain the hex key"""
+        service, bucket = storage_service
+        key = f"sha256/40/409{'a' * 61}.png"
+        bucket.upload.side_effect = _StorageException({
+            "statusCode": 500, "error": "InternalError", "message": f"Failed to write {key}: already exists in cache"
+        })
+
+        with pytest.raises(Exception, match="Failed to upload file"):
+            await service.upload_file(b"broken", "a.png", bucket="team-assets")
+
+        assert bucket.upload.call_count == 1
+        assert service.content_index._keys == set()
+
+    @pytest.mark.asyncio
+    async def test_explicit_opt_out_keeps_unique_names(self, storage_service):
+        """content_addressed=False falls back to timestamped unique names"""
+        service, bucket = storage_service
+
+        result = await service.upload_file(b"data", "logo.png", content_addressed=False)
+
+        assert result.file_name.startswith("logo_")
+        assert bucket.upload.call_args.kwargs["file_options"]["cache-control"] == "3600"
+
+
+class TestContentIndex:
+    """Test cases for the local content index"""
+
+    def test_index_persists_between_instances(self, tmp_path):
+        """Keys written by one index are visible to the next"""
+        path = str(tmp_path / "nested" / "index.txt")
+        ContentIndex(path).add("team-assets", "sha256/ab/abc.png")
+
+        assert ContentIndex(path).contains("team-assets", "sha256/ab/abc.png")
+        assert not ContentIndex(path).contains("team-logos", "sha256/ab/abc.png")
+
+    def test_discard_removes_key(self, tmp_path):
+        """Deleted objects are dropped from the index"""
+        path = str(tmp_path / "index.txt")
+        index = ContentIndex(path)
+        index.add("team-assets", "k1")
+        index.add("team-assets", "k2")
+        index.discard("team-assets", "k1")
+
+        reloaded = ContentIndex(path)
+        assert not reloaded.contains("team-assets", "k1")
+        assert len(reloaded) == 1
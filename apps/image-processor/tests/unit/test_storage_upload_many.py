@@ -0,0 +1,86 @@
+"""
+Unit tests for concurrent multi-object uploads in the storage service
+"""
+
+import io
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from src.storage.storage_service_simple import StorageService
+
+
+@pytest.fixture
+def storage_service(monkeypatch):
+    """StorageService backed by a mock Supabase client"""
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost:54321")
+    monkeypatch.setenv("SUPABASE_SERVICE_KEY", "test-key")
+    with patch("src.storage.storage_service_simple.create_client") as mock_create:
+        client = MagicMock()
+        mock_create.return_value = client
+        service = StorageService()
+    bucket = client.storage.from_.return_value
+    bucket.get_public_url.side_effect = lambda name: f"https://cdn.test/{name}"
+    return service, bucket
+
+
+class TestUploadMany:
+    """Test cases for StorageService.upload_many"""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_input_order(self, storage_service):
+        """Files come back in the order they were submitted"""
+        service, bucket = storage_service
+        items = [(b"a" * n, f"file{n}.png", "image/png") for n in (3, 1, 2)]
+
+        result = await service.upload_many(items, bucket="team-assets")
+
+        assert [f.file_name.split("_")[0] for f in result.files] == ["file3", "file1", "file2"]
+        assert result.total_bytes == 6
+        assert all(f.bucket == "team-assets" for f in result.files)
+        assert bucket.upload.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_memoryview_is_streamed_without_copy(self, storage_service):
+        """Memoryview data is passed as a readable file object with the same bytes"""
+        service, bucket = storage_service
+        buffer = io.BytesIO(b"png-bytes")
+        received = []
+        bucket.upload.side_effect = lambda name, body, file_options: received.append(body.read())
+
+        result = await service.upload_many([(buffer.getbuffer(), "front.png", "image/png")])
+
+        assert received == [b"png-bytes"]
+        assert result.files[0].file_size == len(b"png-bytes")
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, storage_service):
+        """No more than max_concurrency uploads run at once"""
+        service, bucket = storage_service
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow_upload(name, body, file_options):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+
+        bucket.upload.side_effect = slow_upload
+        items = [(b"x", f"f{i}.png", "image/png") for i in range(6)]
+
+        result = await service.upload_many(items, max_concurrency=2)
+
+        assert result.max_concurrency == 2
+        assert 1 < state["peak"] <= 2
+
+    @pytest.mark.asyncio
+    async def test_upload_error_propagates(self, storage_service):
+        """A failed upload raises the usual storage error"""
+        service, bucket = storage_service
+        bucket.upload.side_effect = RuntimeError("boom")
+
+        with pytest.raises(Exception, match="Failed to upload file: boom"):
+            await service.upload_many([(b"x", "f.png", "image/png")])
@@ -0,0 +1,132 @@
+"""
+Unit tests for concurrent streaming batch upscales
+"""
+
+import json
+import time
+import threading
+import numpy as np
+import pytest
+from unittest.mock import patch
+from src.services import upscaler as upscaler_module
+from src.services.upscaler import batch_throughput
+
+
+@pytest.fixture
+def upscaler_env():
+    return {"UPSCALE_BATCH_WORKERS": "3"}
+
+
+def _fake_upscale(delays, active, peak):
+    """upscale_image stand-in that sleeps per URL and records concurrency"""
+    lock = threading.Lock()
+
+    async def upscale_image(image_url, scale_factor, model, output_format, quality):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(delays[image_url])
+        with lock:
+            active[0] -= 1
+        return {"success": image_url != "bad", "width": 1000, "height": 1000,
+                "upscaled_path": f"https://cdn/{image_url}", "error": "boom" if image_url == "bad" else None}
+
+    return upscale_image
+
+
+class TestUpscaleStream:
+    """Test cases for ImageUpscaler.upscale_stream"""
+
+    @pytest.mark.asyncio
+    async def test_results_stream_in_completion_order_with_bounded_concurrency(self, upscaler):
+        """Fast items come back first and no more than batch_workers run at once"""
+        delays = {"slow": 0.3, "a": 0.05, "b": 0.05, "c": 0.05, "d": 0.05}
+        active, peak = [0], [0]
+
+        with patch.object(upscaler, "upscale_image", _fake_upscale(delays, active, peak)):
+            order = [index async for index, _ in upscaler.upscale_stream(list(delays), scale_factor=2)]
+
+        assert sorted(order) == [0, 1, 2, 3, 4]
+        assert order[-1] == 0
+        assert peak[0] == 3
+
+
+class _StatefulESRGANer:
+    """RealESRGANer stand-in that, like the real one, keeps the call's input on the instance"""
+
+    def __init__(self):
+        self.active = 0
+        self.overlapped = False
+
+    def enhance(self, img, outscale=4):
+        self.img = img
+        self.active += 1
+        self.overlapped = self.overlapped or self.active > 1
+        time.sleep(0.02)
+        output = np.repeat(np.repeat(self.img, outscale, axis=0), outscale, axis=1)
+        self.active -= 1
+        return output, None
+
+
+class TestSharedRealESRGAN:
+    """Test cases for batch workers sharing one cached RealESRGANer"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_images_get_their_own_pixels(self, upscaler):
+        model = _StatefulESRGANer()
+        upscaler._realesrgan_model = model
+
+        async def upscale_image(image_url, scale_factor, model_name, output_format, quality):
+            value = int(image_url)
+            result = await upscaler.upscale_array(np.full((8, 8, 3), value, dtype=np.uint8), scale_factor, model_name)
+            return {"success": result["success"], "values": np.unique(result["image"]).tolist(), "expected": value}
+
+        with patch.object(upscaler_module, "REALESRGAN_AVAILABLE", True), \
+             patch.object(upscaler, "upscale_image", upscale_image):
+            results = [result async for _, result in upscaler.upscale_stream(["10", "20", "30", "40", "50", "60"], scale_factor=4)]
+
+        assert all(result["success"] for result in results)
+        assert all(result["values"] == [result["expected"]] for result in results)
+        assert model.overlapped is False
+
+
+class TestBatchThroughput:
+    """Test cases for batch_throughput"""
+
+    def test_counts_and_rates(self):
+        results = [
+            {"success": True, "width": 2000, "height": 1000},
+            {"success": True, "width": 1000, "height": 1000},
+            {"success": False, "error": "x"}
+        ]
+
+        summary = batch_throughput(results, 2.0)
+
+        assert summary["total_processed"] == 2
+        assert summary["total_failed"] == 1
+        assert summary["images_per_second"] == 1.0
+        assert summary["megapixels_per_second"] == 1.5
+
+
+class TestBatchStreamEndpoint:
+    """Test cases for POST /upscale/batch/stream"""
+
+    def test_streams_ndjson_with_summary(self, client):
+        """Each result is one line, followed by a summary line; failures are reported per item"""
+        import src.api.upscaling as upscaling_api
+
+        delays = {"https://example.com/a.png": 0.01, "bad": 0.01}
+        with patch.object(upscaling_api.upscaler, "upscale_image", _fake_upscale(delays, [0], [0])), \
+             patch.object(upscaling_api.InputValidator, "validate_image_url"):
+            response = client.post("/api/v1/upscale/batch/stream", json={"image_urls": list(delays), "scale_factor": 2})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["result", "result", "summary"]
+        by_url = {line["original_url"]: line for line in lines[:2]}
+        assert by_url["bad"]["success"] is False
+        assert by_url["https://example.com/a.png"]["upscaled_url"] == "https://cdn/https://example.com/a.png"
+        assert lines[-1]["total_processed"] == 1
+        assert lines[-1]["total_failed"] == 1
+        assert lines[-1]["images_per_second"] > 0
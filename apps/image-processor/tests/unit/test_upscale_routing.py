@@ -0,0 +1,76 @@
+"""
+Unit tests for model="auto" upscale routing
+"""
+
+import cv2
+import numpy as np
+import pytest
+from src.services.upscale_routing import classify, extract_features, route
+
+
+def _logo():
+    """Flat two-colour logo on a transparent background"""
+    image = np.zeros((300, 400, 4), dtype=np.uint8)
+    cv2.rectangle(image, (50, 50), (350, 250), (20, 120, 220, 255), -1)
+    cv2.circle(image, (200, 150), 60, (255, 255, 255, 255), -1)
+    return image
+
+
+def _photo():
+    """Noisy continuous-tone image"""
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 200, 400, dtype=np.float32)[None, :, None]
+    return np.clip(gradient + rng.normal(0, 25, (300, 400, 3)), 0, 255).astype(np.uint8)
+
+
+class TestRouting:
+    """Test cases for feature extraction and routing"""
+
+    def test_flat_logo_takes_the_cheap_path(self):
+        features = extract_features(_logo())
+
+        assert classify(features) == "flat"
+        decision = route(features, "standard", gan_model="realesrgan-onnx")
+        assert decision["model"] == "opencv-edge"
+        assert decision["estimated_saving"] > 0.9
+
+    def test_photo_gets_the_gan(self):
+        features = extract_features(_photo())
+
+        assert classify(features) == "photo"
+        assert route(features, "standard", gan_model="realesrgan-onnx")["model"] == "realesrgan-onnx"
+
+    def test_draft_target_is_plain_interpolation(self):
+        assert route(extract_features(_photo()), "draft")["model"] == "opencv"
+
+    def test_features_ignore_transparent_pixels(self):
+        """A mostly transparent canvas doesn't dilute the colour statistics"""
+        features = extract_features(_logo())
+
+        assert features["colors_95"] <= 3
+
+
+class TestAutoModel:
+    """Test cases for model="auto" in ImageUpscaler"""
+
+    @pytest.mark.asyncio
+    async def test_auto_dispatches_and_records_decision(self, upscaler):
+        stats = {}
+
+        output, model_used = await upscaler._run_model(_logo(), 2, "auto", stats)
+
+        assert output.shape == (600, 800, 4)
+        assert model_used == "opencv-edge"
+        assert stats["routing"]["category"] == "flat"
+        assert upscaler._routing_counts == {"opencv-edge": 1}
+
+    def test_gan_tier_degrades_without_models(self, upscaler):
+        """With no GAN weights on disk, the GAN tier uses the edge-preserving path"""
+        assert upscaler._gan_model_for_auto() == "opencv-edge"
+
+    @pytest.mark.asyncio
+    async def test_auto_listed_with_decision_counts(self, upscaler):
+        await upscaler._run_model(_logo(), 2, "auto", {})
+
+        auto = next(m for m in upscaler.available_models() if m["name"] == "auto")
+        assert auto["decisions"] == {"opencv-edge": 1}
@@ -0,0 +1,123 @@
+"""
+Unit tests for the output megapixel budget and stripe-by-stripe PNG/TIFF encoding
+"""
+
+import io
+import base64
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from PIL import Image
+from src.services import upscaler as upscaler_module
+from src.services.upscaler import _resample_rows
+from src.services.render_cache import render_cache
+from src.utils.striped_encoder import open_stripe_writer
+
+
+def _noise(height, width, channels):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (height, width, channels), dtype=np.uint8)
+
+
+def _bands(image, rows):
+    return (image[y:y + rows] for y in range(0, image.shape[0], rows))
+
+
+def _data_url(size=(40, 30)):
+    buffer = io.BytesIO()
+    Image.fromarray(_noise(size[1], size[0], 4), "RGBA").save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+class TestStripeWriters:
+    """Test cases for the incremental PNG/TIFF writers"""
+
+    @pytest.mark.parametrize("output_format", ["png", "tiff"])
+    @pytest.mark.parametrize("channels", [3, 4])
+    def test_round_trip(self, output_format, channels):
+        """Rows written in uneven bands decode to the same pixels (BGR in, RGB in the file)"""
+        image = _noise(150, 97, channels)
+        buffer = io.BytesIO()
+        writer = open_stripe_writer(output_format, buffer, 97, 150, channels)
+        for rows in _bands(image, 37):
+            writer.write_rows(rows)
+        writer.close()
+
+        decoded = np.array(Image.open(io.BytesIO(buffer.getvalue())))
+        expected = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA if channels == 4 else cv2.COLOR_BGR2RGB)
+        assert np.array_equal(decoded, expected)
+
+    def test_incomplete_image_is_an_error(self):
+        writer = open_stripe_writer("png", io.BytesIO(), 10, 10, 3)
+        writer.write_rows(_noise(5, 10, 3))
+
+        with pytest.raises(ValueError, match="incomplete"):
+            writer.close()
+
+
+class TestResampleRows:
+    """Test cases for _resample_rows"""
+
+    @pytest.mark.parametrize("size,interpolation", [
+        ((140, 180), cv2.INTER_CUBIC),
+        ((87, 112), cv2.INTER_CUBIC),
+        ((35, 45), cv2.INTER_AREA),
+        ((52, 67), cv2.INTER_AREA),
+    ])
+    def test_matches_full_image_resize(self, size, interpolation, monkeypatch):
+        """Stripes from a band-by-band source are identical to one cv2.resize"""
+        monkeypatch.setattr(upscaler_module, "STREAM_STRIPE_BYTES", 3000)
+        image = _noise(90, 70, 3)
+
+        striped = np.concatenate(list(_resample_rows(_bands(image, 13), 90, size[0], size[1], interpolation)))
+
+        assert np.array_equal(striped, cv2.resize(image, size, interpolation=interpolation))
+
+
+class TestStreamedUpscale:
+    """Test cases for the budget check and the streamed upscale_image path"""
+
+    @pytest.mark.asyncio
+    async def test_oversized_output_rejected_before_decoding(self, upscaler):
+        upscaler.max_output_megapixels = 0.01
+
+        with patch.object(upscaler, "_load_image") as load:
+            result = await upscaler.upscale_image(_data_url(), scale_factor=4, model="opencv")
+
+        assert result["success"] is False
+        assert "Output too large" in result["error"]
+        load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_large_png_is_streamed_and_matches_in_memory_output(self, upscaler, monkeypatch):
+        """Above the threshold the output is encoded in stripes with the same pixels"""
+        from src.storage import storage
+
+        monkeypatch.setattr(upscaler_module, "STREAM_STRIPE_BYTES", 4000)
+        upscaler.stream_encode_megapixels = 0
+        render_cache.purge()
+        upload = AsyncMock(return_value=MagicMock(public_url="https://cdn/up.png", file_size=1))
+        with patch.object(storage, "upload_file", upload):
+            result = await upscaler.upscale_image(_data_url(), scale_factor=3, model="opencv-edge")
+        render_cache.purge()
+
+        assert result["success"] is True
+        assert result["streamed_encode"]["stripes"] > 1
+        decoded = np.array(Image.open(io.BytesIO(upload.call_args.kwargs["file_data"])))
+        source = cv2.cvtColor(np.array(Image.open(io.BytesIO(base64.b64decode(_data_url().split(",")[1])))), cv2.COLOR_RGBA2BGRA)
+        expected = cv2.cvtColor(upscaler._upscale_edge_preserving(source, 3), cv2.COLOR_BGRA2RGBA)
+        assert np.array_equal(decoded, expected)
+
+    def test_tiled_model_output_arrives_one_tile_row_at_a_time(self, upscaler):
+        """With a small memory budget no band is taller than one row of tiles"""
+        upscaler.memory_budget_mb = 1
+        image = _noise(300, 200, 3)
+        enhance = lambda patch: cv2.resize(patch, (patch.shape[1] * 2, patch.shape[0] * 2), interpolation=cv2.INTER_NEAREST)
+        stats = {}
+
+        bands = list(upscaler._iter_enhanced_rows(image, stats, enhance=enhance, out_scale=2))
+
+        assert len(bands) > 1
+        assert max(band.shape[0] for band in bands) <= stats["tiling"]["tile_size"] * 2
+        assert np.array_equal(np.concatenate(bands), cv2.resize(image, (400, 600), interpolation=cv2.INTER_NEAREST))
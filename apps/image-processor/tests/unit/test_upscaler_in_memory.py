@@ -0,0 +1,76 @@
+"""
+Unit tests for the zero-disk upscale path in ImageUpscaler
+"""
+
+import io
+import os
+import base64
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from PIL import Image
+from src.services.render_cache import render_cache
+
+
+def _data_url(mode="RGBA"):
+    buffer = io.BytesIO()
+    Image.new(mode, (16, 12), (10, 20, 30, 255)[:len(mode)]).save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+class TestInMemoryUpscale:
+    """Test cases for upscale_image without a filesystem round trip"""
+
+    @pytest.mark.asyncio
+    async def test_uploads_memoryview_without_writing_files(self, upscaler):
+        """The encoded image goes to storage as a memoryview and nothing lands in OUTPUT_DIR"""
+        from src.storage import storage
+
+        render_cache.purge()
+        upload = AsyncMock(return_value=MagicMock(public_url="https://cdn/up.png", file_size=123))
+        with patch.object(storage, "upload_file", upload):
+            result = await upscaler.upscale_image(_data_url(), scale_factor=2, model="opencv")
+        render_cache.purge()
+
+        assert result["success"] is True
+        assert result["upscaled_path"] == "https://cdn/up.png"
+        kwargs = upload.call_args.kwargs
+        assert isinstance(kwargs["file_data"], memoryview)
+        assert kwargs["content_type"] == "image/png"
+        assert Image.open(io.BytesIO(kwargs["file_data"])).size == (32, 24)
+        assert os.listdir(upscaler.output_dir) == []
+
+    def test_jpeg_content_type_and_flattening(self, upscaler):
+        """JPEG output flattens alpha and reports image/jpeg"""
+        bgra = np.zeros((8, 8, 4), dtype=np.uint8)
+
+        buffer, content_type = upscaler._encode_image(bgra, "jpg", 90)
+
+        assert content_type == "image/jpeg"
+        assert Image.open(buffer).mode == "RGB"
+
+
+class TestUpscaleArray:
+    """Test cases for the ndarray-in, ndarray-out path"""
+
+    @pytest.mark.asyncio
+    async def test_returns_array_without_encoding(self, upscaler):
+        """Chained callers get the upscaled array back and nothing is encoded"""
+        image = np.full((10, 12, 4), 128, dtype=np.uint8)
+
+        with patch.object(upscaler, "_encode_image") as encode:
+            result = await upscaler.upscale_array(image, scale_factor=2, model="opencv")
+
+        assert result["success"] is True
+        assert result["image"].shape == (20, 24, 4)
+        assert result["model_used"] == "opencv"
+        assert encode.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_model_falls_back_to_opencv(self, upscaler):
+        """Fallback behaviour matches upscale_image"""
+        result = await upscaler.upscale_array(np.zeros((4, 4, 3), dtype=np.uint8), scale_factor=3, model="nope")
+
+        assert result["success"] is True
+        assert result["model_used"] == "opencv"
+        assert result["image"].shape == (12, 12, 3)
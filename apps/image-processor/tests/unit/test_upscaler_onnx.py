@@ -0,0 +1,99 @@
+"""
+Unit tests for the ONNX Runtime upscaling backend
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from src.services import upscaler as upscaler_module
+
+
+class _FakeSession:
+    """Stand-in for ort.InferenceSession: nearest-neighbour 4x on NCHW float input"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_inputs(self):
+        return [MagicMock(name="input")]
+
+    def run(self, output_names, feeds):
+        self.calls += 1
+        tensor = next(iter(feeds.values()))
+        return [tensor.repeat(4, axis=2).repeat(4, axis=3)]
+
+
+@pytest.fixture
+def upscaler(upscaler):
+    upscaler._onnx_session = _FakeSession()
+    return upscaler
+
+
+class TestOnnxBackend:
+    """Test cases for model="realesrgan-onnx" """
+
+    def test_enhance_preserves_colour_order_and_alpha(self, upscaler):
+        """BGR channels survive the RGB/NCHW round trip and alpha is carried through"""
+        image = np.zeros((4, 5, 4), dtype=np.uint8)
+        image[..., 0], image[..., 1], image[..., 2], image[..., 3] = 10, 120, 250, 77
+
+        output = upscaler._onnx_enhance(image)
+
+        assert output.shape == (16, 20, 4)
+        assert tuple(output[3, 7]) == (10, 120, 250, 77)
+
+    @pytest.mark.asyncio
+    async def test_run_model_reports_onnx_and_records_speed(self, upscaler):
+        """The ONNX backend is used when selected and its speed shows up in available_models"""
+        with patch.object(upscaler_module, "ONNXRUNTIME_AVAILABLE", True):
+            output, model_used = await upscaler._run_model(
+                np.full((8, 8, 3), 90, dtype=np.uint8), 4, "realesrgan-onnx", {}
+            )
+
+        assert model_used == "realesrgan-onnx"
+        assert output.shape == (32, 32, 3)
+        listed = {m["name"]: m for m in upscaler.available_models()}
+        assert listed["realesrgan-onnx"]["measured"]["runs"] == 1
+        assert listed["realesrgan-onnx"]["measured"]["megapixels_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_non_native_scale_is_resampled(self, upscaler):
+        with patch.object(upscaler_module, "ONNXRUNTIME_AVAILABLE", True):
+            output = await upscaler._upscale_onnx(np.zeros((6, 6, 3), dtype=np.uint8), 2)
+
+        assert output.shape == (12, 12, 3)
+
+    @pytest.mark.asyncio
+    async def test_missing_runtime_falls_back_to_opencv(self, upscaler):
+        """Without ONNX Runtime the response names the model actually used"""
+        upscaler._onnx_session = None
+        with patch.object(upscaler_module, "ONNXRUNTIME_AVAILABLE", False):
+            _, model_used = await upscaler._run_model(np.zeros((4, 4, 3), dtype=np.uint8), 2, "realesrgan-onnx", {})
+
+        assert model_used == "opencv"
+
+    def test_int8_quantizes_once(self, upscaler, tmp_path):
+        """REALESRGAN_ONNX_INT8 points the session at a quantized copy, creating it if missing"""
+        upscaler.onnx_int8 = True
+        upscaler.onnx_model_path = str(tmp_path / "model.onnx")
+        quantization = MagicMock()
+
+        with patch.dict("sys.modules", {"onnxruntime.quantization": quantization}):
+            path = upscaler._onnx_model_file()
+
+        assert path == str(tmp_path / "model.int8.onnx")
+        quantization.quantize_dynamic.assert_called_once()
+
+
+class TestUpscaleModelsEndpoint:
+    def test_lists_onnx_backend(self, client):
+        response = client.get("/api/v1/upscale/models")
+
+        assert response.status_code == 200
+        names = [m["name"] for m in response.json()["models"]]
+        assert "realesrgan-onnx" in names
+
+    def test_unknown_model_rejected(self, client):
+        response = client.post("/api/v1/upscale/jobs", json={"image_url": "https://example.com/a.png", "model": "bogus"})
+
+        assert response.status_code == 400
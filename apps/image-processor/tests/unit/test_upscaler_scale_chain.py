@@ -0,0 +1,92 @@
+"""
+Unit tests for native multi-scale (x2/x4) upscale chains
+"""
+
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from src.services.upscaler import plan_scale_chain
+
+
+def _nearest(k):
+    """Stand-in for a native-scale model"""
+    calls = []
+
+    def enhance(patch):
+        calls.append(patch.shape)
+        return cv2.resize(patch, (patch.shape[1] * k, patch.shape[0] * k), interpolation=cv2.INTER_NEAREST)
+
+    enhance.calls = calls
+    return enhance
+
+
+class TestPlanScaleChain:
+    """Test cases for plan_scale_chain"""
+
+    def test_exact_native_scales(self):
+        """Factors the models hit exactly need no resample"""
+        assert plan_scale_chain(2, [2, 4])["steps"] == [2]
+        assert plan_scale_chain(4, [2, 4])["steps"] == [4]
+        eight = plan_scale_chain(8, [2, 4])
+        assert eight["steps"] == [2, 4]
+        assert eight["resample"] == 1.0
+
+    def test_cheap_pass_runs_first(self):
+        """The x2 pass runs on the small image, before the x4 pass"""
+        assert plan_scale_chain(8, [2, 4])["estimated_cost"] < plan_scale_chain(8, [4], max_cost=100)["estimated_cost"]
+
+    def test_small_factor_without_x2_overshoots_and_downsamples(self):
+        """With only x4, 2x is a 4x pass plus area downsample rather than bicubic"""
+        chain = plan_scale_chain(2, [4])
+
+        assert chain["steps"] == [4]
+        assert chain["resample"] == 0.5
+
+    def test_residual_upsample_is_bounded(self):
+        """A short chain is only topped up by a small cubic resample"""
+        assert plan_scale_chain(5, [2, 4])["steps"] == [4]
+        assert plan_scale_chain(6, [2, 4])["steps"] == [2, 4]
+
+    def test_cost_cap_avoids_runaway_chains(self):
+        """x4 then x4 again for 8x is over budget; the cheaper chain is used with a larger resample"""
+        chain = plan_scale_chain(8, [4])
+
+        assert chain["steps"] == [4]
+        assert chain["resample"] == 2.0
+
+
+class TestUpscaleChain:
+    """Test cases for ImageUpscaler._upscale_chain"""
+
+    def test_chain_runs_each_native_pass_and_reports(self, upscaler):
+        x2, x4 = _nearest(2), _nearest(4)
+        stats = {}
+
+        output = upscaler._upscale_chain(np.zeros((10, 12, 3), dtype=np.uint8), 8, {2: x2, 4: x4}, stats)
+
+        assert output.shape == (80, 96, 3)
+        assert x2.calls == [(10, 12, 3)]
+        assert x4.calls == [(20, 24, 3)]
+        assert stats["chain"]["steps"] == [2, 4]
+        assert len(stats["chain"]["step_times_ms"]) == 2
+        assert stats["tiling"]["tiles"] == 1
+
+    def test_final_resample_hits_target_size(self, upscaler):
+        output = upscaler._upscale_chain(np.zeros((10, 10, 4), dtype=np.uint8), 3, {4: _nearest(4)}, {})
+
+        assert output.shape == (30, 30, 4)
+
+    @pytest.mark.asyncio
+    async def test_realesrgan_scale_2_no_longer_bicubic(self, upscaler, monkeypatch):
+        """Scale 2 goes through the model (x4 then downsample) instead of straight OpenCV"""
+        model = MagicMock()
+        model.enhance.side_effect = lambda patch, outscale=4: (_nearest(4)(patch), None)
+        monkeypatch.setattr(upscaler, "_realesrgan_enhancers", lambda: {4: lambda p: model.enhance(p, outscale=4)[0]})
+        stats = {}
+
+        output = await upscaler._upscale_realesrgan(np.zeros((8, 8, 3), dtype=np.uint8), 2, stats)
+
+        assert output.shape == (16, 16, 3)
+        assert model.enhance.call_count == 1
+        assert stats["chain"]["steps"] == [4]
@@ -0,0 +1,143 @@
+"""
+Unit tests for flat-colour logo vectorization
+"""
+
+import io
+import threading
+import cv2
+import numpy as np
+import pytest
+import xml.etree.ElementTree as ET
+from unittest.mock import patch, AsyncMock, MagicMock
+from PIL import Image
+from src.services.vectorizer import LogoVectorizer, contour_to_path, quantize_to_palette
+
+
+def _logo_png(background=None):
+    """Orange square with a white disc and a blue triangle, on transparency or a solid background"""
+    image = np.zeros((300, 400, 4), dtype=np.uint8)
+    if background is not None:
+        image[:] = background + (255,)
+    cv2.rectangle(image, (50, 50), (350, 250), (20, 120, 220, 255), -1)
+    cv2.circle(image, (200, 150), 60, (255, 255, 255, 255), -1, cv2.LINE_8)
+    cv2.fillPoly(image, [np.array([[70, 230], [130, 230], [100, 180]])], (200, 0, 0, 255), cv2.LINE_8)
+    buffer = io.BytesIO()
+    Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA), "RGBA").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _paths(svg):
+    root = ET.fromstring(svg)
+    return root, [(path.get("fill"), path.get("d")) for path in root.iter("{http://www.w3.org/2000/svg}path")]
+
+
+class TestTracingPrimitives:
+    """Test cases for palette quantization and contour paths"""
+
+    def test_quantize_picks_nearest_palette_colour(self):
+        rgb = np.array([[[250, 250, 250], [10, 10, 40], [200, 30, 30]]], dtype=np.uint8)
+
+        labels = quantize_to_palette(rgb, [(0, 0, 0), (255, 255, 255), (220, 20, 20)])
+
+        assert labels.tolist() == [[1, 0, 2]]
+
+    def test_rectangle_keeps_sharp_corners(self):
+        mask = np.zeros((40, 40), dtype=np.uint8)
+        mask[10:30, 5:35] = 1
+        contours, _ = cv2.findContours(mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE)
+
+        path = contour_to_path(contours[0], corner_threshold=60)
+
+        assert "C" not in path
+        assert path.count("L") == 4
+
+    def test_circle_is_smoothed_and_threshold_is_tunable(self):
+        mask = np.zeros((100, 100), dtype=np.uint8)
+        cv2.circle(mask, (50, 50), 40, 1, -1, cv2.LINE_8)
+        contours, _ = cv2.findContours(mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE)
+
+        smooth = contour_to_path(contours[0], corner_threshold=60, smoothness=1.0)
+        sharp = contour_to_path(contours[0], corner_threshold=0, smoothness=1.0)
+
+        assert "C" in smooth and "L" not in smooth
+        assert "C" not in sharp
+        assert len(contour_to_path(contours[0], smoothness=4.0)) < len(smooth)
+
+
+class TestLogoVectorizer:
+    """Test cases for LogoVectorizer"""
+
+    def test_trace_uses_color_analysis_palette_as_stacked_layers(self):
+        traced = LogoVectorizer().trace(_logo_png())
+
+        root, paths = _paths(traced["svg"])
+        assert root.get("viewBox") == "0 0 400 300"
+        # Largest area at the bottom
+        assert [fill for fill, _ in paths] == ["#DC7814", "#FFFFFF", "#0000C8"]
+        assert traced["palette"] == ["#DC7814", "#FFFFFF", "#0000C8"]
+        assert all(d.startswith("M") and d.endswith("Z") for _, d in paths)
+
+    def test_remove_background(self):
+        traced = LogoVectorizer().trace(_logo_png(background=(255, 255, 255)), remove_background=True)
+
+        # The white disc shares the background colour, so only orange and blue remain
+        assert traced["palette"] == ["#DC7814", "#0000C8"]
+
+    def test_large_inputs_traced_at_max_edge_but_keep_their_size(self):
+        vectorizer = LogoVectorizer()
+        vectorizer.max_edge = 200
+
+        traced = vectorizer.trace(_logo_png())
+
+        root, _ = _paths(traced["svg"])
+        assert root.get("viewBox") == "0 0 200 150"
+        assert (root.get("width"), root.get("height")) == ("400", "300")
+
+
+class TestVectorizeEndpoint:
+    """Test cases for POST /upscale/vectorize"""
+
+    def test_uploads_svg(self, client):
+        import src.api.upscaling as upscaling_api
+        from src.services.upscaler import upscaler
+        from src.storage import storage
+
+        upload = AsyncMock(return_value=MagicMock(public_url="https://cdn/logo.svg", file_size=1))
+        with patch.object(upscaler, "_download_image", AsyncMock(return_value=_logo_png())), \
+             patch.object(storage, "upload_file", upload), \
+             patch.object(upscaling_api.InputValidator, "validate_image_url"):
+            response = client.post("/api/v1/upscale/vectorize", json={"image_url": "https://example.com/logo.png"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["success"] is True
+        assert body["svg_url"] == "https://cdn/logo.svg"
+        assert upload.call_args.kwargs["content_type"] == "image/svg+xml"
+        assert upload.call_args.kwargs["file_data"].startswith(b"<svg")
+
+    @pytest.mark.asyncio
+    async def test_tracing_runs_off_the_event_loop(self):
+        from src.services.upscaler import upscaler
+        from src.storage import storage
+
+        vectorizer = LogoVectorizer()
+        trace = vectorizer.trace
+        threads = []
+
+        def traced_in_thread(*args):
+            threads.append(threading.get_ident())
+            return trace(*args)
+
+        upload = AsyncMock(return_value=MagicMock(public_url="https://cdn/logo.svg", file_size=1))
+        with patch.object(upscaler, "_download_image", AsyncMock(return_value=_logo_png())), \
+             patch.object(storage, "upload_file", upload), \
+             patch.object(vectorizer, "trace", side_effect=traced_in_thread):
+            result = await vectorizer.vectorize_image("https://example.com/logo.png")
+
+        assert result["success"] is True
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_rejects_out_of_range_thresholds(self, client):
+        response = client.post("/api/v1/upscale/vectorize", json={"image_url": "https://example.com/a.png", "corner_threshold": 500})
+
+        assert response.status_code == 422